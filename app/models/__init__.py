@@ -70,7 +70,10 @@ from app.models.scenario_participant import ScenarioParticipant
 from app.models.participant import Participant
 
 # Pipeline automation models (added 2025-11-30)
-from app.models.pipeline_run import PipelineRun, PipelineQueue, PIPELINE_STATUS
+from app.models.pipeline_run import PipelineRun, PipelineRunSpan, PipelineQueue, PIPELINE_STATUS
+
+# LLM token/cost accounting
+from app.models.llm_usage import LLMUsageRecord
 
 # Document sections with embeddings
 from app.models.document_section import DocumentSection
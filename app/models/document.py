@@ -190,6 +190,14 @@ class DocumentChunk(db.Model):
     
     # Define relationship to document
     document = db.relationship('Document', backref='chunks')
+
+    __table_args__ = (
+        # ANN index for USE_DB_VECTOR_SEARCH (cosine distance, <=>)
+        db.Index('ix_document_chunks_embedding_384_hnsw', 'embedding_384',
+                 postgresql_using='hnsw',
+                 postgresql_with={'m': 16, 'ef_construction': 64},
+                 postgresql_ops={'embedding_384': 'vector_cosine_ops'}),
+    )
     
     def __repr__(self):
         return f"<DocumentChunk {self.id}: {self.document_id}:{self.chunk_index}>"
@@ -1,7 +1,8 @@
 from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Text, DateTime
-from sqlalchemy.dialects.postgresql import JSONB, ARRAY
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.models import db
+from app.models.pgvector import Vector
 from sqlalchemy import func
 import datetime
 from sqlalchemy.ext.hybrid import hybrid_property
@@ -27,10 +28,11 @@ class EntityTriple(db.Model):
     predicate_label = db.Column(String(255))  # Human readable label for predicate
     object_label = db.Column(String(255))  # Human readable label for object
     
-    # Vector embeddings for semantic similarity searches
-    subject_embedding = db.Column(ARRAY(db.Float), nullable=True)
-    predicate_embedding = db.Column(ARRAY(db.Float), nullable=True)
-    object_embedding = db.Column(ARRAY(db.Float), nullable=True)
+    # Vector embeddings for semantic similarity searches (local 384-dim model).
+    # Existing databases: scripts/migrations/alter_entity_triples_embeddings_to_vector.sql
+    subject_embedding = db.Column(Vector(384), nullable=True)
+    predicate_embedding = db.Column(Vector(384), nullable=True)
+    object_embedding = db.Column(Vector(384), nullable=True)
     
     # Additional metadata for the triple
     triple_metadata = db.Column(JSONB, default=dict)
@@ -77,6 +79,15 @@ class EntityTriple(db.Model):
     scenario = relationship("Scenario", back_populates="entity_triples", foreign_keys=[scenario_id])
     character = relationship("Character", foreign_keys=[character_id])
     guideline = relationship("Guideline", back_populates="entity_triples", foreign_keys=[guideline_id])
+
+    __table_args__ = tuple(
+        # ANN indexes for EmbeddingService.find_similar_triples (cosine distance, <=>)
+        db.Index(f'ix_entity_triples_{column}_hnsw', column,
+                 postgresql_using='hnsw',
+                 postgresql_with={'m': 16, 'ef_construction': 64},
+                 postgresql_ops={column: 'vector_cosine_ops'})
+        for column in ('subject_embedding', 'predicate_embedding', 'object_embedding')
+    )
     
     def __repr__(self):
         return f'<EntityTriple {self.subject} {self.predicate} {self.object_literal or self.object_uri}>'
@@ -0,0 +1,49 @@
+"""
+LLM usage records.
+
+One row per Anthropic API call, written in batches by
+``app.utils.llm_usage``. Tokens are split the way the API reports them:
+``input_tokens`` excludes prompt-cache reads and writes, which are counted
+in ``cache_read_tokens`` / ``cache_write_tokens``.
+"""
+
+from datetime import datetime
+
+from app.models import db
+
+
+class LLMUsageRecord(db.Model):
+    """Tokens, cost and latency of a single LLM call, tagged with where it came from."""
+    # Existing databases: scripts/migrations/create_llm_usage_records.sql
+    __tablename__ = 'llm_usage_records'
+
+    id = db.Column(db.BigInteger, primary_key=True)
+    called_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    # Where the call came from
+    run_id = db.Column(db.Integer, db.ForeignKey('pipeline_runs.id', ondelete='SET NULL'), index=True)
+    case_id = db.Column(db.Integer, index=True)
+    step = db.Column(db.String(100))
+    concept = db.Column(db.String(100))
+    section_type = db.Column(db.String(50))
+    span_name = db.Column(db.String(200))
+    source = db.Column(db.String(20))  # create / stream / gateway
+
+    # What it cost
+    model = db.Column(db.String(100))
+    input_tokens = db.Column(db.Integer, default=0)
+    output_tokens = db.Column(db.Integer, default=0)
+    cache_read_tokens = db.Column(db.Integer, default=0)
+    cache_write_tokens = db.Column(db.Integer, default=0)
+    cost_usd = db.Column(db.Float, default=0.0)
+    latency_seconds = db.Column(db.Float)
+    queue_seconds = db.Column(db.Float)
+    error = db.Column(db.Boolean, default=False)
+
+    __table_args__ = (
+        db.Index('ix_llm_usage_records_case_called', 'case_id', 'called_at'),
+    )
+
+    def __repr__(self):
+        return (f'<LLMUsageRecord {self.id} {self.model} in={self.input_tokens} '
+                f'out={self.output_tokens} case={self.case_id}>')
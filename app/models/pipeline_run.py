@@ -169,6 +169,47 @@ class PipelineRun(db.Model):
         }
 
 
+class PipelineRunSpan(db.Model):
+    """
+    Timing breakdown of one task execution within a pipeline run.
+
+    Written by ``app.utils.pipeline_spans.record_run``: ``spans`` is the span
+    tree (name, start offset and duration in seconds, attrs, counters, children)
+    and ``totals`` sums the counters (LLM calls and tokens, bytes written, ...)
+    over the whole tree. A run that executes several tasks (steps, substeps,
+    commits) has one row per task.
+    """
+    # Existing databases: scripts/migrations/create_pipeline_run_spans.sql
+    __tablename__ = 'pipeline_run_spans'
+
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey('pipeline_runs.id', ondelete='CASCADE'),
+                       nullable=False, index=True)
+    name = db.Column(db.String(100), nullable=False)
+    started_at = db.Column(db.DateTime)
+    duration_seconds = db.Column(db.Float)
+    totals = db.Column(JSONB, default=dict)
+    spans = db.Column(JSONB, default=dict)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    run = db.relationship('PipelineRun', backref=db.backref(
+        'timing_spans', lazy='dynamic', passive_deletes=True))
+
+    def __repr__(self):
+        return f'<PipelineRunSpan {self.id} run={self.run_id} {self.name} {self.duration_seconds:.1f}s>'
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'run_id': self.run_id,
+            'name': self.name,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'duration_seconds': self.duration_seconds,
+            'totals': self.totals or {},
+            'spans': self.spans or {},
+        }
+
+
 class PipelineQueue(db.Model):
     """
     Queue for batch processing of cases.
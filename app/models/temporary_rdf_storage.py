@@ -13,11 +13,14 @@ Draft/Publish Workflow (2025-12-10):
 import hashlib
 import logging
 from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.dialects.postgresql import JSONB, array
+
 from app.models import db
 
 logger = logging.getLogger(__name__)
 
-
 class TemporaryRDFStorage(db.Model):
     """
     Store temporary RDF triples for review before committing to ontologies.
@@ -41,7 +44,7 @@ class TemporaryRDFStorage(db.Model):
 
     # RDF content
     rdf_turtle = db.Column(db.Text)  # Turtle serialization of the RDF graph
-    rdf_json_ld = db.Column(db.JSON)  # JSON-LD representation for easier manipulation
+    rdf_json_ld = db.Column(JSONB)  # JSON-LD representation for easier manipulation
 
     # Extracted entity information for display
     entity_label = db.Column(db.String(255), index=True)
@@ -74,7 +77,7 @@ class TemporaryRDFStorage(db.Model):
     available_to_role = db.Column(db.String(200))  # Which role has access (for case context)
 
     # PROV-O Provenance Metadata (Added 2025-10-12)
-    provenance_metadata = db.Column(db.JSON)  # Provenance tracking (activity_id, section_type, match_reasoning, etc.)
+    provenance_metadata = db.Column(JSONB)  # Provenance tracking (activity_id, section_type, match_reasoning, etc.)
 
     # OntServe Class Matching (Added 2025-12-01 for Entity-Ontology Linking)
     matched_ontology_uri = db.Column(db.String(500))  # URI of matched OntServe class
@@ -92,6 +95,20 @@ class TemporaryRDFStorage(db.Model):
     # Relationships
     case = db.relationship('Document', backref='temporary_rdf_entities', lazy=True)
 
+    # Existing databases: scripts/migrations/create_temporary_rdf_storage_indexes.sql
+    # and scripts/migrations/alter_temporary_rdf_storage_json_to_jsonb.sql
+    __table_args__ = (
+        # Per-case reads by extraction type (re-extraction clears, Step 4 views,
+        # QC audit, get_bulk_progress counts); covers case_id-only filters too
+        db.Index('ix_temporary_rdf_storage_case_extraction',
+                 'case_id', 'extraction_type', 'storage_type', 'is_published'),
+        # Draft lookups by entity type / exact label (rdf_storage_service dedup,
+        # reconciliation grouping); drafts only, published rows are never matched
+        db.Index('ix_temporary_rdf_storage_draft_type_label',
+                 'case_id', 'entity_type', 'entity_label',
+                 postgresql_where=db.text('is_published = false')),
+    )
+
     @staticmethod
     def compute_content_hash(uri: str, label: str = None, definition: str = None) -> str:
         """Compute SHA-256 content hash for entity version comparison.
@@ -187,6 +204,60 @@ class TemporaryRDFStorage(db.Model):
 
         return query.order_by(cls.created_at.desc()).all()
 
+    @classmethod
+    def rdf_type_contains(cls, fragment: str):
+        """SQL filter for rows whose JSON-LD ``@type`` contains ``fragment``.
+
+        Pushed-down form of the ``fragment in rdf.get('@type', '')`` test the
+        Step 3/4 readers apply. For a list-valued ``@type`` it matches the JSON
+        text, so it never drops a row the Python test would keep; callers that
+        care re-check the fetched ``@type``.
+        """
+        return cls.rdf_json_ld['@type'].astext.contains(fragment)
+
+    @classmethod
+    def typed_rdf_fields(
+        cls, case_id: int, extraction_type: str, type_fragment: str,
+        keys: Sequence[str], storage_type: Optional[str] = None
+    ) -> List[Tuple[Optional[str], Dict[str, Any]]]:
+        """[(entity_label, {key: value})] for rows whose ``@type`` contains ``type_fragment``.
+
+        Only the requested top-level JSON-LD keys are read (``@type`` always),
+        so the whole document is never loaded. Missing keys map to None.
+        """
+        keys = ['@type'] + [k for k in keys if k != '@type']
+        query = cls.query.filter_by(case_id=case_id, extraction_type=extraction_type)
+        if storage_type:
+            query = query.filter_by(storage_type=storage_type)
+        rows = (query
+                .filter(cls.rdf_type_contains(type_fragment))
+                .with_entities(cls.entity_label, *[cls.rdf_json_ld[k] for k in keys])
+                .order_by(cls.id)
+                .all())
+        return [(row[0], dict(zip(keys, row[1:]))) for row in rows]
+
+    @classmethod
+    def individual_properties(
+        cls, case_id: int, extraction_type: str, keys: Sequence[str]
+    ) -> List[Tuple[Optional[str], Dict[str, Any]]]:
+        """[(entity_label, {key: value})] for individuals carrying any of ``keys``
+        under ``rdf_json_ld['properties']``.
+
+        Rows without any of the keys are filtered in SQL; absent keys are
+        omitted from the returned dict.
+        """
+        keys = list(keys)
+        props = cls.rdf_json_ld['properties']
+        rows = (cls.query
+                .filter_by(case_id=case_id, extraction_type=extraction_type,
+                           storage_type='individual')
+                .filter(props.has_any(array(keys)))
+                .with_entities(cls.entity_label, *[props[k] for k in keys])
+                .order_by(cls.id)
+                .all())
+        return [(row[0], {k: v for k, v in zip(keys, row[1:]) if v is not None})
+                for row in rows]
+
     @classmethod
     def store_extraction_results(cls, case_id, extraction_session_id,
                                 extraction_type, rdf_data,
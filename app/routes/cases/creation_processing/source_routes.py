@@ -305,8 +305,7 @@ def register_creation_from_source(bp):
                 document.content = text
 
                 chunks = embedding_service._split_text(text)
-                embeddings = embedding_service.embed_documents(chunks)
-                embedding_service._store_chunks(document.id, chunks, embeddings)
+                embedding_service.ingest_chunks(document.id, chunks)
 
                 document.processing_status = PROCESSING_STATUS['COMPLETED']
                 document.processing_progress = 100
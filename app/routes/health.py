@@ -225,6 +225,9 @@ def services():
         'environment': current_app.config.get('ENVIRONMENT', 'unknown'),
     }
 
+    # Per-worker LLM client pool: limiter queue wait vs API latency
+    from app.utils.llm_client_pool import llm_pool_stats
+
     # Determine overall status
     all_up = all(c['status'] == 'up' for c in checks.values())
 
@@ -232,6 +235,7 @@ def services():
         'status': 'healthy' if all_up else 'degraded',
         'services': checks,
         'system': system_info,
+        'llm_pool': llm_pool_stats(),
         'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
     }), 200 if all_up else 503
 
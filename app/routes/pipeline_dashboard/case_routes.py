@@ -181,6 +181,13 @@ def register_case_routes(bp):
         })
 
 
+    @bp.route('/api/cases/<int:case_id>/usage', methods=['GET'])
+    def api_case_usage(case_id):
+        """LLM token/cost/latency rollup for a case across all its runs."""
+        from app.utils.llm_usage import usage_summary
+        return jsonify(usage_summary(case_id=case_id))
+
+
     @bp.route('/api/reprocess/<int:case_id>', methods=['POST'])
     def api_reprocess_case(case_id):
         """
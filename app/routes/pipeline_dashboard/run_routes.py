@@ -1,7 +1,7 @@
 """Pipeline run API (list/get/retry/cancel)."""
 from flask import Blueprint, render_template, jsonify, request
 from app.models import db
-from app.models.pipeline_run import PipelineRun, PipelineQueue, PIPELINE_STATUS
+from app.models.pipeline_run import PipelineRun, PipelineRunSpan, PipelineQueue, PIPELINE_STATUS
 from app.models.document import Document
 from app.services.pipeline_state_manager import PipelineStateManager
 from datetime import datetime
@@ -40,6 +40,31 @@ def register_run_routes(bp):
         return jsonify(run.to_dict())
 
 
+    @bp.route('/api/runs/<int:run_id>/timing', methods=['GET'])
+    def api_get_run_timing(run_id):
+        """Per-task span trees recorded for a run (see app.utils.pipeline_spans)."""
+        run = PipelineRun.query.get_or_404(run_id)
+        rows = run.timing_spans.order_by(PipelineRunSpan.started_at, PipelineRunSpan.id).all()
+        totals = {}
+        for row in rows:
+            for key, value in (row.totals or {}).items():
+                totals[key] = totals.get(key, 0) + value
+        return jsonify({
+            'run_id': run.id,
+            'tasks': [row.to_dict() for row in rows],
+            'recorded_seconds': sum(row.duration_seconds or 0 for row in rows),
+            'totals': totals,
+        })
+
+
+    @bp.route('/api/runs/<int:run_id>/usage', methods=['GET'])
+    def api_get_run_usage(run_id):
+        """LLM token/cost/latency rollup for a run (see app.utils.llm_usage)."""
+        from app.utils.llm_usage import usage_summary
+        run = PipelineRun.query.get_or_404(run_id)
+        return jsonify(usage_summary(run_id=run.id))
+
+
     @bp.route('/api/runs/<int:run_id>/retry', methods=['POST'])
     def api_retry_run(run_id):
         """Retry a failed pipeline run (resumes from failed step)."""
@@ -37,12 +37,12 @@ def _load_provision_map():
             return _provision_map
         mapping = {}
         try:
-            from rdflib import Graph, URIRef
+            from rdflib import URIRef
             from rdflib.namespace import RDFS, SKOS, DCTERMS
+            from app.services.entity.graph_store import load_ttl_graph
             from app.services.ontserve.ontserve_config import get_ontserve_base_path
             ttl_path = get_ontserve_base_path() / "ontologies" / "NSPE Code of Ethics.ttl"
-            g = Graph()
-            g.parse(str(ttl_path), format='turtle')
+            g = load_ttl_graph(ttl_path)
             for s, _, ident in g.triples((None, DCTERMS.identifier, None)):
                 entry = {
                     'label': str(next(g.objects(s, RDFS.label), '') or ''),
@@ -73,6 +73,8 @@ def register_reconciliation_routes(bp):
         existing_decisions = {}
         if existing_run:
             for d in existing_run.decisions:
+                if d.user_decision == 'auto_merge':
+                    continue  # exact-match merges are not review candidates
                 key = f"{d.entity_a_id}_{d.entity_b_id}"
                 existing_decisions[key] = {
                     'decision': d.user_decision,
@@ -158,6 +160,8 @@ def register_reconciliation_routes(bp):
                 )
                 db.session.add(decision)
 
+            # Undo snapshots of the exact-match merges, stored like reviewed merges
+            recon_service.record_auto_merges(reconciliation, run)
             db.session.commit()
 
             # Updated entity counts after merges
@@ -245,6 +249,10 @@ def register_reconciliation_routes(bp):
     def reconcile_unmerge(case_id):
         """Undo a merge by restoring both entities from pre-merge snapshots.
 
+        Accepts a reviewed pair ({'keep', 'merge'}) or an auto-merged
+        exact-match cluster ({'keep', 'merged': [...]}, see
+        EntityReconciliationService.record_auto_merges).
+
         Also clears the decision record and returns the original candidate data
         so the JS can rebuild the candidate row without a page reload.
         """
@@ -254,14 +262,18 @@ def register_reconciliation_routes(bp):
         entity_a_id = data.get('entity_a_id')
         entity_b_id = data.get('entity_b_id')
 
-        if not snapshots or 'keep' not in snapshots or 'merge' not in snapshots:
+        if not snapshots or 'keep' not in snapshots or not ('merge' in snapshots or 'merged' in snapshots):
             return jsonify({'success': False, 'error': 'Missing snapshots'}), 400
 
         from app.services.entity.entity_reconciliation_service import EntityReconciliationService
         from app.models.reconciliation_run import ReconciliationDecision
 
         service = EntityReconciliationService()
-        success = service.unmerge_entities(snapshots['keep'], snapshots['merge'])
+        if 'merged' in snapshots:
+            # an auto-merged exact-match cluster
+            success = service.unmerge_cluster(snapshots['keep'], snapshots['merged'])
+        else:
+            success = service.unmerge_entities(snapshots['keep'], snapshots['merge'])
 
         if success:
             # Clear the decision so the candidate appears as pending again
@@ -276,7 +288,11 @@ def register_reconciliation_routes(bp):
                                 ReconciliationDecision.entity_b_id == entity_a_id),
                     )
                 ).first()
-                if decision:
+                if decision and decision.user_decision == 'auto_merge':
+                    # An undone exact-match merge was never a review candidate
+                    db.session.delete(decision)
+                    db.session.commit()
+                elif decision:
                     # Return the original candidate data for row rebuild
                     candidate_data = {
                         'entity_a_id': decision.entity_a_id,
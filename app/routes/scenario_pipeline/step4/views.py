@@ -472,12 +472,15 @@ def register_view_routes(bp):
             except Exception as e:
                 logger.debug(f"Could not check embeddings for case {case_id}: {e}")
 
-            unpublished_count = TemporaryRDFStorage.query.filter_by(
-                case_id=case_id, is_published=False
-            ).count()
-            published_count = TemporaryRDFStorage.query.filter_by(
-                case_id=case_id, is_published=True
-            ).count()
+            # One grouped count instead of a query per publish state.
+            publish_counts = dict(
+                db.session.query(
+                    TemporaryRDFStorage.is_published, db.func.count(TemporaryRDFStorage.id)
+                ).filter(TemporaryRDFStorage.case_id == case_id)
+                .group_by(TemporaryRDFStorage.is_published).all()
+            )
+            unpublished_count = publish_counts.get(False, 0)
+            published_count = publish_counts.get(True, 0)
 
             # Load rich analysis data
             rich_analysis = None
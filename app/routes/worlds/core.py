@@ -442,9 +442,8 @@ def register_core_routes(bp):
                 try:
                     embedding_service = EmbeddingService()
                     chunks = embedding_service._split_text(guidelines['text'])
-                    embeddings = embedding_service.embed_documents(chunks)
                     db.session.flush()  # Get document ID
-                    embedding_service._store_chunks(document.id, chunks, embeddings)
+                    embedding_service.ingest_chunks(document.id, chunks)
                 except Exception:
                     pass  # Ignore embedding errors in API
 
@@ -119,6 +119,9 @@ def clear_cascade(case_id: int, target: str) -> Dict[str, Any]:
     for substep in to_clear:
         _clear_substep(case_id, substep, stats)
 
+    from app.services.view_model_cache import invalidate_case
+    invalidate_case(case_id)
+
     # NOTE: Does NOT commit. Caller is responsible for db.session.commit()
     # so clearing + any subsequent operations (e.g., PipelineRun creation)
     # can be committed atomically.
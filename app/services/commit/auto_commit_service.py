@@ -205,6 +205,11 @@ class AutoCommitService(DuplicateMatchingMixin, CaseTtlBuilderMixin, TemporalEnt
             # TTL; entities/results let the fallback build the lean TTL if needed).
             self._sync_to_ontserve(case_id, entities, results)
 
+            from app.services.view_model_cache import invalidate_case
+            from app.services.entity.corpus_graph import sync_case
+            invalidate_case(case_id)
+            sync_case(case_id)
+
             # Compile summary
             summary = CommitSummary(
                 case_id=case_id,
@@ -670,6 +675,11 @@ class AutoCommitService(DuplicateMatchingMixin, CaseTtlBuilderMixin, TemporalEnt
                 result['entities_reset'] = reset_count
                 logger.info(f"Reset {reset_count} committed entities to uncommitted")
 
+            from app.services.view_model_cache import invalidate_case
+            from app.services.entity.corpus_graph import sync_case
+            invalidate_case(case_id)
+            sync_case(case_id)
+
             result['success'] = True
             logger.info(f"Case {case_id} ontology cleared successfully")
 
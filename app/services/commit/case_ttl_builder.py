@@ -29,6 +29,7 @@ from rdflib import Graph, Literal, Namespace, URIRef, RDF, RDFS, OWL, XSD
 from rdflib.namespace import SKOS, DCTERMS
 
 from app.models.temporary_rdf_storage import TemporaryRDFStorage
+from app.services.commit.turtle_writer import write_turtle
 
 logger = logging.getLogger(__name__)
 
@@ -172,7 +173,7 @@ class CaseTtlBuilderMixin:
                         logger.info(f"Created {first_entity.entity_label} with merged properties from {len(entity_list)} sections")
 
             # Save the graph
-            g.serialize(destination=case_file, format='turtle')
+            write_turtle(g, case_file)
             logger.info(f"Generated case TTL: {individuals_added} new, {individuals_merged} merged: {case_file}")
 
             # NOTE: edge materialization (defeasibility + R->P->O + cites-provision)
@@ -26,6 +26,7 @@ from rdflib import Graph, Namespace, URIRef, RDF, RDFS, OWL
 
 from app.services.extraction.schemas import CATEGORY_TO_ONTOLOGY_IRI
 from app.services.commit import naming
+from app.services.commit.turtle_writer import write_turtle
 
 logger = logging.getLogger(__name__)
 
@@ -535,6 +536,6 @@ class CategoryResolutionMixin:
                 post_vetoes, case_id,
             )
             naming.sanitize_graph_literals(g)
-            g.serialize(destination=str(ttl_path), format='turtle')
+            write_turtle(g, ttl_path)
         stats['role_axis_vetoes_post_canonicalization'] = post_vetoes
         return stats
@@ -41,6 +41,7 @@ from app.services.ontserve.ontserve_config import (
 )
 from app.services.commit import naming
 from app.services.commit.commit_context import build_commit_context, _is_role_individual
+from app.services.commit.turtle_writer import write_turtle
 
 logger = logging.getLogger(__name__)
 
@@ -351,6 +352,16 @@ class OntServeCommitService(VersionedCommitMixin, AgentLayerMixin, EmitterMixin,
             from app.services.commit.precedent_features import update_entity_classes_from_storage
             results['entity_class_types'] = update_entity_classes_from_storage(case_id)
 
+            # Precedent features and cached similarity pairs, recomputed only
+            # where the committed inputs changed. Never raises.
+            from app.services.commit.precedent_features import refresh_precedent_features
+            results['precedent_features_refreshed'] = refresh_precedent_features(case_id)
+
+            from app.services.view_model_cache import invalidate_case
+            from app.services.entity.corpus_graph import sync_case
+            invalidate_case(case_id)
+            sync_case(case_id)
+
             return results
 
         except Exception as e:
@@ -783,7 +794,7 @@ class OntServeCommitService(VersionedCommitMixin, AgentLayerMixin, EmitterMixin,
 
             # Save the graph
             naming.sanitize_graph_literals(g)
-            g.serialize(destination=case_file, format='turtle')
+            write_turtle(g, case_file)
             logger.info(f"Committed {count} new individuals ({merged} merged onto existing) to {case_file}")
 
             # Materialize the relational edge layer (defeasibility + R->P->O +
@@ -891,6 +902,9 @@ class OntServeCommitService(VersionedCommitMixin, AgentLayerMixin, EmitterMixin,
                 return {'success': False, 'error': result.stderr}
 
             logger.info(f"Synced {ontology_name} to OntServe DB: {result.stdout.strip()}")
+            # Cached MCP reads predate the sync.
+            from app.services.ontserve.mcp_transport import invalidate_mcp_cache
+            invalidate_mcp_cache()
             # Notify the MCP server to refresh its cache (optional).
             try:
                 response = requests.post(f"{self.mcp_url}/refresh_cache")
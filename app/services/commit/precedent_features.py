@@ -8,10 +8,18 @@ wrote it lived only in AutoCommitService, so the live pipeline path
 the pipeline dashboard) left the column NULL. This module derives the mapping
 from the committed working-store rows instead of from commit-internal results,
 so any commit path can call it idempotently.
+
+refresh_precedent_features does the same for the embedding and scalar
+precedent features: after a commit it recomputes only what the committed
+inputs changed, and patches the affected cached similarity pairs. It loads the
+embedding model and runs inside the commit, so it is opt-in
+(PRECEDENT_REFRESH_ON_COMMIT=true); otherwise they are refreshed by Step 4
+precedent extraction or a corpus build (build_corpus_features).
 """
 
 import json
 import logging
+import os
 from collections import defaultdict
 from datetime import datetime
 
@@ -79,3 +87,29 @@ def update_entity_classes_from_storage(case_id: int) -> int:
         logger.error("entity_classes update failed for case %s: %s", case_id, e)
         db.session.rollback()
         return 0
+
+
+def refresh_precedent_features(case_id: int) -> list:
+    """Refresh the case's precedent features and cached similarity pairs.
+
+    Only the columns whose inputs changed since the row was written are
+    recomputed (CaseFeatureExtractor.refresh_case_features), so a re-commit
+    of one case updates retrieval without a corpus rebuild. Runs only with
+    PRECEDENT_REFRESH_ON_COMMIT=true, since it blocks the commit while the
+    case is re-embedded.
+
+    Returns the refreshed feature columns. Never raises.
+    """
+    if os.environ.get('PRECEDENT_REFRESH_ON_COMMIT', 'false').lower() not in ('1', 'true', 'yes'):
+        return []
+    try:
+        from app.services.precedent.case_feature_extractor import CaseFeatureExtractor
+        refreshed = CaseFeatureExtractor().refresh_case_features([case_id])
+        return refreshed.get(case_id, [])
+    except Exception as e:
+        logger.error("precedent feature refresh failed for case %s: %s", case_id, e)
+        try:
+            db.session.rollback()
+        except Exception:  # noqa: BLE001
+            pass
+        return []
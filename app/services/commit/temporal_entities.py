@@ -40,6 +40,7 @@ from rdflib.namespace import SKOS, DCTERMS
 
 from app import db
 from app.models.temporary_rdf_storage import TemporaryRDFStorage
+from app.services.commit.turtle_writer import write_turtle
 
 logger = logging.getLogger(__name__)
 
@@ -128,7 +129,7 @@ class TemporalEntitiesMixin:
                     logger.warning(f"Error adding temporal entity {entity.id}: {e}")
 
             # Save the updated graph
-            g.serialize(destination=case_file, format='turtle')
+            write_turtle(g, case_file)
             logger.info(f"Saved case TTL with temporal entities: {case_file}")
 
             # Mark temporal entities as committed
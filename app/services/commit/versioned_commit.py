@@ -26,6 +26,7 @@ from app.models.temporary_rdf_storage import TemporaryRDFStorage
 from app.services.ontserve.ontserve_config import get_ontserve_db_config
 from app.services.commit import naming
 from app.services.commit.commit_context import _is_role_individual
+from app.services.commit.turtle_writer import write_turtle
 
 logger = logging.getLogger(__name__)
 
@@ -208,6 +209,11 @@ class VersionedCommitMixin:
                 else:
                     results['errors'].append(f"OntServe sync warning: {sync_result.get('error')}")
 
+            from app.services.view_model_cache import invalidate_case
+            from app.services.entity.corpus_graph import sync_case
+            invalidate_case(case_id)
+            sync_case(case_id)
+
             logger.info(f"Versioned commit for case {case_id}: v{new_version}, "
                        f"{results['individuals_committed']} individuals, "
                        f"{results['classes_committed']} classes")
@@ -552,7 +558,7 @@ class VersionedCommitMixin:
 
             # Write file (overwrites existing)
             naming.sanitize_graph_literals(g)
-            g.serialize(destination=case_file, format='turtle')
+            write_turtle(g, case_file)
             logger.info(f"Wrote fresh TTL file with {count} individuals to {case_file}")
 
             # role_kind_by_uri travels with the result so the caller's
@@ -688,5 +694,10 @@ class VersionedCommitMixin:
         result['entities_reset'] = reset_count
         logger.info(f"Reset {reset_count} committed entities to unpublished")
 
+        from app.services.view_model_cache import invalidate_case
+        from app.services.entity.corpus_graph import sync_case
+        invalidate_case(case_id)
+        sync_case(case_id)
+
         result['success'] = len(result['errors']) == 0
         return result
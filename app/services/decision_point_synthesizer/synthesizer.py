@@ -108,8 +108,8 @@ class DecisionPointSynthesizer(LLMStrategiesMixin):
         # (2026-07-08 Decisions analysis).
         try:
             from rdflib import RDFS
-            from app.services.entity.committed_case_graph import load_case_graph
-            g = load_case_graph(case_id)
+            from app.services.entity.committed_case_graph import load_case_index
+            g = load_case_index(case_id)
             for s, o in g.subject_objects(RDFS.label):
                 lookup.setdefault(str(o).lower(), str(s))
         except Exception as exc:  # noqa: BLE001 - no committed TTL yet
@@ -132,19 +132,17 @@ class DecisionPointSynthesizer(LLMStrategiesMixin):
             return v
 
         obl_map = {}
-        for o in TemporaryRDFStorage.query.filter_by(
-            case_id=case_id, extraction_type='obligations', storage_type='individual'
-        ).all():
-            props = (o.rdf_json_ld or {}).get('properties', {})
+        for label, props in TemporaryRDFStorage.individual_properties(
+            case_id, 'obligations', ['complianceStatus']
+        ):
             status = _first(props.get('complianceStatus'))
-            if o.entity_label and status:
-                obl_map[o.entity_label] = status
+            if label and status:
+                obl_map[label] = status
 
         cap_map = {}
-        for c in TemporaryRDFStorage.query.filter_by(
-            case_id=case_id, extraction_type='capabilities', storage_type='individual'
-        ).all():
-            props = (c.rdf_json_ld or {}).get('properties', {})
+        for label, props in TemporaryRDFStorage.individual_properties(
+            case_id, 'capabilities', ['proficiencyLevel', 'demonstratedThrough']
+        ):
             level = _first(props.get('proficiencyLevel'))
             # demonstratedThrough is extracted, committed (proeth:demonstratedThrough)
             # and shown on the review page but had no downstream consumer (HO-005
@@ -154,8 +152,8 @@ class DecisionPointSynthesizer(LLMStrategiesMixin):
             # also surfaces evidenced-but-unrated capabilities (the evidence is the
             # useful part); proficiency is rendered only when present (no fallback).
             evidence = _first(props.get('demonstratedThrough'))
-            if c.entity_label and (level or evidence):
-                cap_map[c.entity_label] = {'level': level, 'evidence': evidence}
+            if label and (level or evidence):
+                cap_map[label] = {'level': level, 'evidence': evidence}
 
         if not obl_map and not cap_map:
             return ''
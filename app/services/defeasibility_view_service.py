@@ -25,7 +25,9 @@ import logging
 import rdflib
 from rdflib import RDFS
 
-from app.services.entity.committed_case_graph import case_ttl_path, load_case_graph
+from app.services.entity.committed_case_graph import (
+    case_ttl_path, load_case_graph, load_case_index,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -73,11 +75,14 @@ def _entity_index(g, case_id):
     OntServe definition popovers to the entity labels the view renders. Definition prefers
     skos:definition, falls back to rdfs:comment; type is the materialized direct
     rdf:type proeth-core:<Category> (CMT-1); the OntServe target is the case ontology.
-    Predicates matched by local name (namespace-robust)."""
+    Predicates matched by local name (namespace-robust). Accepts an rdflib Graph or
+    a TripleIndex."""
     target = f"proethica-case-{case_id}"
     labels = {}
-    for s, p, o in g:
-        if _local(p) == "label":
+    for p in set(g.predicates()):
+        if _local(p) != "label":
+            continue
+        for s, o in g.subject_objects(p):
             labels.setdefault(s, str(o))
     out = {}
     for s, lbl in labels.items():
@@ -556,7 +561,13 @@ def get_cross_case_band_dynamic(anchor_case_id: int, case_data: dict) -> dict |
 
 def build_defeasibility_view(case_id: int) -> dict:
     """Assemble both bands for the case. Raises FileNotFoundError if the case has no
-    committed ontology yet."""
+    committed ontology yet. Served from the per-case view-model cache, which is
+    versioned by the case TTL mtime and the band index state."""
+    from app.services.view_model_cache import cached_view
+    return cached_view('defeasibility', case_id, lambda: _build_defeasibility_view(case_id))
+
+
+def _build_defeasibility_view(case_id: int) -> dict:
     case_data = get_case_conflicts(case_id)
     # 2026-07-08: the former CURATED_BANDS theme path (a pinned "Faithful Agent"
     # comparison set) was retired -- it pinned legacy prior-extraction cases the
@@ -572,10 +583,10 @@ def build_defeasibility_view(case_id: int) -> dict:
     cids = [case_id] + ([r["case_id"] for r in cross_case["rows"]] if cross_case else [])
     for cid in cids:
         try:
-            g = load_case_graph(cid)
+            index = load_case_index(cid)
         except FileNotFoundError:
             continue
-        for key, entry in _entity_index(g, cid).items():
+        for key, entry in _entity_index(index, cid).items():
             lookup.setdefault(key, entry)
 
     return {
@@ -0,0 +1,298 @@
+"""In-process nearest-neighbour index over document chunk embeddings.
+
+``EmbeddingService.search_similar_chunks`` uses pgvector when
+USE_DB_VECTOR_SEARCH is set (an HNSW index on ``document_chunks.embedding_384``
+serves that query). Without it, the previous fallback loaded every
+``DocumentChunk`` row and scored it in Python. This module replaces that loop:
+
+- one ``ChunkIndex`` per embedding column holds an L2-normalized float32
+  matrix plus the chunk id, document id, world id and document type of each
+  row, so a query is a single matrix product over the filtered rows and an
+  ``argpartition`` top-k. Several queries can be scored in one call;
+- ``embedding_384`` rows are indexed as-is; ``embedding`` (legacy / hosted
+  provider) rows are indexed only for chunks without an ``embedding_384``,
+  matching the old per-chunk column preference;
+- ``EmbeddingService`` chunk writes update the index in place. Changes made
+  by other processes are detected by a cheap table fingerprint (row count,
+  max id, max updated_at), checked at most every CHUNK_INDEX_CHECK_SECONDS,
+  and trigger a rebuild;
+- the index is persisted as ``.npz`` under CHUNK_INDEX_DIR (default: a
+  directory in the system temp dir; ``off`` disables it), keyed by column and
+  database, so a restarted worker loads it instead of re-reading every vector.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("embedding_384", "embedding")
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def _disk_dir() -> Optional[Path]:
+    root = os.environ.get("CHUNK_INDEX_DIR")
+    if root and root.lower() == "off":
+        return None
+    return Path(root or os.path.join(tempfile.gettempdir(), "proethica-chunk-index"))
+
+
+class ChunkIndex:
+    """Exact top-k cosine search over one chunk embedding column."""
+
+    def __init__(self, column: str, path: Optional[Path] = None):
+        if column not in COLUMNS:
+            raise ValueError(f"Unknown chunk embedding column: {column}")
+        self.column = column
+        self.path = path
+        self.fingerprint: Optional[Tuple[int, int, int]] = None
+        self._checked_at = 0.0
+        self._lock = threading.RLock()
+        self._set([], [], [], [], np.zeros((0, 0), dtype=np.float32))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1]
+
+    def _set(self, ids, document_ids, world_ids, document_types, matrix) -> None:
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.document_ids = np.asarray(document_ids, dtype=np.int64)
+        self.world_ids = np.asarray([-1 if w is None else w for w in world_ids], dtype=np.int64)
+        self.document_types = np.asarray(document_types, dtype=str)
+        self.matrix = matrix
+
+    def _vectors(self, embeddings: Iterable) -> Tuple[np.ndarray, np.ndarray]:
+        """Stack embeddings into a normalized matrix; also returns the mask of rows kept.
+
+        A column holds one dimension; rows of another dimension (e.g. a provider
+        switch) are skipped rather than truncated.
+        """
+        rows = [np.asarray(e, dtype=np.float32).ravel() for e in embeddings]
+        if not rows:
+            return np.zeros((0, self.dimension), dtype=np.float32), np.zeros(0, dtype=bool)
+        dim = self.dimension if len(self) else rows[0].shape[0]
+        keep = np.array([r.shape[0] == dim for r in rows])
+        if not keep.all():
+            logger.debug(f"Skipping {int((~keep).sum())} {self.column} vectors not of dimension {dim}")
+        kept = [r for r, k in zip(rows, keep) if k]
+        matrix = np.vstack(kept) if kept else np.zeros((0, dim), dtype=np.float32)
+        return _normalize(matrix), keep
+
+    def rebuild(self, rows: Sequence[tuple]) -> None:
+        """Replace the index from (chunk_id, document_id, world_id, document_type, embedding) rows."""
+        with self._lock:
+            self._set([], [], [], [], np.zeros((0, 0), dtype=np.float32))
+            matrix, keep = self._vectors(r[4] for r in rows)
+            rows = [r for r, k in zip(rows, keep) if k]
+            self._set([r[0] for r in rows], [r[1] for r in rows], [r[2] for r in rows],
+                      [r[3] or "" for r in rows], matrix)
+
+    def replace_document(self, document_id: int, world_id: Optional[int],
+                         document_type: Optional[str], chunk_ids: Sequence[int],
+                         embeddings: Sequence) -> None:
+        """Drop a document's rows and add its current chunks."""
+        with self._lock:
+            self.remove_document(document_id)
+            if not chunk_ids:
+                return
+            matrix, keep = self._vectors(embeddings)
+            ids = np.asarray(chunk_ids, dtype=np.int64)[keep]
+            if not len(ids):
+                return
+            base = self.matrix if len(self) else np.zeros((0, matrix.shape[1]), dtype=np.float32)
+            self._set(np.concatenate([self.ids, ids]),
+                      np.concatenate([self.document_ids, np.full(len(ids), document_id)]),
+                      np.concatenate([self.world_ids, np.full(len(ids), -1 if world_id is None else world_id)]),
+                      np.concatenate([self.document_types, np.full(len(ids), document_type or "")]),
+                      np.vstack([base, matrix]))
+
+    def remove_document(self, document_id: int) -> None:
+        with self._lock:
+            keep = self.document_ids != document_id
+            if keep.all():
+                return
+            self._set(self.ids[keep], self.document_ids[keep], self.world_ids[keep],
+                      self.document_types[keep], self.matrix[keep])
+
+    def search(self, queries, k: int = 5, world_id: Optional[int] = None,
+               document_type: Optional[Union[str, List[str]]] = None) -> List[List[Tuple[int, float]]]:
+        """Top-k (chunk_id, cosine similarity) per query; ``queries`` is one vector or a matrix."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        with self._lock:
+            ids, matrix = self.ids, self.matrix
+            mask = np.ones(len(ids), dtype=bool)
+            if world_id is not None:
+                mask &= self.world_ids == world_id
+            if document_type is not None:
+                types = list(document_type) if isinstance(document_type, (list, tuple)) else [document_type]
+                mask &= np.isin(self.document_types, types)
+        if k <= 0 or not len(ids) or queries.shape[1] != matrix.shape[1] or not mask.any():
+            return [[] for _ in range(len(queries))]
+        if not mask.all():
+            ids, matrix = ids[mask], matrix[mask]
+
+        scores = _normalize(queries) @ matrix.T
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in zip(scores, top):
+            order = candidates[np.argsort(-row[candidates], kind="stable")]
+            results.append([(int(ids[i]), float(row[i])) for i in order])
+        return results
+
+    # -- freshness and persistence -------------------------------------------------
+
+    def needs_check(self) -> bool:
+        interval = float(os.environ.get("CHUNK_INDEX_CHECK_SECONDS", 30))
+        return self.fingerprint is None or time.monotonic() - self._checked_at >= interval
+
+    def mark_checked(self, fingerprint: Tuple[int, int, int]) -> None:
+        self.fingerprint = tuple(fingerprint)
+        self._checked_at = time.monotonic()
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            arrays = dict(ids=self.ids, document_ids=self.document_ids, world_ids=self.world_ids,
+                          document_types=self.document_types, matrix=self.matrix,
+                          fingerprint=np.asarray(self.fingerprint or (0, 0, 0), dtype=np.int64))
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                np.savez(fh, **arrays)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            logger.warning(f"Could not persist chunk index {self.column}: {e}")
+
+    def load(self) -> bool:
+        """Load the persisted index; the caller still checks its fingerprint."""
+        if self.path is None:
+            return False
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                with self._lock:
+                    self._set(data["ids"], data["document_ids"], data["world_ids"],
+                              data["document_types"], data["matrix"].astype(np.float32, copy=False))
+                    self.fingerprint = tuple(int(x) for x in data["fingerprint"])
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"Discarding unreadable chunk index {self.path.name}: {e}")
+            self.path.unlink(missing_ok=True)
+            return False
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def _db_key() -> str:
+    from app import db
+    return hashlib.sha256(str(db.engine.url).encode("utf-8")).hexdigest()[:16]
+
+
+def _db_fingerprint() -> Tuple[int, int, int]:
+    from sqlalchemy import func
+    from app import db
+    from app.models.document import DocumentChunk
+
+    count, max_id, updated = db.session.query(
+        func.count(DocumentChunk.id), func.max(DocumentChunk.id), func.max(DocumentChunk.updated_at)).one()
+    return (int(count or 0), int(max_id or 0),
+            int(updated.timestamp() * 1_000_000) if updated is not None else 0)
+
+
+def _db_rows(column: str) -> List[tuple]:
+    from app import db
+    from app.models import Document, DocumentChunk
+
+    embedding = getattr(DocumentChunk, column)
+    q = (db.session.query(DocumentChunk.id, DocumentChunk.document_id, Document.world_id,
+                          Document.document_type, embedding)
+         .join(Document, DocumentChunk.document_id == Document.id)
+         .filter(embedding.isnot(None)))
+    if column == "embedding":
+        q = q.filter(DocumentChunk.embedding_384.is_(None))
+    return q.all()
+
+
+def get_chunk_index(column: str = "embedding_384") -> ChunkIndex:
+    """The process-wide index for ``column``, loaded from disk or rebuilt when stale."""
+    with _indexes_lock:
+        index = _indexes.get(column)
+        if index is None:
+            root = _disk_dir()
+            path = None
+            if root is not None:
+                path = root / f"{column}-{_db_key()}.npz"
+            index = _indexes[column] = ChunkIndex(column, path)
+            index.load()
+            index._checked_at = 0.0
+
+    if index.needs_check():
+        with index._lock:
+            if index.needs_check():
+                fingerprint = _db_fingerprint()
+                if tuple(fingerprint) != index.fingerprint:
+                    started = time.monotonic()
+                    index.rebuild(_db_rows(column))
+                    index.mark_checked(fingerprint)
+                    index.save()
+                    logger.info(f"Rebuilt {column} chunk index: {len(index)} chunks "
+                                f"in {time.monotonic() - started:.2f}s")
+                else:
+                    index.mark_checked(fingerprint)
+    return index
+
+
+def indexes_loaded() -> bool:
+    return bool(_indexes)
+
+
+def sync_document(document_id: int, world_id: Optional[int], document_type: Optional[str],
+                  chunks: Sequence[tuple]) -> None:
+    """Apply a document's freshly stored chunks to the loaded indexes.
+
+    ``chunks`` holds (chunk_id, embedding_384, embedding) per chunk. Indexes
+    not loaded in this process are left alone; they rebuild on first use.
+    """
+    fingerprint = None
+    for column in COLUMNS:
+        index = _indexes.get(column)
+        if index is None:
+            continue
+        position = COLUMNS.index(column)
+        rows = [(c[0], c[1 + position]) for c in chunks
+                if c[1 + position] is not None and (column == "embedding_384" or c[1] is None)]
+        with index._lock:
+            in_sync = index.fingerprint is not None
+            index.replace_document(document_id, world_id, document_type,
+                                   [r[0] for r in rows], [r[1] for r in rows])
+            if in_sync:
+                fingerprint = fingerprint or _db_fingerprint()
+                index.mark_checked(fingerprint)
+            index.save()
+
+
+def reset_chunk_indexes() -> None:
+    """Forget the loaded indexes (tests, or after bulk changes made outside the app)."""
+    with _indexes_lock:
+        _indexes.clear()
@@ -0,0 +1,312 @@
+"""
+Local embedding model server.
+
+One process hosts the SentenceTransformer model(s) and serves every Gunicorn
+worker and Celery child over a Unix socket, instead of each process loading
+its own copy (hundreds of MB and several seconds of startup apiece).
+
+Run it next to the app:
+
+    python -m app.services.embedding.embedding_server
+
+and point the workers at it with EMBEDDING_SERVER_SOCKET (the same path).
+Without it the server binds ``$XDG_RUNTIME_DIR/proethica-embeddings.sock``,
+or ``embeddings.sock`` in the app-private ``instance/embedding-server``
+directory, never a shared, guessable name under /tmp.
+``shared_model.load_sentence_transformer`` then hands out a
+``RemoteSentenceTransformer`` client instead of loading a model.
+
+Requests from all connections go through one queue. A batcher thread takes
+the first waiting request, collects whatever else arrives within
+EMBEDDING_SERVER_BATCH_WAIT_MS (up to EMBEDDING_SERVER_MAX_BATCH texts),
+de-duplicates the texts, answers the ones already in the shared result
+cache (EMBEDDING_SERVER_CACHE_SIZE vectors, LRU) and encodes the rest in a
+single ``model.encode`` call.
+
+Wire format (both directions): an 8-byte header ``!II`` giving the JSON
+header length and the binary payload length, the UTF-8 JSON header, then the
+payload. Encode responses carry the vectors as raw little-endian float32 in
+the payload, shaped by the header's ``shape``.
+"""
+
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = 'all-MiniLM-L6-v2'
+
+_FRAME = struct.Struct('!II')
+
+
+# ---------------------------------------------------------------------------
+# Wire protocol
+# ---------------------------------------------------------------------------
+
+def send_message(sock: socket.socket, header: dict, payload: bytes = b'') -> None:
+    head = json.dumps(header).encode('utf-8')
+    sock.sendall(_FRAME.pack(len(head), len(payload)) + head + payload)
+
+
+def _recv_exact(sock: socket.socket, n: int) -> Optional[bytes]:
+    chunks, remaining = [], n
+    while remaining:
+        chunk = sock.recv(min(remaining, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def recv_message(sock: socket.socket) -> Optional[Tuple[dict, bytes]]:
+    """Read one framed message; None when the peer closed the connection."""
+    frame = _recv_exact(sock, _FRAME.size)
+    if frame is None:
+        return None
+    head_len, payload_len = _FRAME.unpack(frame)
+    head = _recv_exact(sock, head_len)
+    payload = _recv_exact(sock, payload_len) if payload_len else b''
+    if head is None or payload is None:
+        return None
+    return json.loads(head.decode('utf-8')), payload
+
+
+def socket_path() -> str:
+    configured = os.environ.get('EMBEDDING_SERVER_SOCKET')
+    if configured:
+        return configured
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        # Per-user, mode 0700 and owned by us by spec.
+        return os.path.join(runtime_dir, 'proethica-embeddings.sock')
+    from app.utils.private_cache_dir import private_cache_dir
+    return str(private_cache_dir('embedding-server') / 'embeddings.sock')
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+class _Job:
+    __slots__ = ('model', 'texts', 'done', 'result', 'error')
+
+    def __init__(self, model: str, texts: List[str]):
+        self.model = model
+        self.texts = texts
+        self.done = threading.Event()
+        self.result: Optional[np.ndarray] = None
+        self.error: Optional[str] = None
+
+
+def _load_model(model_name: str):
+    from sentence_transformers import SentenceTransformer
+    from app.services.embedding.embedding_service import resolve_embedding_device
+
+    allow_dl = os.environ.get('ALLOW_HF_DOWNLOAD', 'false').lower() in ('1', 'true', 'yes')
+    return SentenceTransformer(model_name, local_files_only=not allow_dl,
+                               device=resolve_embedding_device())
+
+
+class EmbeddingServer:
+    """Unix-socket embedding server with request micro-batching and a result cache."""
+
+    def __init__(self, path: Optional[str] = None,
+                 model_factory: Callable[[str], object] = _load_model,
+                 max_batch: Optional[int] = None, batch_wait_ms: Optional[float] = None,
+                 cache_size: Optional[int] = None):
+        self.path = path or socket_path()
+        self.model_factory = model_factory
+        self.max_batch = max_batch or int(os.environ.get('EMBEDDING_SERVER_MAX_BATCH', 128))
+        wait_ms = batch_wait_ms if batch_wait_ms is not None else float(
+            os.environ.get('EMBEDDING_SERVER_BATCH_WAIT_MS', 5))
+        self.batch_wait = wait_ms / 1000.0
+        self.cache_size = cache_size or int(os.environ.get('EMBEDDING_SERVER_CACHE_SIZE', 50000))
+
+        self._models: Dict[str, object] = {}
+        self._models_lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._queue: "queue.Queue[Optional[_Job]]" = queue.Queue()
+        self._server: Optional[socketserver.ThreadingUnixStreamServer] = None
+        self._batcher: Optional[threading.Thread] = None
+        # Handler threads and the batcher both bump these.
+        self.stats = {'requests': 0, 'batches': 0, 'encoded': 0, 'cache_hits': 0}
+        self._stats_lock = threading.Lock()
+
+    # --- models and batching -------------------------------------------------
+
+    def model(self, name: str):
+        with self._models_lock:
+            model = self._models.get(name)
+            if model is None:
+                logger.info(f"Embedding server loading model {name}")
+                model = self._models[name] = self.model_factory(name)
+            return model
+
+    def _count(self, **deltas: int) -> None:
+        with self._stats_lock:
+            for key, delta in deltas.items():
+                self.stats[key] += delta
+
+    def snapshot_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def submit(self, model: str, texts: List[str]) -> _Job:
+        job = _Job(model, texts)
+        self._count(requests=1)
+        self._queue.put(job)
+        return job
+
+    def _collect(self, first: _Job) -> List[_Job]:
+        jobs, n = [first], len(first.texts)
+        deadline = time.monotonic() + self.batch_wait
+        while n < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                job = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if job is None:
+                self._queue.put(None)
+                break
+            jobs.append(job)
+            n += len(job.texts)
+        return jobs
+
+    def _run_batch(self, jobs: List[_Job]) -> None:
+        by_model: Dict[str, List[_Job]] = {}
+        for job in jobs:
+            by_model.setdefault(job.model, []).append(job)
+        for model_name, model_jobs in by_model.items():
+            try:
+                missing = list(dict.fromkeys(
+                    t for job in model_jobs for t in job.texts if (model_name, t) not in self._cache))
+                if missing:
+                    vectors = np.asarray(
+                        self.model(model_name).encode(missing, batch_size=self.max_batch,
+                                                      show_progress_bar=False),
+                        dtype=np.float32)
+                    for text, vec in zip(missing, vectors):
+                        self._cache[(model_name, text)] = vec
+                    self._count(encoded=len(missing))
+                for job in model_jobs:
+                    rows = []
+                    for t in job.texts:
+                        rows.append(self._cache[(model_name, t)])
+                        self._cache.move_to_end((model_name, t))
+                    job.result = np.vstack(rows) if rows else np.zeros((0, 0), dtype=np.float32)
+                requested = sum(len(job.texts) for job in model_jobs)
+                self._count(cache_hits=requested - len(missing))
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            except Exception as e:
+                logger.exception(f"Embedding batch failed for model {model_name}")
+                for job in model_jobs:
+                    job.error = str(e)
+            finally:
+                for job in model_jobs:
+                    job.done.set()
+        self._count(batches=1)
+
+    def _batch_loop(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            self._run_batch(self._collect(first))
+
+    # --- socket handling -----------------------------------------------------
+
+    def handle(self, header: dict) -> Tuple[dict, bytes]:
+        op = header.get('op')
+        model_name = header.get('model') or DEFAULT_MODEL
+        if op == 'ping':
+            return {'ok': True}, b''
+        if op == 'stats':
+            return {'ok': True, 'cache': len(self._cache), **self.snapshot_stats()}, b''
+        if op == 'info':
+            model = self.model(model_name)
+            return {'ok': True, 'dimension': int(model.get_sentence_embedding_dimension())}, b''
+        if op == 'encode':
+            job = self.submit(model_name, [str(t) for t in header.get('texts', [])])
+            job.done.wait()
+            if job.error:
+                return {'ok': False, 'error': job.error}, b''
+            result = job.result
+            if header.get('normalize') and result.size:
+                norms = np.linalg.norm(result, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                result = result / norms
+            result = np.ascontiguousarray(result, dtype='<f4')
+            return {'ok': True, 'shape': list(result.shape)}, result.tobytes()
+        return {'ok': False, 'error': f"unknown op {op!r}"}, b''
+
+    def start(self) -> None:
+        """Bind the socket and start serving in background threads."""
+        server = self
+
+        class _Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                while True:
+                    msg = recv_message(self.request)
+                    if msg is None:
+                        return
+                    try:
+                        reply, payload = server.handle(msg[0])
+                    except Exception as e:
+                        logger.exception("Embedding server request failed")
+                        reply, payload = {'ok': False, 'error': str(e)}, b''
+                    send_message(self.request, reply, payload)
+
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # stale socket from a previous run
+        self._server = socketserver.ThreadingUnixStreamServer(self.path, _Handler)
+        self._server.daemon_threads = True
+        self._batcher = threading.Thread(target=self._batch_loop, name='embedding-batcher',
+                                         daemon=True)
+        self._batcher.start()
+        threading.Thread(target=self._server.serve_forever, name='embedding-server',
+                         daemon=True).start()
+        logger.info(f"Embedding server listening on {self.path}")
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self._queue.put(None)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    server = EmbeddingServer()
+    # Load the default model up front so the first request does not pay for it.
+    server.model(os.environ.get('LOCAL_EMBEDDING_MODEL', DEFAULT_MODEL))
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
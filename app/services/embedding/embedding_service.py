@@ -7,6 +7,8 @@ from sqlalchemy import text
 import io
 import logging
 
+from app.utils.pipeline_spans import span
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -47,6 +49,31 @@ def resolve_embedding_device() -> str:
         return "cpu"
 
 
+def _ingest_batch_size() -> int:
+    return max(1, int(os.environ.get("CHUNK_INGEST_BATCH_SIZE", 64)))
+
+
+TRIPLE_EMBEDDING_DIMENSION = 384
+TRIPLE_EMBEDDING_FIELDS = ("subject_embedding", "predicate_embedding", "object_embedding")
+
+
+def _triple_batch_size() -> int:
+    return max(1, int(os.environ.get("TRIPLE_EMBEDDING_BATCH_SIZE", 256)))
+
+
+def _triple_texts(triple) -> tuple:
+    """Subject, predicate and object text of a triple (or a row with the same fields)."""
+    return (triple.subject, triple.predicate,
+            triple.object_literal if triple.is_literal else triple.object_uri)
+
+
+def _triple_vector(vector) -> Optional[List[float]]:
+    """``vector`` as a list if it fits the EntityTriple vector(384) columns, else None."""
+    if vector is None or len(vector) != TRIPLE_EMBEDDING_DIMENSION:
+        return None
+    return [float(x) for x in vector]
+
+
 class EmbeddingService:
     """
     Service for generating and managing embeddings for RDF triples.
@@ -143,8 +170,7 @@ class EmbeddingService:
         # Local model setup
         if "local" in self.provider_priority and not disable_local:
             try:
-                from sentence_transformers import SentenceTransformer
-                import torch
+                from app.services.embedding.shared_model import load_sentence_transformer
 
                 # Configure offline mode to avoid HuggingFace Hub requests
                 os.environ["HF_HUB_OFFLINE"] = "1"
@@ -153,7 +179,7 @@ class EmbeddingService:
                 device = resolve_embedding_device()
 
                 self.providers["local"] = {
-                    "model": SentenceTransformer(self.model_name, local_files_only=True, device=device),
+                    "model": load_sentence_transformer(self.model_name, device=device),
                     "available": True,
                     "dimension": self.dimensions["local"],
                     "device": device
@@ -167,14 +193,13 @@ class EmbeddingService:
                 tried_download = False
                 if allow_dl:
                     try:
-                        from sentence_transformers import SentenceTransformer
+                        from app.services.embedding.shared_model import load_sentence_transformer
                         # Reconfigure to allow online download
                         os.environ["HF_HUB_OFFLINE"] = "0"
                         os.environ["TRANSFORMERS_OFFLINE"] = "0"
-                        import torch
                         device = resolve_embedding_device()
                         # Silent download attempt
-                        model = SentenceTransformer(self.model_name, local_files_only=False, device=device)
+                        model = load_sentence_transformer(self.model_name, device=device, local_files_only=False)
                         self.providers["local"] = {
                             "model": model,
                             "available": True,
@@ -292,25 +317,67 @@ class EmbeddingService:
             logger.warning("All embedding providers failed. Using random embeddings.")
         return self._get_random_embedding()
     
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Get embeddings for many texts, in input order.
+
+        When the local model is the active provider the non-empty texts are
+        encoded in one batched ``model.encode`` call; otherwise (or if the
+        batch fails) each text goes through get_embedding. Empty texts get a
+        zero vector, as in get_embedding.
+        """
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        pending = [i for i, t in enumerate(texts) if t]
+        for i, t in enumerate(texts):
+            if not t:
+                results[i] = [0.0] * self.embedding_dimension
+
+        active = next((p for p in self.provider_priority
+                       if p in self.providers and self.providers[p]["available"]), None)
+        if active == "local" and pending:
+            try:
+                with span('embed', texts=len(pending)):
+                    vectors = self.providers["local"]["model"].encode(
+                        [texts[i] for i in pending], show_progress_bar=False)
+                for i, vec in zip(pending, vectors):
+                    results[i] = vec.tolist()
+                self.embedding_dimension = len(results[pending[0]])
+                return results
+            except Exception as e:
+                logger.warning(f"Batched local embedding failed, embedding one by one: {str(e)}")
+
+        for i in pending:
+            results[i] = self.get_embedding(texts[i])
+        return results
+
     def _get_local_embedding(self, text: str) -> List[float]:
         """Get embedding from local sentence-transformers model."""
+        return self._local_encode(text).tolist()
+
+    def _get_local_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Embed many texts with the local model in one batched encode.
+
+        Returns a float32 matrix with one row per text. Unlike get_embeddings
+        this never falls back to a hosted provider, so every row is in the
+        local model's space.
+        """
+        if not texts:
+            return np.zeros((0, self.embedding_dimension), dtype=np.float32)
+        with span('embed', texts=len(texts)):
+            return np.asarray(self._local_encode(list(texts), show_progress_bar=False), dtype=np.float32)
+
+    def _local_encode(self, inputs, **kwargs):
         model = self.providers["local"]["model"]
         try:
-            embedding = model.encode(text)
+            return model.encode(inputs, **kwargs)
         except Exception as e:
             # Force CPU fallback if a CUDA-related error occurs
             if "CUDA" in str(e).upper():
-                try:
-                    from sentence_transformers import SentenceTransformer
-                    model_name = self.model_name
-                    self.providers["local"]["model"] = SentenceTransformer(model_name, local_files_only=True, device="cpu")
-                    logger.warning("Local embedding: CUDA error detected, falling back to CPU")
-                    embedding = self.providers["local"]["model"].encode(text)
-                except Exception:
-                    raise
-            else:
-                raise
-        return embedding.tolist()
+                from app.services.embedding.shared_model import load_sentence_transformer
+                self.providers["local"]["model"] = load_sentence_transformer(self.model_name, device="cpu")
+                logger.warning("Local embedding: CUDA error detected, falling back to CPU")
+                return self.providers["local"]["model"].encode(inputs, **kwargs)
+            raise
 
     def _get_gemini_embedding(self, text: str) -> List[float]:
         """Get embedding from Google Gemini embeddings API (text-embedding-004)."""
@@ -435,40 +502,43 @@ class EmbeddingService:
         normalized = random_vector / np.linalg.norm(random_vector)
         return normalized.tolist()
     
-    def generate_triple_embeddings(self, triple) -> Dict[str, List[float]]:
+    def generate_triple_embeddings(self, triple) -> Dict[str, Optional[List[float]]]:
         """
         Generate embeddings for the subject, predicate, and object of a triple.
         
         Args:
-            triple: The Triple object to generate embeddings for
+            triple: The EntityTriple object to generate embeddings for
             
         Returns:
             Dictionary with embeddings for subject, predicate, and object
+            (None where no 384-dim vector could be produced)
         """
-        # Generate embeddings
-        subject_embedding = self.get_embedding(triple.subject)
-        predicate_embedding = self.get_embedding(triple.predicate)
-        
-        # Object could be literal or URI
-        object_text = triple.object_literal if triple.is_literal else triple.object_uri
-        object_embedding = self.get_embedding(object_text)
-        
-        return {
-            "subject_embedding": subject_embedding,
-            "predicate_embedding": predicate_embedding,
-            "object_embedding": object_embedding
-        }
+        return self._triple_embeddings([triple])[0]
+
+    def _triple_embeddings(self, triples) -> List[Dict[str, Optional[List[float]]]]:
+        """Embed the subject, predicate and object of many triples.
+
+        Subjects and predicates repeat across a world's triples, so each
+        distinct text is encoded once, in one get_embeddings call. Vectors that
+        do not fit the vector(384) columns (empty text, or a hosted provider
+        answered instead of the local model) come back as None.
+        """
+        texts = [_triple_texts(t) for t in triples]
+        unique = list(dict.fromkeys(x for row in texts for x in row if x))
+        vectors = dict(zip(unique, self.get_embeddings(unique))) if unique else {}
+        return [{field: _triple_vector(vectors.get(x)) for field, x in zip(TRIPLE_EMBEDDING_FIELDS, row)}
+                for row in texts]
     
     def update_triple_embeddings(self, triple, commit: bool = True):
         """
         Update the embeddings for a triple.
         
         Args:
-            triple: The Triple object to update embeddings for
+            triple: The EntityTriple object to update embeddings for
             commit: Whether to commit the session after update
             
         Returns:
-            The updated Triple object
+            The updated EntityTriple object
         """
         from app import db
         
@@ -495,31 +565,72 @@ class EmbeddingService:
         Returns:
             Number of triples updated
         """
+        return self.backfill_triple_embeddings(triple_ids=triple_ids, limit=limit)
+
+    def backfill_triple_embeddings(self, triple_ids: Optional[List[int]] = None,
+                                   world_id: Optional[int] = None, limit: Optional[int] = None,
+                                   batch_size: Optional[int] = None) -> int:
+        """
+        Fill in missing EntityTriple embeddings, a batch at a time.
+
+        Triples without a subject embedding are read in id order, TRIPLE_EMBEDDING_BATCH_SIZE
+        at a time; each batch is encoded in one call and written with one
+        executemany UPDATE, then committed, so an interrupted backfill resumes
+        where it stopped.
+
+        Args:
+            triple_ids: Optional list of triple IDs to restrict the backfill to
+            world_id: Optional world ID to restrict the backfill to
+            limit: Maximum number of triples to examine (None: all of them)
+            batch_size: Triples per batch (default TRIPLE_EMBEDDING_BATCH_SIZE)
+
+        Returns:
+            Number of triples updated
+        """
+        from sqlalchemy import bindparam, select
         from app import db
-        from app.models.triple import Triple
-        
-        query = db.session.query(Triple)
-        
-        # Filter by IDs if provided
-        if triple_ids:
-            query = query.filter(Triple.id.in_(triple_ids))
-        
-        # Filter triples with missing embeddings
-        query = query.filter(Triple.subject_embedding.is_(None))
-        
-        # Limit the batch size
-        query = query.limit(limit)
-        
-        triples = query.all()
-        
-        logger.info(f"Updating embeddings for {len(triples)} triples...")
-        
-        for triple in triples:
-            self.update_triple_embeddings(triple, commit=False)
-        
-        db.session.commit()
-        
-        return len(triples)
+        from app.models.entity_triple import EntityTriple
+
+        table = EntityTriple.__table__
+        batch_size = batch_size or _triple_batch_size()
+        update = (table.update()
+                  .where(table.c.id == bindparam("triple_id"))
+                  .values({field: bindparam(f"new_{field}") for field in TRIPLE_EMBEDDING_FIELDS}))
+
+        last_id, seen, updated = 0, 0, 0
+        while limit is None or seen < limit:
+            query = (select(table.c.id, table.c.subject, table.c.predicate, table.c.object_literal,
+                            table.c.object_uri, table.c.is_literal)
+                     .where(table.c.subject_embedding.is_(None), table.c.id > last_id)
+                     .order_by(table.c.id)
+                     .limit(batch_size if limit is None else min(batch_size, limit - seen)))
+            if triple_ids:
+                query = query.where(table.c.id.in_(triple_ids))
+            if world_id is not None:
+                query = query.where(table.c.world_id == world_id)
+            rows = db.session.execute(query).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            seen += len(rows)
+
+            params = [{"triple_id": row.id, **{f"new_{f}": e[f] for f in TRIPLE_EMBEDDING_FIELDS}}
+                      for row, e in zip(rows, self._triple_embeddings(rows))
+                      if e["subject_embedding"] is not None]
+            with span('store_triple_embeddings', triples=len(params)):
+                try:
+                    if params:
+                        db.session.execute(update, params)
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    raise
+            updated += len(params)
+            if len(params) < len(rows):
+                logger.warning(f"Skipped {len(rows) - len(params)} triples without a 384-dim subject embedding")
+
+        logger.info(f"Updated embeddings for {updated} triples")
+        return updated
     
     def search_similar_chunks(self, query: str, k: int = 5, world_id: Optional[int] = None, document_type: Optional[Union[str, List[str]]] = None) -> List[Dict[str, Any]]:
         """
@@ -537,9 +648,6 @@ class EmbeddingService:
         from app import db
         from app.models import Document, DocumentChunk
 
-        # Helper cosine (shared pure-Python implementation)
-        from app.services.embedding.similarity_utils import cosine_similarity_list as cosine
-
         # Prefer local 384-dim embedding (matches embedding_384)
         try:
             qvec_384 = self._get_local_embedding(query)
@@ -554,7 +662,8 @@ class EmbeddingService:
                 embedding_str = f"[{','.join(str(x) for x in qvec_384)}]"
                 parts = [
                     "SELECT dc.id, dc.document_id, dc.content AS chunk_text, dc.chunk_index, d.title, d.document_type,",
-                    "dc.embedding_384 <-> (:embedding)::vector AS distance",
+                    # cosine distance, served by the HNSW index on embedding_384
+                    "dc.embedding_384 <=> (:embedding)::vector AS distance",
                     "FROM document_chunks dc",
                     "JOIN documents d ON dc.document_id = d.id",
                     "WHERE dc.embedding_384 IS NOT NULL",
@@ -589,36 +698,35 @@ class EmbeddingService:
                     db.session.rollback()
                 except Exception:
                     pass
-                logger.warning(f"DB vector search failed, falling back to Python cosine: {e}")
+                logger.warning(f"DB vector search failed, falling back to the in-process index: {e}")
 
-        # Python fallback: support both 384 and legacy embeddings
-        # Lazily compute a generic embedding if needed
-        qvec_legacy: Optional[List[float]] = None
-        q = db.session.query(DocumentChunk, Document).join(Document, DocumentChunk.document_id == Document.id)
-        q = q.filter((DocumentChunk.embedding_384.isnot(None)) | (DocumentChunk.embedding.isnot(None)))
-        if world_id is not None:
-            q = q.filter(Document.world_id == world_id)
-        if document_type is not None:
-            if isinstance(document_type, (list, tuple)):
-                q = q.filter(Document.document_type.in_(document_type))
-            else:
-                q = q.filter(Document.document_type == document_type)
+        # In-process index fallback (embedding_384 first, legacy column for
+        # chunks that only have a hosted-provider embedding)
+        from app.services.embedding.chunk_index import get_chunk_index
 
-        rows = q.all()
+        hits = []
+        if qvec_384:
+            hits += get_chunk_index("embedding_384").search(
+                qvec_384, k, world_id=world_id, document_type=document_type)[0]
+        legacy = get_chunk_index("embedding")
+        if len(legacy):
+            try:
+                qvec_legacy = self.get_embedding(query)
+            except Exception:
+                qvec_legacy = []
+            if qvec_legacy:
+                hits += legacy.search(qvec_legacy, k, world_id=world_id, document_type=document_type)[0]
+        hits = sorted(hits, key=lambda h: h[1], reverse=True)[:k]
+        if not hits:
+            return []
+
+        similarity = dict(hits)
+        rows = (db.session.query(DocumentChunk, Document)
+                .join(Document, DocumentChunk.document_id == Document.id)
+                .filter(DocumentChunk.id.in_(list(similarity))).all())
         scored: List[Dict[str, Any]] = []
         for dc, d in rows:
-            emb = dc.embedding_384 if getattr(dc, "embedding_384", None) is not None else dc.embedding
-            if emb is None:
-                continue
-            if len(emb) == 384 and qvec_384:
-                sim = cosine(qvec_384, emb)
-            else:
-                if qvec_legacy is None:
-                    try:
-                        qvec_legacy = self.get_embedding(query)
-                    except Exception:
-                        qvec_legacy = []
-                sim = cosine(qvec_legacy or [], emb)
+            sim = similarity[dc.id]
             scored.append({
                 "id": dc.id,
                 "document_id": dc.document_id,
@@ -631,9 +739,10 @@ class EmbeddingService:
             })
 
         scored.sort(key=lambda x: x["similarity"], reverse=True)
-        return scored[:k]
-    
-    def find_similar_triples(self, text: str, field: str = "subject", limit: int = 10) -> List[Dict[str, Any]]:
+        return scored
+
+    def find_similar_triples(self, text: str, field: str = "subject", limit: int = 10,
+                             world_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Find triples with similar embeddings to the given text.
         
@@ -641,48 +750,36 @@ class EmbeddingService:
             text: The text to find similar triples for
             field: Which field to search (subject, predicate, object)
             limit: Maximum number of results to return
+            world_id: Optional world ID to filter triples by
             
         Returns:
-            List of (triple, similarity) tuples
+            List of similar triples with their cosine similarity
         """
+        from sqlalchemy import select
         from app import db
+        from app.models.entity_triple import EntityTriple
         
-        # Generate embedding for the query text
-        embedding = self.get_embedding(text)
-        
-        # Determine which embedding field to search
-        if field == "subject":
-            embedding_field = "subject_embedding"
-        elif field == "predicate":
-            embedding_field = "predicate_embedding"
-        elif field == "object":
-            embedding_field = "object_embedding"
-        else:
+        if field not in ("subject", "predicate", "object"):
             raise ValueError(f"Invalid field: {field}")
         
-        # Convert the embedding to a string representation for SQL
-        embedding_str = f"[{','.join(str(x) for x in embedding)}]"
-        
-        # Query for similar triples
-        query = f"""
-        SELECT 
-            id,
-            subject,
-            predicate, 
-            object_literal,
-            object_uri,
-            is_literal,
-            {embedding_field} <-> '{embedding_str}'::vector AS distance
-        FROM 
-            character_triples
-        WHERE 
-            {embedding_field} IS NOT NULL
-        ORDER BY 
-            distance
-        LIMIT {limit}
-        """
-        
-        result = db.session.execute(text(query))
+        # Generate embedding for the query text; the columns hold local 384-dim vectors
+        embedding = _triple_vector(self.get_embeddings([text])[0])
+        if embedding is None:
+            logger.warning("No 384-dim embedding for the query text; cannot search triples")
+            return []
+        
+        # Cosine distance (<=>) against a bound vector, served by the HNSW index on the column
+        table = EntityTriple.__table__
+        column = table.c[f"{field}_embedding"]
+        distance = column.cosine_distance(embedding).label("distance")
+        query = (select(table.c.id, table.c.subject, table.c.predicate, table.c.object_literal,
+                        table.c.object_uri, table.c.is_literal, table.c.world_id, distance)
+                 .where(column.isnot(None))
+                 .order_by(distance)
+                 .limit(int(limit)))
+        if world_id is not None:
+            query = query.where(table.c.world_id == world_id)
+        result = db.session.execute(query)
         
         # Format results
         similar_triples = []
@@ -694,6 +791,7 @@ class EmbeddingService:
                 "predicate": row.predicate,
                 "object": object_value,
                 "is_literal": row.is_literal,
+                "world_id": row.world_id,
                 "similarity": 1.0 - row.distance
             })
         
@@ -754,21 +852,43 @@ class EmbeddingService:
         Returns:
             List of embedding vectors
         """
-        embeddings = []
-        
         logger.info(f"Generating embeddings for {len(chunks)} chunks...")
-        
-        for chunk in chunks:
-            try:
-                embedding = self.get_embedding(chunk)
-                embeddings.append(embedding)
-            except Exception as e:
-                logger.error(f"Error generating embedding for chunk: {str(e)}")
-                # Use zero vector as fallback for failed embeddings
-                embeddings.append([0.0] * self.embedding_dimension)
-        
+        batch_size = _ingest_batch_size()
+        embeddings = []
+        for start in range(0, len(chunks), batch_size):
+            embeddings.extend(self._embed_batch(chunks[start:start + batch_size]))
         return embeddings
-    
+
+    def _embed_batch(self, chunks: List[str]) -> List[List[float]]:
+        """Embed one batch of chunks; a failed batch gets zero vectors."""
+        try:
+            return self.get_embeddings(chunks)
+        except Exception as e:
+            logger.error(f"Error generating embeddings for {len(chunks)} chunks: {str(e)}")
+            return [[0.0] * self.embedding_dimension for _ in chunks]
+
+    def ingest_chunks(self, document_id: int, chunks: List[str]) -> int:
+        """
+        Replace a document's chunks, embedding and inserting them batch by batch.
+
+        Each batch of CHUNK_INGEST_BATCH_SIZE chunks is embedded in one call and
+        written with one multi-row INSERT, so a large guideline never holds
+        more than a batch of pending rows. The whole replacement is one
+        transaction.
+        
+        Args:
+            document_id: ID of the document these chunks belong to
+            chunks: List of text chunks
+            
+        Returns:
+            Number of chunks stored
+        """
+        batch_size = _ingest_batch_size()
+        logger.info(f"Ingesting {len(chunks)} chunks for document {document_id}")
+        return self._write_chunks(document_id, (
+            (start, chunks[start:start + batch_size], self._embed_batch(chunks[start:start + batch_size]))
+            for start in range(0, len(chunks), batch_size)))
+
     def _store_chunks(self, document_id: int, chunks: List[str], embeddings: List[List[float]]) -> int:
         """
         Store document chunks with their embeddings in the database.
@@ -781,31 +901,61 @@ class EmbeddingService:
         Returns:
             Number of chunks stored
         """
-        from app import db
-        from app.models.document import DocumentChunk
-        
         # Make sure we have the same number of chunks and embeddings
         if len(chunks) != len(embeddings):
             raise ValueError(f"Number of chunks ({len(chunks)}) does not match number of embeddings ({len(embeddings)})")
         
-        # Delete existing chunks for this document
-        existing_chunks = DocumentChunk.query.filter_by(document_id=document_id).all()
-        for chunk in existing_chunks:
-            db.session.delete(chunk)
-        
-        # Store new chunks
-        for i, (chunk_text, embedding) in enumerate(zip(chunks, embeddings)):
-            chunk = DocumentChunk(
-                document_id=document_id,
-                chunk_index=i,
-                content=chunk_text,
-                embedding=embedding,
-                chunk_metadata={"position": i}
-            )
-            db.session.add(chunk)
-        
-        db.session.commit()
-        return len(chunks)
+        return self._write_chunks(document_id, [(0, chunks, embeddings)])
+
+    def _write_chunks(self, document_id: int, batches) -> int:
+        """Delete a document's chunks and bulk-insert (start, texts, embeddings) batches."""
+        from app import db
+        from app.models import Document
+        from app.models.document import DocumentChunk
+        from app.services.embedding import chunk_index
+
+        table = DocumentChunk.__table__
+        vectors = {}
+        count = 0
+        with span('store_chunks'):
+            try:
+                db.session.execute(table.delete().where(table.c.document_id == document_id))
+                for start, texts, embeddings in batches:
+                    rows = []
+                    for i, (chunk_text, embedding) in enumerate(zip(texts, embeddings), start):
+                        # Local 384-dim vectors go to embedding_384 (the embedding
+                        # column is sized for hosted providers)
+                        local = embedding is not None and len(embedding) == 384
+                        rows.append({
+                            "document_id": document_id,
+                            "chunk_index": i,
+                            "content": chunk_text,
+                            "embedding": None if local else embedding,
+                            "embedding_384": embedding if local else None,
+                            "chunk_metadata": {"position": i},
+                        })
+                        vectors[i] = (embedding if local else None, None if local else embedding)
+                    if rows:
+                        db.session.execute(table.insert(), rows)
+                        count += len(rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+        # Keep the in-process chunk index in step with the table
+        if chunk_index.indexes_loaded():
+            try:
+                document = db.session.get(Document, document_id)
+                ids = (db.session.query(DocumentChunk.chunk_index, DocumentChunk.id)
+                       .filter(DocumentChunk.document_id == document_id).all())
+                chunk_index.sync_document(
+                    document_id, getattr(document, 'world_id', None),
+                    getattr(document, 'document_type', None),
+                    [(chunk_id, *vectors[i]) for i, chunk_id in ids if i in vectors])
+            except Exception as e:
+                logger.warning(f"Could not update chunk index for document {document_id}: {str(e)}")
+        return count
     
     def process_url(self, url: str, title: str, document_type: str, world_id: int) -> int:
         """
@@ -845,11 +995,8 @@ class EmbeddingService:
             # Split text into chunks
             chunks = self._split_text(text)
             
-            # Generate embeddings
-            embeddings = self.embed_documents(chunks)
-            
-            # Store chunks with embeddings
-            self._store_chunks(document.id, chunks, embeddings)
+            # Embed and store chunks in batches
+            self.ingest_chunks(document.id, chunks)
             
             # Update document status
             document.processing_status = PROCESSING_STATUS['COMPLETED']
@@ -375,19 +375,22 @@ class SectionEmbeddingService(EmbeddingService):
                 # Get all sections
                 sections = query.all()
                 
-                for section in sections:
-                    if section.embedding is None:
-                        continue
-                    
-                    # Calculate similarity in Python
-                    similarity = self.calculate_similarity(query_embedding, section.embedding)
-                    
+                sections = [section for section in sections if section.embedding is not None]
+                
+                # Calculate similarity in Python (calculate_similarity, batched)
+                import numpy as np
+                from app.services.embedding.similarity_kernels import cosine_one_to_many
+                similarities = cosine_one_to_many(
+                    query_embedding, [section.embedding for section in sections],
+                    'clamped', dtype=np.float64)
+                
+                for section, similarity in zip(sections, similarities):
                     similar_sections.append({
                         'document_id': section.document_id,
                         'document_title': section.document.title,
                         'section_id': section.section_id,
                         'section_type': section.section_type,
-                        'similarity': similarity,
+                        'similarity': float(similarity),
                         'content': section.content
                     })
                 
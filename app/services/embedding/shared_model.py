@@ -0,0 +1,153 @@
+"""
+Process-shared access to SentenceTransformer models.
+
+Every code path that needs a local embedding model goes through
+``load_sentence_transformer``:
+
+* When EMBEDDING_SERVER_SOCKET is set and the embedding server answers, it
+  returns a ``RemoteSentenceTransformer``: a thin client with the same
+  ``encode`` / ``get_sentence_embedding_dimension`` surface, so no model is
+  loaded in this process at all (see embedding_server.py).
+* Otherwise the model is loaded once per (model, device, local_files_only)
+  and shared by every caller in the process, so constructing several
+  EmbeddingService / SectionEmbeddingService instances no longer loads
+  several copies.
+"""
+
+import logging
+import os
+import socket
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.services.embedding.embedding_server import recv_message, send_message
+
+logger = logging.getLogger(__name__)
+
+# Requests larger than this are split; the server re-batches them anyway.
+_MAX_TEXTS_PER_REQUEST = 1024
+
+_models: Dict[Tuple, object] = {}
+_models_lock = threading.Lock()
+_server_reachable: Dict[str, bool] = {}
+
+
+class EmbeddingServerError(RuntimeError):
+    """The embedding server was unreachable or rejected a request."""
+
+
+class RemoteSentenceTransformer:
+    """Client for the embedding server, usable wherever a SentenceTransformer is."""
+
+    def __init__(self, path: str, model_name: str, timeout: Optional[float] = None):
+        self.path = path
+        self.model_name = model_name
+        self.timeout = timeout if timeout is not None else float(
+            os.environ.get('EMBEDDING_SERVER_TIMEOUT', 60))
+        self._local = threading.local()
+        self._dimension: Optional[int] = None
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, 'sock', None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+            self._local.sock = sock
+        return sock
+
+    def _drop_connection(self) -> None:
+        sock = getattr(self._local, 'sock', None)
+        self._local.sock = None
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def request(self, header: dict) -> Tuple[dict, bytes]:
+        # One reconnect covers a server restart between calls.
+        for attempt in (1, 2):
+            try:
+                sock = self._connection()
+                send_message(sock, header)
+                msg = recv_message(sock)
+                if msg is None:
+                    raise ConnectionError("embedding server closed the connection")
+                break
+            except OSError as e:
+                self._drop_connection()
+                if attempt == 2:
+                    raise EmbeddingServerError(f"embedding server unavailable: {e}") from e
+        reply, payload = msg
+        if not reply.get('ok'):
+            raise EmbeddingServerError(reply.get('error') or 'embedding server error')
+        return reply, payload
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32,
+               show_progress_bar: Optional[bool] = None, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        parts = []
+        for start in range(0, len(texts), _MAX_TEXTS_PER_REQUEST):
+            chunk = texts[start:start + _MAX_TEXTS_PER_REQUEST]
+            reply, payload = self.request({'op': 'encode', 'model': self.model_name,
+                                           'texts': chunk, 'normalize': normalize_embeddings})
+            parts.append(np.frombuffer(payload, dtype='<f4').reshape(reply['shape']))
+        if not parts:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        result = np.vstack(parts) if len(parts) > 1 else parts[0].copy()
+        return result[0] if single else result
+
+    def get_sentence_embedding_dimension(self) -> int:
+        if self._dimension is None:
+            reply, _ = self.request({'op': 'info', 'model': self.model_name})
+            self._dimension = int(reply['dimension'])
+        return self._dimension
+
+
+def _server_available(path: str) -> bool:
+    """Ping the server once per process and path; a missing server means local models."""
+    known = _server_reachable.get(path)
+    if known is not None:
+        return known
+    try:
+        RemoteSentenceTransformer(path, '', timeout=2).request({'op': 'ping'})
+        ok = True
+    except EmbeddingServerError as e:
+        logger.warning(f"Embedding server at {path} unavailable, loading models in-process: {e}")
+        ok = False
+    _server_reachable[path] = ok
+    return ok
+
+
+def load_sentence_transformer(model_name: str, device: Optional[str] = None,
+                              local_files_only: bool = True):
+    """Return the shared model (or server client) for ``model_name``.
+
+    Raises whatever SentenceTransformer raises when the model cannot be
+    loaded locally, so existing fallback handling in callers still applies.
+    """
+    path = os.environ.get('EMBEDDING_SERVER_SOCKET')
+    if path and _server_available(path):
+        return RemoteSentenceTransformer(path, model_name)
+
+    key = (model_name, device, local_files_only)
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            from sentence_transformers import SentenceTransformer
+            kwargs = {'device': device} if device else {}
+            model = SentenceTransformer(model_name, local_files_only=local_files_only, **kwargs)
+            _models[key] = model
+        return model
+
+
+def reset_shared_models() -> None:
+    """Forget loaded models and server probes (tests, or after a fork that must reload)."""
+    with _models_lock:
+        _models.clear()
+    _server_reachable.clear()
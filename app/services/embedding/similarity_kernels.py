@@ -0,0 +1,150 @@
+"""Vectorized cosine kernels, one explicit variant per existing semantics.
+
+Cosine similarity is implemented in several places with deliberately
+different edge-case behaviour (see ``similarity_utils``). Each behaviour is a
+named variant here:
+
+    variant          zero norm  lengths differ                   clamp   matches
+    'raw'            0.0        ValueError                       no      defeasibility_view_service._cosine
+    'prefix'         0.0        leading min(len) components      no      similarity_utils.cosine_similarity_list
+    'truncated_dot'  0.0        dot over the common prefix,      no      edge_resolution._cosine
+                                norms over the whole vectors
+    'strict'         0.0        0.0 (None on either side: 0.0)   no      PrecedentSimilarityService._cosine_similarity
+    'clamped'        0.0        ValueError                       [0, 1]  SectionEmbeddingService.calculate_similarity,
+                                                                         ttl EmbeddingService.compute_similarity
+
+Empty vectors score 0.0 in every variant. Each variant comes in pairwise
+and batched form:
+
+    cosine(a, b, variant)                       -> float
+    cosine_one_to_many(query, items, variant)   -> (N,) scores
+    cosine_matrix(queries, items, variant)      -> (M, N) scores
+    top_k(query, items, k, variant, threshold)  -> [(index, score)], best first
+    top_k_many(queries, items, k, ...)          -> one such list per query
+
+Batched forms L2-normalize the rows once and take a single matrix product.
+They use float32 by default (scores agree with the pairwise float64 forms to
+~1e-6); pass ``dtype=np.float64`` where a caller compares against hard
+thresholds and must reproduce the old scores exactly. Ties in ``top_k`` keep
+input order, like a stable ``sorted(..., reverse=True)``. Ragged item lists
+(vectors of several lengths, or None entries) fall back to the pairwise form
+so the variant's length rules still apply.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+VARIANTS = ('raw', 'prefix', 'truncated_dot', 'strict', 'clamped')
+
+
+def _check(variant: str) -> None:
+    if variant not in VARIANTS:
+        raise ValueError(f"Unknown cosine variant {variant!r}; expected one of {VARIANTS}")
+
+
+def normalize_rows(matrix, dtype=np.float32) -> np.ndarray:
+    """L2-normalize each row; zero rows stay zero."""
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=dtype))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def cosine(a, b, variant: str = 'raw') -> float:
+    """Cosine similarity of two vectors under ``variant`` (float64)."""
+    _check(variant)
+    if a is None or b is None:
+        if variant == 'strict':
+            return 0.0
+        raise TypeError("cosine() of None")
+    a = np.asarray(a, dtype=np.float64).ravel()
+    b = np.asarray(b, dtype=np.float64).ravel()
+    if a.size == 0 or b.size == 0:
+        return 0.0
+    if a.size != b.size:
+        n = min(a.size, b.size)
+        if variant == 'strict':
+            return 0.0
+        if variant == 'prefix':
+            a, b = a[:n], b[:n]
+        elif variant == 'truncated_dot':
+            na, nb = np.linalg.norm(a), np.linalg.norm(b)
+            return float(np.dot(a[:n], b[:n]) / (na * nb)) if na and nb else 0.0
+        else:
+            raise ValueError(f"Vectors differ in length ({a.size} vs {b.size})")
+    na, nb = np.linalg.norm(a), np.linalg.norm(b)
+    if na == 0 or nb == 0:
+        return 0.0
+    sim = float(np.dot(a, b) / (na * nb))
+    return max(0.0, min(1.0, sim)) if variant == 'clamped' else sim
+
+
+def _as_matrix(vectors, dtype) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=dtype)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1) if matrix.size else matrix.reshape(0, 0)
+    if matrix.ndim != 2:
+        raise ValueError(f"Expected a vector or a matrix, got shape {matrix.shape}")
+    return matrix
+
+
+def cosine_matrix(queries, items, variant: str = 'raw', dtype=np.float32) -> np.ndarray:
+    """(M, N) cosine scores of every query row against every item row."""
+    _check(variant)
+    q = _as_matrix(queries, dtype)
+    m = _as_matrix(items, dtype)
+    if not len(q) or not len(m) or q.shape[1] == 0 or m.shape[1] == 0:
+        return np.zeros((len(q), len(m)), dtype=dtype)
+    if q.shape[1] != m.shape[1]:
+        n = min(q.shape[1], m.shape[1])
+        if variant == 'strict':
+            return np.zeros((len(q), len(m)), dtype=dtype)
+        if variant == 'prefix':
+            q, m = q[:, :n], m[:, :n]
+        elif variant == 'truncated_dot':
+            qn = np.linalg.norm(q, axis=1)[:, None]
+            mn = np.linalg.norm(m, axis=1)[None, :]
+            denom = qn * mn
+            return np.divide(q[:, :n] @ m[:, :n].T, denom,
+                             out=np.zeros((len(q), len(m)), dtype=dtype), where=denom > 0)
+        else:
+            raise ValueError(f"Vectors differ in length ({q.shape[1]} vs {m.shape[1]})")
+    scores = normalize_rows(q, dtype) @ normalize_rows(m, dtype).T
+    if variant == 'clamped':
+        np.clip(scores, 0.0, 1.0, out=scores)
+    return scores
+
+
+def cosine_one_to_many(query, items: Sequence, variant: str = 'raw', dtype=np.float32) -> np.ndarray:
+    """(N,) cosine scores of one query against each item."""
+    _check(variant)
+    if items is None or len(items) == 0:
+        return np.zeros(0, dtype=dtype)
+    if query is None:
+        if variant == 'strict':
+            return np.zeros(len(items), dtype=dtype)
+        raise TypeError("cosine() of None")
+    try:
+        matrix = _as_matrix(items, dtype)
+    except (TypeError, ValueError):
+        # ragged or None entries: score pair by pair under the same variant
+        return np.array([cosine(query, item, variant) for item in items], dtype=dtype)
+    return cosine_matrix(np.asarray(query, dtype=dtype).ravel(), matrix, variant, dtype)[0]
+
+
+def _top(scores: np.ndarray, k: int, threshold: Optional[float]) -> List[Tuple[int, float]]:
+    order = np.argsort(-scores, kind='stable')[:max(k, 0)]
+    return [(int(i), float(scores[i])) for i in order
+            if threshold is None or scores[i] >= threshold]
+
+
+def top_k(query, items: Sequence, k: int, variant: str = 'raw',
+          threshold: Optional[float] = None, dtype=np.float32) -> List[Tuple[int, float]]:
+    """The k best (item index, score) pairs at or above ``threshold``, best first."""
+    return _top(cosine_one_to_many(query, items, variant, dtype), k, threshold)
+
+
+def top_k_many(queries, items, k: int, variant: str = 'raw',
+               threshold: Optional[float] = None, dtype=np.float32) -> List[List[Tuple[int, float]]]:
+    """``top_k`` for each query row, from one (M, N) score matrix."""
+    return [_top(row, k, threshold) for row in cosine_matrix(queries, items, variant, dtype)]
@@ -9,6 +9,8 @@ The numpy-based cosines in ``section_embedding_service``,
 differ in load-bearing ways (clamping to [0, 1], None handling,
 length-mismatch semantics, pre-normalization) and are intentionally NOT
 routed through here, because doing so would change their results.
+``similarity_kernels`` provides every variant (this one is ``'prefix'``)
+explicitly, pairwise and in batched NumPy form.
 """
 
 from typing import List
@@ -3,20 +3,28 @@
 The committed per-case ontology TTL under the OntServe ontologies directory is
 the authoritative record of an extracted case. This module is the single access
 point for reading it from ProEthica view code: path resolution, existence check,
-and a per-(path, mtime) parsed-graph cache shared by every consumer, so repeated
+and parsed-graph access through the shared graph store (graph_store), so repeated
 reads of the same case graph do not re-parse it.
 """
 
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
 import rdflib
 
+from app.services.entity.graph_store import load_ttl_graph
+from app.services.entity.triple_index import TripleIndex
 from app.services.ontserve.ontserve_config import get_ontserve_base_path
 
 logger = logging.getLogger(__name__)
 
-_GRAPH_CACHE = {}
+# case TTL path -> (mtime_ns, size, TripleIndex); most recently used last. The
+# indexes are compact, so the bound is a plain entry count.
+_INDEX_CACHE_MAX = 256
+_index_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_index_lock = threading.Lock()
 
 
 def case_ttl_path(case_id: int) -> Path:
@@ -55,15 +63,33 @@ def load_case_graph(case_id: int) -> rdflib.Graph:
         # A missing committed TTL is a genuine state (not every case is extracted),
         # surfaced to the caller rather than silently substituted.
         raise FileNotFoundError(f"No committed ontology for case {case_id}: {path}")
-    # Cache the parsed graph per (path, mtime) so repeated reads of the same case
-    # TTL do not re-parse it. Read-only use only. Stale mtimes for the same path
-    # are dropped so re-commits do not accumulate dead graphs.
-    key = (str(path), path.stat().st_mtime_ns)
-    g = _GRAPH_CACHE.get(key)
-    if g is None:
-        for old in [k for k in _GRAPH_CACHE if k[0] == key[0]]:
-            del _GRAPH_CACHE[old]
-        g = rdflib.Graph()
-        g.parse(str(path), format="turtle")
-        _GRAPH_CACHE[key] = g
-    return g
+    # The graph store validates against the file's mtime and size, so a re-commit
+    # is picked up on the next read. Read-only use only.
+    return load_ttl_graph(path)
+
+
+def load_case_index(case_id: int) -> TripleIndex:
+    """Read-optimized triple index over the committed case graph.
+
+    Built once per committed TTL version (mtime and size) and cached; the
+    parsed graph it is built from is not retained. Use this instead of
+    load_case_graph for label lookups and subjects/objects walks. Raises
+    FileNotFoundError when the case has no committed TTL.
+    """
+    path = case_ttl_path(case_id)
+    if not path.exists():
+        raise FileNotFoundError(f"No committed ontology for case {case_id}: {path}")
+    st = path.stat()
+    key = str(path)
+    with _index_lock:
+        hit = _index_cache.get(key)
+        if hit is not None and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+            _index_cache.move_to_end(key)
+            return hit[2]
+    index = TripleIndex.from_graph(load_ttl_graph(path, retain=False))
+    with _index_lock:
+        _index_cache[key] = (st.st_mtime_ns, st.st_size, index)
+        _index_cache.move_to_end(key)
+        while len(_index_cache) > _INDEX_CACHE_MAX:
+            _index_cache.popitem(last=False)
+    return index
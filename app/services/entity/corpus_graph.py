@@ -0,0 +1,507 @@
+"""Cross-case corpus graph: every committed case TTL in one indexed store.
+
+Cross-case questions ("every case where an obligation of type X yields to one of
+type Y") previously meant parsing each ``proethica-case-<id>.ttl`` in turn or
+maintaining a bespoke side table. This module keeps a single embedded quad store
+with one named graph per case, ingested incrementally when a case is committed,
+and exposes SPARQL over it.
+
+Storage is an rdflib ``Store`` implemented on the standard-library ``sqlite3``
+module (no extra dependency): interned terms plus a ``quads`` table with SPO,
+POS and OSP covering indexes, so rdflib's SPARQL engine resolves each triple
+pattern with an indexed lookup instead of a scan. The database runs in WAL mode
+so Gunicorn workers can read while a commit ingests. Within a process the one
+connection and the term caches are shared, so every store call holds the
+store's lock. Removing quads garbage-collects the terms nothing references any
+more, so re-committing a case does not grow the terms table.
+
+The named graph for case N is ``http://proethica.org/ontology/case/N``. Ingest
+is keyed by the SHA-256 of the TTL bytes, so re-ingesting an unchanged case is a
+no-op. The store is a derived cache: ``sync_corpus`` rebuilds it from the TTLs.
+Location: CORPUS_GRAPH_PATH (default ``data/corpus_graph.sqlite`` under the
+repository root).
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from rdflib import BNode, Literal, URIRef
+from rdflib.graph import Dataset, Graph
+from rdflib.store import VALID_STORE, Store
+
+logger = logging.getLogger(__name__)
+
+CASE_GRAPH_TEMPLATE = "http://proethica.org/ontology/case/{case_id}"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    datatype TEXT NOT NULL DEFAULT '',
+    lang TEXT NOT NULL DEFAULT '',
+    UNIQUE (kind, value, datatype, lang)
+);
+CREATE TABLE IF NOT EXISTS quads (
+    g INTEGER NOT NULL,
+    s INTEGER NOT NULL,
+    p INTEGER NOT NULL,
+    o INTEGER NOT NULL,
+    PRIMARY KEY (g, s, p, o)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS quads_spo ON quads (s, p, o, g);
+CREATE INDEX IF NOT EXISTS quads_pos ON quads (p, o, s, g);
+CREATE INDEX IF NOT EXISTS quads_osp ON quads (o, s, p, g);
+CREATE TABLE IF NOT EXISTS namespaces (
+    prefix TEXT PRIMARY KEY,
+    uri TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS corpus_cases (
+    case_id INTEGER PRIMARY KEY,
+    graph_iri TEXT NOT NULL,
+    content_sha256 TEXT NOT NULL,
+    triple_count INTEGER NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+"""
+
+
+def _term_key(term) -> Tuple[str, str, str, str]:
+    if isinstance(term, Literal):
+        return ('L', str(term), str(term.datatype or ''), term.language or '')
+    if isinstance(term, BNode):
+        return ('B', str(term), '', '')
+    return ('U', str(term), '', '')
+
+
+def _term_from_row(kind: str, value: str, datatype: str, lang: str):
+    if kind == 'L':
+        return Literal(value, lang=lang or None, datatype=URIRef(datatype) if datatype else None)
+    if kind == 'B':
+        return BNode(value)
+    return URIRef(value)
+
+
+class SQLiteQuadStore(Store):
+    """Context-aware rdflib store on sqlite3. Formulae (quoted graphs) are not supported.
+
+    ``lock`` guards the connection and the term caches; hold it across
+    multi-statement transactions that use ``connection`` directly.
+    """
+
+    context_aware = True
+    graph_aware = True
+    formula_aware = False
+    transaction_aware = False
+
+    def __init__(self, configuration: Optional[str] = None, identifier=None):
+        self._conn: Optional[sqlite3.Connection] = None
+        self._ids: Dict[Tuple, int] = {}
+        self._terms: Dict[int, Any] = {}
+        self.lock = threading.RLock()
+        super().__init__(configuration, identifier)
+
+    # --- lifecycle -----------------------------------------------------------
+
+    def open(self, configuration: str, create: bool = True) -> int:
+        Path(configuration).parent.mkdir(parents=True, exist_ok=True)
+        with self.lock:
+            self._conn = sqlite3.connect(configuration, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+        return VALID_STORE
+
+    def close(self, commit_pending_transaction: bool = False) -> None:
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        return self._conn
+
+    # --- term interning (callers hold self.lock) -------------------------------
+
+    def _id(self, term, create: bool = False) -> Optional[int]:
+        key = _term_key(term)
+        tid = self._ids.get(key)
+        if tid is not None:
+            return tid
+        row = self._conn.execute(
+            "SELECT id FROM terms WHERE kind=? AND value=? AND datatype=? AND lang=?", key
+        ).fetchone()
+        if row is None:
+            if not create:
+                return None
+            cur = self._conn.execute(
+                "INSERT INTO terms (kind, value, datatype, lang) VALUES (?, ?, ?, ?)", key)
+            tid = cur.lastrowid
+        else:
+            tid = row[0]
+        self._ids[key] = tid
+        self._terms[tid] = term
+        return tid
+
+    def _term(self, tid: int):
+        term = self._terms.get(tid)
+        if term is None:
+            row = self._conn.execute(
+                "SELECT kind, value, datatype, lang FROM terms WHERE id=?", (tid,)).fetchone()
+            term = _term_from_row(*row)
+            self._terms[tid] = term
+            self._ids[_term_key(term)] = tid
+        return term
+
+    def _delete_quads(self, where: str, params: list) -> set:
+        """Delete the matching quads; returns the term ids they referenced."""
+        rows = self._conn.execute("SELECT s, p, o, g FROM quads" + where, params).fetchall()
+        self._conn.execute("DELETE FROM quads" + where, params)
+        return {tid for row in rows for tid in row}
+
+    def _collect_terms(self, candidates: set) -> None:
+        """Delete the candidate terms no quad references any more (same transaction)."""
+        orphans = [(tid,) for tid in candidates if self._conn.execute(
+            "SELECT NOT EXISTS (SELECT 1 FROM quads WHERE s = :t)"
+            " AND NOT EXISTS (SELECT 1 FROM quads WHERE p = :t)"
+            " AND NOT EXISTS (SELECT 1 FROM quads WHERE o = :t)"
+            " AND NOT EXISTS (SELECT 1 FROM quads WHERE g = :t)", {'t': tid}).fetchone()[0]]
+        self._conn.executemany("DELETE FROM terms WHERE id = ?", orphans)
+        for (tid,) in orphans:
+            term = self._terms.pop(tid, None)
+            if term is not None:
+                self._ids.pop(_term_key(term), None)
+
+    @staticmethod
+    def _ctx_term(context):
+        if context is None:
+            return None
+        return getattr(context, 'identifier', context)
+
+    # --- rdflib Store API ----------------------------------------------------
+
+    def add(self, triple, context, quoted: bool = False) -> None:
+        Store.add(self, triple, context, quoted)
+        self.addN([(*triple, context)])
+
+    def addN(self, quads: Iterable) -> None:
+        with self.lock, self._conn:
+            rows = []
+            for s, p, o, c in quads:
+                g = self._ctx_term(c)
+                rows.append((self._id(g, True), self._id(s, True),
+                             self._id(p, True), self._id(o, True)))
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO quads (g, s, p, o) VALUES (?, ?, ?, ?)", rows)
+
+    def _where(self, triple, context) -> Optional[Tuple[str, list]]:
+        clauses, params = [], []
+        for col, term in zip(('s', 'p', 'o'), triple):
+            if term is None:
+                continue
+            tid = self._id(term)
+            if tid is None:
+                return None
+            clauses.append(f"{col} = ?")
+            params.append(tid)
+        ctx = self._ctx_term(context)
+        if ctx is not None:
+            gid = self._id(ctx)
+            if gid is None:
+                return None
+            clauses.append("g = ?")
+            params.append(gid)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def remove(self, triple, context=None) -> None:
+        Store.remove(self, triple, context)
+        with self.lock:
+            where = self._where(triple, context)
+            if where is None:
+                return
+            with self._conn:
+                self._collect_terms(self._delete_quads(*where))
+
+    def triples(self, triple_pattern, context=None) -> Iterator:
+        # Terms are resolved under the lock: a concurrent remove may collect them.
+        with self.lock:
+            where = self._where(triple_pattern, context)
+            if where is None:
+                return
+            rows = self._conn.execute(
+                "SELECT s, p, o, g FROM quads" + where[0] + " ORDER BY s, p, o",
+                where[1]).fetchall()
+            matches, current, graphs = [], None, []
+            for s, p, o, g in rows:
+                if (s, p, o) != current:
+                    if current is not None:
+                        matches.append(self._emit(current, graphs))
+                    current, graphs = (s, p, o), []
+                graphs.append(g)
+            if current is not None:
+                matches.append(self._emit(current, graphs))
+        yield from matches
+
+    def _emit(self, spo, graph_ids):
+        triple = tuple(self._term(i) for i in spo)
+        contexts = [Graph(store=self, identifier=self._term(g)) for g in graph_ids]
+        return triple, iter(contexts)
+
+    def __len__(self, context=None) -> int:
+        with self.lock:
+            where = self._where((None, None, None), context)
+            if where is None:
+                return 0
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM quads" + where[0], where[1]).fetchone()[0]
+
+    def contexts(self, triple=None) -> Iterator[Graph]:
+        with self.lock:
+            if triple is None:
+                rows = self._conn.execute("SELECT DISTINCT g FROM quads").fetchall()
+            else:
+                where = self._where(triple, None)
+                if where is None:
+                    return
+                rows = self._conn.execute(
+                    "SELECT DISTINCT g FROM quads" + where[0], where[1]).fetchall()
+            graphs = [Graph(store=self, identifier=self._term(gid)) for (gid,) in rows]
+        yield from graphs
+
+    def add_graph(self, graph) -> None:
+        # Graphs exist implicitly through their quads.
+        pass
+
+    def remove_graph(self, graph) -> None:
+        with self.lock:
+            gid = self._id(self._ctx_term(graph))
+            if gid is not None:
+                with self._conn:
+                    self._collect_terms(self._delete_quads(" WHERE g = ?", [gid]))
+
+    def bind(self, prefix: str, namespace, override: bool = True) -> None:
+        verb = "INSERT OR REPLACE" if override else "INSERT OR IGNORE"
+        with self.lock, self._conn:
+            self._conn.execute(f"{verb} INTO namespaces (prefix, uri) VALUES (?, ?)",
+                               (prefix, str(namespace)))
+
+    def namespace(self, prefix: str):
+        with self.lock:
+            row = self._conn.execute(
+                "SELECT uri FROM namespaces WHERE prefix=?", (prefix,)).fetchone()
+        return URIRef(row[0]) if row else None
+
+    def prefix(self, namespace):
+        with self.lock:
+            row = self._conn.execute(
+                "SELECT prefix FROM namespaces WHERE uri=?", (str(namespace),)).fetchone()
+        return row[0] if row else None
+
+    def namespaces(self):
+        with self.lock:
+            rows = self._conn.execute("SELECT prefix, uri FROM namespaces").fetchall()
+        for prefix, uri in rows:
+            yield prefix, URIRef(uri)
+
+    # --- bulk graph replacement ----------------------------------------------
+
+    def replace_graph(self, graph_iri: URIRef, triples: Iterable) -> int:
+        """Replace a named graph's contents in one transaction. Returns the triple count.
+
+        Terms only the old contents used are deleted in the same transaction.
+        """
+        triples = list(triples)
+        with self.lock, self._conn:
+            gid = self._id(graph_iri, True)
+            rows = [(gid, self._id(s, True), self._id(p, True), self._id(o, True))
+                    for s, p, o in triples]
+            candidates = self._delete_quads(" WHERE g = ?", [gid])
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO quads (g, s, p, o) VALUES (?, ?, ?, ?)", rows)
+            self._collect_terms(candidates)
+        return len(rows)
+
+
+# --- corpus API ---------------------------------------------------------------
+
+_lock = threading.Lock()
+_store: Optional[SQLiteQuadStore] = None
+
+
+def corpus_graph_path() -> Path:
+    env = os.environ.get('CORPUS_GRAPH_PATH')
+    if env:
+        return Path(env)
+    return Path(__file__).resolve().parents[3] / 'data' / 'corpus_graph.sqlite'
+
+
+def get_store() -> SQLiteQuadStore:
+    """Process-wide store handle (opened lazily)."""
+    global _store
+    with _lock:
+        if _store is None:
+            store = SQLiteQuadStore()
+            store.open(str(corpus_graph_path()), create=True)
+            _store = store
+        return _store
+
+
+def reset_store() -> None:
+    """Close the process-wide handle (the next get_store reopens CORPUS_GRAPH_PATH)."""
+    global _store
+    with _lock:
+        if _store is not None:
+            _store.close()
+        _store = None
+
+
+def case_graph_iri(case_id: int) -> URIRef:
+    return URIRef(CASE_GRAPH_TEMPLATE.format(case_id=case_id))
+
+
+def ingest_case(case_id: int, ttl_path: Optional[Path] = None) -> Dict[str, Any]:
+    """Load a committed case TTL into its named graph, skipping unchanged content.
+
+    A missing TTL removes the case from the corpus (the uncommitted state).
+    """
+    from app.services.entity.committed_case_graph import case_ttl_path
+    from app.services.entity.graph_store import load_ttl_graph
+
+    path = Path(ttl_path) if ttl_path else case_ttl_path(case_id)
+    if not path.exists():
+        if _store is None and not corpus_graph_path().exists():
+            return {'case_id': case_id, 'status': 'missing_ttl'}
+        removed = remove_case(case_id)
+        return {'case_id': case_id, 'status': 'removed' if removed else 'missing_ttl'}
+
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    store = get_store()
+    with store.lock:
+        row = store.connection.execute(
+            "SELECT content_sha256 FROM corpus_cases WHERE case_id = ?", (case_id,)).fetchone()
+    if row and row[0] == digest:
+        return {'case_id': case_id, 'status': 'unchanged'}
+
+    g = load_ttl_graph(path, retain=False)
+    iri = case_graph_iri(case_id)
+    with store.lock:
+        count = store.replace_graph(iri, g)
+        for prefix, ns in g.namespaces():
+            if prefix:
+                store.connection.execute(
+                    "INSERT OR IGNORE INTO namespaces (prefix, uri) VALUES (?, ?)",
+                    (prefix, str(ns)))
+        store.connection.execute(
+            "INSERT OR REPLACE INTO corpus_cases "
+            "(case_id, graph_iri, content_sha256, triple_count, ingested_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (case_id, str(iri), digest, count, datetime.now(timezone.utc).isoformat()))
+        store.connection.commit()
+    logger.info(f"Corpus graph: ingested case {case_id} ({count} triples)")
+    return {'case_id': case_id, 'status': 'ingested', 'triples': count}
+
+
+def remove_case(case_id: int) -> bool:
+    store = get_store()
+    with store.lock:
+        store.remove_graph(case_graph_iri(case_id))
+        cur = store.connection.execute("DELETE FROM corpus_cases WHERE case_id = ?", (case_id,))
+        store.connection.commit()
+    return cur.rowcount > 0
+
+
+def sync_case(case_id: int) -> Dict[str, Any]:
+    """Best-effort commit/uncommit hook: ingest or drop the case. Never raises."""
+    try:
+        return ingest_case(case_id)
+    except Exception as e:
+        logger.warning(f"Corpus graph sync failed for case {case_id}: {e}", exc_info=True)
+        return {'case_id': case_id, 'status': 'error', 'error': str(e)}
+
+
+def sync_corpus(ontologies_dir: Optional[Path] = None) -> Dict[str, int]:
+    """Ingest every committed case TTL (unchanged ones are skipped) and drop cases
+    whose TTL is gone. Returns status counts."""
+    import re
+    from app.services.ontserve.ontserve_config import get_ontserve_base_path
+
+    root = Path(ontologies_dir) if ontologies_dir else get_ontserve_base_path() / 'ontologies'
+    counts: Dict[str, int] = {}
+    present = set()
+    for path in sorted(root.glob('proethica-case-*.ttl')):
+        m = re.fullmatch(r'proethica-case-(\d+)\.ttl', path.name)
+        if not m:
+            continue
+        case_id = int(m.group(1))
+        present.add(case_id)
+        status = ingest_case(case_id, path)['status']
+        counts[status] = counts.get(status, 0) + 1
+    store = get_store()
+    with store.lock:
+        known = {r[0] for r in store.connection.execute("SELECT case_id FROM corpus_cases")}
+    for case_id in known - present:
+        remove_case(case_id)
+        counts['removed'] = counts.get('removed', 0) + 1
+    return counts
+
+
+def corpus_dataset() -> Dataset:
+    """rdflib Dataset over the corpus store. The default graph is the union of all
+    case graphs; ``GRAPH ?g { ... }`` binds the case graph IRI."""
+    return Dataset(store=get_store(), default_union=True)
+
+
+def query(sparql: str, init_bindings: Optional[Dict[str, Any]] = None):
+    """Run a SPARQL query over the corpus; returns the rdflib Result."""
+    return corpus_dataset().query(sparql, initBindings=init_bindings or {})
+
+
+def case_id_from_graph(graph_iri) -> Optional[int]:
+    tail = str(graph_iri).rstrip('/').rsplit('/', 1)[-1]
+    return int(tail) if tail.isdigit() else None
+
+
+_YIELDS_QUERY = """
+PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX core: <http://proethica.org/ontology/core#>
+PREFIX proeth: <http://proethica.org/ontology/intermediate#>
+SELECT DISTINCT ?g ?winner ?winnerLabel ?loser ?loserLabel WHERE {
+    GRAPH ?g {
+        ?winner core:prevailsOver ?loser .
+        ?loser rdf:type ?loserType .
+        ?winner rdf:type ?winnerType .
+        OPTIONAL { ?winner rdfs:label ?winnerLabel }
+        OPTIONAL { ?loser rdfs:label ?loserLabel }
+    }
+}
+"""
+
+
+def cases_where_yields(loser_type: str, winner_type: Optional[str] = None) -> list:
+    """Every resolved competition where an obligation of intermediate type
+    ``loser_type`` (local name, e.g. ``FaithfulAgentObligation``) yields, optionally
+    to one of ``winner_type``. One indexed query across all committed cases."""
+    bindings = {'loserType': URIRef(f"http://proethica.org/ontology/intermediate#{loser_type}")}
+    if winner_type:
+        bindings['winnerType'] = URIRef(
+            f"http://proethica.org/ontology/intermediate#{winner_type}")
+    rows = []
+    for r in query(_YIELDS_QUERY, bindings):
+        rows.append({
+            'case_id': case_id_from_graph(r.g),
+            'winner_uri': str(r.winner),
+            'winner_label': str(r.winnerLabel) if r.winnerLabel else None,
+            'loser_uri': str(r.loser),
+            'loser_label': str(r.loserLabel) if r.loserLabel else None,
+        })
+    rows.sort(key=lambda x: (x['case_id'] or 0, x['loser_label'] or '', x['winner_label'] or ''))
+    return rows
@@ -74,10 +74,11 @@ def _add_committed_graph_edges(case_id: int, nodes: list, edges: list, label_to_
 
     Raises FileNotFoundError when the case has no committed TTL (caller treats
     that as the uncommitted-case state and keeps JSON-derived edges only).
+    Reads the compact triple index, not the parsed rdflib graph.
     """
     from rdflib import RDF, RDFS, URIRef
-    from app.services.entity.committed_case_graph import load_case_graph
-    g = load_case_graph(case_id)
+    from app.services.entity.committed_case_graph import load_case_index
+    g = load_case_index(case_id)
 
     core_agent = URIRef("http://proethica.org/ontology/core#Agent")
     for s in g.subjects(RDF.type, core_agent):
@@ -108,9 +109,12 @@ def _add_committed_graph_edges(case_id: int, nodes: list, edges: list, label_to_
 
     existing = {(e['source'], e['target'], e['type']) for e in edges}
     added = 0
-    for s, p, o in g:
+    # Walk only the object-property predicates in the edge namespace.
+    edge_triples = ((s, p, o) for p in g.predicates() if str(p).startswith(_GRAPH_EDGE_NS)
+                    for s, o in g.subject_objects(p))
+    for s, p, o in edge_triples:
         ps = str(p)
-        if not ps.startswith(_GRAPH_EDGE_NS) or not isinstance(o, URIRef):
+        if not isinstance(o, URIRef):
             continue
         s_l = g.value(s, RDFS.label)
         o_l = g.value(o, RDFS.label)
@@ -209,8 +213,16 @@ def build_entity_graph(case_id: int, show_type_hubs: bool = False) -> dict:
     """
     Build entity graph data for D3.js visualization.
 
-    Returns dict with nodes, edges, metadata, and success flag.
+    Returns dict with nodes, edges, metadata, and success flag. Served from the
+    per-case view-model cache (see app.services.view_model_cache).
     """
+    from app.services.view_model_cache import cached_view
+    return cached_view('entity_graph', case_id,
+                       lambda: _build_entity_graph(case_id, show_type_hubs),
+                       variant=(bool(show_type_hubs),))
+
+
+def _build_entity_graph(case_id: int, show_type_hubs: bool = False) -> dict:
     case = Document.query.get_or_404(case_id)
 
     entities = TemporaryRDFStorage.query.filter(
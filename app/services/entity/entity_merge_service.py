@@ -29,6 +29,7 @@ class EntityMergeService:
             'properties_added': 0,
             'sections_combined': []
         }
+        self._section_types: Dict[str, str] = {}
 
     def find_existing_entity(
         self,
@@ -62,12 +63,28 @@ class EntityMergeService:
 
     def get_section_type(self, extraction_session_id: str) -> str:
         """Get the section type for an extraction session."""
+        if extraction_session_id in self._section_types:
+            return self._section_types[extraction_session_id]
         prompt = ExtractionPrompt.query.filter_by(
             extraction_session_id=extraction_session_id
         ).first()
-        if prompt and prompt.section_type:
-            return prompt.section_type
-        return "unknown"
+        section_type = prompt.section_type if prompt and prompt.section_type else "unknown"
+        self._section_types[extraction_session_id] = section_type
+        return section_type
+
+    def prime_section_types(self, extraction_session_ids) -> None:
+        """Load the section types of many extraction sessions in one query."""
+        missing = {s for s in extraction_session_ids if s} - set(self._section_types)
+        if not missing:
+            return
+        rows = db.session.query(
+            ExtractionPrompt.extraction_session_id, ExtractionPrompt.section_type
+        ).filter(ExtractionPrompt.extraction_session_id.in_(missing)).all()
+        for session_id, section_type in rows:
+            if section_type and session_id not in self._section_types:
+                self._section_types[session_id] = section_type
+        for session_id in missing:
+            self._section_types.setdefault(session_id, "unknown")
 
     def merge_entity_properties(
         self,
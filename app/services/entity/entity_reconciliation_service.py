@@ -17,6 +17,7 @@ import logging
 import os
 import re
 from difflib import SequenceMatcher
+from types import SimpleNamespace
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 
@@ -87,6 +88,8 @@ class ReconciliationResult:
     review_candidates: List[ReconciliationCandidate] = field(default_factory=list)
     skipped: int = 0
     errors: List[str] = field(default_factory=list)
+    # Undo snapshots of auto-merged clusters: {'keep': snapshot, 'merged': [snapshots]}
+    merge_snapshots: List[Dict[str, Any]] = field(default_factory=list)
 
 
 class EntityReconciliationService:
@@ -99,11 +102,8 @@ class EntityReconciliationService:
         """Batch mode: exact-match merges only, no LLM, no review candidates."""
         result = ReconciliationResult(case_id=case_id)
         groups = self._group_entities(case_id)
-
-        for group_key, entities in groups.items():
-            merged = self._auto_merge_exact_matches(entities, result)
-            result.auto_merged += merged
-
+        result.auto_merged += self._auto_merge_exact_matches(
+            [e for entities in groups.values() for e in entities], result)
         return result
 
     def reconcile_with_review(self, case_id: int) -> ReconciliationResult:
@@ -111,10 +111,9 @@ class EntityReconciliationService:
         result = ReconciliationResult(case_id=case_id)
         groups = self._group_entities(case_id)
 
-        for group_key, entities in groups.items():
-            # Phase 2: Exact-match auto-merge
-            merged = self._auto_merge_exact_matches(entities, result)
-            result.auto_merged += merged
+        # Phase 2: Exact-match auto-merge
+        result.auto_merged += self._auto_merge_exact_matches(
+            [e for entities in groups.values() for e in entities], result)
 
         # Re-fetch groups after merges (entities were deleted)
         groups = self._group_entities(case_id)
@@ -199,11 +198,118 @@ class EntityReconciliationService:
             logger.error(f"Merge failed: {e}", exc_info=True)
             return {'success': False, 'error': str(e)}
 
+    def merge_clusters(self, clusters: List[List[TemporaryRDFStorage]]) -> Dict[str, Any]:
+        """Merge whole duplicate clusters in one transaction.
+
+        Each cluster is a list of loaded entities; the first unpublished one is
+        kept and the other unpublished ones are merged into it. Published
+        members are left out of the merge and reported in 'errors'. Merged rows
+        are computed in memory with EntityMergeService.merge_entity_properties(),
+        then written with one executemany UPDATE for the kept rows and one
+        DELETE for the merged rows.
+
+        The write is all-or-nothing: if it fails (a deadlock, a row deleted
+        underneath us), every cluster of the call is rolled back and reported
+        as one error, and nothing is merged.
+
+        Returns dict with 'success', 'merged' (rows deleted), 'errors' and
+        'snapshots' -- one {'keep': snapshot, 'merged': [snapshots]} per cluster,
+        for unmerge_cluster().
+        """
+        from sqlalchemy import bindparam, delete, update
+
+        errors: List[str] = []
+        plans = []
+        for cluster in clusters:
+            published = [e for e in cluster if e.is_published]
+            if published:
+                errors.append(
+                    f"Cannot merge published entities: "
+                    f"{', '.join(repr(e.entity_label) for e in published)}"
+                )
+            drafts = [e for e in cluster if not e.is_published]
+            if len(drafts) > 1:
+                plans.append((drafts[0], drafts[1:]))
+
+        if not plans:
+            return {'success': not errors, 'merged': 0, 'errors': errors, 'snapshots': []}
+
+        self._merge_service.prime_section_types(
+            e.extraction_session_id for keep, merged in plans for e in [keep] + merged)
+
+        rows, merged_ids, snapshots = [], [], []
+        for keep, merged in plans:
+            keep_snapshot = self._snapshot_entity(keep)
+            merged_snapshots = [self._snapshot_entity(e) for e in merged]
+            # Merge into a detached copy so the ORM does not flush per-row UPDATEs
+            target = SimpleNamespace(
+                entity_label=keep.entity_label,
+                extraction_session_id=keep.extraction_session_id,
+                rdf_json_ld=json.loads(json.dumps(keep.rdf_json_ld)) if keep.rdf_json_ld else None,
+                property_count=keep.property_count,
+                relationship_count=keep.relationship_count,
+            )
+            for entity, snapshot in zip(merged, merged_snapshots):
+                self._merge_service.merge_entity_properties(
+                    target,
+                    json.loads(json.dumps(snapshot['rdf_json_ld'])),
+                    entity.extraction_session_id
+                )
+                preferred = self._pick_preferred_label(
+                    target.entity_label or '', entity.entity_label or '')
+                if preferred != (target.entity_label or ''):
+                    target.entity_label = preferred
+                    target.rdf_json_ld['label'] = preferred
+
+            rows.append({
+                'row_id': keep.id,
+                'new_entity_label': target.entity_label,
+                'new_rdf_json_ld': target.rdf_json_ld,
+                'new_property_count': target.property_count,
+                'new_relationship_count': target.relationship_count,
+            })
+            merged_ids.extend(e.id for e in merged)
+            snapshots.append({'keep': keep_snapshot, 'merged': merged_snapshots})
+
+        table = TemporaryRDFStorage.__table__
+        try:
+            db.session.execute(
+                update(table)
+                .where(table.c.id == bindparam('row_id'))
+                .values(
+                    entity_label=bindparam('new_entity_label'),
+                    rdf_json_ld=bindparam('new_rdf_json_ld'),
+                    property_count=bindparam('new_property_count'),
+                    relationship_count=bindparam('new_relationship_count'),
+                    updated_at=db.func.now(),
+                ),
+                rows,
+            )
+            db.session.execute(delete(table).where(table.c.id.in_(merged_ids)))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Cluster merge failed: {e}", exc_info=True)
+            return {'success': False, 'merged': 0, 'errors': errors + [str(e)], 'snapshots': []}
+
+        logger.info(
+            f"Merged {len(merged_ids)} entities into {len(rows)} clusters"
+        )
+        return {'success': not errors, 'merged': len(merged_ids), 'errors': errors,
+                'snapshots': snapshots}
+
     def unmerge_entities(self, keep_snapshot: Dict, merge_snapshot: Dict) -> bool:
         """Restore both entities to their pre-merge state.
 
         Restores the kept entity from its snapshot and recreates the deleted entity.
         """
+        return self.unmerge_cluster(keep_snapshot, [merge_snapshot])
+
+    def unmerge_cluster(self, keep_snapshot: Dict, merged_snapshots: List[Dict]) -> bool:
+        """Restore a merged cluster to its pre-merge state.
+
+        Restores the kept entity from its snapshot and recreates every deleted entity.
+        """
         keep_id = keep_snapshot.get('id')
         keep_entity = TemporaryRDFStorage.query.get(keep_id)
 
@@ -219,33 +325,14 @@ class EntityReconciliationService:
             keep_entity.property_count = keep_snapshot.get('property_count', 0)
             keep_entity.relationship_count = keep_snapshot.get('relationship_count', 0)
 
-            # Recreate the deleted entity
-            restored = TemporaryRDFStorage(
-                case_id=merge_snapshot['case_id'],
-                extraction_session_id=merge_snapshot['extraction_session_id'],
-                extraction_type=merge_snapshot['extraction_type'],
-                storage_type=merge_snapshot['storage_type'],
-                ontology_target=merge_snapshot.get('ontology_target'),
-                entity_label=merge_snapshot['entity_label'],
-                entity_type=merge_snapshot.get('entity_type'),
-                entity_definition=merge_snapshot.get('entity_definition'),
-                entity_uri=merge_snapshot.get('entity_uri'),
-                rdf_json_ld=merge_snapshot['rdf_json_ld'],
-                extraction_model=merge_snapshot.get('extraction_model'),
-                provenance_metadata=merge_snapshot.get('provenance_metadata', {}),
-                matched_ontology_uri=merge_snapshot.get('matched_ontology_uri'),
-                matched_ontology_label=merge_snapshot.get('matched_ontology_label'),
-                match_confidence=merge_snapshot.get('match_confidence'),
-                match_method=merge_snapshot.get('match_method'),
-                match_reasoning=merge_snapshot.get('match_reasoning'),
-                is_selected=merge_snapshot.get('is_selected', True),
-                is_published=False,
-            )
-            db.session.add(restored)
+            # Recreate the deleted entities
+            for merge_snapshot in merged_snapshots:
+                db.session.add(self._restore_entity(merge_snapshot))
             db.session.commit()
 
             logger.info(
-                f"Unmerged: restored '{merge_snapshot['entity_label']}' "
+                f"Unmerged: restored "
+                f"{', '.join(repr(m['entity_label']) for m in merged_snapshots)} "
                 f"and reverted '{keep_entity.entity_label}' (id={keep_id})"
             )
             return True
@@ -255,6 +342,71 @@ class EntityReconciliationService:
             logger.error(f"Unmerge failed: {e}", exc_info=True)
             return False
 
+    def record_auto_merges(self, result: ReconciliationResult, run=None) -> int:
+        """Store the undo snapshots of auto-merged clusters on the case's reconciliation run.
+
+        Each cluster becomes a ReconciliationDecision (entity_a = kept row,
+        entity_b = first merged row, user_decision 'auto_merge') whose
+        merge_snapshots_json is the cluster's {'keep', 'merged'} snapshot, as
+        the unmerge route accepts. ``run`` defaults to the case's existing
+        ReconciliationRun, created if there is none. The caller commits.
+        Returns the number of decisions recorded.
+        """
+        from datetime import datetime
+        from app.models.reconciliation_run import ReconciliationRun, ReconciliationDecision
+
+        if not result.merge_snapshots:
+            return 0
+        if run is None:
+            run = ReconciliationRun.query.filter_by(case_id=result.case_id).first()
+            if run is None:
+                run = ReconciliationRun(case_id=result.case_id, candidates_json=[],
+                                        auto_merged=0, errors_json=[])
+                db.session.add(run)
+                db.session.flush()  # get run.id
+            run.auto_merged = (run.auto_merged or 0) + result.auto_merged
+
+        decided_at = datetime.utcnow()
+        for snapshot in result.merge_snapshots:
+            keep, first_merged = snapshot['keep'], snapshot['merged'][0]
+            db.session.add(ReconciliationDecision(
+                run_id=run.id,
+                entity_a_id=keep['id'],
+                entity_b_id=first_merged['id'],
+                entity_a_label=keep.get('entity_label'),
+                entity_b_label=first_merged.get('entity_label'),
+                llm_recommendation='auto_merge',
+                llm_reason='identical normalized label',
+                user_decision='auto_merge',
+                merge_snapshots_json=snapshot,
+                decided_at=decided_at,
+            ))
+        return len(result.merge_snapshots)
+
+    def _restore_entity(self, merge_snapshot: Dict) -> TemporaryRDFStorage:
+        """Rebuild a deleted entity from its snapshot (unpublished)."""
+        return TemporaryRDFStorage(
+            case_id=merge_snapshot['case_id'],
+            extraction_session_id=merge_snapshot['extraction_session_id'],
+            extraction_type=merge_snapshot['extraction_type'],
+            storage_type=merge_snapshot['storage_type'],
+            ontology_target=merge_snapshot.get('ontology_target'),
+            entity_label=merge_snapshot['entity_label'],
+            entity_type=merge_snapshot.get('entity_type'),
+            entity_definition=merge_snapshot.get('entity_definition'),
+            entity_uri=merge_snapshot.get('entity_uri'),
+            rdf_json_ld=merge_snapshot['rdf_json_ld'],
+            extraction_model=merge_snapshot.get('extraction_model'),
+            provenance_metadata=merge_snapshot.get('provenance_metadata', {}),
+            matched_ontology_uri=merge_snapshot.get('matched_ontology_uri'),
+            matched_ontology_label=merge_snapshot.get('matched_ontology_label'),
+            match_confidence=merge_snapshot.get('match_confidence'),
+            match_method=merge_snapshot.get('match_method'),
+            match_reasoning=merge_snapshot.get('match_reasoning'),
+            is_selected=merge_snapshot.get('is_selected', True),
+            is_published=False,
+        )
+
     def _snapshot_entity(self, entity: TemporaryRDFStorage) -> Dict[str, Any]:
         """Capture a full snapshot of an entity for undo support."""
         return {
@@ -307,35 +459,35 @@ class EntityReconciliationService:
     def _auto_merge_exact_matches(
         self, entities: List[TemporaryRDFStorage], result: ReconciliationResult
     ) -> int:
-        """Find and merge entities with identical normalized labels within a group."""
-        # Build normalized-label → entity list mapping
-        label_groups: Dict[str, List[TemporaryRDFStorage]] = {}
+        """Find and merge entities with identical normalized labels within a group.
+
+        Entities may span several (extraction_type, storage_type) groups; labels
+        only cluster within their own group. All clusters are merged in a single
+        merge_clusters() transaction.
+        """
+        # Build (group, normalized-label) → entity list mapping
+        label_groups: Dict[Tuple[str, str, str], List[TemporaryRDFStorage]] = {}
         for e in entities:
-            norm = self._normalize_label(e.entity_label or '')
-            label_groups.setdefault(norm, []).append(e)
+            key = (e.extraction_type or 'unknown', e.storage_type or 'unknown',
+                   self._normalize_label(e.entity_label or ''))
+            label_groups.setdefault(key, []).append(e)
 
-        merged_count = 0
-        for norm_label, group in label_groups.items():
-            if len(group) < 2:
-                continue
+        # Keep first, merge rest into it
+        clusters = [group for group in label_groups.values() if len(group) > 1]
+        if not clusters:
+            return 0
+
+        try:
+            merge_result = self.merge_clusters(clusters)
+        except Exception as e:
+            result.errors.append(str(e))
+            logger.error(f"Auto-merge error: {e}", exc_info=True)
+            return 0
 
-            # Keep first, merge rest into it
-            keep = group[0]
-            for merge_entity in group[1:]:
-                try:
-                    merge_result = self.merge_entities(keep.id, merge_entity.id)
-                    if merge_result.get('success'):
-                        merged_count += 1
-                    else:
-                        result.errors.append(
-                            f"Failed to auto-merge '{merge_entity.entity_label}' "
-                            f"into '{keep.entity_label}': {merge_result.get('error', '')}"
-                        )
-                except Exception as e:
-                    result.errors.append(str(e))
-                    logger.error(f"Auto-merge error: {e}", exc_info=True)
-
-        return merged_count
+        for error in merge_result.get('errors', []):
+            result.errors.append(f"Failed to auto-merge: {error}")
+        result.merge_snapshots.extend(merge_result.get('snapshots', []))
+        return merge_result.get('merged', 0)
 
     # -- Phase 3: LLM pair-based evaluation --
 
@@ -713,8 +865,8 @@ class EntityReconciliationService:
         if not api_key:
             raise RuntimeError("No ANTHROPIC_API_KEY available for reconciliation")
 
-        import anthropic
-        client = anthropic.Anthropic(api_key=api_key)
+        from app.utils.llm_client_pool import get_anthropic_client
+        client = get_anthropic_client(api_key, timeout=600.0)
         model = ModelConfig.get_claude_model("fast")
 
         logger.info(f"Calling {model} for entity reconciliation")
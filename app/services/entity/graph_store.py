@@ -0,0 +1,185 @@
+"""Shared read-only parsed-graph store for TTL files.
+
+Committed case TTLs (and the handful of static ontologies the views read) are
+parsed by many independent consumers. This store gives them one parsed
+``rdflib.Graph`` per file:
+
+* **In process** -- graphs are held in an LRU keyed by resolved path and
+  validated against the file's (mtime_ns, size). The store is bounded by the
+  total triple count of the cached graphs (GRAPH_STORE_MAX_TRIPLES), a proxy
+  for memory that does not require measuring rdflib's object graph. A single
+  graph larger than the bound is returned uncached.
+* **On disk** -- the parsed graph is pickled under GRAPH_STORE_DIR (default
+  ``<instance>/graph-store``, created 0700 and refused unless owned by the
+  app's user, since pickles are loaded back) keyed by a SHA-256 of the TTL
+  bytes. Unpickling a Memory-store graph skips the Turtle
+  tokenizer and re-indexing, so a cold worker loads a case graph roughly an
+  order of magnitude faster than parsing the Turtle. Pickles are content
+  addressed, so a rewritten TTL never serves a stale graph; old pickles are
+  pruned by LRU (GRAPH_STORE_MAX_FILES). GRAPH_STORE_DIR=off disables the
+  disk layer.
+
+Graphs are shared between callers: treat them as read-only. Commit-time
+appliers that edit a TTL in place (edge materialization, canonicalization)
+must keep parsing a private ``Graph``.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+
+import rdflib
+
+from app.utils.pipeline_spans import add_counts, span
+from app.utils.private_cache_dir import private_cache_dir
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_TRIPLES = 2_000_000
+DEFAULT_MAX_FILES = 1024
+
+_lock = threading.Lock()
+# resolved path -> (mtime_ns, size, graph, triple_count); most recently used last
+_graphs: "OrderedDict[str, tuple]" = OrderedDict()
+_cached_triples = 0
+
+
+def _max_triples() -> int:
+    return int(os.environ.get('GRAPH_STORE_MAX_TRIPLES', DEFAULT_MAX_TRIPLES))
+
+
+def _disk_dir() -> Optional[Path]:
+    root = os.environ.get('GRAPH_STORE_DIR')
+    if root and root.lower() == 'off':
+        return None
+    try:
+        return private_cache_dir('graph-store', root)
+    except OSError as e:
+        logger.warning(f"Graph store disk layer disabled: {e}")
+        return None
+
+
+def _pickle_path(root: Path, digest: str, fmt: str) -> Path:
+    return root / f"{digest}.{fmt}.pickle"
+
+
+def _load_from_disk(data: bytes, fmt: str) -> Optional[rdflib.Graph]:
+    root = _disk_dir()
+    if root is None:
+        return None
+    path = _pickle_path(root, hashlib.sha256(data).hexdigest(), fmt)
+    try:
+        with open(path, 'rb') as fh:
+            g = pickle.load(fh)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        # A truncated or incompatible pickle (rdflib upgrade) is just a miss.
+        logger.warning(f"Discarding unreadable graph pickle {path.name}: {e}")
+        path.unlink(missing_ok=True)
+        return None
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+    return g
+
+
+def _save_to_disk(data: bytes, fmt: str, g: rdflib.Graph) -> None:
+    root = _disk_dir()
+    if root is None:
+        return
+    try:
+        path = _pickle_path(root, hashlib.sha256(data).hexdigest(), fmt)
+        fd, tmp = tempfile.mkstemp(dir=root, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fh:
+            pickle.dump(g, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        _prune_disk(root, keep=path)
+    except Exception as e:
+        logger.warning(f"Could not persist parsed graph: {e}")
+
+
+def _prune_disk(root: Path, keep: Path) -> None:
+    max_files = int(os.environ.get('GRAPH_STORE_MAX_FILES', DEFAULT_MAX_FILES))
+    entries = [p for p in root.glob('*.pickle') if p != keep]
+    overflow = len(entries) + 1 - max_files
+    if overflow <= 0:
+        return
+    entries.sort(key=lambda p: p.stat().st_mtime_ns if p.exists() else 0)
+    for p in entries[:overflow]:
+        p.unlink(missing_ok=True)
+
+
+def _parse(path: Path, fmt: str) -> rdflib.Graph:
+    with span('ttl_load', file=path.name):
+        data = path.read_bytes()
+        add_counts(bytes_read=len(data))
+        g = _load_from_disk(data, fmt)
+        if g is None:
+            g = rdflib.Graph()
+            g.parse(data=data, format=fmt, publicID=path.absolute().as_uri())
+            _save_to_disk(data, fmt, g)
+        return g
+
+
+def load_ttl_graph(path: Union[str, Path], fmt: str = 'turtle',
+                   retain: bool = True) -> rdflib.Graph:
+    """Return the shared parsed graph for ``path``. Read-only use only.
+
+    ``retain=False`` still uses the on-disk pickle and any graph already held
+    in memory, but does not add a newly loaded graph to the in-process LRU
+    (for callers that derive a compact structure and drop the graph).
+
+    Raises FileNotFoundError if the file does not exist.
+    """
+    global _cached_triples
+    path = Path(path)
+    st = path.stat()
+    key = str(path.resolve())
+    with _lock:
+        hit = _graphs.get(key)
+        if hit is not None and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+            _graphs.move_to_end(key)
+            return hit[2]
+
+    g = _parse(path, fmt)
+    if not retain:
+        return g
+    n = len(g)
+    with _lock:
+        old = _graphs.pop(key, None)
+        if old is not None:
+            _cached_triples -= old[3]
+        if n > _max_triples():
+            return g
+        _graphs[key] = (st.st_mtime_ns, st.st_size, g, n)
+        _cached_triples += n
+        while _cached_triples > _max_triples() and len(_graphs) > 1:
+            _, evicted = _graphs.popitem(last=False)
+            _cached_triples -= evicted[3]
+    return g
+
+
+def clear_graph_store(disk: bool = False) -> None:
+    """Drop every in-process graph; with ``disk=True`` also the pickles."""
+    global _cached_triples
+    with _lock:
+        _graphs.clear()
+        _cached_triples = 0
+    root = _disk_dir()
+    if disk and root is not None and root.exists():
+        for p in root.glob('*.pickle'):
+            p.unlink(missing_ok=True)
+
+
+def graph_store_stats() -> dict:
+    with _lock:
+        return {'graphs': len(_graphs), 'triples': _cached_triples,
+                'max_triples': _max_triples()}
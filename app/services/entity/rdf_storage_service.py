@@ -88,15 +88,20 @@ def store_extraction_results(
             f"for case {case_id} section_type={section_type}"
         )
 
+    # One planner resolves merge targets for the whole batch: candidates are
+    # loaded once and all texts are embedded together on first semantic need.
+    new_items = rdf_data.get('new_classes', []) + rdf_data.get('new_individuals', [])
+    planner = _MergePlanner(
+        case_id, extraction_type.capitalize(),
+        [(item['label'], item.get('definition')) for item in new_items],
+    )
+
     # Store new classes with merge detection
     for class_info in rdf_data.get('new_classes', []):
         clean_class_info = _clean_json_data(class_info)
         match_decision = class_info.get('match_decision', {})
 
-        existing = _find_existing_entity(
-            case_id, class_info['label'], extraction_type.capitalize(), extraction_session_id,
-            definition=class_info.get('definition'),
-        )
+        existing = planner.find(class_info['label'], class_info.get('definition'))
 
         if existing:
             _merge_into_existing(existing, clean_class_info, section_type)
@@ -131,6 +136,7 @@ def store_extraction_results(
                 is_selected=True
             )
             db.session.add(entity)
+            planner.add(entity)
             created_entities.append(entity)
 
     # Store individuals with merge detection
@@ -138,10 +144,7 @@ def store_extraction_results(
         clean_indiv_info = _clean_json_data(indiv_info)
         match_decision = indiv_info.get('match_decision', {})
 
-        existing = _find_existing_entity(
-            case_id, indiv_info['label'], extraction_type.capitalize(), extraction_session_id,
-            definition=indiv_info.get('definition'),
-        )
+        existing = planner.find(indiv_info['label'], indiv_info.get('definition'))
 
         if existing:
             _merge_into_existing(existing, clean_indiv_info, section_type)
@@ -177,6 +180,7 @@ def store_extraction_results(
                 is_selected=True
             )
             db.session.add(entity)
+            planner.add(entity)
             created_entities.append(entity)
 
     logger.info(f"Stored {len(created_entities)} {extraction_type} entities ({merged_count} merged from other sections)")
@@ -187,7 +191,9 @@ def store_extraction_results(
 # Internal helpers
 # ---------------------------------------------------------------------------
 
-from functools import lru_cache
+from collections import OrderedDict
+
+import numpy as np
 
 _DEDUP_THRESHOLD = 0.88  # conservative cosine for cross-pass semantic merge (precision over recall)
 
@@ -199,14 +205,37 @@ def _embedding_service():
         return _EMB_SVC
     except NameError:
         from app.services.embedding.embedding_service import EmbeddingService
-        _EMB_SVC = EmbeddingService()
+        _EMB_SVC = EmbeddingService.get_instance()
         return _EMB_SVC
 
 
-@lru_cache(maxsize=4096)
+_EMBED_CACHE_SIZE = 4096
+_EMBED_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def _remember(text: str, emb: tuple) -> tuple:
+    _EMBED_CACHE[text] = emb
+    _EMBED_CACHE.move_to_end(text)
+    while len(_EMBED_CACHE) > _EMBED_CACHE_SIZE:
+        _EMBED_CACHE.popitem(last=False)
+    return emb
+
+
 def _embed_text(text: str) -> tuple:
     """Cached embedding (a hashable tuple) for an entity's (label + definition) text."""
-    return tuple(_embedding_service().get_embedding(text))
+    emb = _EMBED_CACHE.get(text)
+    if emb is None:
+        emb = tuple(_embedding_service().get_embedding(text))
+    return _remember(text, emb)
+
+
+def _embed_texts(texts: List[str]) -> List[tuple]:
+    """Cached embeddings for many texts; the misses are embedded in one batch."""
+    misses = list(dict.fromkeys(t for t in texts if t not in _EMBED_CACHE))
+    if misses:
+        for text, emb in zip(misses, _embedding_service().get_embeddings(misses)):
+            _remember(text, tuple(emb))
+    return [_embed_text(t) for t in texts]
 
 
 def _entity_text(label, definition) -> str:
@@ -233,61 +262,107 @@ def _label_designators(label) -> frozenset:
     return frozenset(m.group(0).upper() for m in _DESIGNATOR_RE.finditer(label or ""))
 
 
-def _find_semantic_match(
-    case_id: int, label: str, definition, entity_type: str,
-    threshold: float = _DEDUP_THRESHOLD,
-) -> Optional[TemporaryRDFStorage]:
-    """The best existing same-case, same-type, unpublished entity whose (label+definition) embedding
-    cosine to the new entity is >= threshold, else None. Catches the same concept paraphrased across
-    the facts and discussion passes that the exact-label merge misses (the over-split problem). The
-    high threshold plus same-type scoping favors leaving a duplicate over fusing two genuinely
-    distinct concepts; survivors stay deletable in review. Labels whose citation designators
-    differ are NEVER merged (_DESIGNATOR_RE). Best-effort: any embedding failure returns
-    None (no merge) and never blocks storage."""
-    try:
-        from app.services.embedding.similarity_utils import cosine_similarity_list
-        new_emb = list(_embed_text(_entity_text(label, definition)))
-        new_designators = _label_designators(label)
+class _MergePlanner:
+    """Merge-target resolution for one store_extraction_results batch.
+
+    An uncommitted entity is merged into the same-case, same-type unpublished
+    entity with the exact label, else into the best candidate whose
+    (label+definition) embedding is at cosine >= _DEDUP_THRESHOLD and whose
+    citation designators agree (last candidate wins a tie). This catches the
+    same concept paraphrased across the facts and discussion passes; the high
+    threshold favors leaving a duplicate over fusing two distinct concepts.
+    Semantic matching is best-effort: an embedding failure disables it for the
+    batch and never blocks storage.
+
+    The case's candidates are queried once, and every candidate and new
+    entity text is embedded in one batch the first time a label misses, so
+    the semantic pass is one matrix-vector product per entity. Entities
+    created earlier in the batch are added as candidates.
+    """
+
+    def __init__(self, case_id: int, entity_type: str, new_items: List[tuple],
+                 threshold: float = _DEDUP_THRESHOLD):
+        self.threshold = threshold
+        self._entities: List[TemporaryRDFStorage] = []
+        self._labels: List[str] = []
+        self._designators: List[frozenset] = []
+        self._texts: List[str] = []
+        self._by_label = {}
+        self._new_texts = [_entity_text(label, definition) for label, definition in new_items]
+        self._matrix = None      # unit-normalized rows for self._texts[:self._rows]
+        self._rows = 0
+        self._semantic_ok = True
         candidates = TemporaryRDFStorage.query.filter(
             TemporaryRDFStorage.case_id == case_id,
             TemporaryRDFStorage.entity_type == entity_type,
             TemporaryRDFStorage.is_published == False,
-        ).all()
-        best, best_sim = None, threshold
+        ).order_by(TemporaryRDFStorage.id).all()
         for cand in candidates:
-            if (cand.entity_label or '') == (label or ''):
+            self.add(cand)
+
+    def add(self, entity: TemporaryRDFStorage) -> None:
+        label = entity.entity_label or ''
+        self._entities.append(entity)
+        self._labels.append(label)
+        self._designators.append(_label_designators(label))
+        self._texts.append(_entity_text(entity.entity_label, entity.entity_definition))
+        self._by_label.setdefault(label, entity)
+
+    def find(self, label: str, definition=None) -> Optional[TemporaryRDFStorage]:
+        exact = self._by_label.get(label or '')
+        if exact is not None:
+            return exact
+        return self._semantic(label, definition)
+
+    def _unit_rows(self, texts: List[str]) -> np.ndarray:
+        vecs = np.asarray(_embed_texts(texts), dtype=np.float64)
+        norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0   # zero vectors stay zero -> cosine 0.0
+        return vecs / norms
+
+    def _sync_matrix(self) -> None:
+        if self._matrix is None:
+            # First semantic lookup: embed candidates and the whole batch at once.
+            _embed_texts(self._texts + self._new_texts)
+            self._matrix = np.empty((len(self._texts) + len(self._new_texts),
+                                     len(_embed_text(self._texts[0]))), dtype=np.float64)
+        if self._rows < len(self._texts):
+            new_rows = self._unit_rows(self._texts[self._rows:])
+            needed = len(self._texts)
+            if needed > len(self._matrix):
+                grown = np.empty((needed * 2, self._matrix.shape[1]), dtype=np.float64)
+                grown[:self._rows] = self._matrix[:self._rows]
+                self._matrix = grown
+            self._matrix[self._rows:needed] = new_rows
+            self._rows = needed
+
+    def _semantic(self, label: str, definition) -> Optional[TemporaryRDFStorage]:
+        if not self._semantic_ok or not self._texts:
+            return None
+        try:
+            self._sync_matrix()
+            sims = self._matrix[:self._rows] @ self._unit_rows([_entity_text(label, definition)])[0]
+        except Exception as e:
+            # Best-effort: no semantic merges this batch.
+            logger.debug("semantic dedup skipped for batch at '%s': %s", label, e)
+            self._semantic_ok = False
+            return None
+
+        new_designators = _label_designators(label)
+        best, best_sim = None, self.threshold
+        for i in np.flatnonzero(sims >= self.threshold).tolist():
+            if self._labels[i] == (label or ''):
                 continue  # exact-label is handled before this fallback
-            cand_designators = _label_designators(cand.entity_label)
+            cand_designators = self._designators[i]
             if (new_designators or cand_designators) and new_designators != cand_designators:
                 continue  # different citation identities; never fuse
-            sim = cosine_similarity_list(
-                new_emb, list(_embed_text(_entity_text(cand.entity_label, cand.entity_definition))))
-            if sim >= best_sim:
-                best, best_sim = cand, sim
-        if best is not None:
-            logger.info("semantic dedup: '%s' ~ '%s' (cos=%.3f) -> merge",
-                        label, best.entity_label, best_sim)
-        return best
-    except Exception as e:
-        logger.debug("semantic dedup skipped for '%s': %s", label, e)
-        return None
-
-
-def _find_existing_entity(
-    case_id: int, entity_label: str, entity_type: str, current_session_id: str,
-    definition=None,
-) -> Optional[TemporaryRDFStorage]:
-    """Find an existing uncommitted entity to merge into: exact label first, then a conservative
-    cross-pass semantic match (the same concept paraphrased between the facts and discussion passes)."""
-    exact = TemporaryRDFStorage.query.filter(
-        TemporaryRDFStorage.case_id == case_id,
-        TemporaryRDFStorage.entity_label == entity_label,
-        TemporaryRDFStorage.entity_type == entity_type,
-        TemporaryRDFStorage.is_published == False
-    ).first()
-    if exact:
-        return exact
-    return _find_semantic_match(case_id, entity_label, definition, entity_type)
+            if sims[i] >= best_sim:
+                best, best_sim = i, float(sims[i])
+        if best is None:
+            return None
+        logger.info("semantic dedup: '%s' ~ '%s' (cos=%.3f) -> merge",
+                    label, self._labels[best], best_sim)
+        return self._entities[best]
 
 
 def _merge_into_existing(
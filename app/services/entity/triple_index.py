@@ -0,0 +1,160 @@
+"""Compact read-only triple index over a committed case graph.
+
+The case-view builders (defeasibility hover index, entity-graph edges, the
+decision-point label lookup) only ever do label lookups, ``subjects(p, o)`` and
+``objects(s, p)`` walks over a committed case graph. rdflib's Memory store
+keeps three nested dict indexes of Python objects per triple; for these
+read-only walks that is mostly overhead.
+
+``TripleIndex`` interns every term once (id -> term list, term -> id dict) and
+stores the triples as three sorted ``int32`` NumPy arrays in SPO, POS and OSP
+order. Any pattern with a bound leading position is a pair of
+``searchsorted`` calls on the matching ordering. The query API mirrors the
+subset of ``rdflib.Graph`` those builders use (``triples``, ``subjects``,
+``objects``, ``value``, ``subject_objects``, ``predicates``, iteration,
+``len`` and ``in``), so a function written against a Graph accepts an index
+unchanged.
+
+Indexes are built once per committed TTL version by
+``committed_case_graph.load_case_index``.
+"""
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+class TripleIndex:
+    """Sorted-array SPO/POS/OSP index with interned term ids."""
+
+    __slots__ = ('terms', '_ids', '_spo', '_pos', '_osp')
+
+    def __init__(self, terms: List, ids: Dict, spo: np.ndarray):
+        self.terms = terms
+        self._ids = ids
+        # Columns of each ordering are permuted so the leading key is column 0.
+        self._spo = spo[np.lexsort((spo[:, 2], spo[:, 1], spo[:, 0]))]
+        pos = spo[:, [1, 2, 0]]
+        self._pos = pos[np.lexsort((pos[:, 2], pos[:, 1], pos[:, 0]))]
+        osp = spo[:, [2, 0, 1]]
+        self._osp = osp[np.lexsort((osp[:, 2], osp[:, 1], osp[:, 0]))]
+
+    @classmethod
+    def from_graph(cls, g) -> 'TripleIndex':
+        """Build from any iterable of (s, p, o) rdflib terms (e.g. a Graph)."""
+        terms: List = []
+        ids: Dict = {}
+
+        def _intern(t) -> int:
+            i = ids.get(t)
+            if i is None:
+                i = ids[t] = len(terms)
+                terms.append(t)
+            return i
+
+        rows = [(_intern(s), _intern(p), _intern(o)) for s, p, o in g]
+        spo = np.array(rows, dtype=np.int32).reshape(-1, 3)
+        return cls(terms, ids, spo)
+
+    # --- internals -----------------------------------------------------------
+
+    @staticmethod
+    def _narrow(arr: np.ndarray, lo: int, hi: int, col: int, key: int) -> Tuple[int, int]:
+        column = arr[lo:hi, col]
+        return (lo + int(np.searchsorted(column, key, side='left')),
+                lo + int(np.searchsorted(column, key, side='right')))
+
+    def _rows(self, s, p, o) -> Iterator[Tuple[int, int, int]]:
+        """Yield (s, p, o) id triples matching the pattern (None = wildcard)."""
+        ids = []
+        for term in (s, p, o):
+            if term is None:
+                ids.append(None)
+                continue
+            i = self._ids.get(term)
+            if i is None:
+                return
+            ids.append(i)
+        si, pi, oi = ids
+
+        # Pick the ordering whose leading columns are bound; unpermute on output.
+        if si is not None:
+            arr, keys, perm = self._spo, (si, pi, oi), (0, 1, 2)
+            if pi is None and oi is not None:
+                arr, keys, perm = self._osp, (oi, si, None), (1, 2, 0)
+        elif pi is not None:
+            arr, keys, perm = self._pos, (pi, oi, None), (2, 0, 1)
+        elif oi is not None:
+            arr, keys, perm = self._osp, (oi, None, None), (1, 2, 0)
+        else:
+            arr, keys, perm = self._spo, (None, None, None), (0, 1, 2)
+
+        lo, hi = 0, len(arr)
+        for col, key in enumerate(keys):
+            if key is None:
+                break
+            lo, hi = self._narrow(arr, lo, hi, col, key)
+            if lo == hi:
+                return
+        for row in arr[lo:hi].tolist():
+            yield row[perm[0]], row[perm[1]], row[perm[2]]
+
+    # --- rdflib.Graph-compatible read API ------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._spo)
+
+    def __iter__(self):
+        return self.triples((None, None, None))
+
+    def __contains__(self, triple) -> bool:
+        return next(self._rows(*triple), None) is not None
+
+    def triples(self, pattern):
+        t = self.terms
+        for s, p, o in self._rows(*pattern):
+            yield t[s], t[p], t[o]
+
+    def subjects(self, predicate=None, object=None, unique: bool = False):
+        seen = set()
+        for s, _p, _o in self._rows(None, predicate, object):
+            if unique:
+                if s in seen:
+                    continue
+                seen.add(s)
+            yield self.terms[s]
+
+    def objects(self, subject=None, predicate=None, unique: bool = False):
+        seen = set()
+        for _s, _p, o in self._rows(subject, predicate, None):
+            if unique:
+                if o in seen:
+                    continue
+                seen.add(o)
+            yield self.terms[o]
+
+    def subject_objects(self, predicate=None):
+        t = self.terms
+        for s, _p, o in self._rows(None, predicate, None):
+            yield t[s], t[o]
+
+    def predicates(self, subject=None, object=None):
+        """Distinct predicates (unlike rdflib, which repeats per triple)."""
+        if subject is None and object is None:
+            return [self.terms[i] for i in np.unique(self._pos[:, 0]).tolist()]
+        seen = {p for _s, p, _o in self._rows(subject, None, object)}
+        return [self.terms[i] for i in sorted(seen)]
+
+    def value(self, subject=None, predicate=None, object=None, default=None):
+        if object is None:
+            row = next(self._rows(subject, predicate, None), None)
+            return self.terms[row[2]] if row else default
+        row = next(self._rows(None, predicate, object), None)
+        return self.terms[row[0]] if row else default
+
+    def nbytes(self) -> int:
+        """Bytes held by the three triple arrays (excluding the term table)."""
+        return int(self._spo.nbytes + self._pos.nbytes + self._osp.nbytes)
+
+    def term_id(self, term) -> Optional[int]:
+        return self._ids.get(term)
@@ -171,40 +171,35 @@ class UnifiedEntityResolver:
             from app.services.ontserve.external_mcp_client import get_external_mcp_client
             client = get_external_mcp_client()
 
-            # Fetch each category
-            category_methods = [
-                ('get_all_role_entities', 'roles'),
-                ('get_all_state_entities', 'states'),
-                ('get_all_resource_entities', 'resources'),
-                ('get_all_principle_entities', 'principles'),
-                ('get_all_obligation_entities', 'obligations'),
-                ('get_all_constraint_entities', 'constraints'),
-                ('get_all_capability_entities', 'capabilities'),
-                ('get_all_action_entities', 'actions'),
-                ('get_all_event_entities', 'events'),
+            # Fetch all categories in one batched MCP request
+            categories = [
+                ('Role', 'roles'),
+                ('State', 'states'),
+                ('Resource', 'resources'),
+                ('Principle', 'principles'),
+                ('Obligation', 'obligations'),
+                ('Constraint', 'constraints'),
+                ('Capability', 'capabilities'),
+                ('Action', 'actions'),
+                ('Event', 'events'),
             ]
-
-            for method_name, entity_type in category_methods:
-                try:
-                    method = getattr(client, method_name, None)
-                    if method:
-                        items = method()
-                        for item in items:
-                            uri = item.get('uri', '')
-                            if uri:
-                                entities[uri] = {
-                                    'label': item.get('label', item.get('name', '')),
-                                    'definition': item.get('description', item.get('comment', '')),
-                                    'entity_type': entity_type,
-                                    'extraction_type': entity_type,
-                                    'uri': uri,
-                                    'is_published': True,
-                                    'source_pass': None,
-                                    'ontology_target': 'proethica-intermediate',
-                                    'ontserve_path': self.compute_ontserve_path(uri, 'proethica-intermediate'),
-                                }
-                except Exception as e:
-                    logger.warning(f"Failed to fetch {entity_type} from OntServe: {e}")
+            by_category = client.get_entities_by_categories([c for c, _ in categories])
+
+            for category, entity_type in categories:
+                for item in by_category.get(category, []):
+                    uri = item.get('uri', '')
+                    if uri:
+                        entities[uri] = {
+                            'label': item.get('label', item.get('name', '')),
+                            'definition': item.get('description', item.get('comment', '')),
+                            'entity_type': entity_type,
+                            'extraction_type': entity_type,
+                            'uri': uri,
+                            'is_published': True,
+                            'source_pass': None,
+                            'ontology_target': 'proethica-intermediate',
+                            'ontserve_path': self.compute_ontserve_path(uri, 'proethica-intermediate'),
+                        }
 
             logger.info(f"Fetched {len(entities)} entities from OntServe")
 
@@ -33,6 +33,7 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from rdflib import Graph, Namespace, RDF, URIRef
 
+from app.services.commit.turtle_writer import write_turtle
 from app.services.extraction.edge_resolution import (
     _individuals_in_category,
     emit_edge_prov,
@@ -382,7 +383,7 @@ def apply_analysis_record_edges(case_id: int, ttl_path,
         added += 1
         by_pred[pred] = by_pred.get(pred, 0) + 1
     if write_back and added:
-        g.serialize(destination=str(ttl_path), format="turtle")
+        write_turtle(g, ttl_path)
     if misses:
         logger.warning("analysis_edges case %s: %d unresolved (first: %s)",
                        case_id, len(misses), misses[0])
@@ -415,7 +416,7 @@ def reconstruct_analysis_record_edges(case_id: int, ttl_path) -> Dict[str, Any]:
         for t in list(g.triples((s, None, None))):
             g.remove(t)
         removed_prov += 1
-    g.serialize(destination=str(ttl_path), format="turtle")
+    write_turtle(g, ttl_path)
     result = apply_analysis_record_edges(case_id, ttl_path)
     result["reconstructed"] = {"edges_dropped": removed_edges,
                                "prov_dropped": removed_prov}
@@ -424,8 +425,8 @@ def reconstruct_analysis_record_edges(case_id: int, ttl_path) -> Dict[str, Any]:
 
 def check_analysis_record_edges(case_id: int, ttl_path) -> Dict[str, Any]:
     """Backfill acceptance gate: every expected edge present, no extras."""
-    g = Graph()
-    g.parse(str(ttl_path), format="turtle")
+    from app.services.entity.graph_store import load_ttl_graph
+    g = load_ttl_graph(ttl_path)
     edges, misses = build_expectations(case_id, g)
     expected = {(s, CASES[p], o) for s, p, o, _ in edges}
     missing = [f"{p}: {str(s).rsplit('#')[-1]} -> {str(o).rsplit('#')[-1]}"
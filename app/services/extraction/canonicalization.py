@@ -133,6 +133,11 @@ def canonicalize_ttl(case_id, ttl_path, write_back: bool = True) -> dict:
         res["compound_classes_removed"] += 1
 
     if write_back and any(res.values()):
-        g.serialize(destination=str(ttl_path), format="turtle")
+        try:
+            from app.services.commit.turtle_writer import write_turtle
+        except ImportError:  # pragma: no cover - tooling path
+            g.serialize(destination=str(ttl_path), format="turtle")
+        else:
+            write_turtle(g, ttl_path)
     res["_graph"] = g
     return res
@@ -41,6 +41,7 @@ from typing import Any, Dict, List
 
 from rdflib import Graph, Namespace, OWL, RDF, URIRef
 
+from app.services.commit.turtle_writer import write_turtle
 from app.services.extraction.state_edges import (
     _candidate_pool,
     _embedding_service,
@@ -294,7 +295,7 @@ def apply_causal_edges(case_id: int, ttl_path, write_back: bool = True,
     total = sum(v.get("edges", 0) for v in res.values() if isinstance(v, dict)) - precedence_dropped
     res["total"] = total
     if write_back and (total or precedence_dropped):
-        g.serialize(destination=str(ttl_path), format="turtle")
+        write_turtle(g, ttl_path)
     return res
 
 
@@ -399,7 +400,7 @@ def apply_event_cause_edges(case_id: int, ttl_path, write_back: bool = True) ->
 
     res["edges"], res["unresolved"] = edges, unresolved
     if write_back and edges:
-        g.serialize(destination=str(ttl_path), format="turtle")
+        write_turtle(g, ttl_path)
     return res
 
 
@@ -453,5 +454,5 @@ def apply_causal_normative_link_edges(case_id: int, ttl_path, write_back: bool =
 
     res["edges"], res["unresolved"] = edges, unresolved
     if write_back and edges:
-        g.serialize(destination=str(ttl_path), format="turtle")
+        write_turtle(g, ttl_path)
     return res
@@ -9,7 +9,7 @@ import time
 import uuid
 import logging
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Any, Callable, List, Optional
 
 from tenacity import (
     retry,
@@ -18,6 +18,9 @@ from tenacity import (
     retry_if_exception_type,
 )
 
+from app.utils.llm_usage import usage_context
+from app.utils.pipeline_spans import add_counts, span
+
 logger = logging.getLogger(__name__)
 
 # Retry configuration (consolidated from step1_enhanced.py / step2_enhanced.py)
@@ -65,6 +68,7 @@ def extract_concept(
     model: Optional[str] = None,
     apply_filters: bool = True,
     store: bool = True,
+    on_entity: Optional[Callable[[str, Any], None]] = None,
 ) -> ExtractionResult:
     """
     Extract a single concept from case text and store results.
@@ -89,6 +93,10 @@ def extract_concept(
         store: When True (default, live behavior) results are persisted to
             temporary_rdf_storage. When False storage is skipped, so an audit
             run cannot mutate the live case data.
+        on_entity: Optional callback ``(kind, entity)`` invoked for each class
+            or individual as soon as it is parsed and validated off the LLM
+            stream (kind is 'class' or 'individual'), for live entity cards.
+            The returned result is still built from the complete response.
 
     Returns:
         ExtractionResult with classes, individuals, prompt, response, timing.
@@ -101,15 +109,18 @@ def extract_concept(
 
     start = time.time()
 
-    extractor = UnifiedDualExtractor(
-        concept_type, model=model, injection_mode=injection_mode,
-        apply_filters=apply_filters,
-    )
-    classes, individuals = extractor.extract(
-        case_text=case_text,
-        case_id=case_id,
-        section_type=section_type,
-    )
+    with usage_context(case_id=case_id, concept=concept_type, section_type=section_type), \
+            span('extract_concept', concept=concept_type, section=section_type):
+        extractor = UnifiedDualExtractor(
+            concept_type, model=model, injection_mode=injection_mode,
+            apply_filters=apply_filters, on_entity=on_entity,
+        )
+        classes, individuals = extractor.extract(
+            case_text=case_text,
+            case_id=case_id,
+            section_type=section_type,
+        )
+        add_counts(classes=len(classes), individuals=len(individuals))
 
     if store:
         store_extraction_result(
@@ -165,6 +176,7 @@ def extract_concept_with_retry(
     step_number: int = 1,
     session_id: Optional[str] = None,
     injection_mode: Optional[str] = None,
+    on_entity: Optional[Callable[[str, Any], None]] = None,
 ) -> ExtractionResult:
     """
     Extract with tenacity retry on timeout/connection errors.
@@ -189,6 +201,7 @@ def extract_concept_with_retry(
                 step_number=step_number,
                 session_id=session_id,
                 injection_mode=mode,
+                on_entity=on_entity,
             )
         except Exception as e:
             error_str = str(e).lower()
@@ -19,6 +19,8 @@ from typing import Any, Dict, List, Optional, Set, Tuple
 from rdflib import Graph, Literal, Namespace, URIRef
 from rdflib.namespace import PROV, RDF, RDFS, XSD
 
+from app.services.commit.turtle_writer import write_turtle
+
 from .defeasibility_edges import DefeasibilityEdgeExtractor
 from .enhanced_prompts_defeasibility import (
     NarrativeContext,
@@ -181,9 +183,8 @@ def parse_case_graph(g: Graph, case_id: int) -> CaseEntities:
 
 
 def parse_case_ttl(ttl_path: Path, case_id: int) -> CaseEntities:
-    g = Graph()
-    g.parse(ttl_path, format="turtle")
-    return parse_case_graph(g, case_id)
+    from app.services.entity.graph_store import load_ttl_graph
+    return parse_case_graph(load_ttl_graph(ttl_path), case_id)
 
 
 def add_edges_to_graph(
@@ -335,7 +336,7 @@ def apply_defeasibility_edges(
         g.bind("proeth", PROETH)
         g.bind("proeth-core", PROETH_CORE)
         g.bind("prov", PROV)
-        g.serialize(destination=str(ttl_path), format="turtle")
+        write_turtle(g, ttl_path)
 
     return {
         "case_id": case_id,
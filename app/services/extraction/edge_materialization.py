@@ -25,6 +25,9 @@ import logging
 from pathlib import Path
 from typing import Any, Dict
 
+from app.services.commit.turtle_writer import write_turtle
+from app.utils.pipeline_spans import span, timed
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,13 +38,14 @@ def _run_family(results: Dict[str, Any], key: str, case_id: int, ttl_path) -> No
     (resource / state-affects / participant / fluent / obligation / temporal-relation /
     requires-capability) share one framework; the spec for ``key`` carries all the
     per-family data."""
-    try:
-        from app.services.extraction.edge_spec import EDGE_REGISTRY, materialize_edge_family
-        spec = next(s for s in EDGE_REGISTRY if s.name == key)
-        results[key] = materialize_edge_family(case_id, ttl_path, spec, write_back=True)
-    except Exception as e:
-        logger.exception("materialize: %s applier failed for case %s", key, case_id)
-        results[key] = {"error": str(e)}
+    with span(key):
+        try:
+            from app.services.extraction.edge_spec import EDGE_REGISTRY, materialize_edge_family
+            spec = next(s for s in EDGE_REGISTRY if s.name == key)
+            results[key] = materialize_edge_family(case_id, ttl_path, spec, write_back=True)
+        except Exception as e:
+            logger.exception("materialize: %s applier failed for case %s", key, case_id)
+            results[key] = {"error": str(e)}
 
 
 def drop_fluent_incoherence(g, case_id: int) -> int:
@@ -77,6 +81,7 @@ def drop_fluent_incoherence(g, case_id: int) -> int:
     return dropped
 
 
+@timed()
 def materialize_edges_on_ttl(case_id: int, ttl_path) -> Dict[str, Any]:
     """Run the full ordered edge-applier registry plus the deterministic appliers
     and the unified domain/range guard over a just-written case TTL (in place).
@@ -92,28 +97,30 @@ def materialize_edges_on_ttl(case_id: int, ttl_path) -> Dict[str, Any]:
     results: Dict[str, Any] = {}
 
     # 1. Defeasibility edges (LLM).
-    try:
-        from app.services.extraction.defeasibility_pipeline import apply_defeasibility_edges
-        results["defeasibility"] = apply_defeasibility_edges(
-            case_id=case_id, ttl_path=ttl_path, write_back=True,
-        )
-    except Exception as e:
-        logger.exception("materialize: defeasibility applier failed for case %s", case_id)
-        results["defeasibility"] = {"error": str(e)}
+    with span("defeasibility"):
+        try:
+            from app.services.extraction.defeasibility_pipeline import apply_defeasibility_edges
+            results["defeasibility"] = apply_defeasibility_edges(
+                case_id=case_id, ttl_path=ttl_path, write_back=True,
+            )
+        except Exception as e:
+            logger.exception("materialize: defeasibility applier failed for case %s", case_id)
+            results["defeasibility"] = {"error": str(e)}
 
     # 2. State-anchored edges (DB-driven, embedding-resolved): the state
     # extractor's obligation_activation / action_constraints / activation+
     # termination_conditions become activatesObligation / activatesConstraint /
     # activatedByEvent / terminatedByEvent, plus a principleTransformation
     # annotation. Runs before R->P->O so the annotation can ground that derivation.
-    try:
-        from app.services.extraction.state_edges import apply_state_edges
-        results["state_edges"] = apply_state_edges(
-            case_id=case_id, ttl_path=ttl_path, write_back=True,
-        )
-    except Exception as e:
-        logger.exception("materialize: state-edge applier failed for case %s", case_id)
-        results["state_edges"] = {"error": str(e)}
+    with span("state_edges"):
+        try:
+            from app.services.extraction.state_edges import apply_state_edges
+            results["state_edges"] = apply_state_edges(
+                case_id=case_id, ttl_path=ttl_path, write_back=True,
+            )
+        except Exception as e:
+            logger.exception("materialize: state-edge applier failed for case %s", case_id)
+            results["state_edges"] = {"error": str(e)}
 
     # 2b. Resource-anchored edges (DB-driven, embedding-resolved): the resource
     # `used_by` field becomes Resource proeth-core:availableTo Agent edges, naming
@@ -136,13 +143,14 @@ def materialize_edges_on_ttl(case_id: int, ttl_path) -> Dict[str, Any]:
     # board-pattern label. Without this family precedent references were
     # committed as edge-less islands (2026-07-10 walkthrough, case 9: the
     # three precedent nodes were the only unconnected entity-graph nodes).
-    try:
-        results["precedent_citation_edges"] = apply_precedent_citation_edges(
-            case_id=case_id, ttl_path=ttl_path, write_back=True,
-        )
-    except Exception as e:
-        logger.exception("materialize: precedent-citation applier failed for case %s", case_id)
-        results["precedent_citation_edges"] = {"error": str(e)}
+    with span("precedent_citation_edges"):
+        try:
+            results["precedent_citation_edges"] = apply_precedent_citation_edges(
+                case_id=case_id, ttl_path=ttl_path, write_back=True,
+            )
+        except Exception as e:
+            logger.exception("materialize: precedent-citation applier failed for case %s", case_id)
+            results["precedent_citation_edges"] = {"error": str(e)}
 
     # 2c3. Analysis-record edges (deterministic, proethica-cases v3.6.0):
     # emergence rationales, resolution patterns, provision references, and
@@ -153,14 +161,15 @@ def materialize_edges_on_ttl(case_id: int, ttl_path) -> Dict[str, Any]:
     # endpoint existence- and type-checked always. Without this family the
     # analysis records were committed as edge-less islands (2026-07-10
     # alignment audit).
-    try:
-        from app.services.extraction.analysis_edges import apply_analysis_record_edges
-        results["analysis_record_edges"] = apply_analysis_record_edges(
-            case_id=case_id, ttl_path=ttl_path, write_back=True,
-        )
-    except Exception as e:
-        logger.exception("materialize: analysis-record applier failed for case %s", case_id)
-        results["analysis_record_edges"] = {"error": str(e)}
+    with span("analysis_record_edges"):
+        try:
+            from app.services.extraction.analysis_edges import apply_analysis_record_edges
+            results["analysis_record_edges"] = apply_analysis_record_edges(
+                case_id=case_id, ttl_path=ttl_path, write_back=True,
+            )
+        except Exception as e:
+            logger.exception("materialize: analysis-record applier failed for case %s", case_id)
+            results["analysis_record_edges"] = {"error": str(e)}
 
 
     # 2d. Participant edges (DB-driven, embedding-resolved): the Pass-2 component
@@ -199,14 +208,15 @@ def materialize_edges_on_ttl(case_id: int, ttl_path) -> Dict[str, Any]:
     # individual per happening (from its proeth:temporalExtent) and link via time:hasTime.
     # The OWL-Time "when" complement to the Event Calculus fluent layer; Allen-relation
     # individuals supply the ordering. Outside the nine disjoint categories, so guard-neutral.
-    try:
-        from app.services.extraction.time_anchor import apply_time_anchors
-        results["time_anchors"] = apply_time_anchors(
-            case_id=case_id, ttl_path=ttl_path, write_back=True,
-        )
-    except Exception as e:
-        logger.exception("materialize: time-anchor applier failed for case %s", case_id)
-        results["time_anchors"] = {"error": str(e)}
+    with span("time_anchors"):
+        try:
+            from app.services.extraction.time_anchor import apply_time_anchors
+            results["time_anchors"] = apply_time_anchors(
+                case_id=case_id, ttl_path=ttl_path, write_back=True,
+            )
+        except Exception as e:
+            logger.exception("materialize: time-anchor applier failed for case %s", case_id)
+            results["time_anchors"] = {"error": str(e)}
 
     # 2f-ter. Timeline membership edges (deterministic): the single Step-3 timeline
     # individual (rdf:type time:TemporalEntity) gains a dcterms:hasPart edge to every
@@ -216,14 +226,15 @@ def materialize_edges_on_ttl(case_id: int, ttl_path) -> Dict[str, Any]:
     # Unordered membership; ordering stays with proeth:temporalSequence, the Allen
     # relations, and the time:hasTime anchors. Guard-neutral (dcterms:hasPart is not
     # in ALL_EDGE_RANGE).
-    try:
-        from app.services.extraction.timeline_edges import apply_timeline_haspart
-        results["timeline_haspart"] = apply_timeline_haspart(
-            case_id=case_id, ttl_path=ttl_path, write_back=True,
-        )
-    except Exception as e:
-        logger.exception("materialize: timeline-haspart applier failed for case %s", case_id)
-        results["timeline_haspart"] = {"error": str(e)}
+    with span("timeline_haspart"):
+        try:
+            from app.services.extraction.timeline_edges import apply_timeline_haspart
+            results["timeline_haspart"] = apply_timeline_haspart(
+                case_id=case_id, ttl_path=ttl_path, write_back=True,
+            )
+        except Exception as e:
+            logger.exception("materialize: timeline-haspart applier failed for case %s", case_id)
+            results["timeline_haspart"] = {"error": str(e)}
 
     # 2f-bis. Temporal (Allen) relation endpoints (DB-driven, embedding-resolved): each
     # reified TemporalRelation's fromEntity/toEntity free-text timeline phrasings are
@@ -251,76 +262,83 @@ def materialize_edges_on_ttl(case_id: int, ttl_path) -> Dict[str, Any]:
     # (the irreducible NESS analysis stays as literal content) into the graph so it is
     # traversable. Mirrors the fluent/obligation appliers; CausalChain is a non-core domain,
     # so the unified guard validates only the object endpoints.
-    try:
-        from app.services.extraction.causal_edges import apply_causal_edges
-        results["causal_edges"] = apply_causal_edges(
-            case_id=case_id, ttl_path=ttl_path, write_back=True,
-        )
-    except Exception as e:
-        logger.exception("materialize: causal-edge applier failed for case %s", case_id)
-        results["causal_edges"] = {"error": str(e)}
+    with span("causal_edges"):
+        try:
+            from app.services.extraction.causal_edges import apply_causal_edges
+            results["causal_edges"] = apply_causal_edges(
+                case_id=case_id, ttl_path=ttl_path, write_back=True,
+            )
+        except Exception as e:
+            logger.exception("materialize: causal-edge applier failed for case %s", case_id)
+            results["causal_edges"] = {"error": str(e)}
 
     # 2i. Event -> causing Action edges (deterministic): the converter's legacy
     # causedByAction IRI, skipped by the serializer, resolved to the committed Action
     # individual so the event->cause link is durable (not always covered by a CausalChain).
-    try:
-        from app.services.extraction.causal_edges import apply_event_cause_edges
-        results["event_cause_edges"] = apply_event_cause_edges(
-            case_id=case_id, ttl_path=ttl_path, write_back=True,
-        )
-    except Exception as e:
-        logger.exception("materialize: event-cause-edge applier failed for case %s", case_id)
-        results["event_cause_edges"] = {"error": str(e)}
+    with span("event_cause_edges"):
+        try:
+            from app.services.extraction.causal_edges import apply_event_cause_edges
+            results["event_cause_edges"] = apply_event_cause_edges(
+                case_id=case_id, ttl_path=ttl_path, write_back=True,
+            )
+        except Exception as e:
+            logger.exception("materialize: event-cause-edge applier failed for case %s", case_id)
+            results["event_cause_edges"] = {"error": str(e)}
 
     # 2j. Ground synthesis CausalNormativeLink reasoning nodes to the Action they analyze
     # (proeth:analyzesAction), so the reasoning -> action -> obligation-URI chain is reachable.
-    try:
-        from app.services.extraction.causal_edges import apply_causal_normative_link_edges
-        results["causal_normative_link_edges"] = apply_causal_normative_link_edges(
-            case_id=case_id, ttl_path=ttl_path, write_back=True,
-        )
-    except Exception as e:
-        logger.exception("materialize: causal-normative-link applier failed for case %s", case_id)
-        results["causal_normative_link_edges"] = {"error": str(e)}
+    with span("causal_normative_link_edges"):
+        try:
+            from app.services.extraction.causal_edges import apply_causal_normative_link_edges
+            results["causal_normative_link_edges"] = apply_causal_normative_link_edges(
+                case_id=case_id, ttl_path=ttl_path, write_back=True,
+            )
+        except Exception as e:
+            logger.exception("materialize: causal-normative-link applier failed for case %s", case_id)
+            results["causal_normative_link_edges"] = {"error": str(e)}
 
     # 3. R->P->O dependency edges (LLM) with the domain/range Pellet guard.
-    try:
-        from app.services.extraction.rpo_edges import apply_rpo_edges
-        results["rpo"] = apply_rpo_edges(
-            case_id=case_id, ttl_path=ttl_path, write_back=True,
-        )
-    except Exception as e:
-        logger.exception("materialize: R->P->O applier failed for case %s", case_id)
-        results["rpo"] = {"error": str(e)}
+    with span("rpo"):
+        try:
+            from app.services.extraction.rpo_edges import apply_rpo_edges
+            results["rpo"] = apply_rpo_edges(
+                case_id=case_id, ttl_path=ttl_path, write_back=True,
+            )
+        except Exception as e:
+            logger.exception("materialize: R->P->O applier failed for case %s", case_id)
+            results["rpo"] = {"error": str(e)}
 
     # 3. cites-provision edges (deterministic, DB-driven).
-    try:
-        from app.services.extraction.provision_citation_resolver import apply_cites_provision_on_ttl
-        results["cites_provision"] = {"edges_added": apply_cites_provision_on_ttl(ttl_path)}
-    except Exception as e:
-        logger.exception("materialize: cites-provision applier failed for case %s", case_id)
-        results["cites_provision"] = {"error": str(e)}
+    with span("cites_provision"):
+        try:
+            from app.services.extraction.provision_citation_resolver import apply_cites_provision_on_ttl
+            results["cites_provision"] = {"edges_added": apply_cites_provision_on_ttl(ttl_path)}
+        except Exception as e:
+            logger.exception("materialize: cites-provision applier failed for case %s", case_id)
+            results["cites_provision"] = {"error": str(e)}
 
     # 3b. resource provisionCodes -> containsProvision edges (a code resource -> the CodeProvisions
     # it cites; deterministic, DB-driven). Gap 3 of the Resources fix, mirroring cites-provision.
-    try:
-        from app.services.extraction.provision_citation_resolver import apply_resource_provisions_on_ttl
-        results["resource_provisions"] = {"edges_added": apply_resource_provisions_on_ttl(ttl_path)}
-    except Exception as e:
-        logger.exception("materialize: resource-provision applier failed for case %s", case_id)
-        results["resource_provisions"] = {"error": str(e)}
+    with span("resource_provisions"):
+        try:
+            from app.services.extraction.provision_citation_resolver import apply_resource_provisions_on_ttl
+            results["resource_provisions"] = {"edges_added": apply_resource_provisions_on_ttl(ttl_path)}
+        except Exception as e:
+            logger.exception("materialize: resource-provision applier failed for case %s", case_id)
+            results["resource_provisions"] = {"error": str(e)}
 
     # 3c. constraint source -> establishedBy edges (deterministic, DB-validated):
     # dotted NSPE codes inside Constraint proeth:source literals resolve to nspe:
     # CodeProvision IRIs via the SAME provision resolver as citesProvision
     # (constraint -> the provision that establishes it). Non-code sources
     # ("State Seal Law", "Local regulations") yield no edge; the literal is kept.
-    try:
-        from app.services.extraction.provision_citation_resolver import apply_established_by_on_ttl
-        results["established_by"] = {"edges_added": apply_established_by_on_ttl(ttl_path)}
-    except Exception as e:
-        logger.exception("materialize: establishedBy applier failed for case %s", case_id)
-        results["established_by"] = {"error": str(e)}
+    with span("established_by"):
+        try:
+            from app.services.extraction.provision_citation_resolver import apply_established_by_on_ttl
+            results["established_by"] = {"edges_added": apply_established_by_on_ttl(ttl_path)}
+        except Exception as e:
+            logger.exception("materialize: establishedBy applier failed for case %s", case_id)
+            results["established_by"] = {"error": str(e)}
 
     # 4. Unified Pellet-safety guard over ALL edge families on the final TTL.
     # apply_rpo_edges guards its own edges, but a defeasibility edge can still
@@ -328,51 +346,54 @@ def materialize_edges_on_ttl(case_id: int, ttl_path) -> Dict[str, Any]:
     # (e.g. a Principle-typed individual used as a competesWith endpoint, range
     # Obligation). Running the guard once here, after every applier, drops any
     # such cross-family violation so the persisted case stays OWL-DL consistent.
-    try:
-        from rdflib import Graph
-        from app.services.extraction.rpo_edges import (
-            drop_domain_range_violations, ALL_EDGE_RANGE,
-        )
-        g = Graph()
-        g.parse(str(ttl_path), format="turtle")
-        incoherent = drop_fluent_incoherence(g, case_id)
-        dropped = drop_domain_range_violations(g, case_id, edge_range=ALL_EDGE_RANGE)
-        if dropped or incoherent:
-            g.serialize(destination=str(ttl_path), format="turtle")
-        results["unified_guard"] = {"triples_dropped": dropped}
-    except Exception as e:
-        logger.exception("materialize: unified domain/range guard failed for case %s", case_id)
-        results["unified_guard"] = {"error": str(e)}
+    with span("unified_guard"):
+        try:
+            from rdflib import Graph
+            from app.services.extraction.rpo_edges import (
+                drop_domain_range_violations, ALL_EDGE_RANGE,
+            )
+            g = Graph()
+            g.parse(str(ttl_path), format="turtle")
+            incoherent = drop_fluent_incoherence(g, case_id)
+            dropped = drop_domain_range_violations(g, case_id, edge_range=ALL_EDGE_RANGE)
+            if dropped or incoherent:
+                write_turtle(g, ttl_path)
+            results["unified_guard"] = {"triples_dropped": dropped}
+        except Exception as e:
+            logger.exception("materialize: unified domain/range guard failed for case %s", case_id)
+            results["unified_guard"] = {"error": str(e)}
 
     # 5. Case-relative participant-agent definitions, derived from the edges
     # the appliers above just materialized (deterministic; marker-refreshed on
     # every run). Runs AFTER the guard so a dropped edge never feeds a clause.
-    try:
-        from rdflib import Graph as _AG
-        from app.services.extraction.edge_spec import annotate_participant_agents
-        _ag = _AG()
-        _ag.parse(str(ttl_path), format="turtle")
-        _stats = annotate_participant_agents(_ag, case_id)
-        if any(_stats[k] for k in ("defined", "refreshed", "attributed")):
-            _ag.serialize(destination=str(ttl_path), format="turtle")
-        results["agent_annotations"] = _stats
-    except Exception as e:
-        logger.warning("materialize: agent annotation failed for case %s: %s",
-                       case_id, e, exc_info=True)
-        results["agent_annotations"] = {"error": str(e)}
+    with span("agent_annotations"):
+        try:
+            from rdflib import Graph as _AG
+            from app.services.extraction.edge_spec import annotate_participant_agents
+            _ag = _AG()
+            _ag.parse(str(ttl_path), format="turtle")
+            _stats = annotate_participant_agents(_ag, case_id)
+            if any(_stats[k] for k in ("defined", "refreshed", "attributed")):
+                write_turtle(_ag, ttl_path)
+            results["agent_annotations"] = _stats
+        except Exception as e:
+            logger.warning("materialize: agent annotation failed for case %s: %s",
+                           case_id, e, exc_info=True)
+            results["agent_annotations"] = {"error": str(e)}
 
     logger.info("Edge materialization for case %s: %s", case_id, results)
 
     # Refresh the cross-case defeasibility band index from the just-materialized TTL.
     # Derived/rebuildable cache; a failure must not fail the commit but is logged so it
     # stays visible (matches the edge-applier hook convention above).
-    try:
-        from app.services.defeasibility_view_service import refresh_band_index
-        results["band_index"] = {"rows": refresh_band_index(case_id)}
-    except Exception as e:
-        logger.warning("materialize: band-index refresh failed for case %s: %s",
-                       case_id, e, exc_info=True)
-        results["band_index"] = {"error": str(e)}
+    with span("band_index"):
+        try:
+            from app.services.defeasibility_view_service import refresh_band_index
+            results["band_index"] = {"rows": refresh_band_index(case_id)}
+        except Exception as e:
+            logger.warning("materialize: band-index refresh failed for case %s: %s",
+                           case_id, e, exc_info=True)
+            results["band_index"] = {"error": str(e)}
 
     return results
 
@@ -411,5 +432,5 @@ def apply_precedent_citation_edges(case_id: int, ttl_path, write_back: bool = Tr
             g.add((ref, CORE.citedByAgent, board))
             added += 1
     if write_back and added:
-        g.serialize(destination=str(ttl_path), format="turtle")
+        write_turtle(g, ttl_path)
     return {"added": added}
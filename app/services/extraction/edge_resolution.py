@@ -30,8 +30,11 @@ import math
 import re
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 from rdflib import Graph, Literal, Namespace, RDF, RDFS, URIRef
 
+from app.services.embedding.similarity_kernels import cosine_one_to_many, top_k
+
 logger = logging.getLogger(__name__)
 
 CORE = Namespace("http://proethica.org/ontology/core#")
@@ -148,11 +151,10 @@ def _resolve(svc, description: str, pool, threshold: float) -> Tuple[Optional[UR
     qv = _embed(svc, description)
     if not qv or not pool:
         return None, 0.0
-    best, best_sim = None, -1.0
-    for iri, _t, ev in pool:
-        sim = _cosine(qv, ev)
-        if sim > best_sim:
-            best, best_sim = iri, sim
+    # One batched _cosine over the pool; argmax keeps the first of equal scores.
+    scores = cosine_one_to_many(qv, [ev for _i, _t, ev in pool], 'truncated_dot', dtype=np.float64)
+    i = int(np.argmax(scores))
+    best, best_sim = (pool[i][0], float(scores[i])) if scores[i] > -1.0 else (None, -1.0)
     if best is not None and best_sim >= threshold:
         return best, best_sim
     return None, best_sim
@@ -164,9 +166,9 @@ def _shortlist(svc, description: str, pool, floor: float, k: int):
     qv = _embed(svc, description)
     if not qv or not pool:
         return []
-    scored = sorted(((iri, txt, _cosine(qv, ev)) for iri, txt, ev in pool),
-                    key=lambda x: -x[2])
-    return [(iri, txt, sim) for iri, txt, sim in scored[:k] if sim >= floor]
+    hits = top_k(qv, [ev for _i, _t, ev in pool], k, 'truncated_dot',
+                 threshold=floor, dtype=np.float64)
+    return [(pool[i][0], pool[i][1], sim) for i, sim in hits]
 
 
 # --- batched LLM select (single + multi; moved verbatim) --------------------
@@ -39,6 +39,7 @@ from typing import Any, Callable, Dict, List, Optional, Tuple
 from rdflib import Graph, Literal, Namespace, RDF, RDFS, URIRef
 from rdflib.namespace import OWL, TIME
 
+from app.services.commit.turtle_writer import write_turtle
 from app.services.extraction.edge_resolution import (
     BOARD_AGENT_LOCALNAME,
     _agent_pool,
@@ -528,7 +529,7 @@ def materialize_edge_family(case_id: int, ttl_path, spec: EdgeSpec, write_back:
     total = sum(v.get("edges", 0) for v in res.values() if isinstance(v, dict))
     res["total"] = total
     if write_back and total:
-        g.serialize(destination=str(ttl_path), format="turtle")
+        write_turtle(g, ttl_path)
     return res
 
 
@@ -31,6 +31,7 @@ from app.services.extraction.schemas import (
     INTERMEDIATE_NS,
 )
 from app.services.extraction.unified_dual_extractor import CONCEPT_CONFIG
+from app.utils.pipeline_spans import timed
 
 logger = logging.getLogger(__name__)
 
@@ -285,6 +286,7 @@ def pydantic_to_rdf_data(
     }
 
 
+@timed()
 def store_extraction_result(
     case_id: int,
     concept_type: str,
@@ -18,6 +18,8 @@ from __future__ import annotations
 import re
 from typing import List, Optional, Set
 
+from app.services.commit.turtle_writer import write_turtle
+
 NSPE_NS = "http://proethica.org/ontology/nspe#"
 INTERMEDIATE_NS = "http://proethica.org/ontology/intermediate#"
 CORE_NS = "http://proethica.org/ontology/core#"
@@ -168,7 +170,7 @@ def apply_cites_provision_on_ttl(ttl_path) -> int:
     g.parse(str(ttl_path), format="turtle")
     added = apply_cites_provision_edges(g, resolver)
     if added:
-        g.serialize(destination=str(ttl_path), format="turtle")
+        write_turtle(g, ttl_path)
     return added
 
 
@@ -233,7 +235,7 @@ def apply_established_by_on_ttl(ttl_path) -> int:
     g.parse(str(ttl_path), format="turtle")
     added = apply_established_by_edges(g, resolver)
     if added:
-        g.serialize(destination=str(ttl_path), format="turtle")
+        write_turtle(g, ttl_path)
     return added
 
 
@@ -300,5 +302,5 @@ def apply_resource_provisions_on_ttl(ttl_path) -> int:
     g.parse(str(ttl_path), format="turtle")
     added = apply_resource_provision_edges(g, resolver)
     if added:
-        g.serialize(destination=str(ttl_path), format="turtle")
+        write_turtle(g, ttl_path)
     return added
@@ -27,15 +27,31 @@ fabrication). Tests 1-2 remain as free fast-paths so a verbatim quote never pays
 
 Only entities whose EVERY quote is ungrounded are dropped (a single grounded quote keeps the entity),
 so the filter is precision-favoring.
+
+The semantic test is vectorized. The index holds the case sentences as one L2-normalized float32
+matrix built with a single batched encode, and a batch of quotes is scored as one matrix product.
+The matrix is also persisted under GROUNDING_INDEX_DIR (default: ``<instance>/grounding-index``,
+created 0700 by ``private_cache_dir``; ``off`` disables it), keyed by the embedding model and a SHA-256 of the section text, so every worker
+and every re-run over the same section shares one embedding pass.
 """
 from __future__ import annotations
 
+import hashlib
+import logging
+import os
 import re
-from dataclasses import dataclass
+import tempfile
+from dataclasses import dataclass, field
 from functools import lru_cache
-from typing import Callable, List, Tuple, TypeVar
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+import numpy as np
 
 from app.services.extraction.rules import Rule, RuleSet
+from app.utils.private_cache_dir import private_cache_dir
+
+logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
@@ -44,6 +60,7 @@ _N = 5                       # shingle size (contiguous words) for the lexical c
 _GROUNDED_COVERAGE = 0.5     # a reworded quote is grounded if >= this fraction of its shingles appear
 _SEMANTIC_THRESHOLD = 0.6    # a paraphrased quote is grounded if its cosine to some case sentence >= this
 _SENTENCE = re.compile(r"(?<=[.!?])\s+|\n+")  # split the case into sentences for the semantic test
+_DEFAULT_MAX_FILES = 512     # persisted sentence matrices kept on disk (LRU by mtime)
 
 
 def _tokens(text: str | None) -> List[str]:
@@ -62,36 +79,129 @@ def _sentences(case_text: str) -> List[str]:
     return [s.strip() for s in _SENTENCE.split(case_text or "") if len(s.strip()) >= 8]
 
 
-def _embed(text: str) -> List[float]:
-    """Embed text in the local 384-dim space (all-MiniLM-L6-v2). Uses _get_local_embedding directly,
-    not get_embedding, so the case sentences and the quotes live in the SAME space and no hosted
-    provider (which could return a different dimension, or a random vector on the Claude path) is ever
-    consulted. Raises if the local model is unavailable -- a real misconfiguration surfaces here rather
-    than being papered over."""
+def _local_embedding_service():
+    """The local 384-dim space (all-MiniLM-L6-v2). Uses the local model directly, not get_embedding,
+    so the case sentences and the quotes live in the SAME space and no hosted provider (which could
+    return a different dimension, or a random vector on the Claude path) is ever consulted. Raises if
+    the local model is unavailable -- a real misconfiguration surfaces here rather than being papered
+    over."""
     from app.services.embedding.embedding_service import EmbeddingService
-    return EmbeddingService.get_instance()._get_local_embedding(text)
+    return EmbeddingService.get_instance()
 
 
-@dataclass(frozen=True)
+def _embed(text: str) -> List[float]:
+    """Embed one text in the local space (see _local_embedding_service)."""
+    return _local_embedding_service()._get_local_embedding(text)
+
+
+def _embed_normalized(texts: List[str]) -> np.ndarray:
+    """Embed ``texts`` in one batched encode; rows are L2-normalized float32 (zero rows stay zero)."""
+    matrix = _local_embedding_service()._get_local_embeddings(texts)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def _model_name() -> str:
+    from app.services.embedding.embedding_service import EmbeddingService
+    instance = EmbeddingService._instance
+    if instance is not None:
+        return instance.model_name
+    return os.environ.get("LOCAL_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+
+def _disk_dir() -> Optional[Path]:
+    root = os.environ.get("GROUNDING_INDEX_DIR")
+    if root and root.lower() == "off":
+        return None
+    try:
+        return private_cache_dir("grounding-index", root)
+    except OSError as e:
+        logger.warning(f"Grounding index disk layer disabled: {e}")
+        return None
+
+
+def _matrix_path(root: Path, case_text: str) -> Path:
+    digest = hashlib.sha256(f"{_model_name()}\0{case_text}".encode("utf-8")).hexdigest()
+    return root / f"{digest}.npy"
+
+
+def _load_matrix(case_text: str, n_sentences: int) -> Optional[np.ndarray]:
+    root = _disk_dir()
+    if root is None:
+        return None
+    path = _matrix_path(root, case_text)
+    try:
+        matrix = np.load(path, allow_pickle=False)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Discarding unreadable grounding index {path.name}: {e}")
+        path.unlink(missing_ok=True)
+        return None
+    if matrix.ndim != 2 or matrix.shape[0] != n_sentences:
+        path.unlink(missing_ok=True)  # written by a different sentence splitter
+        return None
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+    return matrix.astype(np.float32, copy=False)
+
+
+def _save_matrix(case_text: str, matrix: np.ndarray) -> None:
+    root = _disk_dir()
+    if root is None:
+        return
+    try:
+        path = _matrix_path(root, case_text)
+        fd, tmp = tempfile.mkstemp(dir=root, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            np.save(fh, matrix, allow_pickle=False)
+        os.replace(tmp, path)
+        _prune_disk(root, keep=path)
+    except Exception as e:
+        logger.warning(f"Could not persist grounding index: {e}")
+
+
+def _prune_disk(root: Path, keep: Path) -> None:
+    max_files = int(os.environ.get("GROUNDING_INDEX_MAX_FILES", _DEFAULT_MAX_FILES))
+    entries = [p for p in root.glob("*.npy") if p != keep]
+    overflow = len(entries) + 1 - max_files
+    if overflow <= 0:
+        return
+    entries.sort(key=lambda p: p.stat().st_mtime_ns if p.exists() else 0)
+    for p in entries[:overflow]:
+        p.unlink(missing_ok=True)
+
+
+@dataclass(frozen=True, eq=False)
 class GroundingIndex:
     """The case text indexed for grounding: the normalized token string (verbatim substring test), the
-    word n-gram shingles (lexical coverage test), and the per-sentence embeddings (semantic test)."""
+    word n-gram shingles (lexical coverage test), and the L2-normalized sentence embedding matrix
+    (semantic test). ``similarities`` memoizes quote scores, so a quote is embedded once per index."""
     token_string: str
     ngrams: frozenset
-    sentence_embeddings: Tuple[Tuple[float, ...], ...]
+    sentence_matrix: np.ndarray
+    similarities: Dict[str, float] = field(default_factory=dict, repr=False)
 
 
 @lru_cache(maxsize=8)
 def build_grounding_index(case_text: str, n: int = _N) -> GroundingIndex:
-    """Index the case text for grounding. Built once per (case_text, n) and cached: the nine concept
-    passes over the same section reuse one embedding pass rather than re-embedding nine times. Pass the
-    section text the quotes were drawn from (the live extractor passes the current section)."""
+    """Index the case text for grounding. Built once per (case_text, n) in process and the sentence
+    matrix is persisted on disk: the nine concept passes over the same section -- and any other worker
+    or re-run -- reuse one embedding pass rather than re-embedding. Pass the section text the quotes
+    were drawn from (the live extractor passes the current section)."""
     toks = _tokens(case_text)
-    sentence_embeddings = tuple(tuple(_embed(s)) for s in _sentences(case_text))
+    sentences = _sentences(case_text)
+    matrix = _load_matrix(case_text, len(sentences)) if sentences else None
+    if matrix is None:
+        matrix = _embed_normalized(sentences) if sentences else np.zeros((0, 0), dtype=np.float32)
+        if sentences:
+            _save_matrix(case_text, matrix)
     return GroundingIndex(
         token_string=" ".join(toks),
         ngrams=frozenset(_shingles(toks, n)),
-        sentence_embeddings=sentence_embeddings,
+        sentence_matrix=matrix,
     )
 
 
@@ -103,15 +213,36 @@ def quote_coverage(quote: str | None, index: GroundingIndex, n: int = _N) -> flo
     return sum(1 for s in sh if s in index.ngrams) / len(sh)
 
 
+def quote_semantic_similarities(quotes: Iterable[str | None], index: GroundingIndex) -> List[float]:
+    """Max cosine between each quote's embedding and any case-sentence embedding, in input order (0.0
+    for a blank quote or an index with no sentences). The quotes not yet scored against this index are
+    embedded in one batch and scored with one matrix product."""
+    quotes = list(quotes)
+    if not len(index.sentence_matrix):
+        return [0.0] * len(quotes)
+    pending = list(dict.fromkeys(q for q in quotes
+                                 if q and q.strip() and q not in index.similarities))
+    if pending:
+        scores = (_embed_normalized(pending) @ index.sentence_matrix.T).max(axis=1)
+        index.similarities.update(zip(pending, scores.tolist()))
+    return [index.similarities.get(q, 0.0) if q and q.strip() else 0.0 for q in quotes]
+
+
 def quote_semantic_similarity(quote: str | None, index: GroundingIndex) -> float:
     """Max cosine between the quote's embedding and any case-sentence embedding (0.0 if no sentences).
     This is the semantic grounding signal: high when the quote's meaning is attested somewhere in the
     case, regardless of exact wording."""
-    if not (quote and quote.strip()) or not index.sentence_embeddings:
-        return 0.0
-    from app.services.embedding.similarity_utils import cosine_similarity_list
-    qe = _embed(quote)
-    return max(cosine_similarity_list(qe, list(se)) for se in index.sentence_embeddings)
+    return quote_semantic_similarities([quote], index)[0]
+
+
+def _lexically_grounded(quote: str | None, index: GroundingIndex, threshold: float) -> Optional[bool]:
+    """True/False when the lexical tests decide the quote; None when only the embedding can."""
+    q = " ".join(_tokens(quote))
+    if not q:
+        return False
+    if q in index.token_string or quote_coverage(quote, index) >= threshold:
+        return True
+    return None
 
 
 def is_grounded(quote: str | None, index: GroundingIndex, threshold: float = _GROUNDED_COVERAGE) -> bool:
@@ -119,13 +250,9 @@ def is_grounded(quote: str | None, index: GroundingIndex, threshold: float = _GR
     quote whose shingle coverage clears ``threshold``, or a paraphrase whose embedding is within
     ``_SEMANTIC_THRESHOLD`` cosine of some case sentence. The lexical tests run first (free); the
     embedding is computed only for a quote that fails both."""
-    q = " ".join(_tokens(quote))
-    if not q:
-        return False
-    if q in index.token_string:
-        return True
-    if quote_coverage(quote, index) >= threshold:
-        return True
+    lexical = _lexically_grounded(quote, index, threshold)
+    if lexical is not None:
+        return lexical
     return quote_semantic_similarity(quote, index) >= _SEMANTIC_THRESHOLD
 
 
@@ -175,5 +302,12 @@ def drop_ungrounded_entities(
             index=index,
         )
 
+    # Score every quote the lexical tests cannot decide in one batch up front; the rule's per-quote
+    # is_grounded calls then hit the index's memo instead of embedding quote by quote.
+    undecided = [q for it in items for q in (get_quotes(it) or [])
+                 if q and q.strip() and _lexically_grounded(q, index, _GROUNDED_COVERAGE) is None]
+    if undecided:
+        quote_semantic_similarities(undecided, index)
+
     kept, hits = GROUNDING_RULES.partition(items, to_ctx, get_label)
     return kept, [h.label for h in hits]
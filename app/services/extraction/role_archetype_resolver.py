@@ -48,8 +48,8 @@ def _strip_role(label: str) -> str:
 def _build_index(ttl_path: str) -> Dict[str, str]:
     """{synonym (lowercased) -> archetype IRI} for every class tagged
     archetypeAxis="occupational". Synonyms = label minus a trailing " Role", plus altLabels."""
-    g = rdflib.Graph()
-    g.parse(ttl_path, format="turtle")
+    from app.services.entity.graph_store import load_ttl_graph
+    g = load_ttl_graph(ttl_path)
     syn_to_iri: Dict[str, str] = {}
     for cls in g.subjects(_ARCHETYPE_AXIS, _OCCUPATIONAL_ARCHETYPE):
         iri = str(cls)
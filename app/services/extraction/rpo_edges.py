@@ -29,6 +29,8 @@ from typing import Any, Dict, List, Optional, Set, Tuple
 
 from rdflib import Graph, Literal, RDF, RDFS, URIRef, Namespace
 
+from app.services.commit.turtle_writer import write_turtle
+
 from .edge_extractor_base import StreamingEdgeExtractor
 
 logger = logging.getLogger(__name__)
@@ -777,7 +779,7 @@ def apply_rpo_edges(case_id: int, ttl_path, extractor: Optional["RPOEdgeExtracto
         g.bind("proeth", PROETH)
         g.bind("proeth-core", PROETH_CORE)
         g.bind("prov", PROV)
-        g.serialize(destination=str(ttl_path), format="turtle")
+        write_turtle(g, ttl_path)
 
     return {"case_id": case_id, "status": "ok",
             "roles": len(roles), "principles": len(principles),
@@ -37,6 +37,8 @@ from typing import Any, Dict, List
 
 from rdflib import Graph, Literal, Namespace, URIRef
 
+from app.services.commit.turtle_writer import write_turtle
+
 # The embedding / graph / shortlist / LLM-select / provenance primitives now live in
 # the shared edge_resolution module (moved verbatim, de-duplicated across the appliers).
 # Re-imported here so the historical state_edges import surface is preserved: sibling
@@ -386,5 +388,5 @@ def apply_state_edges(case_id: int, ttl_path, write_back: bool = True,
     added = sum(res[k] for k in ("activatesObligation", "activatesConstraint",
                                  "activatedByEvent", "terminatedByEvent", "principleTransformation"))
     if write_back and added:
-        g.serialize(destination=str(ttl_path), format="turtle")
+        write_turtle(g, ttl_path)
     return res
@@ -26,6 +26,7 @@ from typing import Any, Dict
 
 from rdflib import Graph, Literal, Namespace, RDF, RDFS
 
+from app.services.commit.turtle_writer import write_turtle
 from app.services.extraction.state_edges import _safe_frag
 
 logger = logging.getLogger(__name__)
@@ -77,5 +78,5 @@ def apply_time_anchors(case_id: int, ttl_path, write_back: bool = True) -> Dict[
         added += 1
 
     if write_back and added:
-        g.serialize(destination=str(ttl_path), format="turtle")
+        write_turtle(g, ttl_path)
     return {"case_id": case_id, "status": "ok", "time_anchors": added}
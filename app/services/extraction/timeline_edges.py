@@ -31,6 +31,7 @@ from typing import Any, Dict, List, Set, Tuple
 
 from rdflib import Graph, Literal, Namespace, RDF, URIRef
 
+from app.services.commit.turtle_writer import write_turtle
 from app.services.extraction.edge_resolution import (
     _individuals_in_category,
     emit_edge_prov,
@@ -135,7 +136,7 @@ def apply_timeline_haspart(case_id: int, ttl_path, write_back: bool = True) -> D
     counts_refreshed = _refresh_counts(g, timeline, members)
 
     if write_back and (added or counts_refreshed):
-        g.serialize(destination=str(ttl_path), format="turtle")
+        write_turtle(g, ttl_path)
     return {"case_id": case_id, "status": "ok", "added": added,
             "present": present, "counts_refreshed": counts_refreshed}
 
@@ -161,7 +162,7 @@ def reconstruct_timeline_haspart(case_id: int, ttl_path) -> Dict[str, Any]:
         for t in list(g.triples((s, None, None))):
             g.remove(t)
         removed_prov += 1
-    g.serialize(destination=str(ttl_path), format="turtle")
+    write_turtle(g, ttl_path)
     result = apply_timeline_haspart(case_id, ttl_path)
     result["reconstructed"] = {"edges_dropped": removed_edges,
                                "prov_dropped": removed_prov}
@@ -173,8 +174,8 @@ def check_timeline_haspart(case_id: int, ttl_path) -> Dict[str, Any]:
     the committed Action/Event individual set (compared against the committed
     individuals, never the count literals). Reports missing AND extra edges;
     a stray hasPart from any other subject is reported as extra."""
-    g = Graph()
-    g.parse(str(ttl_path), format="turtle")
+    from app.services.entity.graph_store import load_ttl_graph
+    g = load_ttl_graph(ttl_path)
     try:
         timeline, members = _timeline_and_members(g)
     except ValueError as e:
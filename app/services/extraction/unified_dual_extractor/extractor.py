@@ -15,7 +15,7 @@ from __future__ import annotations
 
 import logging
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from pydantic import BaseModel
 
@@ -32,6 +32,7 @@ from app.services.extraction.unified_dual_extractor.parsing import (
 from app.services.extraction.unified_dual_extractor.matching import (
     MatchingMixin,
 )
+from app.utils.pipeline_spans import span
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +55,7 @@ class UnifiedDualExtractor(
         model: Optional[str] = None,
         injection_mode: str = 'full',
         apply_filters: bool = True,
+        on_entity: Optional[Callable[[str, BaseModel], None]] = None,
     ):
         if concept_type not in CONCEPT_CONFIG:
             raise ValueError(
@@ -124,6 +126,9 @@ class UnifiedDualExtractor(
         # and individual/type filters are skipped). Used by the offline A/B audit
         # harness to capture pre-filter extractions; the live pipeline leaves this True.
         self.apply_filters = apply_filters
+        # -- Live entities: called as on_entity('class' | 'individual', model) for each
+        # entity validated off the LLM stream, before the response completes (SSE cards).
+        self.on_entity = on_entity
         self.tool_call_count = 0
         self.tool_call_log: List[Dict[str, Any]] = []
 
@@ -160,27 +165,32 @@ class UnifiedDualExtractor(
         self._current_section_type = section_type
 
         # 1. Build prompt
-        prompt = self._build_prompt(case_text, section_type, case_id=case_id)
+        with span('build_prompt'):
+            prompt = self._build_prompt(case_text, section_type, case_id=case_id)
         self.last_prompt = prompt
 
         # 2. Call LLM
-        raw_json = self._call_llm(prompt)
+        with span('llm_call', model=self.model_name):
+            raw_json = self._call_llm(prompt)
         if not raw_json:
             logger.warning(f"No LLM result for {self.concept_type}")
             return [], []
 
         # 3. Parse + validate
-        classes, individuals = self._parse_and_validate(raw_json, case_id)
+        with span('parse_validate'):
+            classes, individuals = self._parse_and_validate(raw_json, case_id)
 
         # 3a/3b. Deterministic precedent-contamination + quote-grounding filters.
         # Gated by self.apply_filters (default True = live behavior); the offline
         # A/B audit sets it False to capture the raw, pre-filter extraction.
         if self.apply_filters:
-            classes, individuals = self._apply_text_filters(
-                classes, individuals, case_id, section_type)
+            with span('text_filters'):
+                classes, individuals = self._apply_text_filters(
+                    classes, individuals, case_id, section_type)
 
         # 4. Match against existing ontology classes
-        self._check_existing_matches(classes)
+        with span('match_existing'):
+            self._check_existing_matches(classes)
 
         # 5. Collect ontology definitions for matched entities
         self.ontology_definitions = self._collect_ontology_definitions(classes)
@@ -10,12 +10,15 @@ sibling methods (e.g. self._repair_truncated_json) and instance attributes
 """
 from __future__ import annotations
 
+import json
 import logging
 import time
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import anthropic
+from pydantic import ValidationError
 
+from app.utils.llm_json_utils import IncrementalJSONItems
 from app.utils.llm_utils import extract_json_from_response
 
 logger = logging.getLogger(__name__)
@@ -45,6 +48,72 @@ class LLMCallMixin:
             return {'temperature': self.config['temperature']}
         return {}
 
+    def _message_content(self, prompt: str, mark_end: bool = False):
+        """User-message content for ``prompt``.
+
+        The cache-ordered blocks from _build_prompt when they still spell out
+        this prompt (stable prefix carries a breakpoint), otherwise the plain
+        string. ``mark_end`` also puts a breakpoint on the last block (the
+        tool-use loop re-sends the whole prompt every round).
+        """
+        blocks = getattr(self, '_prompt_blocks', None)
+        if blocks and ''.join(b['text'] for b in blocks) == prompt:
+            content = [dict(b) for b in blocks]
+        elif mark_end:
+            content = [{"type": "text", "text": prompt}]
+        else:
+            return prompt
+        if mark_end:
+            content[-1]['cache_control'] = {"type": "ephemeral"}
+        return content
+
+    # ------------------------------------------------------------------
+    # Live entities (incremental parse of the stream)
+    # ------------------------------------------------------------------
+
+    def _live_entity_parser(self) -> Optional[IncrementalJSONItems]:
+        """A fresh incremental parser per stream attempt, or None when no
+        ``on_entity`` callback is registered (the common batch case)."""
+        if getattr(self, 'on_entity', None) is None:
+            return None
+        return IncrementalJSONItems()
+
+    def _emit_live_entities(self, parser: IncrementalJSONItems, text: str) -> None:
+        """Validate each item the chunk completed and hand it to ``on_entity``.
+
+        Items are validated one at a time against the class/individual model
+        (after the same field normalization the final parse applies); invalid
+        ones are skipped here and reported by the final parse. An item already
+        emitted by an earlier (retried) stream attempt is not emitted again.
+        """
+        for key, item in parser.feed(text):
+            if not isinstance(item, dict):
+                continue
+            if key == self.config['individuals_key']:
+                kind, model_class = 'individual', self.individual_model
+            elif key in (None, self.config['classes_key'], self.concept_type):
+                kind, model_class = 'class', self.class_model
+            else:
+                continue
+            fingerprint = (kind, json.dumps(item, sort_keys=True, default=str))
+            if fingerprint in self._live_emitted:
+                continue
+            try:
+                entity = model_class.model_validate(self._normalize_field_names(dict(item)))
+            except ValidationError:
+                continue
+            self._live_emitted.add(fingerprint)
+            if self._first_entity_seconds is None:
+                self._first_entity_seconds = time.monotonic() - self._stream_started
+                logger.info(
+                    f"First streamed {self.concept_type} {kind} after "
+                    f"{self._first_entity_seconds:.1f}s"
+                )
+            try:
+                self.on_entity(kind, entity)
+            except Exception as e:
+                logger.warning(f"on_entity callback failed for {self.concept_type}: {e}")
+
     # ------------------------------------------------------------------
     # LLM call
     # ------------------------------------------------------------------
@@ -102,7 +171,7 @@ class LLMCallMixin:
                 model=self.model_name,
                 max_tokens=self.config['max_tokens'],
                 **self._maybe_temperature(),
-                messages=[{"role": "user", "content": prompt}],
+                messages=[{"role": "user", "content": self._message_content(prompt)}],
             )
             _system = (getattr(self, '_rendered_system', '') or '').strip()
             if _system:
@@ -127,14 +196,22 @@ class LLMCallMixin:
             # does not retry an already-started stream -- so wrap the stream attempt in a backoff retry. The
             # batch-1 corpus run dropped a whole component (case-5 constraints) to a one-off overloaded_error;
             # across 119 cases that would silently lose components, so retry the full call before giving up.
+            # With an on_entity callback, each completed class/individual is also parsed off the stream
+            # and emitted as soon as its closing brace arrives; the full parse below stays authoritative.
+            self._live_emitted = set()
+            self._first_entity_seconds = None
+            self._stream_started = time.monotonic()
             _MAX_TRANSIENT_RETRIES = 4
             for _attempt in range(_MAX_TRANSIENT_RETRIES):
                 chunks = []
+                _live = self._live_entity_parser()
                 try:
                     try:
                         with client.messages.stream(**stream_kwargs) as stream:
                             for text in stream.text_stream:
                                 chunks.append(text)
+                                if _live is not None:
+                                    self._emit_live_entities(_live, text)
                         final_msg = stream.get_final_message()
                     except anthropic.BadRequestError as e:
                         # Structured outputs compiles the schema into a grammar with a size ceiling
@@ -149,9 +226,12 @@ class LLMCallMixin:
                             )
                             stream_kwargs.pop('output_config', None)
                             chunks = []
+                            _live = self._live_entity_parser()
                             with client.messages.stream(**stream_kwargs) as stream:
                                 for text in stream.text_stream:
                                     chunks.append(text)
+                                    if _live is not None:
+                                        self._emit_live_entities(_live, text)
                             final_msg = stream.get_final_message()
                         else:
                             raise
@@ -176,9 +256,12 @@ class LLMCallMixin:
             self.last_raw_response = response_text
 
             stop_reason = final_msg.stop_reason
+            usage = final_msg.usage
             logger.info(
-                f"LLM stream complete: {final_msg.usage.input_tokens} in / "
-                f"{final_msg.usage.output_tokens} out, stop={stop_reason}"
+                f"LLM stream complete: {usage.input_tokens} in / "
+                f"{usage.output_tokens} out, cache read "
+                f"{getattr(usage, 'cache_read_input_tokens', 0) or 0} / write "
+                f"{getattr(usage, 'cache_creation_input_tokens', 0) or 0}, stop={stop_reason}"
             )
 
             if stop_reason == 'max_tokens':
@@ -276,14 +359,11 @@ class LLMCallMixin:
         # tool_result, so each round writes only its own delta and reads the
         # rest at ~0.1x (5-minute TTL; rounds are seconds apart). Worst case
         # (zero tool rounds) costs the 1.25x write premium on the prompt once;
-        # the first tool round already recovers it.
+        # the first tool round already recovers it. In the cache-ordered
+        # layout the stable prefix adds a third, cross-case breakpoint.
         messages = [{
             "role": "user",
-            "content": [{
-                "type": "text",
-                "text": prompt,
-                "cache_control": {"type": "ephemeral"},
-            }],
+            "content": self._message_content(prompt, mark_end=True),
         }]
         _prev_tail_mark: Dict[str, Any] | None = None
         max_rounds = 25
@@ -310,7 +390,9 @@ class LLMCallMixin:
                 logger.info(
                     f"Tool-use round {round_num + 1}: "
                     f"{response.usage.input_tokens} in / "
-                    f"{response.usage.output_tokens} out, "
+                    f"{response.usage.output_tokens} out, cache read "
+                    f"{getattr(response.usage, 'cache_read_input_tokens', 0) or 0} / write "
+                    f"{getattr(response.usage, 'cache_creation_input_tokens', 0) or 0}, "
                     f"stop={response.stop_reason}"
                 )
 
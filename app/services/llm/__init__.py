@@ -21,6 +21,7 @@ Usage:
 from .manager import LLMManager, get_llm_manager, reset_llm_manager
 from .response import LLMResponse, Usage
 from .config import LLMConfig
+from .gateway import LLMGateway, get_llm_gateway, reset_llm_gateway, gateway_completion
 
 __all__ = [
     'LLMManager',
@@ -28,5 +29,9 @@ __all__ = [
     'reset_llm_manager',
     'LLMResponse',
     'Usage',
-    'LLMConfig'
+    'LLMConfig',
+    'LLMGateway',
+    'get_llm_gateway',
+    'reset_llm_gateway',
+    'gateway_completion',
 ]
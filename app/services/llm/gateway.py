@@ -0,0 +1,355 @@
+"""
+Asyncio LLM gateway with global concurrency control.
+
+Pipeline LLM work used the sync Anthropic client from ad-hoc thread pools,
+so total parallelism was whatever each call site's ``max_workers`` added up
+to. The gateway owns one event loop (in a daemon thread) and one
+``AsyncAnthropic`` client per process; every prompt submitted to it, from
+any thread, is scheduled against:
+
+- a global concurrency limit (LLM_GATEWAY_MAX_CONCURRENCY, default 8) and a
+  per-model limit (LLM_GATEWAY_MAX_PER_MODEL, default 4);
+- two priority classes: ``interactive`` (SSE / user-facing requests) is
+  always admitted before ``batch`` (Celery pipeline) when a slot frees up;
+- adaptive backoff: a 429/529/5xx/connection error is retried with
+  exponential backoff plus jitter (honoring ``retry-after``) up to
+  LLM_GATEWAY_MAX_RETRIES times, and halves that model's effective
+  concurrency; each run of successes raises it again by one slot (AIMD).
+
+Requests stream (``messages.stream``) so long generations keep the
+connection busy, and they pass the per-process token-bucket limiter from
+``app.utils.llm_client_pool``.
+
+Sync code adopts it through the blocking facade::
+
+    from app.services.llm import gateway_completion
+    text = gateway_completion(prompt, model=model, max_tokens=4000)
+
+or fans out with ``get_llm_gateway().submit(...)``, which returns a
+``concurrent.futures.Future``. Coroutines can ``await gateway.complete(...)``.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+from app.utils.pipeline_spans import current_span
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {'interactive': 0, 'batch': 1}
+_RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504, 529}
+
+
+class PrioritySemaphore:
+    """Asyncio semaphore whose waiters are woken lowest-priority-number first.
+
+    ``limit`` can be changed at runtime; lowering it takes effect as running
+    holders release.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self._waiters: List = []
+        self._seq = itertools.count()
+
+    async def acquire(self, priority: int = 1) -> None:
+        if self.in_use < self.limit and not self._waiters:
+            self.in_use += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._seq), fut]
+        heapq.heappush(self._waiters, entry)
+        self._wake()  # drops cancelled entries; grants at once if a slot is free
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()  # woken and cancelled in the same tick
+            else:
+                entry[2] = None
+            raise
+
+    def release(self) -> None:
+        self.in_use -= 1
+        self._wake()
+
+    def set_limit(self, limit: int) -> None:
+        self.limit = limit
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_use < self.limit:
+            _prio, _seq, fut = heapq.heappop(self._waiters)
+            if fut is None or fut.done():
+                continue
+            self.in_use += 1
+            fut.set_result(None)
+
+
+class _ModelLane:
+    """Per-model semaphore with AIMD on its effective limit."""
+
+    def __init__(self, max_limit: int):
+        self.max_limit = max_limit
+        self.sem = PrioritySemaphore(max_limit)
+        self.successes = 0
+
+    def on_overload(self) -> None:
+        self.successes = 0
+        self.sem.set_limit(max(1, self.sem.limit // 2))
+
+    def on_success(self) -> None:
+        if self.sem.limit >= self.max_limit:
+            return
+        self.successes += 1
+        if self.successes >= self.sem.limit:
+            self.successes = 0
+            self.sem.set_limit(self.sem.limit + 1)
+
+
+def _retry_after(error) -> Optional[float]:
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+def _credit_usage(span, future: Future, submitted: float) -> None:
+    usage = None if future.cancelled() or future.exception() else getattr(future.result(), 'usage', None)
+    span.add(llm_calls=1, input_tokens=getattr(usage, 'input_tokens', 0) or 0,
+             output_tokens=getattr(usage, 'output_tokens', 0) or 0,
+             llm_seconds=time.monotonic() - submitted)
+
+
+def _is_retryable(error) -> bool:
+    import anthropic
+    if isinstance(error, anthropic.APIConnectionError):
+        return True
+    return getattr(error, 'status_code', None) in _RETRYABLE_STATUS
+
+
+class LLMGateway:
+    """Process-wide async LLM front door; see module docstring."""
+
+    def __init__(self, api_key: Optional[str] = None, client=None):
+        self.api_key = api_key or os.environ.get('ANTHROPIC_API_KEY')
+        self.max_concurrency = int(os.environ.get('LLM_GATEWAY_MAX_CONCURRENCY', 8))
+        self.max_per_model = int(os.environ.get('LLM_GATEWAY_MAX_PER_MODEL', 4))
+        self.max_retries = int(os.environ.get('LLM_GATEWAY_MAX_RETRIES', 5))
+        self.base_backoff = float(os.environ.get('LLM_GATEWAY_BACKOFF_SECONDS', 1.0))
+        self._injected_client = client
+        self.stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'retries': 0}
+        self._reset_process_state()
+
+    # --- loop management ------------------------------------------------------
+
+    def _reset_process_state(self) -> None:
+        """(Re)build the per-process loop, client and semaphores.
+
+        A forked child (Gunicorn / Celery prefork) inherits these from the
+        parent, but not the loop thread, and the client's connection pool is
+        shared with the parent, so the child starts from scratch.
+        """
+        self._pid = os.getpid()
+        self._client = self._injected_client
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._global: Optional[PrioritySemaphore] = None
+        self._lanes: Dict[str, _ModelLane] = {}
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._pid != os.getpid():
+            self._reset_process_state()
+        with self._start_lock:
+            if self._loop is None or not self._thread.is_alive():
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def _run():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=_run, name='llm-gateway', daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+        return self._loop
+
+    def _client_for_loop(self):
+        if self._client is None:
+            import anthropic
+            from app.utils.llm_client_pool import http_limits
+            self._client = anthropic.AsyncAnthropic(
+                api_key=self.api_key, max_retries=0,
+                timeout=float(os.environ.get('LLM_GATEWAY_TIMEOUT', 300)),
+                http_client=anthropic.DefaultAsyncHttpxClient(limits=http_limits()),
+            )
+        return self._client
+
+    def _lane(self, model: str) -> _ModelLane:
+        lane = self._lanes.get(model)
+        if lane is None:
+            lane = self._lanes[model] = _ModelLane(self.max_per_model)
+        return lane
+
+    # --- async API --------------------------------------------------------------
+
+    async def complete(self, messages: List[Dict[str, Any]], model: str, max_tokens: int,
+                       temperature: Optional[float] = None, system: Optional[str] = None,
+                       priority: str = 'batch', usage_tags: Optional[Dict[str, Any]] = None,
+                       **extra):
+        """Send one Messages request through the gateway; returns the final Message.
+
+        ``model`` / ``max_tokens`` / ``temperature`` go through
+        ``direct_call_params`` (thinking-budget floor, temperature gate).
+        ``usage_tags`` are the caller's ``llm_usage`` tags (``submit`` passes
+        them, since the event loop thread does not see the caller's context).
+        """
+        from app.utils.llm_client_pool import estimate_input_tokens, get_rate_limiter
+        from app.utils.llm_usage import current_usage_tags
+        from app.utils.llm_utils import direct_call_params
+
+        if usage_tags is None:
+            usage_tags = current_usage_tags()
+
+        prio = PRIORITIES.get(priority, PRIORITIES['batch'])
+        params = dict(direct_call_params(model, max_tokens, temperature), messages=messages, **extra)
+        if system is not None:
+            params['system'] = system
+        if self._global is None:
+            self._global = PrioritySemaphore(self.max_concurrency)
+        lane = self._lane(model)
+        limiter = get_rate_limiter()
+        est_in, est_out = estimate_input_tokens(params), params['max_tokens']
+        loop = asyncio.get_running_loop()
+        self.stats['submitted'] += 1
+
+        attempt = 0
+        while True:
+            queued = time.monotonic()
+            # Wait for rate-limit budget before taking a slot, so a request
+            # sleeping in the limiter does not hold concurrency others could use.
+            await loop.run_in_executor(None, limiter.acquire, est_in, est_out)
+            await lane.sem.acquire(prio)
+            try:
+                await self._global.acquire(prio)
+                try:
+                    waited = time.monotonic() - queued
+                    start = time.monotonic()
+                    message, error = None, None
+                    try:
+                        async with self._client_for_loop().messages.stream(**params) as stream:
+                            message = await stream.get_final_message()
+                    except Exception as e:
+                        error = e
+                    limiter.record(waited, time.monotonic() - start, est_in, est_out,
+                                   usage=getattr(message, 'usage', None), error=error is not None,
+                                   model=model, source='gateway', tags=usage_tags)
+                finally:
+                    self._global.release()
+            finally:
+                lane.sem.release()
+
+            if error is None:
+                lane.on_success()
+                self.stats['completed'] += 1
+                return message
+            if not _is_retryable(error) or attempt >= self.max_retries:
+                self.stats['failed'] += 1
+                raise error
+            lane.on_overload()
+            attempt += 1
+            self.stats['retries'] += 1
+            delay = _retry_after(error) or self.base_backoff * (2 ** (attempt - 1))
+            delay *= 1 + random.random() * 0.25
+            logger.warning(f"LLM gateway: {model} {type(error).__name__}; retry {attempt}/"
+                           f"{self.max_retries} in {delay:.1f}s (lane limit {lane.sem.limit})")
+            await asyncio.sleep(delay)
+
+    # --- sync facade ------------------------------------------------------------
+
+    def submit(self, prompt: Optional[str] = None, *, model: str, max_tokens: int,
+               messages: Optional[List[Dict[str, Any]]] = None, **kwargs) -> Future:
+        """Schedule a request from any thread; returns a concurrent Future of the Message."""
+        if messages is None:
+            messages = [{'role': 'user', 'content': prompt}]
+        from app.utils.llm_usage import current_usage_tags
+
+        loop = self._ensure_loop()
+        kwargs.setdefault('usage_tags', current_usage_tags())
+        future = asyncio.run_coroutine_threadsafe(
+            self.complete(messages, model=model, max_tokens=max_tokens, **kwargs), loop)
+        # The event loop thread does not see the caller's pipeline span, so
+        # usage is credited to it from here.
+        caller_span = current_span()
+        if caller_span is not None:
+            submitted = time.monotonic()
+            future.add_done_callback(lambda f: _credit_usage(caller_span, f, submitted))
+        return future
+
+    def call(self, prompt: Optional[str] = None, *, timeout: Optional[float] = None, **kwargs):
+        """Blocking form of ``submit``: returns the final Message."""
+        return self.submit(prompt, **kwargs).result(timeout=timeout)
+
+    def close(self) -> None:
+        loop = self._loop
+        if loop is None:
+            return
+        if self._client is not None and hasattr(self._client, 'close'):
+            try:
+                asyncio.run_coroutine_threadsafe(self._client.close(), loop).result(timeout=5)
+            except Exception:
+                pass
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Get or create the process-wide gateway."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway()
+    return _gateway
+
+
+def reset_llm_gateway() -> None:
+    """Stop and drop the singleton (useful for testing)."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is not None:
+            _gateway.close()
+        _gateway = None
+
+
+def gateway_completion(prompt: str, model: str, max_tokens: int,
+                       temperature: Optional[float] = 0.1, priority: str = 'batch',
+                       timeout: Optional[float] = None) -> str:
+    """Blocking drop-in for ``llm_utils.streaming_completion`` via the gateway."""
+    from app.utils.llm_utils import text_from_message
+
+    message = get_llm_gateway().call(prompt, model=model, max_tokens=max_tokens,
+                                     temperature=temperature, priority=priority,
+                                     timeout=timeout)
+    if getattr(message, 'stop_reason', None) == 'max_tokens':
+        logger.warning(f"gateway_completion hit max_tokens on {model}; text is truncated")
+    return text_from_message(message)
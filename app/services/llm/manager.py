@@ -84,11 +84,11 @@ class LLMManager:
         """Initialize the appropriate LLM client."""
         if self.provider == 'anthropic':
             try:
-                import anthropic
+                from app.utils.llm_client_pool import get_anthropic_client
                 api_key = os.getenv('ANTHROPIC_API_KEY')
                 if not api_key:
                     raise ValueError("ANTHROPIC_API_KEY not found in environment")
-                return anthropic.Anthropic(api_key=api_key)
+                return get_anthropic_client(api_key, timeout=600.0)
             except ImportError:
                 raise ImportError("anthropic package not installed. Run: uv pip install anthropic")
 
@@ -295,19 +295,11 @@ class LLMManager:
         """
         Estimate cost for Anthropic API call.
 
-        Pricing (as of Nov 2025):
-        - Claude Sonnet 4: $3 per MTok input, $15 per MTok output
-        - Claude Opus 4.1: $15 per MTok input, $75 per MTok output
+        Uses the shared per-family price table in ``app.utils.llm_usage``
+        (Sonnet $3/$15, Opus $15/$75 per MTok input/output).
         """
-        pricing = {
-            'claude-sonnet-4-6': (3.0, 15.0),
-            'claude-opus-4-6': (15.0, 75.0),
-        }
-
-        input_price, output_price = pricing.get(model, (3.0, 15.0))  # Default to Sonnet 4
-
-        cost = (input_tokens / 1_000_000 * input_price) + (output_tokens / 1_000_000 * output_price)
-        return round(cost, 6)
+        from app.utils.llm_usage import estimate_cost
+        return estimate_cost(model, input_tokens, output_tokens)
 
     def _estimate_cost_openai(self, input_tokens: int, output_tokens: int, model: str) -> float:
         """
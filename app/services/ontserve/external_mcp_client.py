@@ -42,6 +42,22 @@ class ExternalMCPClient:
             logger.error(f"Error calling tool '{tool_name}': {e}")
             return {'success': False, 'error': str(e)}
 
+    def call_tools(self, calls: List[tuple]) -> List[Dict[str, Any]]:
+        """Call several MCP tools in one round trip; one call_tool-style dict per call."""
+        try:
+            results = self.transport.call_tools(calls, return_exceptions=True)
+        except Exception as e:
+            logger.error(f"Error calling {len(calls)} tools: {e}")
+            return [{'success': False, 'error': str(e)} for _ in calls]
+        out = []
+        for (tool_name, _), result in zip(calls, results):
+            if isinstance(result, Exception):
+                logger.error(f"Tool '{tool_name}' failed: {result}")
+                out.append({'success': False, 'error': str(result)})
+            else:
+                out.append({'success': True, 'result': result})
+        return out
+
     def get_entities_by_category(
         self, category: str, domain_id: str = "engineering-ethics"
     ) -> Dict[str, Any]:
@@ -62,6 +78,25 @@ class ExternalMCPClient:
         logger.warning(f"No {category} entities found or query failed")
         return []
 
+    def get_entities_by_categories(
+        self, categories: List[str], domain_id: str = "engineering-ethics"
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Entities for several categories in one batched request, keyed by category."""
+        results = self.call_tools([
+            ("get_entities_by_category",
+             {"category": category, "domain_id": domain_id, "status": "approved"})
+            for category in categories
+        ])
+        entities = {}
+        for category, result in zip(categories, results):
+            if result.get('success') and result.get('result'):
+                entities[category] = result['result'].get('entities', [])
+                logger.info(f"Retrieved {len(entities[category])} {category} entities")
+            else:
+                logger.warning(f"No {category} entities found or query failed")
+                entities[category] = []
+        return entities
+
     def get_all_role_entities(self, domain_id: str = "engineering-ethics") -> List[Dict]:
         return self._get_entities("Role", domain_id)
 
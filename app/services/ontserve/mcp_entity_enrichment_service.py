@@ -122,18 +122,21 @@ class MCPEntityEnrichmentService:
         uncached = [uri for uri in uris if uri not in self._cache]
 
         if uncached:
-            # Step 1: Batch lookup from MCP (max 20 per request)
+            # Step 1: Batch lookup from MCP (max 20 URIs per tool call; all
+            # calls go out in one JSON-RPC batch)
             not_found_in_mcp = []
 
-            for i in range(0, len(uncached), 20):
-                batch = uncached[i:i+20]
+            batches = [uncached[i:i+20] for i in range(0, len(uncached), 20)]
+            results = self._call_mcp_tools(
+                [("get_entities_by_uris", {"uris": batch}) for batch in batches])
+
+            for batch, result in zip(batches, results):
                 # MCP-down signal captured here and raised AFTER the try so the
                 # fail-loud is not swallowed by this block's own except. A transport
                 # failure surfaces as {"error": ...} (not an "entity not in MCP" miss,
                 # which is a normal response and legitimately falls through to local).
                 mcp_error = None
                 try:
-                    result = self._call_mcp_tool("get_entities_by_uris", {"uris": batch})
                     if isinstance(result, dict) and result.get("error"):
                         mcp_error = result["error"]
                         not_found_in_mcp.extend(batch)
@@ -184,20 +187,32 @@ class MCPEntityEnrichmentService:
 
         return {uri: self._cache.get(uri, {"uri": uri, "found": False}) for uri in uris}
 
-    def _call_mcp_tool(self, tool_name: str, arguments: dict) -> dict:
-        """Call an MCP tool on the OntServe server."""
-        from app.services.ontserve.mcp_transport import MCPTransport, MCPTransportError
+    def _get_transport(self):
+        from app.services.ontserve.mcp_transport import MCPTransport
 
         if not hasattr(self, '_transport'):
             self._transport = MCPTransport(
                 base_url=self.mcp_url, timeout=self.timeout
             )
+        return self._transport
+
+    def _call_mcp_tool(self, tool_name: str, arguments: dict) -> dict:
+        """Call an MCP tool on the OntServe server."""
+        from app.services.ontserve.mcp_transport import MCPTransportError
 
         try:
-            return self._transport.call_tool(tool_name, arguments)
+            return self._get_transport().call_tool(tool_name, arguments)
         except MCPTransportError as e:
             return {"error": str(e)}
 
+    def _call_mcp_tools(self, calls: List[tuple]) -> List[dict]:
+        """Call several MCP tools in one batch; failures come back as {"error": ...}."""
+        try:
+            results = self._get_transport().call_tools(calls, return_exceptions=True)
+        except Exception as e:  # unreachable server fails the handshake before any call
+            return [{"error": str(e)} for _ in calls]
+        return [{"error": str(r)} if isinstance(r, Exception) else r for r in results]
+
     def build_glossary(self, entities: Dict[str, Dict]) -> str:
         """
         Build a glossary section from entity definitions.
@@ -5,25 +5,93 @@ Sync client for communicating with a FastMCP server over Streamable HTTP.
 Handles session initialization, SSE response parsing, and tool dispatch.
 
 Used by all ProEthica services that call OntServe MCP tools.
+
+The transport is shared by pipeline threads, so:
+
+- request ids and the MCP session id are updated under a lock, and the
+  HTTP connection pool is sized for concurrent callers
+  (ONTSERVE_MCP_POOL_SIZE);
+- read-only tools (READ_ONLY_TOOLS) are coalesced: identical concurrent
+  calls share one request, and a caller joined to another thread's request
+  waits at most ONTSERVE_MCP_WAIT_TIMEOUT seconds (default three times the
+  HTTP timeout) for it;
+- their responses can also be cached for ONTSERVE_MCP_CACHE_TTL seconds.
+  The cache is off by default (TTL 0): its version is process-local, so a
+  write made through another process or directly in OntServe is only seen
+  once the TTL expires. Enable it where the ontology is stable during a run.
+  Cached entries carry the cache version at the time of the call;
+  ``invalidate_mcp_cache()`` (called after an OntServe sync, and after any
+  write tool in this process) bumps the version;
+- ``call_tools`` sends several tool calls as one JSON-RPC batch array,
+  falling back to concurrent single requests when the server rejects
+  batches (ONTSERVE_MCP_BATCH=false skips the attempt).
 """
 
 import json
 import logging
 import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
 import requests
-from typing import Any, Dict, Optional
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
 MCP_PROTOCOL_VERSION = "2024-11-05"
 
+# Tools that only read ontology state; their responses are cached and coalesced.
+READ_ONLY_TOOLS = frozenset({
+    "get_entities_by_category",
+    "get_entities_by_uris",
+    "get_entity_by_label",
+    "get_domain_info",
+})
+
+_state_lock = threading.Lock()   # request ids, session ids
+_init_lock = threading.Lock()    # initialize handshake
+_cache_lock = threading.Lock()   # response cache, in-flight calls, version
+_cache_version = 0
+_response_cache: Dict[tuple, Tuple[int, float, str]] = {}
+_inflight: Dict[tuple, Future] = {}
+
 
 class MCPTransportError(Exception):
     pass
 
 
+def cache_ttl() -> float:
+    return float(os.environ.get("ONTSERVE_MCP_CACHE_TTL", 0))
+
+
+def invalidate_mcp_cache() -> int:
+    """Drop cached tool responses and bump the cache version; returns the new version."""
+    global _cache_version
+    with _cache_lock:
+        _cache_version += 1
+        _response_cache.clear()
+        _inflight.clear()  # later callers must not join a pre-invalidation request
+        return _cache_version
+
+
+def _cached_text(key: tuple) -> Optional[str]:
+    entry = _response_cache.get(key)
+    if entry is None:
+        return None
+    version, expires_at, text = entry
+    if version != _cache_version or time.monotonic() >= expires_at:
+        return None
+    return text
+
+
 class MCPTransport:
-    """Sync transport for MCP Streamable HTTP servers."""
+    """Sync transport for MCP Streamable HTTP servers (safe to share across threads)."""
+
+    # None until the first batch tells us whether the server accepts arrays.
+    _batch_supported: Optional[bool] = None
 
     def __init__(self, base_url: Optional[str] = None, timeout: int = 30):
         self.base_url = (
@@ -34,29 +102,28 @@ class MCPTransport:
         self.mcp_endpoint = f"{self.base_url}/mcp"
         self.timeout = timeout
         self._session = requests.Session()
+        pool_size = int(os.environ.get("ONTSERVE_MCP_POOL_SIZE", 16))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
         self._session_id: Optional[str] = None
         self._request_id = 0
         self._initialized = False
 
     def _next_id(self) -> int:
-        self._request_id += 1
-        return self._request_id
-
-    def _send(self, method: str, params: Optional[dict] = None) -> dict:
-        """Send a JSON-RPC request to the MCP endpoint, parse SSE response."""
-        payload = {
-            "jsonrpc": "2.0",
-            "id": self._next_id(),
-            "method": method,
-            "params": params or {},
-        }
+        with _state_lock:
+            self._request_id += 1
+            return self._request_id
 
+    def _post(self, payload) -> requests.Response:
+        """POST a JSON-RPC message (or batch array), tracking the session id."""
         headers = {
             "Content-Type": "application/json",
             "Accept": "application/json, text/event-stream",
         }
-        if self._session_id:
-            headers["Mcp-Session-Id"] = self._session_id
+        with _state_lock:
+            if self._session_id:
+                headers["Mcp-Session-Id"] = self._session_id
 
         response = self._session.post(
             self.mcp_endpoint,
@@ -68,12 +135,23 @@ class MCPTransport:
         # Capture session ID
         session_id = response.headers.get("Mcp-Session-Id")
         if session_id:
-            self._session_id = session_id
+            with _state_lock:
+                self._session_id = session_id
 
         if response.status_code != 200:
             raise MCPTransportError(
                 f"MCP server returned HTTP {response.status_code}"
             )
+        return response
+
+    def _send(self, method: str, params: Optional[dict] = None) -> dict:
+        """Send a JSON-RPC request to the MCP endpoint, parse SSE response."""
+        response = self._post({
+            "jsonrpc": "2.0",
+            "id": self._next_id(),
+            "method": method,
+            "params": params or {},
+        })
 
         # Parse response: SSE or plain JSON
         content_type = response.headers.get("content-type", "")
@@ -81,6 +159,28 @@ class MCPTransport:
             return self._parse_sse(response.text)
         return response.json()
 
+    def _send_batch(self, messages: Sequence[Tuple[str, dict]]) -> List[dict]:
+        """Send several requests as one JSON-RPC batch; responses in request order."""
+        ids = [self._next_id() for _ in messages]
+        response = self._post([
+            {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}}
+            for request_id, (method, params) in zip(ids, messages)
+        ])
+
+        content_type = response.headers.get("content-type", "")
+        if "text/event-stream" in content_type:
+            replies = self._parse_sse_all(response.text)
+        else:
+            body = response.json()
+            replies = body if isinstance(body, list) else [body]
+
+        by_id = {reply.get("id"): reply for reply in replies if isinstance(reply, dict)}
+        if not any(request_id in by_id for request_id in ids):
+            error = replies[0].get("error", {}) if replies and isinstance(replies[0], dict) else {}
+            raise MCPTransportError(error.get("message", "MCP server did not answer the batch"))
+        return [by_id.get(request_id, {"error": {"message": "No response for batched request"}})
+                for request_id in ids]
+
     @staticmethod
     def _parse_sse(text: str) -> dict:
         """Extract JSON-RPC result from SSE response."""
@@ -89,6 +189,18 @@ class MCPTransport:
                 return json.loads(line[6:])
         raise MCPTransportError("No data line in SSE response")
 
+    @staticmethod
+    def _parse_sse_all(text: str) -> list:
+        """Extract every JSON-RPC message from an SSE response (batch replies)."""
+        replies = []
+        for line in text.splitlines():
+            if line.startswith("data: "):
+                data = json.loads(line[6:])
+                replies.extend(data if isinstance(data, list) else [data])
+        if not replies:
+            raise MCPTransportError("No data line in SSE response")
+        return replies
+
     def initialize(self) -> dict:
         """Send MCP initialize handshake."""
         result = self._send("initialize", {
@@ -101,8 +213,11 @@ class MCPTransport:
         return result
 
     def _ensure_initialized(self):
-        if not self._initialized:
-            self.initialize()
+        if self._initialized:
+            return
+        with _init_lock:
+            if not self._initialized:
+                self.initialize()
 
     def list_tools(self) -> list:
         """List available MCP tools. Returns list of tool dicts."""
@@ -117,22 +232,152 @@ class MCPTransport:
         not the MCP protocol wrapper.
         """
         self._ensure_initialized()
-        result = self._send("tools/call", {
-            "name": name,
-            "arguments": arguments,
-        })
+        future, job = self._claim(name, arguments)
+        if job is not None:
+            self._run_jobs([job])
+        return json.loads(self._await(future))
+
+    def call_tools(self, calls: Sequence[Tuple[str, dict]],
+                   return_exceptions: bool = False) -> List[Any]:
+        """Call several tools in one round trip; results in the order of ``calls``.
+
+        With ``return_exceptions`` a failed call yields its MCPTransportError in
+        place of a result instead of raising.
+        """
+        self._ensure_initialized()
+        claims = [self._claim(name, arguments) for name, arguments in calls]
+        self._run_jobs([job for _, job in claims if job is not None])
+
+        results = []
+        for future, _ in claims:
+            try:
+                results.append(json.loads(self._await(future)))
+            except MCPTransportError as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    def _await(self, future: Future) -> str:
+        """Result of a claimed call; bounded, since it may be another thread's request."""
+        wait = float(os.environ.get("ONTSERVE_MCP_WAIT_TIMEOUT", 3 * self.timeout))
+        try:
+            return future.result(timeout=wait)
+        except FutureTimeoutError:
+            raise MCPTransportError(f"MCP tool call did not complete within {wait:g}s")
 
-        # Extract tool result from MCP content wrapper
+    @staticmethod
+    def _tool_text(result: dict) -> str:
+        """Extract the tool output text from the MCP content wrapper."""
         content = result.get("result", {}).get("content", [])
         if content:
-            text = content[0].get("text", "{}")
-            return json.loads(text)
+            return content[0].get("text", "{}")
 
         error = result.get("error", {})
         raise MCPTransportError(
             error.get("message", "Empty tool response")
         )
 
+    def _claim(self, name: str, arguments: dict) -> Tuple[Future, Optional[tuple]]:
+        """Future for one tool call, plus the job to run if this caller must send it.
+
+        Read-only calls are answered from the cache or joined to an identical
+        call already in flight; only the first caller gets a job.
+        """
+        future: Future = Future()
+        if name not in READ_ONLY_TOOLS:
+            return future, (name, arguments, None, future, None)
+
+        key = (self.mcp_endpoint, name, json.dumps(arguments, sort_keys=True, default=str))
+        with _cache_lock:
+            text = _cached_text(key)
+            if text is not None:
+                future.set_result(text)
+                return future, None
+            if key in _inflight:
+                return _inflight[key], None
+            _inflight[key] = future
+            return future, (name, arguments, key, future, _cache_version)
+
+    def _run_jobs(self, jobs: List[tuple]) -> None:
+        """Send claimed calls (batched when there are several) and settle their futures."""
+        if not jobs:
+            return
+        try:
+            self._send_jobs(jobs)
+        finally:
+            # Whatever went wrong, no caller (or coalesced waiter) is left
+            # waiting on a future that will never be settled.
+            for _, _, key, future, version in jobs:
+                if not future.done():
+                    self._settle(key, future, version,
+                                 error=MCPTransportError("MCP tool call was not completed"))
+
+    def _send_jobs(self, jobs: List[tuple]) -> None:
+        messages = [("tools/call", {"name": name, "arguments": arguments})
+                    for name, arguments, *_ in jobs]
+        try:
+            if len(jobs) == 1:
+                replies = [self._send(*messages[0])]
+            elif self._batch_supported is False or (
+                    os.environ.get("ONTSERVE_MCP_BATCH", "true").lower() == "false"):
+                replies = self._send_each(messages)
+            else:
+                try:
+                    replies = self._send_batch(messages)
+                    self._batch_supported = True
+                except MCPTransportError as e:
+                    if self._batch_supported:
+                        raise
+                    logger.info(f"MCP server rejected a JSON-RPC batch ({e}); "
+                                f"sending calls concurrently instead")
+                    self._batch_supported = False
+                    replies = self._send_each(messages)
+        except Exception as e:
+            error = e if isinstance(e, MCPTransportError) else MCPTransportError(str(e))
+            replies = [error] * len(jobs)
+
+        wrote = False
+        for (name, _, key, future, version), reply in zip(jobs, replies):
+            try:
+                if isinstance(reply, Exception):
+                    raise reply
+                text = self._tool_text(reply)
+            except MCPTransportError as e:
+                self._settle(key, future, version, error=e)
+                continue
+            self._settle(key, future, version, text=text)
+            wrote = wrote or key is None
+        if wrote:
+            invalidate_mcp_cache()
+
+    def _send_each(self, messages: List[Tuple[str, dict]]) -> List[Any]:
+        """Send requests concurrently (no batch support); errors are returned, not raised."""
+        def send(message):
+            try:
+                return self._send(*message)
+            except Exception as e:
+                return e if isinstance(e, MCPTransportError) else MCPTransportError(str(e))
+
+        workers = min(len(messages), int(os.environ.get("ONTSERVE_MCP_MAX_WORKERS", 8)))
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            return list(pool.map(send, messages))
+
+    @staticmethod
+    def _settle(key: Optional[tuple], future: Future, version: Optional[int],
+                text: Optional[str] = None, error: Optional[Exception] = None) -> None:
+        if key is not None:
+            with _cache_lock:
+                if _inflight.get(key) is future:
+                    del _inflight[key]
+                ttl = cache_ttl()
+                if error is None and ttl > 0 and version == _cache_version:
+                    _response_cache[key] = (version, time.monotonic() + ttl, text)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(text)
+
     def health_check(self) -> dict:
         """GET /health on the MCP server (non-MCP endpoint)."""
         try:
@@ -148,11 +393,14 @@ class MCPTransport:
 
 # Module-level singleton
 _transport: Optional[MCPTransport] = None
+_transport_lock = threading.Lock()
 
 
 def get_mcp_transport() -> MCPTransport:
     """Get or create the shared MCP transport instance."""
     global _transport
     if _transport is None:
-        _transport = MCPTransport()
+        with _transport_lock:
+            if _transport is None:
+                _transport = MCPTransport()
     return _transport
@@ -11,7 +11,10 @@ References:
   Logic rules for explainable case matching
 """
 
+import os
 import re
+import json
+import hashlib
 import logging
 import numpy as np
 from typing import Dict, List, Optional, Tuple
@@ -25,6 +28,8 @@ from app.models import Document
 from app.models.document_section import DocumentSection
 from app.models.temporary_rdf_storage import TemporaryRDFStorage
 from app.services.embedding.embedding_service import EmbeddingService
+from app.services.embedding.similarity_kernels import normalize_rows
+from app.utils.pipeline_spans import span
 
 logger = logging.getLogger(__name__)
 
@@ -85,6 +90,172 @@ COMPONENT_WEIGHTS = {
     'E': 0.08,   # Events - external occurrences
 }
 
+# Order of the per-component embedding_<code> columns in case_precedent_features
+COMPONENT_CODES = ['R', 'P', 'O', 'S', 'Rs', 'A', 'E', 'Ca', 'Cs']
+
+# Truncate long component texts (SentenceTransformer typically has a 512 token
+# limit; rough estimate: 4 chars per token)
+COMPONENT_TEXT_MAX_CHARS = 2000
+
+
+def _component_text(texts: List[str]) -> str:
+    """Concatenate all texts of one component type for embedding."""
+    return ' '.join(texts)[:COMPONENT_TEXT_MAX_CHARS]
+
+
+def tension_signature(tensions) -> Optional[str]:
+    """Signature text of a case's ethical tensions: the deduplicated conflicting-entity labels."""
+    if not tensions:
+        return None
+
+    labels = []
+    for t in tensions:
+        if not isinstance(t, dict):
+            continue
+        for key in ('entity1', 'entity2'):
+            value = (t.get(key) or '').strip()
+            if value:
+                labels.append(value)
+
+    # Deduplicate, preserving first-seen order.
+    seen = set()
+    unique_labels = [l for l in labels if not (l in seen or seen.add(l))]
+    if not unique_labels:
+        return None
+    return '. '.join(unique_labels)
+
+
+def aggregate_component_embeddings(
+    cases: List[Dict[str, np.ndarray]],
+    weights: Optional[Dict[str, float]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Weighted component aggregation for many cases at once.
+
+    Args:
+        cases: One {component code: raw embedding} dict per case
+        weights: Optional custom weights dict. If None, uses COMPONENT_WEIGHTS.
+
+    Returns:
+        Tuple of (aggregated, components). aggregated is (cases, dim): the
+        weighted mean of each case's components over the weights of the
+        components present, L2-normalized. components is
+        (cases, len(COMPONENT_CODES), dim): each component L2-normalized, zero
+        rows for missing components.
+    """
+    if weights is None:
+        weights = COMPONENT_WEIGHTS
+
+    dim = next((len(e) for case in cases for e in case.values()), 384)
+    stack = np.zeros((len(cases), len(COMPONENT_CODES), dim))
+    present = np.zeros((len(cases), len(COMPONENT_CODES)))
+    for i, case in enumerate(cases):
+        for comp_code, embedding in case.items():
+            j = COMPONENT_CODES.index(comp_code)
+            stack[i, j] = embedding
+            present[i, j] = 1.0
+
+    w = present * np.array([weights.get(comp_code, 0.0) for comp_code in COMPONENT_CODES])
+    total = w.sum(axis=1, keepdims=True)
+    aggregated = np.einsum('cn,cnd->cd', w, stack)
+    aggregated = np.divide(aggregated, total, out=np.zeros_like(aggregated), where=total > 0)
+
+    components = normalize_rows(stack.reshape(-1, dim), dtype=np.float64).reshape(stack.shape)
+    return normalize_rows(aggregated, dtype=np.float64), components
+
+
+def _content_hash(value) -> str:
+    """Short stable hash of a text or JSON-serializable value."""
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.md5(value.encode('utf-8')).hexdigest()[:16]
+
+
+SECTION_EMBEDDING_TYPES = ('facts', 'discussion', 'conclusion')
+
+# Non-embedding columns, all derived from the 'features' fingerprint
+SCALAR_FEATURE_COLUMNS = frozenset({
+    'outcome_type', 'outcome_confidence', 'outcome_reasoning', 'provisions_cited',
+    'provision_count', 'subject_tags', 'principle_tensions', 'obligation_conflicts',
+    'transformation_type', 'transformation_pattern',
+})
+
+COMPONENT_EMBEDDING_COLUMNS = frozenset(f'embedding_{code.lower()}' for code in COMPONENT_CODES)
+
+FEATURE_COLUMNS = (SCALAR_FEATURE_COLUMNS
+                   | {f'{t}_embedding' for t in SECTION_EMBEDDING_TYPES}
+                   | COMPONENT_EMBEDDING_COLUMNS
+                   | {'combined_embedding', 'embedding_tension', 'extraction_method'})
+
+
+def stale_feature_columns(old: Optional[Dict], new: Dict) -> Optional[set]:
+    """
+    Columns of a case_precedent_features row whose inputs differ between two
+    input fingerprints.
+
+    Returns None when there is no usable old fingerprint (the whole row must be
+    rebuilt) and an empty set when nothing changed. A model change invalidates
+    every embedding; a COMPONENT_WEIGHTS change only the aggregate.
+    """
+    if not old or not isinstance(old, dict):
+        return None
+
+    model_changed = old.get('model') != new['model']
+    stale = set()
+    if old.get('features') != new['features']:
+        stale |= SCALAR_FEATURE_COLUMNS
+
+    old_sections = old.get('sections') or {}
+    for section_type in SECTION_EMBEDDING_TYPES:
+        if model_changed or old_sections.get(section_type) != new['sections'].get(section_type):
+            stale.add(f'{section_type}_embedding')
+
+    old_components = old.get('components') or {}
+    changed_codes = {code for code in set(old_components) | set(new['components'])
+                     if model_changed or old_components.get(code) != new['components'].get(code)}
+    stale |= {f'embedding_{code.lower()}' for code in changed_codes}
+    if changed_codes or old.get('weights') != new['weights']:
+        stale |= {'combined_embedding', 'extraction_method'}
+
+    if model_changed or old.get('tension') != new['tension']:
+        stale.add('embedding_tension')
+
+    return stale
+
+
+def _precedent_features_table():
+    """Lightweight table construct for the case_precedent_features columns the corpus build writes.
+
+    The vector columns are not declared on the CasePrecedentFeatures model, so
+    the bulk upsert uses its own column list. The raw SQL elsewhere writes
+    embedding_R etc. unquoted, so the real column names are lower case.
+    """
+    from sqlalchemy import ARRAY, Float, Integer, String, Text, DateTime, column, table
+    from sqlalchemy.dialects.postgresql import JSON, JSONB
+    from app.models.pgvector import Vector
+
+    vector_columns = (['facts_embedding', 'discussion_embedding', 'conclusion_embedding',
+                       'combined_embedding', 'embedding_tension']
+                      + [f'embedding_{code.lower()}' for code in COMPONENT_CODES])
+    return table(
+        'case_precedent_features',
+        column('case_id', Integer),
+        column('outcome_type', String),
+        column('outcome_confidence', Float),
+        column('outcome_reasoning', Text),
+        column('provisions_cited', ARRAY(String)),
+        column('provision_count', Integer),
+        column('subject_tags', ARRAY(String)),
+        column('principle_tensions', JSON),
+        column('obligation_conflicts', JSON),
+        column('transformation_type', String),
+        column('transformation_pattern', Text),
+        *[column(name, Vector(384)) for name in vector_columns],
+        column('extraction_method', String),
+        column('extraction_metadata', JSONB),
+        column('extracted_at', DateTime),
+    )
+
 
 @dataclass
 class ExtractedFeatures:
@@ -173,6 +344,21 @@ class CaseFeatureExtractor:
 
         # Get document sections
         sections = self._get_document_sections(case_id)
+        features = self._base_features(document, sections)
+
+        # Generate embeddings
+        doc_sections = ((document.doc_metadata or {}).get('document_structure', {})).get('sections', {})
+        embeddings = self.generate_hierarchical_embeddings(case_id, sections, doc_sections)
+        features.facts_embedding = embeddings.get('facts')
+        features.discussion_embedding = embeddings.get('discussion')
+        features.conclusion_embedding = embeddings.get('conclusion')
+        features.combined_embedding = embeddings.get('combined')
+
+        return features
+
+    def _base_features(self, document: Document, sections: Dict[str, DocumentSection]) -> ExtractedFeatures:
+        """Extract the non-embedding features of a case (outcome, provisions, tags, Step 4 data)."""
+        case_id = document.id
 
         # Get metadata
         metadata = document.doc_metadata or {}
@@ -198,9 +384,6 @@ class CaseFeatureExtractor:
         principle_tensions, obligation_conflicts, transformation_type, transformation_pattern = \
             self._get_step4_data(case_id)
 
-        # Generate embeddings
-        embeddings = self.generate_hierarchical_embeddings(case_id, sections, doc_sections)
-
         features = ExtractedFeatures(
             case_id=case_id,
             outcome_type=outcome_type,
@@ -212,10 +395,6 @@ class CaseFeatureExtractor:
             obligation_conflicts=obligation_conflicts,
             transformation_type=transformation_type,
             transformation_pattern=transformation_pattern,
-            facts_embedding=embeddings.get('facts'),
-            discussion_embedding=embeddings.get('discussion'),
-            conclusion_embedding=embeddings.get('conclusion'),
-            combined_embedding=embeddings.get('combined'),
             extraction_method='automatic'
         )
 
@@ -497,21 +676,21 @@ Return ONLY valid JSON in this format:
         discussion_text = self._get_section_text(sections, doc_sections, 'discussion')
         conclusion_text = self._get_section_text(sections, doc_sections, 'conclusion')
 
-        # Generate section embeddings
-        if facts_text:
-            embeddings['facts'] = self.embedding_service.get_embedding(facts_text)
-
-        if discussion_text:
-            embeddings['discussion'] = self.embedding_service.get_embedding(discussion_text)
-
-        if conclusion_text:
-            embeddings['conclusion'] = self.embedding_service.get_embedding(conclusion_text)
-
-        # Generate combined embedding
+        # Section embeddings plus the combined embedding
         # Weight: facts (0.3), discussion (0.5), conclusion (0.2)
         combined_text = f"{facts_text or ''}\n\n{discussion_text or ''}\n\n{conclusion_text or ''}"
-        if combined_text.strip():
-            embeddings['combined'] = self.embedding_service.get_embedding(combined_text)
+        texts = {
+            'facts': facts_text,
+            'discussion': discussion_text,
+            'conclusion': conclusion_text,
+            'combined': combined_text if combined_text.strip() else '',
+        }
+        keys = [key for key, value in texts.items() if value]
+
+        # One batched call for all four texts
+        if keys:
+            vectors = self.embedding_service.get_embeddings([texts[key] for key in keys])
+            embeddings.update(zip(keys, vectors))
 
         return embeddings
 
@@ -614,37 +793,423 @@ Return ONLY valid JSON in this format:
         row = result.fetchone()
         return row[0] if row else None
 
-    def extract_and_save_all_cases(self) -> Dict[int, bool]:
+    def extract_and_save_all_cases(self, incremental: bool = False) -> Dict[int, bool]:
         """
         Extract and save features for all cases in the database.
 
+        Args:
+            incremental: Only rebuild cases whose source hash changed
+
         Returns:
             Dict mapping case_id to success status
         """
-        results = {}
+        return self.build_corpus_features(incremental=incremental)
+
+    def build_corpus_features(
+        self,
+        case_ids: Optional[List[int]] = None,
+        incremental: bool = False,
+        min_components: int = 3
+    ) -> Dict[int, bool]:
+        """
+        Build case_precedent_features rows for the corpus in one pass.
 
-        # Get all case documents
-        cases = Document.query.filter(
-            Document.document_type.in_(['case', 'case_study'])
-        ).all()
+        Rather than extracting, embedding and committing case by case:
+        - sections and component entities of all cases are read in two queries;
+        - every component text and tension signature in the corpus (and any
+          facts/discussion/conclusion section without a stored
+          document_sections embedding) is embedded with the local model in
+          batched encode calls, each distinct text once;
+        - aggregated and per-component vectors are computed for all cases at once;
+        - all rows are written with one multi-row upsert.
 
-        logger.info(f"Processing {len(cases)} cases for feature extraction")
+        A case that fails while its inputs are gathered is marked False; the
+        rest of the corpus is still written. If the bulk upsert fails, rows are
+        retried one at a time so one bad row cannot fail the others.
 
+        Args:
+            case_ids: Optional list of case IDs (default: all cases)
+            incremental: Skip cases whose source hash (section texts, Step 4
+                data, component texts, embedding model) matches the one stored
+                in extraction_metadata by the previous build
+            min_components: Minimum component types for an aggregated embedding
+
+        Returns:
+            Dict mapping case_id to success status
+        """
+        results: Dict[int, bool] = {}
+        cases = self._corpus_cases(case_ids)
+        ids = [case.id for case in cases]
+        logger.info(f"Building precedent features for {len(cases)} cases")
+
+        sections_by_case, entities_by_case = self._load_corpus_inputs(ids)
+        stored_hashes = self._stored_source_hashes(ids) if incremental else {}
+
+        plans = []
         for case in cases:
             try:
-                features = self.extract_precedent_features(case.id)
-                self.save_features(features)
-                results[case.id] = True
-                logger.info(f"Successfully processed case {case.id}: {case.title[:50]}...")
+                plan = self._plan_case_features(
+                    case, sections_by_case.get(case.id, {}), entities_by_case.get(case.id, [])
+                )
             except Exception as e:
                 logger.error(f"Error processing case {case.id}: {e}")
                 results[case.id] = False
+                continue
+            if incremental and stored_hashes.get(case.id) == plan['source_hash']:
+                results[case.id] = True
+                continue
+            plans.append(plan)
+
+        if not plans:
+            logger.info(f"Feature extraction complete: no cases to rebuild out of {len(cases)}")
+            return results
+
+        rows = self._build_feature_rows(plans, min_components)
+        results.update(self._upsert_feature_rows(rows))
 
         success_count = sum(1 for v in results.values() if v)
-        logger.info(f"Feature extraction complete: {success_count}/{len(cases)} successful")
+        logger.info(
+            f"Feature extraction complete: {success_count}/{len(cases)} successful "
+            f"({len(rows)} rebuilt)"
+        )
 
         return results
 
+    def refresh_case_features(
+        self,
+        case_ids: List[int],
+        min_components: int = 3,
+        refresh_similarity_cache: bool = True
+    ) -> Dict[int, List[str]]:
+        """
+        Recompute only what changed for the given cases.
+
+        Each row's extraction_metadata.input_fingerprints records the hashes of
+        the inputs it was derived from (section texts, extracted features,
+        committed-entity component texts, tension signature, embedding model,
+        COMPONENT_WEIGHTS). The current inputs are fingerprinted the same way
+        and stale_feature_columns() maps the differences to the columns they
+        feed. Only those embeddings are recomputed and only those columns are
+        updated; a case without a row (or without fingerprints) gets a full row.
+        The cached similarity pairs of each changed case are then updated in
+        the affected score columns only.
+
+        Args:
+            case_ids: IDs of the cases to refresh
+            min_components: Minimum component types for an aggregated embedding
+            refresh_similarity_cache: Also update precedent_similarity_cache
+
+        Returns:
+            Dict mapping case_id to the sorted feature columns refreshed
+            ([] when nothing changed); cases that failed are left out
+        """
+        refreshed: Dict[int, List[str]] = {}
+        cases = self._corpus_cases(case_ids)
+        ids = [case.id for case in cases]
+        sections_by_case, entities_by_case = self._load_corpus_inputs(ids)
+        stored = self._stored_fingerprints(ids)
+
+        full_plans, partial_plans = [], []
+        for case in cases:
+            try:
+                plan = self._plan_case_features(
+                    case, sections_by_case.get(case.id, {}), entities_by_case.get(case.id, [])
+                )
+            except Exception as e:
+                logger.error(f"Error refreshing features for case {case.id}: {e}")
+                continue
+            plan['stale'] = stale_feature_columns(stored.get(case.id), plan['fingerprints'])
+            if plan['stale'] and 'combined_embedding' in plan['stale'] and (
+                    min(len(stored[case.id].get('components') or {}),
+                        len(plan['fingerprints']['components'])) < min_components):
+                # Below min_components a row stores no component vectors at all,
+                # so crossing that line rewrites every one, as a full rebuild would.
+                plan['stale'] |= COMPONENT_EMBEDDING_COLUMNS
+            if plan['stale'] is None:
+                full_plans.append(plan)
+            elif plan['stale']:
+                partial_plans.append(plan)
+            else:
+                refreshed[case.id] = []
+
+        if full_plans:
+            written = self._upsert_feature_rows(self._build_feature_rows(full_plans, min_components))
+            for case_id, ok in written.items():
+                if ok:
+                    refreshed[case_id] = sorted(FEATURE_COLUMNS)
+        if partial_plans:
+            rows = self._build_feature_rows(partial_plans, min_components)
+            written = self._update_feature_columns([
+                {name: value for name, value in row.items()
+                 if name in plan['stale'] or name in ('case_id', 'extraction_metadata', 'extracted_at')}
+                for plan, row in zip(partial_plans, rows)
+            ])
+            for plan in partial_plans:
+                if written.get(plan['features'].case_id):
+                    refreshed[plan['features'].case_id] = sorted(plan['stale'])
+
+        if refresh_similarity_cache:
+            from app.services.precedent.similarity_service import PrecedentSimilarityService
+            similarity_service = PrecedentSimilarityService()
+            for case_id, columns in refreshed.items():
+                if columns:
+                    similarity_service.refresh_cached_similarities(case_id, columns)
+
+        logger.info(
+            f"Refreshed precedent features for {sum(1 for c in refreshed.values() if c)}"
+            f"/{len(cases)} cases"
+        )
+        return refreshed
+
+    def _corpus_cases(self, case_ids: Optional[List[int]] = None) -> List[Document]:
+        """Case documents of the corpus, optionally restricted to case_ids."""
+        query = Document.query.filter(Document.document_type.in_(['case', 'case_study']))
+        if case_ids is not None:
+            query = query.filter(Document.id.in_(case_ids))
+        return query.order_by(Document.id).all()
+
+    def _load_corpus_inputs(self, case_ids: List[int]) -> Tuple[Dict[int, Dict], Dict[int, List]]:
+        """DocumentSections (by case, by section_type) and component entities (by case) in two queries."""
+        sections_by_case: Dict[int, Dict[str, DocumentSection]] = defaultdict(dict)
+        entities_by_case: Dict[int, List] = defaultdict(list)
+        if not case_ids:
+            return sections_by_case, entities_by_case
+
+        for section in DocumentSection.query.filter(DocumentSection.document_id.in_(case_ids)).all():
+            sections_by_case[section.document_id][section.section_type] = section
+
+        component_types = list(EXTRACTION_TYPE_TO_COMPONENT) + ['temporal_dynamics_enhanced']
+        entities = TemporaryRDFStorage.query.filter(
+            TemporaryRDFStorage.case_id.in_(case_ids),
+            TemporaryRDFStorage.extraction_type.in_(component_types)
+        ).with_entities(
+            TemporaryRDFStorage.case_id,
+            TemporaryRDFStorage.extraction_type,
+            TemporaryRDFStorage.entity_type,
+            TemporaryRDFStorage.entity_label,
+            TemporaryRDFStorage.entity_definition
+        ).order_by(TemporaryRDFStorage.id).all()
+        for entity in entities:
+            entities_by_case[entity.case_id].append(entity)
+
+        return sections_by_case, entities_by_case
+
+    def _stored_source_hashes(self, case_ids: List[int]) -> Dict[int, Optional[str]]:
+        """source_hash recorded in extraction_metadata by the previous corpus build."""
+        if not case_ids:
+            return {}
+        rows = db.session.execute(text("""
+            SELECT case_id, extraction_metadata->>'source_hash'
+            FROM case_precedent_features
+            WHERE case_id = ANY(:ids)
+        """), {'ids': list(case_ids)}).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def _stored_fingerprints(self, case_ids: List[int]) -> Dict[int, Optional[Dict]]:
+        """input_fingerprints recorded in extraction_metadata when each row was last written."""
+        if not case_ids:
+            return {}
+        rows = db.session.execute(text("""
+            SELECT case_id, extraction_metadata->'input_fingerprints'
+            FROM case_precedent_features
+            WHERE case_id = ANY(:ids)
+        """), {'ids': list(case_ids)}).fetchall()
+        return {row[0]: json.loads(row[1]) if isinstance(row[1], str) else row[1] for row in rows}
+
+    def _plan_case_features(self, document: Document, sections: Dict[str, DocumentSection],
+                            entities: List) -> Dict:
+        """Everything needed to write a case's row, before any embedding is computed."""
+        features = self._base_features(document, sections)
+        doc_sections = ((document.doc_metadata or {}).get('document_structure', {})).get('sections', {})
+
+        # Section embeddings come from document_sections when stored there
+        section_vectors, section_texts, source_sections = {}, {}, {}
+        for section_type in ('facts', 'discussion', 'conclusion'):
+            section_text = self._get_section_text(sections, doc_sections, section_type)
+            source_sections[section_type] = section_text
+            section = sections.get(section_type)
+            if section is not None and getattr(section, 'embedding', None) is not None:
+                section_vectors[section_type] = section.embedding
+            elif section_text:
+                section_texts[section_type] = section_text
+
+        component_texts = {
+            code: _component_text(texts) for code, texts in self._group_component_texts(entities).items()
+        }
+        signature = tension_signature(features.principle_tensions)
+
+        fingerprints = {
+            'sections': {section_type: _content_hash(value) for section_type, value in source_sections.items()},
+            'features': _content_hash({
+                'outcome': [features.outcome_type, features.outcome_confidence, features.outcome_reasoning],
+                'provisions': features.provisions_cited,
+                'subject_tags': features.subject_tags,
+                'principle_tensions': features.principle_tensions,
+                'obligation_conflicts': features.obligation_conflicts,
+                'transformation': [features.transformation_type, features.transformation_pattern],
+            }),
+            'components': {code: _content_hash(value) for code, value in component_texts.items()},
+            'tension': _content_hash(signature) if signature else None,
+            'model': getattr(self.embedding_service, 'model_name', None),
+            'weights': _content_hash(COMPONENT_WEIGHTS),
+        }
+
+        return {
+            'features': features,
+            'section_vectors': section_vectors,
+            'section_texts': section_texts,
+            'component_texts': component_texts,
+            'signature': signature,
+            'fingerprints': fingerprints,
+            'source_hash': _content_hash(fingerprints),
+        }
+
+    def _build_feature_rows(self, plans: List[Dict], min_components: int) -> List[Dict]:
+        """
+        Embed what the plans need in one batched pass and build their rows.
+
+        A plan with a 'stale' column set (refresh_case_features) only has the
+        texts behind those columns embedded. The aggregate needs every
+        component vector of its case, so all of a case's component texts are
+        embedded whenever its combined embedding is stale.
+        """
+        def needed(plan):
+            stale = plan.get('stale')
+            for section_type, section_text in plan['section_texts'].items():
+                if stale is None or f'{section_type}_embedding' in stale:
+                    yield section_text
+            # a changed component always makes the combined embedding stale
+            if stale is None or 'combined_embedding' in stale:
+                yield from plan['component_texts'].values()
+            if plan['signature'] and (stale is None or 'embedding_tension' in stale):
+                yield plan['signature']
+
+        vectors = self._get_local_embeddings([t for plan in plans for t in needed(plan) if t])
+
+        component_sets = [
+            {code: vectors[t] for code, t in plan['component_texts'].items() if t in vectors}
+            for plan in plans
+        ]
+        aggregated, components = aggregate_component_embeddings(component_sets)
+
+        rows = []
+        for i, plan in enumerate(plans):
+            aggregate = (len(plan['component_texts']) >= min_components and bool(component_sets[i]))
+            rows.append(self._feature_row(
+                plan, vectors,
+                aggregated[i] if aggregate else None,
+                {code: components[i, COMPONENT_CODES.index(code)] for code in component_sets[i]}
+                if aggregate else {}
+            ))
+        return rows
+
+    def _update_feature_columns(self, rows: List[Dict]) -> Dict[int, bool]:
+        """Update only the given columns of existing rows, one executemany UPDATE per column set."""
+        from sqlalchemy import bindparam, func, cast
+        from sqlalchemy.dialects.postgresql import JSONB
+
+        table = _precedent_features_table()
+        groups: Dict[Tuple[str, ...], List[Dict]] = defaultdict(list)
+        for row in rows:
+            groups[tuple(sorted(name for name in row if name != 'case_id'))].append(row)
+
+        results = {}
+        for columns, group in groups.items():
+            values = {name: bindparam(f'new_{name}', type_=table.c[name].type)
+                      for name in columns if name != 'extraction_metadata'}
+            # Merge, keeping metadata written by other steps
+            values['extraction_metadata'] = func.coalesce(
+                table.c.extraction_metadata, cast({}, JSONB)
+            ).op('||')(bindparam('new_extraction_metadata', type_=JSONB))
+            stmt = table.update().where(table.c.case_id == bindparam('row_case_id')).values(values)
+            params = [{'row_case_id': row['case_id'], **{f'new_{name}': row[name] for name in columns}}
+                      for row in group]
+            try:
+                with span('store_precedent_features', rows=len(group)):
+                    db.session.execute(stmt, params)
+                    db.session.commit()
+                results.update({row['case_id']: True for row in group})
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error updating precedent features ({', '.join(columns)}): {e}")
+                results.update({row['case_id']: False for row in group})
+        return results
+
+    def _feature_row(self, plan: Dict, vectors: Dict[str, np.ndarray],
+                     aggregated: Optional[np.ndarray],
+                     components: Dict[str, np.ndarray]) -> Dict:
+        """The case_precedent_features row for a planned case."""
+        features = plan['features']
+
+        def as_list(vector):
+            return None if vector is None else [float(x) for x in vector]
+
+        row = {
+            'case_id': features.case_id,
+            'outcome_type': features.outcome_type,
+            'outcome_confidence': features.outcome_confidence,
+            'outcome_reasoning': features.outcome_reasoning,
+            'provisions_cited': features.provisions_cited,
+            'provision_count': len(features.provisions_cited),
+            'subject_tags': features.subject_tags,
+            'principle_tensions': features.principle_tensions or None,
+            'obligation_conflicts': features.obligation_conflicts or None,
+            'transformation_type': features.transformation_type,
+            'transformation_pattern': features.transformation_pattern,
+            'combined_embedding': as_list(aggregated),
+            'embedding_tension': as_list(vectors.get(plan['signature'])) if plan['signature'] else None,
+            'extraction_method': 'component_aggregation' if aggregated is not None else 'automatic',
+            'extraction_metadata': {'source_hash': plan['source_hash'],
+                                    'input_fingerprints': plan['fingerprints']},
+            'extracted_at': datetime.utcnow(),
+        }
+        for section_type in ('facts', 'discussion', 'conclusion'):
+            vector = plan['section_vectors'].get(section_type)
+            if vector is None and section_type in plan['section_texts']:
+                vector = vectors.get(plan['section_texts'][section_type])
+            row[f'{section_type}_embedding'] = as_list(vector)
+        for comp_code in COMPONENT_CODES:
+            row[f'embedding_{comp_code.lower()}'] = as_list(components.get(comp_code))
+        return row
+
+    def _upsert_feature_rows(self, rows: List[Dict]) -> Dict[int, bool]:
+        """Write feature rows with one multi-row INSERT ... ON CONFLICT (case_id) DO UPDATE."""
+        from sqlalchemy import literal_column
+        from sqlalchemy.dialects.postgresql import insert
+
+        table = _precedent_features_table()
+
+        def upsert(batch):
+            stmt = insert(table).values(batch)
+            updates = {name: stmt.excluded[name] for name in batch[0] if name != 'case_id'}
+            # Keep metadata written by other steps (entity linking, ...)
+            updates['extraction_metadata'] = literal_column(
+                "COALESCE(case_precedent_features.extraction_metadata, '{}'::jsonb)"
+                " || excluded.extraction_metadata"
+            )
+            db.session.execute(stmt.on_conflict_do_update(index_elements=['case_id'], set_=updates))
+
+        with span('store_precedent_features', rows=len(rows)):
+            try:
+                upsert(rows)
+                db.session.commit()
+                return {row['case_id']: True for row in rows}
+            except Exception as e:
+                db.session.rollback()
+                logger.warning(f"Bulk feature upsert failed, writing rows one by one: {e}")
+
+            results = {}
+            for row in rows:
+                try:
+                    upsert([row])
+                    db.session.commit()
+                    results[row['case_id']] = True
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Error saving features for case {row['case_id']}: {e}")
+                    results[row['case_id']] = False
+            return results
+
     def _get_document_sections(self, case_id: int) -> Dict[str, DocumentSection]:
         """Get DocumentSection records for a case, indexed by section_type."""
         sections = DocumentSection.query.filter_by(document_id=case_id).all()
@@ -748,7 +1313,16 @@ Return ONLY valid JSON in this format:
         if not text or not text.strip():
             return np.zeros(384)
 
-        # Access the local model directly from the embedding service
+        embedding = self._local_model().encode(text)
+
+        # Ensure it's a numpy array
+        if not isinstance(embedding, np.ndarray):
+            embedding = np.array(embedding)
+
+        return embedding
+
+    def _local_model(self):
+        """The local SentenceTransformer model, accessed directly from the embedding service."""
         embedding_service = self.embedding_service
         if 'local' not in embedding_service.providers:
             raise RuntimeError("Local embedding provider not available")
@@ -759,14 +1333,65 @@ Return ONLY valid JSON in this format:
                 f"Local embedding provider not available: {local_provider.get('reason')}"
             )
 
-        model = local_provider['model']
-        embedding = model.encode(text)
+        return local_provider['model']
 
-        # Ensure it's a numpy array
-        if not isinstance(embedding, np.ndarray):
-            embedding = np.array(embedding)
+    def _get_local_embeddings(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Embed many texts with the local model, each distinct text once.
 
-        return embedding
+        Texts are encoded PRECEDENT_FEATURE_EMBED_BATCH_SIZE at a time. If a
+        batch fails, its texts are retried one by one; a text that still fails
+        is left out of the result (the caller treats it as missing).
+
+        Returns:
+            Dict mapping each embedded text to its 384-dim numpy array
+        """
+        unique = list(dict.fromkeys(t for t in texts if t and t.strip()))
+        batch_size = max(1, int(os.environ.get('PRECEDENT_FEATURE_EMBED_BATCH_SIZE', 64)))
+        vectors: Dict[str, np.ndarray] = {}
+        for start in range(0, len(unique), batch_size):
+            batch = unique[start:start + batch_size]
+            try:
+                with span('embed', texts=len(batch)):
+                    encoded = self._local_model().encode(batch, batch_size=batch_size,
+                                                         show_progress_bar=False)
+                vectors.update(zip(batch, np.asarray(encoded, dtype=np.float64)))
+            except Exception as e:
+                logger.warning(f"Batched local embedding failed, embedding one by one: {e}")
+                for text_value in batch:
+                    try:
+                        vectors[text_value] = np.asarray(self._get_local_embedding(text_value),
+                                                         dtype=np.float64)
+                    except Exception as inner:
+                        logger.error(f"Failed to embed text ({len(text_value)} chars): {inner}")
+        return vectors
+
+    def _group_component_texts(self, entities) -> Dict[str, List[str]]:
+        """Group entity texts (label, plus definition when present) by component code."""
+        # IMPORTANT: Handle temporal_dynamics_enhanced specially for Actions/Events
+        components_by_type: Dict[str, List[str]] = defaultdict(list)
+
+        for entity in entities:
+            comp_code = None
+
+            # Check for standard extraction types first
+            if entity.extraction_type in EXTRACTION_TYPE_TO_COMPONENT:
+                comp_code = EXTRACTION_TYPE_TO_COMPONENT[entity.extraction_type]
+
+            # Special handling for temporal_dynamics_enhanced (Actions and Events)
+            elif entity.extraction_type == 'temporal_dynamics_enhanced':
+                if entity.entity_type:
+                    comp_code = ENTITY_TYPE_TO_COMPONENT.get(entity.entity_type.lower())
+
+            if comp_code:
+                # Combine label and definition for richer semantic content
+                text = entity.entity_label or ''
+                if entity.entity_definition:
+                    text = f"{text}: {entity.entity_definition}"
+                if text.strip():
+                    components_by_type[comp_code].append(text)
+
+        return components_by_type
 
     def generate_component_aggregated_embedding(
         self,
@@ -800,29 +1425,7 @@ Return ONLY valid JSON in this format:
             logger.warning(f"Case {case_id}: No components found in temporary_rdf_storage")
             return None
 
-        # Group entities by component type
-        # IMPORTANT: Handle temporal_dynamics_enhanced specially for Actions/Events
-        components_by_type: Dict[str, List[str]] = defaultdict(list)
-
-        for entity in entities:
-            comp_code = None
-
-            # Check for standard extraction types first
-            if entity.extraction_type in EXTRACTION_TYPE_TO_COMPONENT:
-                comp_code = EXTRACTION_TYPE_TO_COMPONENT[entity.extraction_type]
-
-            # Special handling for temporal_dynamics_enhanced (Actions and Events)
-            elif entity.extraction_type == 'temporal_dynamics_enhanced':
-                if entity.entity_type:
-                    comp_code = ENTITY_TYPE_TO_COMPONENT.get(entity.entity_type.lower())
-
-            if comp_code:
-                # Combine label and definition for richer semantic content
-                text = entity.entity_label or ''
-                if entity.entity_definition:
-                    text = f"{text}: {entity.entity_definition}"
-                if text.strip():
-                    components_by_type[comp_code].append(text)
+        components_by_type = self._group_component_texts(entities)
 
         if len(components_by_type) < min_components:
             logger.warning(
@@ -834,17 +1437,11 @@ Return ONLY valid JSON in this format:
         # Generate embedding for each component type
         component_embeddings: Dict[str, np.ndarray] = {}
         for comp_code, texts in components_by_type.items():
-            # Concatenate all texts for this component type
-            combined_text = ' '.join(texts)
-
-            # Truncate if very long (SentenceTransformer typically has 512 token limit)
-            # Rough estimate: 4 chars per token
-            max_chars = 2000
-            if len(combined_text) > max_chars:
-                combined_text = combined_text[:max_chars]
+            combined_text = _component_text(texts)
+            if len(combined_text) < len(' '.join(texts)):
                 logger.debug(
                     f"Case {case_id}: Truncated {comp_code} text from "
-                    f"{len(' '.join(texts))} to {max_chars} chars"
+                    f"{len(' '.join(texts))} to {COMPONENT_TEXT_MAX_CHARS} chars"
                 )
 
             try:
@@ -858,33 +1455,12 @@ Return ONLY valid JSON in this format:
             logger.error(f"Case {case_id}: No component embeddings generated")
             return None
 
-        # Compute weighted aggregation
-        # Only use weights for components that actually exist
-        aggregated = np.zeros(384)
-        total_weight = 0.0
-
-        for comp_code, embedding in component_embeddings.items():
-            weight = weights.get(comp_code, 0.0)
-            aggregated += weight * embedding
-            total_weight += weight
-
-        # Normalize by actual weight sum (in case some components are missing)
-        if total_weight > 0:
-            aggregated = aggregated / total_weight
-
-        # L2 normalize the final embedding for cosine similarity
-        norm = np.linalg.norm(aggregated)
-        if norm > 0:
-            aggregated = aggregated / norm
-
-        # L2 normalize individual component embeddings for cosine similarity
-        normalized_components: Dict[str, np.ndarray] = {}
-        for comp_code, emb in component_embeddings.items():
-            comp_norm = np.linalg.norm(emb)
-            if comp_norm > 0:
-                normalized_components[comp_code] = emb / comp_norm
-            else:
-                normalized_components[comp_code] = emb
+        # Weighted aggregation over the components that exist, L2-normalized
+        aggregated, normalized = aggregate_component_embeddings([component_embeddings], weights)
+        aggregated = aggregated[0]
+        normalized_components: Dict[str, np.ndarray] = {
+            code: normalized[0, COMPONENT_CODES.index(code)] for code in component_embeddings
+        }
 
         logger.info(
             f"Case {case_id}: Generated component-aggregated embedding from "
@@ -914,25 +1490,10 @@ Return ONLY valid JSON in this format:
 
         import json
         tensions = json.loads(row[0]) if isinstance(row[0], str) else row[0]
-        if not tensions:
-            return None
-
-        labels = []
-        for t in tensions:
-            if not isinstance(t, dict):
-                continue
-            for key in ('entity1', 'entity2'):
-                value = (t.get(key) or '').strip()
-                if value:
-                    labels.append(value)
-
-        # Deduplicate, preserving first-seen order.
-        seen = set()
-        unique_labels = [l for l in labels if not (l in seen or seen.add(l))]
-        if not unique_labels:
+        signature = tension_signature(tensions)
+        if signature is None:
             return None
 
-        signature = '. '.join(unique_labels)
         embedding = self._get_local_embedding(signature)
         return embedding.tolist() if embedding is not None else None
 
@@ -967,7 +1528,7 @@ Return ONLY valid JSON in this format:
             }
 
             # Add per-component embeddings (None for missing components)
-            for comp_code in ['R', 'P', 'O', 'S', 'Rs', 'A', 'E', 'Ca', 'Cs']:
+            for comp_code in COMPONENT_CODES:
                 emb = component_embeddings.get(comp_code)
                 params[f'emb_{comp_code}'] = emb.tolist() if emb is not None else None
 
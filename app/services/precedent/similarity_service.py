@@ -39,6 +39,26 @@ class SimilarityResult:
     per_component_scores: Optional[Dict[str, float]] = None  # D-tuple component cosine similarities
 
 
+# case_precedent_features columns each precedent_similarity_cache score is computed from
+CACHE_SCORE_INPUTS = {
+    'facts_similarity': {'facts_embedding'},
+    'discussion_similarity': {'discussion_embedding'},
+    'component_similarity': {f'embedding_{code}' for code in ('r', 'p', 'o', 's', 'rs', 'a', 'e', 'ca', 'cs')},
+    'provision_overlap': {'provisions_cited'},
+    'outcome_alignment': {'outcome_type'},
+    'tag_overlap': {'subject_tags'},
+    'principle_overlap': {'embedding_tension'},
+}
+
+
+def affected_cache_columns(feature_columns=None) -> List[str]:
+    """Cache score columns that depend on any of ``feature_columns`` (None: all of them)."""
+    if feature_columns is None:
+        return list(CACHE_SCORE_INPUTS)
+    changed = {column.lower() for column in feature_columns}
+    return [column for column, inputs in CACHE_SCORE_INPUTS.items() if inputs & changed]
+
+
 class PrecedentSimilarityService:
     """
     Calculates multi-factor similarity between cases for precedent discovery.
@@ -125,6 +145,21 @@ class PrecedentSimilarityService:
         source_features = self._get_case_features(source_case_id)
         target_features = self._get_case_features(target_case_id)
 
+        return self._score_features(
+            source_case_id, target_case_id, source_features, target_features,
+            weights, use_component_embedding
+        )
+
+    def _score_features(
+        self,
+        source_case_id: int,
+        target_case_id: int,
+        source_features: Optional[Dict],
+        target_features: Optional[Dict],
+        weights: Dict[str, float],
+        use_component_embedding: bool
+    ) -> SimilarityResult:
+        """Score two cases from already loaded features (see calculate_similarity)."""
         method = 'component' if use_component_embedding else 'section'
 
         if source_features is None or target_features is None:
@@ -397,10 +432,74 @@ class PrecedentSimilarityService:
         })
         db.session.commit()
 
-    def _get_case_features(self, case_id: int) -> Optional[Dict]:
-        """Retrieve features for a case from the database."""
-        query = text("""
-            SELECT
+    def refresh_cached_similarities(self, case_id: int, feature_columns=None) -> int:
+        """
+        Update the cached similarity pairs that involve a case after its features changed.
+
+        Only the score columns computed from ``feature_columns`` (see
+        CACHE_SCORE_INPUTS; None means all of them) are rewritten, plus
+        overall_similarity. Each pair is rescored with the weights and method
+        it was cached with, from features loaded in one query.
+
+        Args:
+            case_id: The case whose case_precedent_features row changed
+            feature_columns: Names of the changed case_precedent_features columns
+
+        Returns:
+            Number of cached pairs updated
+        """
+        import json
+
+        columns = affected_cache_columns(feature_columns)
+        if not columns:
+            return 0
+
+        cached = db.session.execute(text("""
+            SELECT id, source_case_id, target_case_id, weights_used, computation_method
+            FROM precedent_similarity_cache
+            WHERE source_case_id = :case_id OR target_case_id = :case_id
+        """), {'case_id': case_id}).fetchall()
+        if not cached:
+            return 0
+
+        features = self._get_features_for_cases(
+            sorted({row[1] for row in cached} | {row[2] for row in cached})
+        )
+
+        params = []
+        for cache_id, source_id, target_id, weights_used, method in cached:
+            use_component = method == 'component'
+            weights = json.loads(weights_used) if isinstance(weights_used, str) else weights_used
+            if not weights:
+                weights = self.COMPONENT_AWARE_WEIGHTS if use_component else self.DEFAULT_WEIGHTS
+            result = self._score_features(
+                source_id, target_id, features.get(source_id), features.get(target_id),
+                weights, use_component
+            )
+            params.append({
+                'cache_id': cache_id,
+                'overall_similarity': result.overall_similarity,
+                **{column: result.component_scores.get(column, 0) for column in columns},
+            })
+
+        # Column names come from CACHE_SCORE_INPUTS; values are bound.
+        assignments = ', '.join(f'{column} = :{column}' for column in columns)
+        db.session.execute(text(f"""
+            UPDATE precedent_similarity_cache
+            SET {assignments},
+                overall_similarity = :overall_similarity,
+                computed_at = CURRENT_TIMESTAMP
+            WHERE id = :cache_id
+        """), params)
+        db.session.commit()
+
+        logger.info(
+            f"Refreshed {len(params)} cached similarity pairs for case {case_id} "
+            f"({', '.join(columns)})"
+        )
+        return len(params)
+
+    _FEATURE_COLUMNS_SQL = """
                 case_id,
                 outcome_type,
                 outcome_confidence,
@@ -423,6 +522,12 @@ class PrecedentSimilarityService:
                 embedding_Ca,
                 embedding_Cs,
                 embedding_tension
+    """
+
+    def _get_case_features(self, case_id: int) -> Optional[Dict]:
+        """Retrieve features for a case from the database."""
+        query = text(f"""
+            SELECT {self._FEATURE_COLUMNS_SQL}
             FROM case_precedent_features
             WHERE case_id = :case_id
         """)
@@ -432,6 +537,21 @@ class PrecedentSimilarityService:
         if not result:
             return None
 
+        return self._features_from_row(result)
+
+    def _get_features_for_cases(self, case_ids: List[int]) -> Dict[int, Dict]:
+        """Retrieve features for many cases in one query, keyed by case_id."""
+        if not case_ids:
+            return {}
+        query = text(f"""
+            SELECT {self._FEATURE_COLUMNS_SQL}
+            FROM case_precedent_features
+            WHERE case_id = ANY(:case_ids)
+        """)
+        rows = db.session.execute(query, {'case_ids': list(case_ids)}).fetchall()
+        return {row[0]: self._features_from_row(row) for row in rows}
+
+    def _features_from_row(self, result) -> Dict:
         return {
             'case_id': result[0],
             'outcome_type': result[1],
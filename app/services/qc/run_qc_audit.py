@@ -161,7 +161,7 @@ def check_v4(case_id):
               'status': 'PASS', 'details': {'decision_points': [], 'violations': []}}
 
     rows = db.session.execute(text("""
-        SELECT entity_label, rdf_json_ld
+        SELECT entity_label, rdf_json_ld -> 'options'
         FROM temporary_rdf_storage
         WHERE case_id = :cid AND extraction_type = 'canonical_decision_point'
         ORDER BY entity_label
@@ -178,8 +178,7 @@ def check_v4(case_id):
     generic_label_pattern = re.compile(r'^Option\s+[A-Z]$', re.IGNORECASE)
 
     for row in rows:
-        label, data = row[0], row[1] or {}
-        options = data.get('options', [])
+        label, options = row[0], row[1] or []
         result['details']['decision_points'].append({'label': label, 'options': len(options)})
 
         for i, opt in enumerate(options):
@@ -93,17 +93,19 @@ def _graph(case_id: int) -> Optional[Graph]:
     ttl = Path(ONT_DIR) / f"proethica-case-{case_id}.ttl"
     if not ttl.exists():
         return None
-    g = Graph()
-    g.parse(str(ttl), format="turtle")
-    return g
+    from app.services.entity.graph_store import load_ttl_graph
+    return load_ttl_graph(ttl)
 
 
-def _rows(case_id: int, extraction_type: str) -> list:
+def _rows(case_id: int, extraction_type: str, **rdf_equals) -> list:
+    """Published rows of one type; ``rdf_equals`` filters top-level JSON-LD
+    string values in SQL (e.g. ``questionType="board_explicit"``)."""
     from app.models.temporary_rdf_storage import TemporaryRDFStorage
-    return (TemporaryRDFStorage.query
-            .filter_by(case_id=case_id, extraction_type=extraction_type,
-                       is_published=True)
-            .order_by(TemporaryRDFStorage.id).all())
+    query = TemporaryRDFStorage.query.filter_by(
+        case_id=case_id, extraction_type=extraction_type, is_published=True)
+    for key, value in rdf_equals.items():
+        query = query.filter(TemporaryRDFStorage.rdf_json_ld[key].astext == value)
+    return query.order_by(TemporaryRDFStorage.id).all()
 
 
 # --- LLM plumbing ------------------------------------------------------------
@@ -190,8 +192,7 @@ def s2_agent_grounding(case_id, g, sections) -> dict:
 
 def s3_board_questions(case_id, sections) -> dict:
     qsec = (sections.get("question") or sections.get("questions") or "").lower()
-    rows = [r for r in _rows(case_id, "ethical_question")
-            if (r.rdf_json_ld or {}).get("questionType") == "board_explicit"]
+    rows = _rows(case_id, "ethical_question", questionType="board_explicit")
     misaligned = []
     for r in rows:
         qtext = ((r.rdf_json_ld or {}).get("questionText") or "").lower()
@@ -0,0 +1,65 @@
+"""Bounded concurrent execution of independent Step-4 LLM batches.
+
+The rich analysis (causal links, question emergence, resolution patterns)
+and the Q&C analytical passes each split their work into batches that share
+the same entity context but are otherwise independent LLM calls. Running
+them one after another made Step 4 take the sum of the batch latencies;
+``run_batches`` runs them on a small thread pool so the phase takes roughly
+as long as its slowest batch.
+
+Results come back in batch order regardless of completion order, so merged
+output (and the LLMTrace list built from it) is the same as a sequential
+run. Each worker thread gets its own Flask app context, mirroring
+``pipeline_tasks.run_extraction_parallel``.
+
+Concurrency is capped by STEP4_BATCH_CONCURRENCY (default 4); set it to 1
+to run batches inline.
+"""
+
+import contextvars
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def batch_concurrency() -> int:
+    """Configured worker cap for Step-4 batch fan-out (>= 1)."""
+    try:
+        return max(1, int(os.environ.get('STEP4_BATCH_CONCURRENCY', 4)))
+    except ValueError:
+        return 4
+
+
+def run_batches(fn: Callable[[T], R], batches: Sequence[T],
+                max_workers: Optional[int] = None) -> List[R]:
+    """Call ``fn`` on every batch concurrently; return results in input order.
+
+    Exceptions raised by ``fn`` propagate to the caller after all batches have
+    finished (the batch methods catch and log their own LLM failures, so this
+    only happens for programming errors).
+    """
+    batches = list(batches)
+    workers = min(max_workers or batch_concurrency(), len(batches))
+    if workers <= 1:
+        return [fn(batch) for batch in batches]
+
+    from flask import current_app, has_app_context
+    app = current_app._get_current_object() if has_app_context() else None
+
+    def _run(batch):
+        if app is None:
+            return fn(batch)
+        with app.app_context():
+            return fn(batch)
+
+    logger.info(f"Running {len(batches)} Step 4 batches with {workers} workers")
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='step4-batch') as executor:
+        # A fresh context copy per batch carries the caller's timing span.
+        futures = [executor.submit(contextvars.copy_context().run, _run, batch) for batch in batches]
+        return [future.result() for future in futures]
@@ -26,6 +26,7 @@ from typing import List, Dict, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from model_config import ModelConfig
+from app.services.step4_synthesis.batch_executor import run_batches
 from app.utils.entity_prompt_utils import format_entities_compact, resolve_entity_labels_to_uris
 from app.utils.llm_json_utils import parse_json_response, parse_json_object
 import anthropic
@@ -601,6 +602,7 @@ class ConclusionAnalyzer:
             (['principle_synthesis'], "principle synthesis"),
         ]
 
+        prompts = []
         for categories, desc in batch_specs:
             prompt = self._create_analytical_prompt(
                 board_conclusions, all_entities, code_provisions,
@@ -614,7 +616,20 @@ class ConclusionAnalyzer:
             else:
                 self.last_prompt = prompt
 
-            batch_result = self._call_analytical_batch(prompt, all_entities, desc)
+            prompts.append(prompt)
+
+        # The batches are independent LLM calls: run them concurrently and
+        # merge responses in batch order so last_response reads as before.
+        outcomes = run_batches(
+            lambda i: self._call_analytical_batch(prompts[i], all_entities, batch_specs[i][1]),
+            range(len(batch_specs)),
+        )
+        for (categories, desc), (batch_result, response_text) in zip(batch_specs, outcomes):
+            if response_text is not None:
+                if self.last_response:
+                    self.last_response += f"\n\n--- ANALYTICAL RESPONSE ({desc}) ---\n" + response_text
+                else:
+                    self.last_response = response_text
             for cat in categories:
                 result[cat] = batch_result.get(cat, [])
 
@@ -627,8 +642,11 @@ class ConclusionAnalyzer:
         prompt: str,
         all_entities: Dict[str, List],
         desc: str
-    ) -> Dict[str, List[EthicalConclusion]]:
-        """Execute a single analytical conclusion batch with retries."""
+    ) -> Tuple[Dict[str, List[EthicalConclusion]], Optional[str]]:
+        """Execute a single analytical conclusion batch with retries.
+
+        Returns (parsed categories, raw response text or None on failure).
+        """
         max_retries = 3
         last_error = None
         for attempt in range(max_retries):
@@ -642,16 +660,11 @@ class ConclusionAnalyzer:
                     temperature=0.3,
                 )
                 logger.info(f"Batch '{desc}' response length: {len(response_text)} chars")
-                if self.last_response:
-                    self.last_response += f"\n\n--- ANALYTICAL RESPONSE ({desc}) ---\n" + response_text
-                else:
-                    self.last_response = response_text
-
                 analytical = self._parse_analytical_conclusions_response(response_text, all_entities)
 
                 total = sum(len(v) for v in analytical.values())
                 logger.info(f"Batch '{desc}': {total} conclusions")
-                return analytical
+                return analytical, response_text
 
             except (anthropic.APIConnectionError, anthropic.APITimeoutError, ConnectionError, ValueError) as e:  # ValueError = strict-parse failure on a malformed response: retryable nondeterminism (2026-07-10)
                 last_error = e
@@ -661,11 +674,11 @@ class ConclusionAnalyzer:
             except Exception as e:
                 logger.error(f"Analytical batch '{desc}' failed (non-retryable): {e}")
                 self.analytical_failed = True
-                return {}
+                return {}, None
 
         logger.error(f"Analytical batch '{desc}' failed after {max_retries} retries: {last_error}")
         self.analytical_failed = True
-        return {}
+        return {}, None
 
     def _create_board_extraction_prompt(
         self,
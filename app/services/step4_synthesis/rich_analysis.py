@@ -19,12 +19,14 @@ from app import db
 from app.models import TemporaryRDFStorage
 from app.utils.llm_utils import get_llm_client, streaming_completion
 from app.utils.llm_json_utils import parse_json_response
+from app.utils.pipeline_spans import timed
 from app.utils.entity_prompt_utils import (
     format_entities_compact, format_subgraph, resolve_labels_flat, _normalize_label,
 )
 from app.services.prompt_style import STYLE_FORMATTING_LINE
 from model_config import ModelConfig
 
+from app.services.step4_synthesis.batch_executor import run_batches
 from app.services.step4_synthesis.template_loader import get_step4_template
 from app.services.step4_synthesis.case_synthesis_models import (
     EntityFoundation, LLMTrace,
@@ -82,10 +84,31 @@ class RichAnalyzer:
 
         return causal_links, question_analysis, resolution_analysis, llm_traces
 
+    def _run_batched(self, items: list, llm_traces: List[LLMTrace], analyze_batch) -> list:
+        """Run ``analyze_batch(batch_start, traces, client)`` over BATCH_SIZE slices concurrently.
+
+        The LLM client is resolved once here and handed to every batch, so the
+        workers never race to create it. Each batch records into its own trace
+        list; results and traces are merged in batch order so the output
+        matches a sequential run.
+        """
+        client = self.llm_client
+
+        def _one(batch_start):
+            traces: List[LLMTrace] = []
+            return analyze_batch(batch_start, traces, client), traces
+
+        all_results = []
+        for batch_results, traces in run_batches(_one, range(0, len(items), self.BATCH_SIZE)):
+            all_results.extend(batch_results)
+            llm_traces.extend(traces)
+        return all_results
+
     # =========================================================================
     # CAUSAL-NORMATIVE LINKS
     # =========================================================================
 
+    @timed()
     def analyze_causal_normative_links(
         self,
         foundation: EntityFoundation,
@@ -93,22 +116,21 @@ class RichAnalyzer:
     ) -> List[CausalNormativeLink]:
         """Analyze which obligations each action fulfills or violates, in batches.
 
-        Batches actions into groups of BATCH_SIZE to avoid truncation.
-        Each batch gets the full entity context but only a subset of actions.
+        Batches actions into groups of BATCH_SIZE to avoid truncation; the
+        batches run concurrently (see batch_executor). Each batch gets the full entity context but only a subset of actions.
         URIs are resolved mechanically after parsing.
         """
         if not foundation.actions:
             return []
 
-        all_results = []
         actions = foundation.actions
-        for batch_start in range(0, len(actions), self.BATCH_SIZE):
-            batch = actions[batch_start:batch_start + self.BATCH_SIZE]
-            batch_results = self._analyze_causal_batch(
-                batch, batch_start, foundation, llm_traces
-            )
-            all_results.extend(batch_results)
-        return all_results
+        return self._run_batched(
+            actions, llm_traces,
+            lambda batch_start, traces, client: self._analyze_causal_batch(
+                actions[batch_start:batch_start + self.BATCH_SIZE], batch_start, foundation, traces,
+                client=client,
+            ),
+        )
 
     def _committed_action_edges(self, case_id) -> Dict[str, Dict[str, list]]:
         """{normalized_action_label: {'fulfills', 'violates', 'guided', 'agent'}} from the
@@ -119,22 +141,23 @@ class RichAnalyzer:
         out: Dict[str, Dict[str, list]] = {}
         if not case_id:
             return out
-        rows = TemporaryRDFStorage.query.filter_by(
-            case_id=case_id, extraction_type='temporal_dynamics_enhanced', storage_type='individual'
-        ).all()
+        rows = TemporaryRDFStorage.typed_rdf_fields(
+            case_id, 'temporal_dynamics_enhanced', 'Action',
+            ['proeth:hasAgent', 'proeth:fulfillsObligation', 'proeth:violatesObligation',
+             'proeth:guidedByPrinciple'],
+            storage_type='individual')
 
         def _lst(rdf, key):
             v = rdf.get(key)
             return v if isinstance(v, list) else ([v] if v else [])
 
-        for r in rows:
-            rdf = r.rdf_json_ld or {}
+        for label, rdf in rows:
             if 'Action' not in (rdf.get('@type', '') or ''):
                 continue
             agent = rdf.get('proeth:hasAgent')
             if isinstance(agent, list):
                 agent = agent[0] if agent else ''
-            out[_normalize_label(r.entity_label or '')] = {
+            out[_normalize_label(label or '')] = {
                 'fulfills': _lst(rdf, 'proeth:fulfillsObligation'),
                 'violates': _lst(rdf, 'proeth:violatesObligation'),
                 'guided': _lst(rdf, 'proeth:guidedByPrinciple'),
@@ -149,12 +172,13 @@ class RichAnalyzer:
         from app.models.temporary_rdf_storage import TemporaryRDFStorage
         if not case_id:
             return ""
-        rows = TemporaryRDFStorage.query.filter_by(
-            case_id=case_id, extraction_type='temporal_dynamics_enhanced', storage_type='individual'
-        ).all()
+        rows = TemporaryRDFStorage.typed_rdf_fields(
+            case_id, 'temporal_dynamics_enhanced', 'CausalChain',
+            ['proeth:cause', 'proeth:causeText', 'proeth:effect', 'proeth:effectText',
+             'proeth:responsibleAgent', 'proeth:responsibleAgentText'],
+            storage_type='individual')
         lines = []
-        for r in rows:
-            rdf = r.rdf_json_ld or {}
+        for _, rdf in rows:
             if 'CausalChain' not in (rdf.get('@type', '') or ''):
                 continue
             cause = rdf.get('proeth:cause') or rdf.get('proeth:causeText') or ''
@@ -187,7 +211,8 @@ class RichAnalyzer:
         batch_actions: list,
         batch_offset: int,
         foundation: EntityFoundation,
-        llm_traces: List[LLMTrace]
+        llm_traces: List[LLMTrace],
+        client=None,
     ) -> List[CausalNormativeLink]:
         """Grounded causal-normative reasoning. The action -> fulfills/violates/guided edges are
         NOT re-derived here: they are taken from the committed Step-3 obligation_engagement
@@ -220,7 +245,7 @@ class RichAnalyzer:
         for attempt in range(max_retries):
             try:
                 response_text = streaming_completion(
-                    self.llm_client,
+                    client or self.llm_client,
                     model=ModelConfig.get_claude_model("default"),
                     max_tokens=6000,
                     prompt=prompt,
@@ -317,6 +342,7 @@ class RichAnalyzer:
     # QUESTION EMERGENCE (Toulmin model)
     # =========================================================================
 
+    @timed()
     def analyze_question_emergence(
         self,
         questions: List[Dict],
@@ -327,21 +353,21 @@ class RichAnalyzer:
         if not questions:
             return []
 
-        all_results = []
-        for batch_start in range(0, len(questions), self.BATCH_SIZE):
-            batch = questions[batch_start:batch_start + self.BATCH_SIZE]
-            batch_results = self.analyze_question_batch(
-                batch, foundation, llm_traces, batch_start
-            )
-            all_results.extend(batch_results)
-        return all_results
+        return self._run_batched(
+            questions, llm_traces,
+            lambda batch_start, traces, client: self.analyze_question_batch(
+                questions[batch_start:batch_start + self.BATCH_SIZE], foundation, traces, batch_start,
+                client=client,
+            ),
+        )
 
     def analyze_question_batch(
         self,
         questions: List[Dict],
         foundation: EntityFoundation,
         llm_traces: List[LLMTrace],
-        batch_offset: int = 0
+        batch_offset: int = 0,
+        client=None,
     ) -> List[QuestionEmergenceAnalysis]:
         """Analyze a batch of questions for emergence patterns.
 
@@ -382,7 +408,7 @@ class RichAnalyzer:
         for attempt in range(max_retries):
             try:
                 response_text = streaming_completion(
-                    self.llm_client,
+                    client or self.llm_client,
                     model=ModelConfig.get_claude_model("default"),
                     max_tokens=5000,
                     prompt=prompt,
@@ -462,13 +488,14 @@ class RichAnalyzer:
     # RESOLUTION PATTERNS
     # =========================================================================
 
+    @timed()
     def analyze_resolution_patterns(
         self,
         conclusions: List[Dict],
         questions: List[Dict],
         provisions: List[Dict],
         foundation: EntityFoundation,
-        llm_traces: List[LLMTrace]
+        llm_traces: List[LLMTrace],
     ) -> List[ResolutionPatternAnalysis]:
         """Analyze HOW the board resolved each ethical question, in batches.
 
@@ -483,15 +510,13 @@ class RichAnalyzer:
         if not conclusions:
             return []
 
-        all_results = []
-        for batch_start in range(0, len(conclusions), self.BATCH_SIZE):
-            batch = conclusions[batch_start:batch_start + self.BATCH_SIZE]
-            batch_results = self._analyze_resolution_batch(
-                batch, batch_start, conclusions, questions, provisions,
-                foundation, llm_traces
-            )
-            all_results.extend(batch_results)
-        return all_results
+        return self._run_batched(
+            conclusions, llm_traces,
+            lambda batch_start, traces, client: self._analyze_resolution_batch(
+                conclusions[batch_start:batch_start + self.BATCH_SIZE], batch_start,
+                conclusions, questions, provisions, foundation, traces, client=client,
+            ),
+        )
 
     def _analyze_resolution_batch(
         self,
@@ -501,7 +526,8 @@ class RichAnalyzer:
         questions: List[Dict],
         provisions: List[Dict],
         foundation: EntityFoundation,
-        llm_traces: List[LLMTrace]
+        llm_traces: List[LLMTrace],
+        client=None,
     ) -> List[ResolutionPatternAnalysis]:
         """Analyze a batch of conclusions for resolution patterns."""
         entity_dict = foundation.to_entity_dict() if foundation else {}
@@ -543,7 +569,7 @@ class RichAnalyzer:
         for attempt in range(max_retries):
             try:
                 response_text = streaming_completion(
-                    self.llm_client,
+                    client or self.llm_client,
                     model=ModelConfig.get_claude_model("default"),
                     max_tokens=6000,
                     prompt=prompt,
@@ -30,6 +30,7 @@ from model_config import ModelConfig
 from app.models import Document, TemporaryRDFStorage, ExtractionPrompt, db
 from app.services.step4_synthesis.qc_entity_storage import make_question_storage, make_conclusion_storage
 from app.utils.llm_utils import get_llm_client
+from app.utils.pipeline_spans import timed
 
 logger = logging.getLogger(__name__)
 
@@ -324,6 +325,7 @@ def _get_all_case_entities(case_id: int) -> dict:
 # Helper functions (same logic as step4_run_all.py)
 # =============================================================================
 
+@timed('step4_clear')
 def _clear_step4_data(case_id: int) -> dict:
     """Clear existing Step 4 data for a case."""
     step4_types = [
@@ -359,6 +361,7 @@ def _clear_step4_data(case_id: int) -> dict:
     return {'deleted_entities': deleted_count}
 
 
+@timed('step4_provisions')
 def _run_provisions(case_id: int, llm_client, get_all_case_entities) -> dict:
     """
     Run provisions extraction - SAME code as step4_run_all.py.
@@ -547,6 +550,7 @@ def _run_provisions(case_id: int, llm_client, get_all_case_entities) -> dict:
         return {'error': str(e)}
 
 
+@timed('step4_precedents')
 def _run_precedents(case_id: int, llm_client) -> dict:
     """Extract precedent case references cited in board discussion."""
     from app.routes.scenario_pipeline.step4.precedents import (
@@ -670,6 +674,7 @@ def _run_precedents(case_id: int, llm_client) -> dict:
         return {'error': str(e)}
 
 
+@timed('step4_qc')
 def _run_qc_unified(case_id: int, llm_client, get_all_case_entities) -> dict:
     """
     Run Q&C unified extraction - SAME code as step4_run_all.py.
@@ -847,6 +852,7 @@ def _run_qc_unified(case_id: int, llm_client, get_all_case_entities) -> dict:
         return {'error': str(e)}
 
 
+@timed('step4_transformation')
 def _run_transformation(case_id: int, llm_client, get_all_case_entities) -> dict:
     """
     Run transformation classification - SAME code as step4_run_all.py.
@@ -944,6 +950,7 @@ def _run_transformation(case_id: int, llm_client, get_all_case_entities) -> dict
         return {'error': str(e)}
 
 
+@timed('step4_rich_analysis')
 def _run_rich_analysis(case_id: int, llm_client) -> dict:
     """
     Run rich analysis - SAME code as step4_run_all.py.
@@ -975,10 +982,16 @@ def _run_rich_analysis(case_id: int, llm_client) -> dict:
         causal_links = analyzer.analyze_causal_normative_links(foundation, llm_traces)
         logger.info(f"[Step4Synthesis] Causal links: {len(causal_links)}")
 
+        from app.services.step4_synthesis.batch_executor import run_batches
+
+        def _emergence(i):
+            traces = []
+            return analyzer.analyze_question_batch([questions[i]], foundation, traces, i), traces
+
         question_emergence = []
-        for i, q in enumerate(questions):
-            batch_results = analyzer.analyze_question_batch([q], foundation, llm_traces, i)
+        for batch_results, traces in run_batches(_emergence, range(len(questions))):
             question_emergence.extend(batch_results)
+            llm_traces.extend(traces)
         logger.info(f"[Step4Synthesis] Question emergence: {len(question_emergence)}")
 
         resolution_patterns = analyzer.analyze_resolution_patterns(
@@ -1024,6 +1037,7 @@ def _run_rich_analysis(case_id: int, llm_client) -> dict:
         return {'error': str(e)}
 
 
+@timed('step4_phase3')
 def _run_phase3(case_id: int, llm_client) -> dict:
     """Run Phase 3 decision point synthesis."""
     try:
@@ -1109,6 +1123,7 @@ def _run_phase3(case_id: int, llm_client) -> dict:
         return {'error': str(e)}
 
 
+@timed('step4_phase4')
 def _run_phase4(case_id: int, llm_client) -> dict:
     """
     Run Phase 4 narrative construction - SAME code as step4_run_all.py.
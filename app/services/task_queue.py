@@ -1,10 +1,18 @@
 """
 Background task queue for processing documents asynchronously.
+
+Documents are processed on a bounded worker pool
+(DOCUMENT_PROCESSING_WORKERS, default 2) that runs each task in the app
+context of the app that queued it, so ingesting a batch of documents does
+not build one Flask app and embedding model per document.
 """
 
+import contextvars
+import os
 import threading
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from app import db
 from app.models.document import Document, PROCESSING_STATUS, PROCESSING_PHASES
@@ -36,6 +44,17 @@ class BackgroundTaskQueue:
         """Initialize the task queue."""
         self.embedding_service = None  # Initialize lazily
         self.active_threads = {}
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the bounded document worker pool."""
+        with self._executor_lock:
+            if self._executor is None:
+                workers = max(1, int(os.environ.get('DOCUMENT_PROCESSING_WORKERS', 2)))
+                self._executor = ThreadPoolExecutor(max_workers=workers,
+                                                    thread_name_prefix='document-worker')
+            return self._executor
     
     def _get_embedding_service(self):
         """Lazily initialize embedding service only when needed."""
@@ -57,17 +76,15 @@ class BackgroundTaskQueue:
         document.processing_status = PROCESSING_STATUS['PROCESSING']
         db.session.commit()
         
-        # Create and start a new thread for processing
-        thread = threading.Thread(
-            target=self._process_document_task,
-            args=(document_id,),
-            daemon=True
-        )
-        
-        self.active_threads[document_id] = thread
-        thread.start()
+        # Queue on the worker pool; the task reuses this app
+        from flask import current_app
+        app = current_app._get_current_object()
+        future = self._get_executor().submit(
+            contextvars.copy_context().run, self._process_document_task, document_id, app)
+        self.active_threads[document_id] = future
+        future.add_done_callback(lambda _: self.active_threads.pop(document_id, None))
         
-        logger.info(f"Started background processing for {entity_type} {document_id}")
+        logger.info(f"Queued background processing for {entity_type} {document_id}")
         return True
     
     def process_task_async(self, task_function):
@@ -96,19 +113,9 @@ class BackgroundTaskQueue:
         logger.info(f"Started background task with ID {task_id}")
         return task_id
     
-    def _process_document_task(self, document_id):
+    def _process_document_task(self, document_id, app):
         """Background task to process a document or guideline."""
         try:
-            # Get a new db session for this thread
-            from app import create_app
-            import os
-            
-            # Ensure environment is set
-            os.environ.setdefault('ENVIRONMENT', 'development')
-            
-            # Create app with proper config
-            app = create_app('config')
-            
             with app.app_context():
                 # Get document
                 document = Document.query.get(document_id)
@@ -246,16 +253,8 @@ class BackgroundTaskQueue:
                     document.processing_progress = 50
                     db.session.commit()
                     
-                    # Generate embeddings for chunks
-                    embeddings = self._get_embedding_service().embed_documents(chunks)
-                    
-                    # Update progress: Storing chunks (70%)
-                    document.processing_phase = PROCESSING_PHASES['STORING']
-                    document.processing_progress = 70
-                    db.session.commit()
-                    
-                    # Store chunks with embeddings
-                    self._get_embedding_service()._store_chunks(document.id, chunks, embeddings)
+                    # Embed and store chunks batch by batch
+                    self._get_embedding_service().ingest_chunks(document.id, chunks)
                     
                     # Update progress: Finalizing (90%)
                     document.processing_phase = PROCESSING_PHASES['FINALIZING']
@@ -282,13 +281,8 @@ class BackgroundTaskQueue:
             
             try:
                 # Update document status to failed
-                # Create a new app context for error handling
-                from app import create_app
-                import os
-                os.environ.setdefault('ENVIRONMENT', 'development')
-                error_app = create_app('config')
-                
-                with error_app.app_context():
+                with app.app_context():
+                    db.session.rollback()
                     document = Document.query.get(document_id)
                     if document:
                         document.processing_status = PROCESSING_STATUS['FAILED']
@@ -56,11 +56,11 @@ def analyze_causal_chains(
     # Initialize Anthropic client directly using environment variables
     # (avoids Flask context issues in LangGraph execution)
     try:
-        import anthropic
+        from app.utils.llm_client_pool import get_anthropic_client
         api_key = os.getenv('ANTHROPIC_API_KEY')
         if not api_key:
             raise RuntimeError("ANTHROPIC_API_KEY not found in environment")
-        llm_client = anthropic.Anthropic(api_key=api_key, timeout=300.0, max_retries=2)
+        llm_client = get_anthropic_client(api_key, timeout=300.0, max_retries=2)
         # Strongest model for the logic step (low volume, high value); see docstring.
         model_name = ModelConfig.get_claude_model('powerful')
         logger.info(f"[Stage 5] Initialized Anthropic client with model {model_name}")
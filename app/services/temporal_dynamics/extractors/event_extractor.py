@@ -51,11 +51,11 @@ def extract_events_with_classification(
     # Initialize Anthropic client directly using environment variables
     # (avoids Flask context issues in LangGraph execution)
     try:
-        import anthropic
+        from app.utils.llm_client_pool import get_anthropic_client
         api_key = os.getenv('ANTHROPIC_API_KEY')
         if not api_key:
             raise RuntimeError("ANTHROPIC_API_KEY not found in environment")
-        llm_client = anthropic.Anthropic(api_key=api_key, timeout=180.0, max_retries=2)
+        llm_client = get_anthropic_client(api_key, timeout=180.0, max_retries=2)
         model_name = ModelConfig.get_claude_model('powerful')
         logger.info(f"[Stage 4] Initialized Anthropic client with model {model_name}")
     except Exception as e:
@@ -47,11 +47,11 @@ def analyze_combined_sections(facts: str, discussion: str) -> Tuple[Dict, Dict]:
     # Initialize Anthropic client directly using environment variables
     # (avoids Flask context issues in LangGraph execution)
     try:
-        import anthropic
+        from app.utils.llm_client_pool import get_anthropic_client
         api_key = os.getenv('ANTHROPIC_API_KEY')
         if not api_key:
             raise RuntimeError("ANTHROPIC_API_KEY not found in environment")
-        llm_client = anthropic.Anthropic(api_key=api_key, timeout=180.0, max_retries=2)
+        llm_client = get_anthropic_client(api_key, timeout=180.0, max_retries=2)
         logger.info("[Extractor] Initialized Anthropic client")
     except Exception as e:
         logger.error(f"[Extractor] Failed to initialize LLM client: {e}")
@@ -57,10 +57,11 @@ class EmbeddingService:
         """
         try:
             # Import here to avoid hard dependency if not using this feature
-            from sentence_transformers import SentenceTransformer
+            from app.services.embedding.shared_model import load_sentence_transformer
             
             logger.info(f"Loading sentence transformer model: {self.model_name}")
-            self.model = SentenceTransformer(self.model_name, device=self.device)
+            self.model = load_sentence_transformer(self.model_name, device=self.device,
+                                                   local_files_only=False)
             self.embedding_dim = self.model.get_sentence_embedding_dimension()
             logger.info(f"Loaded model with embedding dimension: {self.embedding_dim}")
             
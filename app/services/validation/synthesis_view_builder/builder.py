@@ -45,6 +45,7 @@ class SynthesisViewBuilder(
 
     def __init__(self, published_only: bool = True):
         self.published_only = published_only
+        self._class_definitions_deferred = False  # set while building the cached views
 
     def _published_filter(self, query):
         """Apply the is_published gate when the builder is in study mode."""
@@ -54,14 +55,50 @@ class SynthesisViewBuilder(
 
 
     def get_all_views(self, case_id: int) -> Dict[str, Any]:
-        """Get all five synthesis views for the study display."""
-        return {
-            'provisions': self.get_provisions_view(case_id),
-            'qc': self.get_qc_view(case_id),
-            'decisions': self.get_decisions_view(case_id),
-            'timeline': self.get_timeline_view(case_id),
-            'narrative': self.get_narrative_view(case_id)
-        }
+        """Get all five synthesis views for the study display.
+
+        Served from the per-case view-model cache; the cache version covers the
+        case's TemporaryRDFStorage rows, ExtractionPrompts, document and
+        sections, the guideline sections and the committed TTL. The OntServe
+        class definitions (type-chip and role-badge popovers) are in another
+        database, so they are built without them and attached on every call.
+        """
+        from app.services.view_model_cache import cached_view
+        views = cached_view('synthesis_views', case_id,
+                            lambda: self._build_all_views(case_id),
+                            variant=(self.published_only,))
+        self._attach_class_definitions(views)
+        return views
+
+    def _build_all_views(self, case_id: int) -> Dict[str, Any]:
+        self._class_definitions_deferred = True
+        try:
+            return {
+                'provisions': self.get_provisions_view(case_id),
+                'qc': self.get_qc_view(case_id),
+                'decisions': self.get_decisions_view(case_id),
+                'timeline': self.get_timeline_view(case_id),
+                'narrative': self.get_narrative_view(case_id)
+            }
+        finally:
+            self._class_definitions_deferred = False
+
+    def _attach_class_definitions(self, views: Dict[str, Any]) -> None:
+        """Fill the provisions type-chip and narrative role-badge definitions in place."""
+        provisions = views.get('provisions') or {}
+        narrative = views.get('narrative') or {}
+        groups = (narrative.get('grouped_main_characters', [])
+                  + narrative.get('grouped_other_characters', []))
+        role_labels = {r for g in groups for r in g.get('role_suffixes', [])}
+        definitions = self._fetch_class_definitions(
+            sorted(set(self.TYPE_CHIP_LABELS) | role_labels))
+        if provisions:
+            provisions['type_definitions'] = {
+                label: definitions[label] for label in self.TYPE_CHIP_LABELS
+                if label in definitions}
+        for g in groups:
+            g['role_suffix_details'] = {
+                r: definitions[r] for r in g.get('role_suffixes', []) if r in definitions}
 
     def _fetch_class_definitions(self, labels: List[str]) -> Dict[str, str]:
         """Look up abstract class definitions from OntServe by label.
@@ -88,6 +125,8 @@ class SynthesisViewBuilder(
         """
         if not labels:
             return {}
+        if self._class_definitions_deferred:
+            return {}
         import psycopg2
         from app.services.ontserve.ontserve_config import get_ontserve_db_config
         conn = psycopg2.connect(**get_ontserve_db_config())
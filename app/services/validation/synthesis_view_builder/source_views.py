@@ -17,6 +17,11 @@ from app.models.document_section import DocumentSection
 class SourceViewsMixin:
     """Provisions / facts / board-conclusions source views."""
 
+    # Entity-type chips shown next to each provision mapping, in the
+    # title-case form rendered by `{{ etype|title }}` in the template
+    TYPE_CHIP_LABELS = ['Obligation', 'Action', 'State', 'Principle',
+                        'Role', 'Resource', 'Capability', 'Event',
+                        'Constraint']
 
     def get_provisions_view(self, case_id: int) -> Dict[str, Any]:
         """Get code provision mappings from Step 4 Phase 2A.
@@ -134,12 +139,8 @@ class SourceViewsMixin:
         # appear next to each mapping (Obligation, Action, ...). Keyed by
         # exact label match against proeth-core class entries in OntServe.
         # Labels without a non-empty rdfs:comment are omitted; the template
-        # renders those chips without a popover. The order here matches the
-        # title-case form rendered by `{{ etype|title }}` in the template.
-        type_chip_labels = ['Obligation', 'Action', 'State', 'Principle',
-                            'Role', 'Resource', 'Capability', 'Event',
-                            'Constraint']
-        type_definitions = self._fetch_class_definitions(type_chip_labels)
+        # renders those chips without a popover.
+        type_definitions = self._fetch_class_definitions(self.TYPE_CHIP_LABELS)
 
         return {
             'view_type': 'provisions',
@@ -302,12 +302,10 @@ class TimelineViewMixin:
         attributed to a single character. Events are excluded (no agent).
         """
         from collections import Counter
-        rows = TemporaryRDFStorage.query.filter_by(
-            case_id=case_id, extraction_type='temporal_dynamics_enhanced'
-        ).all()
+        rows = TemporaryRDFStorage.typed_rdf_fields(
+            case_id, 'temporal_dynamics_enhanced', 'Action', ['proeth:hasAgent'])
         counts: Counter = Counter()
-        for r in rows:
-            rdf = r.rdf_json_ld or {}
+        for _, rdf in rows:
             if 'Action' not in (rdf.get('@type', '') or ''):
                 continue
             agent = (rdf.get('proeth:hasAgent') or '').strip()
@@ -361,15 +359,14 @@ class TimelineViewMixin:
         MIN_OVERLAP = 2
         MAX_TIES = 2
 
-        rows = TemporaryRDFStorage.query.filter_by(
-            case_id=case_id, extraction_type='temporal_dynamics_enhanced'
-        ).all()
+        rows = TemporaryRDFStorage.typed_rdf_fields(
+            case_id, 'temporal_dynamics_enhanced', 'Action',
+            ['proeth:hasAgent', 'proeth:eventRoleContext'])
 
         # Aggregate per distinct agent string: count + union of role contexts.
         agent_counts: Dict[str, int] = {}
         agent_contexts: Dict[str, set] = {}
-        for r in rows:
-            rdf = r.rdf_json_ld or {}
+        for _, rdf in rows:
             if 'Action' not in (rdf.get('@type', '') or ''):
                 continue
             agent = (rdf.get('proeth:hasAgent') or '').strip()
@@ -0,0 +1,314 @@
+"""Per-case view-model cache for the read-heavy case pages.
+
+The Step 4 review page, the defeasibility view and the entity graph re-walk the
+committed case TTL and the case's TemporaryRDFStorage rows on every request,
+but that data only changes when the case is re-extracted, cleared or
+re-committed. This module caches the assembled view dicts per case.
+
+Keys are (kind, case_id, variant, version). Variants of one kind (entity graph
+with or without type hubs, published-only vs draft synthesis views) are cached
+side by side; writing a new version prunes only older versions of the same
+variant. The version is a fingerprint of everything the builders read:
+
+* the committed TTL's mtime (0 when the case is uncommitted),
+* an aggregate hash over the case's TemporaryRDFStorage rows (row count, max id,
+  max updated_at, published count), so a re-extraction, clear or commit that
+  flips ``is_published`` produces a new version,
+* the newest ExtractionPrompt id for the case (Step 4 synthesis outputs),
+* for cross-case kinds, the defeasibility band index state.
+
+A stale entry therefore cannot be served even without explicit invalidation;
+``invalidate_case`` is still called from the commit and clearing services so
+dead entries do not occupy the size bound.
+
+The store is shared across Gunicorn workers: the filesystem backend (default)
+writes one pickle per entry under VIEW_MODEL_CACHE_DIR (default
+``<instance>/view-cache``, created 0700 and refused unless owned by the app's
+user, since entries are unpickled); the redis backend uses
+VIEW_MODEL_CACHE_REDIS_URL. Both are bounded by VIEW_MODEL_CACHE_MAX_ENTRIES
+with least-recently-used eviction. VIEW_MODEL_CACHE=off disables caching, and
+the cache is bypassed under the TESTING config so tests always exercise the
+builders.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 512
+
+# Kinds whose content depends on other cases' commits (the defeasibility cross-case
+# band). Invalidating any case drops every entry of these kinds.
+CROSS_CASE_KINDS = frozenset({'defeasibility'})
+
+_backend = None
+
+
+class _FilesystemBackend:
+    """One pickle file per entry; file mtime is the LRU clock."""
+
+    def __init__(self, root: Path, max_entries: int):
+        self.root = root
+        self.max_entries = max_entries
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, case_id: int, kind: str, variant: str, version: str) -> Path:
+        return self.root / f"{case_id}__{kind}__{variant}__{version}.pkl"
+
+    def get(self, case_id: int, kind: str, variant: str, version: str) -> Optional[bytes]:
+        path = self._path(case_id, kind, variant, version)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return data
+
+    def set(self, case_id: int, kind: str, variant: str, version: str, data: bytes) -> None:
+        # Drop stale versions of the same (case, kind, variant); other variants
+        # stay cached.
+        for old in self.root.glob(f"{case_id}__{kind}__{variant}__*.pkl"):
+            old.unlink(missing_ok=True)
+        path = self._path(case_id, kind, variant, version)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+        self._evict(keep=path)
+
+    def _evict(self, keep: Path) -> None:
+        entries = [p for p in self.root.glob('*.pkl') if p != keep]
+        overflow = len(entries) + 1 - self.max_entries
+        if overflow <= 0:
+            return
+        entries.sort(key=lambda p: p.stat().st_mtime_ns if p.exists() else 0)
+        for p in entries[:overflow]:
+            p.unlink(missing_ok=True)
+
+    def delete_case(self, case_id: int) -> int:
+        removed = 0
+        for p in self.root.glob(f"{case_id}__*.pkl"):
+            p.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def delete_kind(self, kind: str) -> int:
+        removed = 0
+        for p in self.root.glob(f"*__{kind}__*.pkl"):
+            p.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        removed = 0
+        for p in self.root.glob('*.pkl'):
+            p.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+
+class _RedisBackend:
+    """Entries as plain keys; a sorted set of last-access times drives LRU."""
+
+    PREFIX = 'proethica:vm:'
+
+    def __init__(self, url: str, max_entries: int):
+        import redis
+        self.client = redis.Redis.from_url(url, socket_timeout=2)
+        self.max_entries = max_entries
+        self.lru_key = self.PREFIX + 'lru'
+
+    def _key(self, case_id: int, kind: str, variant: str, version: str) -> str:
+        return f"{self.PREFIX}{case_id}:{kind}:{variant}:{version}"
+
+    def get(self, case_id: int, kind: str, variant: str, version: str) -> Optional[bytes]:
+        key = self._key(case_id, kind, variant, version)
+        data = self.client.get(key)
+        if data is not None:
+            self.client.zadd(self.lru_key, {key: time.time()})
+        return data
+
+    def set(self, case_id: int, kind: str, variant: str, version: str, data: bytes) -> None:
+        stale = [k for k in self.client.scan_iter(f"{self.PREFIX}{case_id}:{kind}:{variant}:*")]
+        key = self._key(case_id, kind, variant, version)
+        pipe = self.client.pipeline()
+        if stale:
+            pipe.delete(*stale)
+            pipe.zrem(self.lru_key, *stale)
+        pipe.set(key, data)
+        pipe.zadd(self.lru_key, {key: time.time()})
+        pipe.execute()
+        overflow = self.client.zcard(self.lru_key) - self.max_entries
+        if overflow > 0:
+            victims = self.client.zrange(self.lru_key, 0, overflow - 1)
+            if victims:
+                self.client.delete(*victims)
+                self.client.zrem(self.lru_key, *victims)
+
+    def _delete_pattern(self, pattern: str) -> int:
+        keys = list(self.client.scan_iter(pattern))
+        if keys:
+            self.client.delete(*keys)
+            self.client.zrem(self.lru_key, *keys)
+        return len(keys)
+
+    def delete_case(self, case_id: int) -> int:
+        return self._delete_pattern(f"{self.PREFIX}{case_id}:*")
+
+    def delete_kind(self, kind: str) -> int:
+        return self._delete_pattern(f"{self.PREFIX}*:{kind}:*")
+
+    def clear(self) -> int:
+        removed = self._delete_pattern(f"{self.PREFIX}*")
+        self.client.delete(self.lru_key)
+        return removed
+
+
+def _get_backend():
+    """Backend selected by VIEW_MODEL_CACHE (filesystem | redis | off)."""
+    global _backend
+    if _backend is not None:
+        return _backend
+    mode = os.environ.get('VIEW_MODEL_CACHE', 'filesystem').lower()
+    if mode == 'off':
+        return None
+    max_entries = int(os.environ.get('VIEW_MODEL_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+    if mode == 'redis':
+        url = os.environ.get('VIEW_MODEL_CACHE_REDIS_URL', 'redis://localhost:6379/2')
+        _backend = _RedisBackend(url, max_entries)
+    else:
+        from app.utils.private_cache_dir import private_cache_dir
+        root = private_cache_dir('view-cache', os.environ.get('VIEW_MODEL_CACHE_DIR'))
+        _backend = _FilesystemBackend(root, max_entries)
+    return _backend
+
+
+def _cache_enabled() -> bool:
+    from flask import current_app, has_app_context
+    if has_app_context() and current_app.config.get('TESTING'):
+        return False
+    return os.environ.get('VIEW_MODEL_CACHE', 'filesystem').lower() != 'off'
+
+
+def case_version(case_id: int, cross_case: bool = False) -> str:
+    """Fingerprint of the inputs the case view builders read.
+
+    Changes whenever the committed TTL is rewritten, any of the case's
+    TemporaryRDFStorage rows are added, removed, updated or published, a new
+    ExtractionPrompt is saved, the case Document or its DocumentSections are
+    edited, or any GuidelineSection changes (the provisions / Q&C views map
+    onto the canonical code sections). ``cross_case`` additionally folds in the
+    defeasibility band index state (other cases' commits).
+
+    OntServe's ontology_entities live in another database and are not covered;
+    views that show them attach them after the cache (see
+    SynthesisViewBuilder.get_all_views).
+    """
+    from sqlalchemy import text
+    from app.models import db
+    from app.services.entity.committed_case_graph import case_ttl_path
+
+    path = case_ttl_path(case_id)
+    ttl_mtime = path.stat().st_mtime_ns if path.exists() else 0
+
+    row = db.session.execute(text("""
+        SELECT COUNT(*), COALESCE(MAX(id), 0), MAX(updated_at),
+               COALESCE(SUM(CASE WHEN is_published THEN 1 ELSE 0 END), 0)
+        FROM temporary_rdf_storage
+        WHERE case_id = :case_id
+    """), {'case_id': case_id}).fetchone()
+    prompt_id = db.session.execute(text(
+        "SELECT COALESCE(MAX(id), 0) FROM extraction_prompts WHERE case_id = :case_id"
+    ), {'case_id': case_id}).scalar()
+    sources = db.session.execute(text("""
+        SELECT (SELECT updated_at FROM documents WHERE id = :case_id),
+               (SELECT COUNT(*) FROM document_sections WHERE document_id = :case_id),
+               (SELECT MAX(updated_at) FROM document_sections WHERE document_id = :case_id),
+               (SELECT COUNT(*) FROM guideline_sections),
+               (SELECT MAX(updated_at) FROM guideline_sections)
+    """), {'case_id': case_id}).fetchone()
+
+    parts = [ttl_mtime, *tuple(row), prompt_id, *tuple(sources)]
+    if cross_case:
+        band = db.session.execute(text(
+            "SELECT COUNT(*), COALESCE(MAX(id), 0) FROM defeasibility_band_index"
+        )).fetchone()
+        parts.extend(tuple(band))
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:16]
+
+
+def cached_view(kind: str, case_id: int, build: Callable[[], Any],
+                variant: Tuple = ()) -> Any:
+    """Return the cached view for (kind, case_id, variant), building on a miss.
+
+    ``build`` is called with no arguments and must return a picklable value.
+    Exceptions from ``build`` propagate and nothing is cached. A cache backend
+    failure (unreachable Redis, unwritable directory, version query error) is
+    logged and the view is built uncached.
+    """
+    if not _cache_enabled():
+        return build()
+    try:
+        backend = _get_backend()
+        version = case_version(case_id, cross_case=kind in CROSS_CASE_KINDS)
+    except Exception as e:
+        logger.warning(f"View-model cache unavailable for {kind}/{case_id}: {e}")
+        return build()
+    if backend is None:
+        return build()
+
+    variant_key = hashlib.sha1(repr(variant).encode('utf-8')).hexdigest()[:12]
+    try:
+        data = backend.get(case_id, kind, variant_key, version)
+        if data is not None:
+            return pickle.loads(data)
+    except Exception as e:
+        logger.warning(f"View-model cache read failed for {kind}/{case_id}: {e}")
+
+    value = build()
+    try:
+        backend.set(case_id, kind, variant_key, version,
+                    pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception as e:
+        logger.warning(f"View-model cache write failed for {kind}/{case_id}: {e}")
+    return value
+
+
+def invalidate_case(case_id: int) -> int:
+    """Drop every cached view for the case, plus all cross-case entries.
+
+    Called by the commit, uncommit and clearing services. Best-effort: a backend
+    failure is logged, never raised into the commit path. Returns the number of
+    entries removed.
+    """
+    try:
+        backend = _get_backend()
+        if backend is None:
+            return 0
+        removed = backend.delete_case(case_id)
+        for kind in CROSS_CASE_KINDS:
+            removed += backend.delete_kind(kind)
+        return removed
+    except Exception as e:
+        logger.warning(f"View-model cache invalidation failed for case {case_id}: {e}")
+        return 0
+
+
+def clear_view_cache() -> int:
+    """Drop every cached view (all cases)."""
+    try:
+        backend = _get_backend()
+        return backend.clear() if backend is not None else 0
+    except Exception as e:
+        logger.warning(f"View-model cache clear failed: {e}")
+        return 0
@@ -269,6 +269,111 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
 
+    // Flame-style timing breakdown: one block per recorded task, one row per
+    // span depth; bar offset/width are relative to the task's duration.
+    function formatSeconds(s) {
+        return s >= 60 ? `${Math.floor(s / 60)}m ${Math.round(s % 60)}s` : `${s.toFixed(1)}s`;
+    }
+
+    function spanTitle(node) {
+        const lines = [`${node.name}: ${formatSeconds(node.duration)}` +
+                       (node.count ? ` (${node.count} calls)` : '')];
+        Object.entries(node.attrs || {}).forEach(([k, v]) => lines.push(`${k}: ${v}`));
+        Object.entries(node.counts || {}).forEach(([k, v]) =>
+            lines.push(`${k}: ${Number.isInteger(v) ? v : v.toFixed(2)}`));
+        return lines.join('\n');
+    }
+
+    function renderTiming(timing) {
+        const container = document.getElementById('runTiming');
+        container.innerHTML = '';
+        if (!timing.tasks || !timing.tasks.length) {
+            container.innerHTML = '<p class="text-muted small mb-0">No timing spans recorded for this run.</p>';
+            return;
+        }
+        const t = timing.totals || {};
+        const summary = document.createElement('p');
+        summary.className = 'small mb-2';
+        summary.textContent = `Recorded ${formatSeconds(timing.recorded_seconds)} across ${timing.tasks.length} task(s); ` +
+            `LLM: ${t.llm_calls || 0} calls, ${formatSeconds(t.llm_seconds || 0)}, ` +
+            `${t.input_tokens || 0} in / ${t.output_tokens || 0} out tokens`;
+        container.appendChild(summary);
+
+        timing.tasks.forEach(task => {
+            const root = task.spans;
+            const total = root.duration || 1;
+            const block = document.createElement('div');
+            block.className = 'flame-task';
+            const rows = [];
+            (function place(node, depth, offset) {
+                if (!rows[depth]) rows[depth] = [];
+                rows[depth].push({node, offset});
+                (node.children || []).forEach(child => place(child, depth + 1, child.start));
+            })(root, 0, 0);
+            rows.forEach(row => {
+                const rowEl = document.createElement('div');
+                rowEl.className = 'flame-row';
+                row.forEach(({node, offset}) => {
+                    const bar = document.createElement('div');
+                    bar.className = 'flame-bar' + (node.count ? ' flame-folded' : '') +
+                        (node.name === 'llm_call' ? ' flame-llm' : '');
+                    bar.style.left = `${Math.min(100, 100 * offset / total)}%`;
+                    bar.style.width = `${Math.max(0.2, Math.min(100, 100 * node.duration / total))}%`;
+                    bar.textContent = node.name;
+                    bar.title = spanTitle(node);
+                    rowEl.appendChild(bar);
+                });
+                block.appendChild(rowEl);
+            });
+            container.appendChild(block);
+        });
+    }
+
+    // LLM usage rollups (app.utils.llm_usage): run and case totals, then the
+    // prompt sites (innermost span) that dominate spend.
+    function usageLine(label, u) {
+        return `${label}: ${u.calls} calls, $${u.cost_usd.toFixed(2)}, ` +
+            `${u.input_tokens} in / ${u.output_tokens} out tokens, ` +
+            `cache hit ${(100 * u.cache_hit_rate).toFixed(0)}%, ${formatSeconds(u.latency_seconds)} LLM time`;
+    }
+
+    function renderUsage(runUsage, caseUsage) {
+        const container = document.getElementById('runUsage');
+        container.innerHTML = '';
+        if (!runUsage.totals.calls && !(caseUsage && caseUsage.totals.calls)) {
+            return;
+        }
+        [['Run', runUsage], [`Case ${caseUsage ? caseUsage.case_id : ''}`, caseUsage]].forEach(([label, u]) => {
+            if (!u) return;
+            const p = document.createElement('p');
+            p.className = 'small mb-1';
+            p.textContent = usageLine(label, u.totals);
+            container.appendChild(p);
+        });
+        if (!runUsage.by_span.length) return;
+        const table = document.createElement('table');
+        table.className = 'table table-sm small mb-0';
+        table.innerHTML = '<thead><tr><th>Prompt site</th><th class="text-end">Calls</th>' +
+            '<th class="text-end">Cost</th><th class="text-end">In / out</th>' +
+            '<th class="text-end">Cache hit</th><th class="text-end">LLM time</th></tr></thead>';
+        const body = document.createElement('tbody');
+        runUsage.by_span.forEach(row => {
+            const tr = document.createElement('tr');
+            [row.span_name || '(untagged)', row.calls, `$${row.cost_usd.toFixed(3)}`,
+             `${row.input_tokens} / ${row.output_tokens}`,
+             `${(100 * row.cache_hit_rate).toFixed(0)}%`, formatSeconds(row.latency_seconds)
+            ].forEach((value, i) => {
+                const td = document.createElement('td');
+                if (i) td.className = 'text-end';
+                td.textContent = value;
+                tr.appendChild(td);
+            });
+            body.appendChild(tr);
+        });
+        table.appendChild(body);
+        container.appendChild(table);
+    }
+
     // Details button
     document.querySelectorAll('.details-btn').forEach(btn => {
         btn.addEventListener('click', async function() {
@@ -277,7 +382,20 @@ document.addEventListener('DOMContentLoaded', function() {
                 const response = await fetch(`/pipeline/api/runs/${runId}`);
                 const data = await response.json();
                 document.getElementById('runDetails').textContent = JSON.stringify(data, null, 2);
+                document.getElementById('runTiming').innerHTML = '';
                 new bootstrap.Modal(document.getElementById('detailsModal')).show();
+                document.getElementById('runUsage').innerHTML = '';
+                const timingResponse = await fetch(`/pipeline/api/runs/${runId}/timing`);
+                if (timingResponse.ok) {
+                    renderTiming(await timingResponse.json());
+                }
+                const [runUsage, caseUsage] = await Promise.all([
+                    fetch(`/pipeline/api/runs/${runId}/usage`),
+                    fetch(`/pipeline/api/cases/${this.dataset.caseId}/usage`),
+                ]);
+                if (runUsage.ok) {
+                    renderUsage(await runUsage.json(), caseUsage.ok ? await caseUsage.json() : null);
+                }
             } catch (e) {
                 alert('Error: ' + e.message);
             }
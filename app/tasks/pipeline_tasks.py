@@ -23,6 +23,7 @@ Usage:
     )
 """
 
+import contextvars
 from typing import Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
@@ -31,6 +32,7 @@ from app import db
 from app.models.pipeline_run import PipelineRun, PIPELINE_STATUS
 from app.models.document import Document
 from app.services.entity.case_entity_storage_service import CaseEntityStorageService
+from app.utils.pipeline_spans import recorded_task, span
 from datetime import datetime
 import logging
 import traceback
@@ -198,12 +200,14 @@ def run_extraction_parallel(entity_types, case_text, case_id, section_type,
     app = current_app._get_current_object()
 
     def _extract_in_context(et):
-        with app.app_context():
+        with app.app_context(), span(f"extract {et}", section=section_type):
             return et, run_extraction(case_text, case_id, section_type, et, step_number)
 
     results = {}
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(_extract_in_context, et): et for et in entity_types}
+        # copy_context carries the caller's timing span into each worker
+        futures = {executor.submit(contextvars.copy_context().run, _extract_in_context, et): et
+                   for et in entity_types}
         for future in as_completed(futures):
             entity_type = futures[future]
             try:
@@ -238,6 +242,7 @@ def _record_pass(run, activity_type, activity_name, result, plan=None,
 
 
 @celery.task(bind=True, name='proethica.tasks.run_step1')
+@recorded_task
 def run_step1_task(self, run_id: int, section_type: str = 'facts'):
     """
     Execute Step 1 (Pass 1) extraction for a case.
@@ -322,6 +327,7 @@ def run_step1_task(self, run_id: int, section_type: str = 'facts'):
 
 
 @celery.task(bind=True, name='proethica.tasks.run_step2')
+@recorded_task
 def run_step2_task(self, run_id: int, section_type: str = 'facts'):
     """
     Execute Step 2 (Pass 2) extraction for a case.
@@ -419,6 +425,7 @@ def run_step2_task(self, run_id: int, section_type: str = 'facts'):
 
 
 @celery.task(bind=True, name='proethica.tasks.run_step3')
+@recorded_task
 def run_step3_task(self, run_id: int):
     """
     Execute Step 3 (Pass 3) extraction for a case.
@@ -558,7 +565,6 @@ def run_step3_task(self, run_id: int):
                     for msg in messages:
                         if 'Stored' in msg:
                             # Parse: "Stored X actions, Y events, Z causal chains..."
-                            import re
                             action_match = re.search(r'(\d+) actions', msg)
                             event_match = re.search(r'(\d+) events', msg)
                             chain_match = re.search(r'(\d+) causal chains', msg)
@@ -630,6 +636,7 @@ def run_step3_task(self, run_id: int):
 
 
 @celery.task(bind=True, name='proethica.tasks.run_reconcile')
+@recorded_task
 def run_reconcile_task(self, run_id: int):
     """Auto-merge near-duplicate entities across extraction passes.
 
@@ -654,6 +661,9 @@ def run_reconcile_task(self, run_id: int):
         # commit-time matcher both see clean canonical labels.
         canon = service.canonicalize_labels(run.case_id)
         result = service.reconcile_auto(run.case_id)
+        # Keep the exact-match merges undoable from the reconcile page
+        service.record_auto_merges(result)
+        db.session.commit()
 
         results = {
             'canonicalized': canon.get('changed', 0),
@@ -962,6 +972,7 @@ def resume_pipeline_task(self, run_id: int):
 
 
 @celery.task(bind=True, name='proethica.tasks.run_step4_substep')
+@recorded_task
 def run_step4_substep_task(self, run_id: int, substep: str):
     """Execute a single Step 4 sub-phase for a case.
 
@@ -1027,6 +1038,7 @@ def run_step4_substep_task(self, run_id: int, substep: str):
 
 
 @celery.task(bind=True, name='proethica.tasks.run_step4')
+@recorded_task
 def run_step4_task(self, run_id: int):
     """
     Execute Step 4 (Case Synthesis) for a case.
@@ -1183,6 +1195,7 @@ def run_step4_task(self, run_id: int):
 
 
 @celery.task(bind=True, name='proethica.tasks.run_commit')
+@recorded_task
 def run_commit_task(self, run_id: int, step_name: str = "commit_extraction"):
     """
     Commit extracted entities to OntServe using full commit service.
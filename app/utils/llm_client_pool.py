@@ -0,0 +1,313 @@
+"""
+Process-wide pooled Anthropic clients with client-side rate limiting.
+
+``get_anthropic_client`` returns one ``anthropic.Anthropic`` per
+(api key, timeout, max_retries) per process instead of a new client -- and a
+new HTTP connection pool, TLS handshake included -- on every call. Each
+client gets a tuned httpx pool:
+
+    LLM_HTTP_MAX_CONNECTIONS     (default 32)
+    LLM_HTTP_MAX_KEEPALIVE       (default 16)
+    LLM_HTTP_KEEPALIVE_EXPIRY    seconds (default 60)
+
+Every ``client.messages.create`` / ``client.messages.stream`` call on a
+pooled client first passes a token-bucket limiter shared by all threads in
+the worker process:
+
+    LLM_RATE_LIMIT_RPM           requests per minute
+    LLM_RATE_LIMIT_INPUT_TPM     input tokens per minute
+    LLM_RATE_LIMIT_OUTPUT_TPM    output tokens per minute
+
+(unset or 0 = unlimited). Input tokens are estimated from the prompt length
+and output tokens are reserved at ``max_tokens``; both are settled against
+the response's ``usage`` afterwards, so the buckets track real spend.
+
+Every call is also handed to ``app.utils.llm_usage`` (tokens including
+prompt-cache reads/writes, cost, latency, model, case/step tags).
+
+``llm_pool_stats()`` reports queue wait (time blocked in the limiter)
+separately from API latency, so throttling and a slow API can be told apart.
+Clients are keyed by pid as well: a worker forked from a preloaded master
+builds its own pool rather than sharing the master's sockets.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.utils.llm_usage import record_llm_call
+from app.utils.pipeline_spans import add_counts
+
+logger = logging.getLogger(__name__)
+
+_clients: Dict[Tuple, Any] = {}
+_clients_lock = threading.Lock()
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``per_minute``.
+
+    A request larger than the bucket capacity waits for a full bucket and
+    then drives it negative, so oversized requests are delayed, not refused.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = float(per_minute) / 60.0
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def acquire(self, amount: float) -> float:
+        """Take ``amount`` tokens, blocking as needed; return seconds waited."""
+        waited = 0.0
+        need = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= need:
+                    self._tokens -= amount
+                    return waited
+                delay = (need - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def settle(self, delta: float) -> None:
+        """Return (positive) or charge (negative) tokens after the fact."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + delta)
+
+
+def _token_count(usage, name: str) -> int:
+    value = getattr(usage, name, None)
+    return value if isinstance(value, int) else 0
+
+
+class LLMRateLimiter:
+    """Requests/min plus input and output tokens/min, with wait/latency metrics."""
+
+    def __init__(self, rpm: float = 0, input_tpm: float = 0, output_tpm: float = 0):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.input_tokens = TokenBucket(input_tpm) if input_tpm else None
+        self.output_tokens = TokenBucket(output_tpm) if output_tpm else None
+        self._lock = threading.Lock()
+        self._metrics = {
+            'calls': 0, 'errors': 0,
+            'queue_wait_total': 0.0, 'queue_wait_max': 0.0,
+            'api_latency_total': 0.0, 'api_latency_max': 0.0,
+            'input_tokens': 0, 'output_tokens': 0,
+            'cache_read_tokens': 0, 'cache_write_tokens': 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> 'LLMRateLimiter':
+        return cls(
+            rpm=float(os.environ.get('LLM_RATE_LIMIT_RPM', 0) or 0),
+            input_tpm=float(os.environ.get('LLM_RATE_LIMIT_INPUT_TPM', 0) or 0),
+            output_tpm=float(os.environ.get('LLM_RATE_LIMIT_OUTPUT_TPM', 0) or 0),
+        )
+
+    def acquire(self, est_input: int, est_output: int) -> float:
+        waited = 0.0
+        if self.requests:
+            waited += self.requests.acquire(1)
+        if self.input_tokens:
+            waited += self.input_tokens.acquire(est_input)
+        if self.output_tokens:
+            waited += self.output_tokens.acquire(est_output)
+        return waited
+
+    def record(self, waited: float, latency: float, est_input: int, est_output: int,
+               usage=None, error: bool = False, model: Optional[str] = None,
+               source: Optional[str] = None, tags: Optional[Dict[str, Any]] = None) -> None:
+        actual_in = getattr(usage, 'input_tokens', None) if usage is not None else None
+        actual_out = getattr(usage, 'output_tokens', None) if usage is not None else None
+        cache_read = _token_count(usage, 'cache_read_input_tokens')
+        cache_write = _token_count(usage, 'cache_creation_input_tokens')
+        if self.input_tokens and actual_in is not None:
+            self.input_tokens.settle(est_input - actual_in)
+        if self.output_tokens:
+            # A failed call produced nothing; refund the whole reservation.
+            self.output_tokens.settle(est_output - (actual_out or 0))
+        with self._lock:
+            m = self._metrics
+            m['calls'] += 1
+            m['errors'] += int(error)
+            m['queue_wait_total'] += waited
+            m['queue_wait_max'] = max(m['queue_wait_max'], waited)
+            m['api_latency_total'] += latency
+            m['api_latency_max'] = max(m['api_latency_max'], latency)
+            m['input_tokens'] += actual_in or 0
+            m['output_tokens'] += actual_out or 0
+            m['cache_read_tokens'] += cache_read
+            m['cache_write_tokens'] += cache_write
+        add_counts(llm_calls=1, input_tokens=actual_in or 0, output_tokens=actual_out or 0,
+                   cache_read_tokens=cache_read, cache_write_tokens=cache_write,
+                   llm_seconds=latency, llm_queue_seconds=waited)
+        record_llm_call(model, usage, latency=latency, queue_seconds=waited,
+                        error=error, source=source, tags=tags)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            m = dict(self._metrics)
+        calls = m['calls'] or 1
+        m['queue_wait_avg'] = m['queue_wait_total'] / calls
+        m['api_latency_avg'] = m['api_latency_total'] / calls
+        return m
+
+
+_limiter: Optional[LLMRateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> LLMRateLimiter:
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = LLMRateLimiter.from_env()
+    return _limiter
+
+
+def estimate_input_tokens(kwargs: Dict[str, Any]) -> int:
+    """~4 characters per token over system + message text (no tokenizer call)."""
+    chars = len(str(kwargs.get('system') or ''))
+    for message in kwargs.get('messages') or []:
+        content = message.get('content') if isinstance(message, dict) else None
+        if isinstance(content, str):
+            chars += len(content)
+        elif isinstance(content, list):
+            chars += sum(len(str(block.get('text', ''))) for block in content
+                         if isinstance(block, dict))
+    return max(1, chars // 4)
+
+
+class _LimitedStream:
+    """Wraps a MessageStreamManager so the limiter covers the whole stream."""
+
+    def __init__(self, manager, limiter: LLMRateLimiter, est_in: int, est_out: int,
+                 model: Optional[str] = None):
+        self._manager = manager
+        self._limiter = limiter
+        self._est = (est_in, est_out)
+        self._model = model
+        self._stream = None
+
+    def __enter__(self):
+        self._waited = self._limiter.acquire(*self._est)
+        self._start = time.monotonic()
+        self._stream = self._manager.__enter__()
+        return self._stream
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            return self._manager.__exit__(exc_type, exc, tb)
+        finally:
+            try:
+                usage = self._stream.current_message_snapshot.usage
+            except Exception:
+                usage = None  # stream failed before the first event
+            self._limiter.record(self._waited, time.monotonic() - self._start, *self._est,
+                                 usage=usage, error=exc_type is not None,
+                                 model=self._model, source='stream')
+
+
+class _LimitedMessages:
+    """Drop-in for ``client.messages`` that rate-limits create() and stream()."""
+
+    def __init__(self, messages, limiter: LLMRateLimiter):
+        self._messages = messages
+        self._limiter = limiter
+
+    def create(self, *args, **kwargs):
+        est_in, est_out = estimate_input_tokens(kwargs), int(kwargs.get('max_tokens') or 0)
+        waited = self._limiter.acquire(est_in, est_out)
+        start = time.monotonic()
+        response, error = None, True
+        try:
+            response = self._messages.create(*args, **kwargs)
+            error = False
+            return response
+        finally:
+            self._limiter.record(waited, time.monotonic() - start, est_in, est_out,
+                                 usage=getattr(response, 'usage', None), error=error,
+                                 model=kwargs.get('model'), source='create')
+
+    def stream(self, *args, **kwargs):
+        est_in, est_out = estimate_input_tokens(kwargs), int(kwargs.get('max_tokens') or 0)
+        return _LimitedStream(self._messages.stream(*args, **kwargs), self._limiter,
+                              est_in, est_out, model=kwargs.get('model'))
+
+    def __getattr__(self, name):
+        return getattr(self._messages, name)
+
+
+def http_limits():
+    """httpx pool limits shared by the sync pool and the async gateway."""
+    import httpx
+
+    return httpx.Limits(
+        max_connections=int(os.environ.get('LLM_HTTP_MAX_CONNECTIONS', 32)),
+        max_keepalive_connections=int(os.environ.get('LLM_HTTP_MAX_KEEPALIVE', 16)),
+        keepalive_expiry=float(os.environ.get('LLM_HTTP_KEEPALIVE_EXPIRY', 60)),
+    )
+
+
+def _http_client():
+    import anthropic
+
+    return anthropic.DefaultHttpxClient(limits=http_limits())
+
+
+def get_anthropic_client(api_key: Optional[str] = None, timeout: float = 180.0,
+                         max_retries: Optional[int] = None):
+    """Shared, rate-limited ``anthropic.Anthropic`` for this process and config."""
+    import anthropic
+
+    api_key = api_key or os.environ.get('ANTHROPIC_API_KEY')
+    key_id = hashlib.sha256((api_key or '').encode()).hexdigest()[:16]
+    # The constructor is part of the key so a reloaded (or test-patched)
+    # anthropic module never hands back a client built by the old one.
+    key = (os.getpid(), anthropic.Anthropic, key_id, float(timeout), max_retries)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            kwargs = {'api_key': api_key, 'timeout': timeout, 'http_client': _http_client()}
+            if max_retries is not None:
+                kwargs['max_retries'] = max_retries
+            client = anthropic.Anthropic(**kwargs)
+            client.messages = _LimitedMessages(client.messages, get_rate_limiter())
+            _clients[key] = client
+            logger.info(f"Created pooled Anthropic client (timeout={timeout}, max_retries={max_retries})")
+        return client
+
+
+def llm_pool_stats() -> Dict[str, Any]:
+    pid = os.getpid()
+    return {'clients': sum(1 for k in _clients if k[0] == pid), **get_rate_limiter().stats()}
+
+
+def reset_llm_client_pool() -> None:
+    """Drop pooled clients and the limiter (tests; config changes)."""
+    global _limiter
+    with _clients_lock:
+        for client in _clients.values():
+            try:
+                client.close()
+            except Exception:
+                pass
+        _clients.clear()
+    with _limiter_lock:
+        _limiter = None
@@ -278,3 +278,92 @@ def repair_truncated_json(response_text: str) -> Optional[str]:
     # Strategy 2: find last complete element (handles escaped quotes,
     # truncated nested arrays, and other patterns that defeat regex stripping)
     return _find_last_complete_element(text)
+
+
+class IncrementalJSONItems:
+    """Incremental parser that yields array items of a streamed JSON response as they close.
+
+    Feed it the text chunks of a streaming response; ``feed`` returns the
+    ``(key, item)`` pairs completed by that chunk, where ``item`` is an
+    object inside a top-level array and ``key`` is the root-object key that
+    array belongs to (``None`` when the root itself is an array). Anything
+    before the first ``{`` / ``[`` (a markdown fence, a preamble) is skipped.
+
+    Only the item currently being read is buffered, and each item is parsed
+    exactly once, so callers can act on entities long before the closing
+    bracket arrives. It does not replace the final parse of the whole
+    response (which still owns truncation repair); a malformed item is
+    skipped here and handled there.
+    """
+
+    def __init__(self):
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._key_chars: Optional[List[str]] = None
+        self._last_key: Optional[str] = None
+        self._array_key: Optional[str] = None
+        self._item: Optional[List[str]] = None
+        self._item_depth = 0
+        self.items_seen = 0
+
+    def _is_item_start(self) -> bool:
+        # Objects directly inside a root array, or inside an array that is a
+        # value of the root object.
+        return self._stack in (['['], ['{', '['])
+
+    def feed(self, text: str) -> List[tuple]:
+        done = []
+        for ch in text:
+            item = self._item
+            if self._in_string:
+                if item is not None:
+                    item.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key_chars is not None:
+                        self._last_key = ''.join(self._key_chars)
+                        self._key_chars = None
+                elif self._key_chars is not None:
+                    self._key_chars.append(ch)
+                continue
+
+            if ch == '"':
+                if not self._stack:
+                    continue
+                self._in_string = True
+                if item is not None:
+                    item.append(ch)
+                elif self._stack == ['{']:
+                    self._key_chars = []
+            elif ch in '{[':
+                if item is None and ch == '{' and self._is_item_start():
+                    self._item = item = []
+                    self._item_depth = len(self._stack) + 1
+                elif ch == '[' and self._stack == ['{']:
+                    self._array_key = self._last_key
+                self._stack.append(ch)
+                if item is not None:
+                    item.append(ch)
+            elif ch in '}]':
+                if not self._stack:
+                    continue
+                self._stack.pop()
+                if item is not None:
+                    item.append(ch)
+                    if len(self._stack) < self._item_depth:
+                        self._item = None
+                        self.items_seen += 1
+                        try:
+                            parsed = json.loads(''.join(item))
+                        except json.JSONDecodeError:
+                            continue
+                        key = self._array_key if self._stack[:1] == ['{'] else None
+                        done.append((key, parsed))
+            elif item is not None:
+                item.append(ch)
+        return done
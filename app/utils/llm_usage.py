@@ -0,0 +1,323 @@
+"""
+Token and cost accounting for every LLM call.
+
+``LLMManager._track_usage`` only sees calls made through ``LLMManager``;
+most production traffic (streaming extraction, edge resolution, Step 4
+analyzers) calls the pooled Anthropic client directly or goes through the
+async gateway. Both of those paths end in ``record_llm_call``, which turns
+the response's ``usage`` into one ``LLMUsageRecord`` row:
+
+    input / output / cache-read / cache-write tokens, estimated cost,
+    API latency, limiter queue wait, model,
+    run_id, case_id, pipeline step, concept, section, innermost span name
+
+Tags come from ``usage_context`` (a ContextVar, so it follows
+``contextvars.copy_context`` into worker threads like the timing spans do):
+
+    with usage_context(case_id=case_id, concept='roles'):
+        ...  # every LLM call in here is tagged
+
+``pipeline_spans.record_run`` tags run_id and step for each pipeline task;
+case_id is filled in from the run when a row only has run_id.
+
+Rows are queued and written by a background thread in batches
+(LLM_USAGE_BATCH_SIZE rows or every LLM_USAGE_FLUSH_SECONDS, whichever
+comes first), so the call path never waits on the database. The queue is
+bounded (LLM_USAGE_MAX_QUEUE); when it is full, rows are dropped and
+counted rather than blocking. LLM_USAGE_TRACKING=false turns capture off.
+"""
+
+import atexit
+import contextvars
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.utils.pipeline_spans import current_span
+
+logger = logging.getLogger(__name__)
+
+TAG_KEYS = ('run_id', 'case_id', 'step', 'concept', 'section_type')
+
+_tags: contextvars.ContextVar = contextvars.ContextVar('llm_usage_tags', default={})
+
+# USD per million tokens: (input, output). Matched on model family; cache
+# reads are billed at 10% of input and 5-minute cache writes at 125%.
+PRICING = {
+    'opus': (15.0, 75.0),
+    'sonnet': (3.0, 15.0),
+    'haiku': (1.0, 5.0),
+}
+CACHE_READ_FACTOR = 0.1
+CACHE_WRITE_FACTOR = 1.25
+
+
+def estimate_cost(model: Optional[str], input_tokens: int = 0, output_tokens: int = 0,
+                  cache_read_tokens: int = 0, cache_write_tokens: int = 0) -> float:
+    """Estimated USD cost of one call (unknown models are priced as Sonnet)."""
+    name = (model or '').lower()
+    input_price, output_price = next(
+        (prices for family, prices in PRICING.items() if family in name), PRICING['sonnet'])
+    cost = (input_tokens * input_price
+            + cache_read_tokens * input_price * CACHE_READ_FACTOR
+            + cache_write_tokens * input_price * CACHE_WRITE_FACTOR
+            + output_tokens * output_price) / 1_000_000
+    return round(cost, 6)
+
+
+@contextmanager
+def usage_context(**tags):
+    """Tag LLM calls made inside the block; nested contexts override outer keys."""
+    unknown = set(tags) - set(TAG_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown usage tags: {sorted(unknown)}")
+    merged = {**_tags.get(), **{k: v for k, v in tags.items() if v is not None}}
+    token = _tags.set(merged)
+    try:
+        yield merged
+    finally:
+        _tags.reset(token)
+
+
+def current_usage_tags() -> Dict[str, Any]:
+    """Tags for a call made now: the usage context plus the innermost span name."""
+    tags = dict(_tags.get())
+    node = current_span()
+    if node is not None:
+        tags['span_name'] = node.name
+    return tags
+
+
+def tracking_enabled() -> bool:
+    return os.environ.get('LLM_USAGE_TRACKING', 'true').lower() != 'false'
+
+
+def usage_row(model: Optional[str], usage, latency: Optional[float] = None,
+              queue_seconds: Optional[float] = None, error: bool = False,
+              source: Optional[str] = None, tags: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Build an ``LLMUsageRecord`` row from an API ``usage`` object."""
+    def tokens(name):
+        return int(getattr(usage, name, 0) or 0) if usage is not None else 0
+
+    input_tokens = tokens('input_tokens')
+    output_tokens = tokens('output_tokens')
+    cache_read = tokens('cache_read_input_tokens')
+    cache_write = tokens('cache_creation_input_tokens')
+    row = {
+        'called_at': datetime.utcnow(),
+        'model': model,
+        'source': source,
+        'input_tokens': input_tokens,
+        'output_tokens': output_tokens,
+        'cache_read_tokens': cache_read,
+        'cache_write_tokens': cache_write,
+        'cost_usd': estimate_cost(model, input_tokens, output_tokens, cache_read, cache_write),
+        'latency_seconds': latency,
+        'queue_seconds': queue_seconds,
+        'error': error,
+    }
+    tags = current_usage_tags() if tags is None else tags
+    for key in (*TAG_KEYS, 'span_name'):
+        row[key] = tags.get(key)
+    return row
+
+
+def record_llm_call(model: Optional[str], usage, latency: Optional[float] = None,
+                    queue_seconds: Optional[float] = None, error: bool = False,
+                    source: Optional[str] = None, tags: Optional[Dict[str, Any]] = None) -> None:
+    """Queue one usage row for the background writer (never raises)."""
+    if not tracking_enabled():
+        return
+    try:
+        get_usage_recorder().submit(
+            usage_row(model, usage, latency, queue_seconds, error, source, tags))
+    except Exception as e:
+        logger.debug(f"LLM usage capture failed: {e}")
+
+
+def _write_rows(app, rows: List[Dict[str, Any]]) -> None:
+    """Bulk-insert a batch of usage rows, filling case_id from the pipeline run."""
+    from app.models import db
+    from app.models.llm_usage import LLMUsageRecord
+    from app.models.pipeline_run import PipelineRun
+
+    with app.app_context():
+        try:
+            run_ids = {r['run_id'] for r in rows if r.get('run_id') and not r.get('case_id')}
+            if run_ids:
+                cases = dict(db.session.query(PipelineRun.id, PipelineRun.case_id)
+                             .filter(PipelineRun.id.in_(run_ids)).all())
+                for r in rows:
+                    if r.get('run_id') in cases and not r.get('case_id'):
+                        r['case_id'] = cases[r['run_id']]
+            db.session.execute(LLMUsageRecord.__table__.insert(), rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+class UsageRecorder:
+    """Bounded queue drained by a daemon thread that writes rows in batches."""
+
+    def __init__(self, writer: Callable = _write_rows, batch_size: Optional[int] = None,
+                 flush_seconds: Optional[float] = None, max_queue: Optional[int] = None):
+        self.writer = writer
+        self.batch_size = batch_size or int(os.environ.get('LLM_USAGE_BATCH_SIZE', 100))
+        self.flush_seconds = flush_seconds or float(os.environ.get('LLM_USAGE_FLUSH_SECONDS', 5))
+        self._queue: queue.Queue = queue.Queue(
+            maxsize=max_queue or int(os.environ.get('LLM_USAGE_MAX_QUEUE', 10000)))
+        self._app = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self.stats = {'queued': 0, 'written': 0, 'dropped': 0, 'batches': 0}
+
+    def submit(self, row: Dict[str, Any]) -> None:
+        if self._app is None:
+            from flask import current_app, has_app_context
+            if has_app_context():
+                self._app = current_app._get_current_object()
+        try:
+            self._queue.put_nowait(row)
+            self.stats['queued'] += 1
+        except queue.Full:
+            self.stats['dropped'] += 1
+            return
+        self._ensure_thread()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='llm-usage-writer', daemon=True)
+                self._thread.start()
+
+    def _take_batch(self, block: bool) -> List[Dict[str, Any]]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_seconds) if block else self._queue.get_nowait()]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if block and remaining > 0
+                             else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch(block=True)
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        with self._write_lock:
+            try:
+                if self._app is None:
+                    self.stats['dropped'] += len(batch)
+                    logger.debug(f"No Flask app to write {len(batch)} LLM usage rows; dropped")
+                    return
+                self.writer(self._app, batch)
+                self.stats['written'] += len(batch)
+                self.stats['batches'] += 1
+            except Exception as e:
+                self.stats['dropped'] += len(batch)
+                logger.warning(f"Could not write {len(batch)} LLM usage rows: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self, timeout: float = 10.0) -> None:
+        """Write everything queued so far, waiting for a batch the writer thread holds."""
+        while True:
+            batch = self._take_batch(block=False)
+            if not batch:
+                break
+            self._write(batch)
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+
+_recorder: Optional[UsageRecorder] = None
+_recorder_pid: Optional[int] = None
+_recorder_lock = threading.Lock()
+
+
+def get_usage_recorder() -> UsageRecorder:
+    """Process-wide recorder (rebuilt after fork so each worker has its own thread)."""
+    global _recorder, _recorder_pid
+    if _recorder is None or _recorder_pid != os.getpid():
+        with _recorder_lock:
+            if _recorder is None or _recorder_pid != os.getpid():
+                _recorder = UsageRecorder()
+                _recorder_pid = os.getpid()
+    return _recorder
+
+
+def flush_usage() -> None:
+    if _recorder is not None and _recorder_pid == os.getpid():
+        _recorder.flush()
+
+
+atexit.register(flush_usage)
+
+
+def usage_summary(run_id: Optional[int] = None, case_id: Optional[int] = None,
+                  top: int = 15) -> Dict[str, Any]:
+    """Totals plus breakdowns by step, span (prompt site) and model for a run or case."""
+    from sqlalchemy import cast, func
+    from app.models import db
+    from app.models.llm_usage import LLMUsageRecord as R
+
+    measures = (
+        func.count(R.id).label('calls'),
+        func.coalesce(func.sum(R.input_tokens), 0).label('input_tokens'),
+        func.coalesce(func.sum(R.output_tokens), 0).label('output_tokens'),
+        func.coalesce(func.sum(R.cache_read_tokens), 0).label('cache_read_tokens'),
+        func.coalesce(func.sum(R.cache_write_tokens), 0).label('cache_write_tokens'),
+        func.coalesce(func.sum(R.cost_usd), 0.0).label('cost_usd'),
+        func.coalesce(func.sum(R.latency_seconds), 0.0).label('latency_seconds'),
+        func.coalesce(func.sum(cast(R.error, db.Integer)), 0).label('errors'),
+    )
+
+    def scoped(query):
+        if run_id is not None:
+            query = query.filter(R.run_id == run_id)
+        if case_id is not None:
+            query = query.filter(R.case_id == case_id)
+        return query
+
+    def as_dict(row, *keys):
+        out = {key: getattr(row, key) for key in keys}
+        for m in measures:
+            value = getattr(row, m.name)
+            out[m.name] = float(value) if m.name in ('cost_usd', 'latency_seconds') else int(value)
+        prompt = out['input_tokens'] + out['cache_read_tokens'] + out['cache_write_tokens']
+        out['cache_hit_rate'] = round(out['cache_read_tokens'] / prompt, 4) if prompt else 0.0
+        return out
+
+    def grouped(column, key):
+        rows = (scoped(db.session.query(column.label(key), *measures))
+                .group_by(column).order_by(func.sum(R.cost_usd).desc()).limit(top).all())
+        return [as_dict(row, key) for row in rows]
+
+    return {
+        'run_id': run_id,
+        'case_id': case_id,
+        'totals': as_dict(scoped(db.session.query(*measures)).one()),
+        'by_step': grouped(R.step, 'step'),
+        'by_span': grouped(R.span_name, 'span_name'),
+        'by_concept': grouped(R.concept, 'concept'),
+        'by_model': grouped(R.model, 'model'),
+    }
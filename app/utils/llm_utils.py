@@ -15,15 +15,33 @@ logger = logging.getLogger(__name__)
 
 
 def streaming_completion(client, model: str, max_tokens: int, prompt: str,
-                         temperature: float = 0.1) -> str:
+                         temperature: float = 0.1,
+                         priority: Optional[str] = None) -> str:
     """Call Anthropic API with streaming to prevent WSL2 TCP idle timeout.
 
     WSL2 kills TCP connections after ~60s of no data.  Non-streaming calls
     that take longer than 60s to process on the server side will fail.
     Streaming keeps data flowing throughout the request.
 
+    With ``LLM_GATEWAY`` on, the call is queued on the process-wide gateway,
+    which sends it on its own pooled client; ``client`` is ignored there.
+    ``priority`` picks the gateway queue ('interactive' or 'batch'). Left as
+    None it is 'interactive' when the call runs for an HTTP request (including
+    Step 4 batch workers, which inherit the caller's context) and 'batch'
+    otherwise, so Celery work never queues ahead of a user waiting on a page.
+
     Returns the full response text.
     """
+    if os.environ.get('LLM_GATEWAY', 'false').lower() in ('1', 'true', 'yes'):
+        # Opt-in: route through the process-wide async gateway (global and
+        # per-model concurrency, priorities, adaptive backoff).
+        from flask import has_request_context
+        from app.services.llm.gateway import gateway_completion
+        if priority is None:
+            priority = 'interactive' if has_request_context() else 'batch'
+        return gateway_completion(prompt, model=model, max_tokens=max_tokens,
+                                  temperature=temperature, priority=priority)
+
     from model_config import ModelConfig
     # Thinking-by-default models (Fable 5, Sonnet 5) spend thinking tokens from the same
     # max_tokens budget as the text, so a budget sized for the text alone truncates the
@@ -177,18 +195,22 @@ def get_llm_client():
     """
     # First check for Anthropic
     try:
-        import anthropic
+        from app.utils.llm_client_pool import get_anthropic_client
         api_key = current_app.config.get('ANTHROPIC_API_KEY') or os.getenv('ANTHROPIC_API_KEY')
         if api_key:
-            # Determine Anthropic API version using multiple methods for reliability
             try:
+                # Pooled per process: the HTTP connection pool (keep-alive, TLS)
+                # and the probes below are paid once, not on every call.
+                client = get_anthropic_client(api_key, timeout=180.0)
+                if getattr(client, 'api_version', None) is not None:
+                    return client
+
+                # Determine Anthropic API version using multiple methods for reliability
                 try:
                     anthropic_version = importlib.metadata.version("anthropic")
                 except Exception:
                     anthropic_version = "unknown"
-                        
-                client = anthropic.Anthropic(api_key=api_key, timeout=180.0)
-                
+
                 # Add version info to client for easier compatibility checks
                 # Current version structure:
                 # <0.5.0 = very old API
@@ -263,11 +285,10 @@ def get_embedding_client():
     
     # If OpenAI failed, try to use a local transformer-based embedding model
     try:
-        import torch
-        from sentence_transformers import SentenceTransformer
+        from app.services.embedding.shared_model import load_sentence_transformer
         
         # Load the model (will download if not available)
-        model = SentenceTransformer('all-MiniLM-L6-v2')
+        model = load_sentence_transformer('all-MiniLM-L6-v2', local_files_only=False)
         return model
     except (ImportError, Exception) as e:
         logger.warning("Failed to initialize local embedding model: %s", e)
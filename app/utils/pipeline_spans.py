@@ -0,0 +1,239 @@
+"""
+Lightweight timing spans for pipeline runs.
+
+``PipelineRun`` knows which steps finished and how long the whole run took,
+not where the time went inside a step. Spans fill that in:
+
+    from app.utils.pipeline_spans import span, timed, add_counts
+
+    with span('parse', concept='roles'):
+        ...
+        add_counts(bytes_written=n)
+
+    @timed('store_extraction_result')
+    def store_extraction_result(...): ...
+
+A span is only recorded inside ``record_run`` (or a task decorated with
+``recorded_task``); anywhere else -- web requests, scripts, tests -- ``span``
+is a no-op, so instrumenting a hot path costs one ContextVar lookup.
+
+Each recorded task execution is persisted as one ``PipelineRunSpan`` row:
+the span tree (name, start offset, duration, attributes, counters) plus the
+counter totals. LLM calls through the pooled Anthropic clients add
+``llm_calls`` / ``input_tokens`` / ``output_tokens`` / ``llm_seconds`` /
+``llm_queue_seconds`` to whatever span is open, so a span's LLM time can be
+told apart from parse, DB and serialization time.
+
+The current span is a ContextVar, so it follows ``contextvars.copy_context``
+into worker threads (see ``pipeline_tasks.run_extraction_parallel`` and
+``step4_synthesis.batch_executor``). PIPELINE_SPANS=false disables
+persistence.
+"""
+
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Siblings beyond this many are folded into one aggregate node per name, so
+# a step that stores thousands of entities does not persist thousands of spans.
+MAX_CHILDREN = 50
+
+_current: contextvars.ContextVar = contextvars.ContextVar('pipeline_span', default=None)
+_counts_lock = threading.Lock()
+
+
+class Span:
+    """One timed region; children are appended from any thread."""
+
+    __slots__ = ('name', 'attrs', 'started', 'wall_start', 'duration', 'counts', 'children')
+
+    def __init__(self, name: str, attrs: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.attrs = dict(attrs or {})
+        self.started = time.perf_counter()
+        self.wall_start = datetime.utcnow()
+        self.duration: Optional[float] = None
+        self.counts: Dict[str, float] = {}
+        self.children: list = []
+
+    def add(self, **counts) -> None:
+        with _counts_lock:
+            for key, value in counts.items():
+                if value:
+                    self.counts[key] = self.counts.get(key, 0) + value
+
+    def finish(self) -> None:
+        if self.duration is None:
+            self.duration = time.perf_counter() - self.started
+
+    def totals(self) -> Dict[str, float]:
+        """Counters summed over this span and all its descendants."""
+        out = dict(self.counts)
+        for child in self.children:
+            for key, value in child.totals().items():
+                out[key] = out.get(key, 0) + value
+        return out
+
+    def to_dict(self, origin: Optional[float] = None) -> Dict[str, Any]:
+        origin = self.started if origin is None else origin
+        duration = self.duration if self.duration is not None else time.perf_counter() - self.started
+        node = {
+            'name': self.name,
+            'start': round(self.started - origin, 4),
+            'duration': round(duration, 4),
+        }
+        if self.attrs:
+            node['attrs'] = self.attrs
+        if self.counts:
+            node['counts'] = dict(self.counts)
+        children = sorted(self.children, key=lambda c: c.started)
+        if len(children) > MAX_CHILDREN:
+            node['children'] = _fold(children, origin)
+        elif children:
+            node['children'] = [c.to_dict(origin) for c in children]
+        return node
+
+
+def _fold(children, origin: float) -> list:
+    """Collapse siblings into one aggregate node per name: ``count``, summed duration and summed
+    counters. The aggregate drops its members' children, so its counters are inclusive."""
+    groups: Dict[str, Dict[str, Any]] = {}
+    for child in children:
+        d = child.to_dict(origin)
+        group = groups.get(d['name'])
+        if group is None:
+            groups[d['name']] = {'name': d['name'], 'start': d['start'], 'duration': d['duration'],
+                                 'count': 1, 'counts': dict(child.totals())}
+            continue
+        group['count'] += 1
+        group['duration'] = round(group['duration'] + d['duration'], 4)
+        for key, value in child.totals().items():
+            group['counts'][key] = group['counts'].get(key, 0) + value
+    return list(groups.values())
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time the enclosed block as a child of the current span (no-op when not recording)."""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    node = Span(name, attrs)
+    parent.children.append(node)
+    token = _current.set(node)
+    try:
+        yield node
+    finally:
+        node.finish()
+        _current.reset(token)
+
+
+def timed(name: Optional[str] = None, **attrs):
+    """Decorator form of ``span``; the span name defaults to the function name."""
+    def decorator(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return fn(*args, **kwargs)
+            with span(label, **attrs):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def add_counts(**counts) -> None:
+    """Add counters (tokens, bytes, rows, ...) to the current span, if any."""
+    node = _current.get()
+    if node is not None:
+        node.add(**counts)
+
+
+@contextmanager
+def record_run(run_id: Optional[int], name: str, **attrs):
+    """Record a span tree for one task execution of ``run_id`` and persist it on exit.
+
+    Nested inside another recording (a task run inline by the full-pipeline
+    task), this is an ordinary child span and the outer recording persists.
+    LLM calls made inside are tagged with ``run_id`` and ``step=name`` for
+    ``app.utils.llm_usage``.
+    """
+    from app.utils.llm_usage import usage_context
+
+    if _current.get() is not None:
+        with usage_context(run_id=run_id, step=name), span(name, **attrs) as node:
+            yield node
+        return
+    root = Span(name, attrs)
+    token = _current.set(root)
+    try:
+        with usage_context(run_id=run_id, step=name):
+            yield root
+    except BaseException as e:
+        root.attrs['error'] = type(e).__name__
+        raise
+    finally:
+        root.finish()
+        _current.reset(token)
+        if run_id is not None:
+            _persist(run_id, root)
+
+
+def recorded_task(fn):
+    """Decorator for Celery task bodies shaped ``(self, run_id, ...)``.
+
+    The root span is named after the task (``run_step1_task`` -> ``run_step1``)
+    and carries the task's remaining scalar arguments (section_type, substep).
+    """
+    signature = inspect.signature(fn)
+    name = fn.__name__[:-len('_task')] if fn.__name__.endswith('_task') else fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        try:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+        except TypeError:
+            return fn(*args, **kwargs)  # let the task raise its own signature error
+        run_id = arguments.pop('run_id', None)
+        attrs = {k: v for k, v in arguments.items()
+                 if k != 'self' and isinstance(v, (str, int, float, bool))}
+        with record_run(run_id, name, **attrs):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def _persist(run_id: int, root: Span) -> None:
+    if os.environ.get('PIPELINE_SPANS', 'true').lower() == 'false':
+        return
+    from app.models import db
+    from app.models.pipeline_run import PipelineRunSpan
+    try:
+        db.session.add(PipelineRunSpan(
+            run_id=run_id,
+            name=root.name,
+            started_at=root.wall_start,
+            duration_seconds=root.duration,
+            totals=root.totals(),
+            spans=root.to_dict(),
+        ))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.warning(f"Could not persist timing spans for run {run_id}: {e}")
@@ -0,0 +1,39 @@
+"""
+App-private cache directories for on-disk caches that are read back with pickle.
+
+Unpickling runs arbitrary code, so a cache directory must not be writable by
+anyone but the application's own user. ``private_cache_dir`` creates the
+directory with mode 0700 under the Flask instance path (``<repo>/instance``
+when called outside an app context), refuses a directory owned by another
+user, and tightens an owned directory that grants group/other access.
+"""
+
+import os
+import stat
+from pathlib import Path
+from typing import Optional
+
+_DEFAULT_INSTANCE_PATH = Path(__file__).resolve().parents[2] / 'instance'
+
+
+def _instance_path() -> Path:
+    from flask import current_app, has_app_context
+    if has_app_context():
+        return Path(current_app.instance_path)
+    return _DEFAULT_INSTANCE_PATH
+
+
+def private_cache_dir(name: str, configured: Optional[str] = None) -> Path:
+    """Return the cache directory ``configured`` or ``<instance>/<name>``, made private.
+
+    Raises PermissionError if the directory is owned by another user; callers
+    treat that like any other cache failure and run uncached.
+    """
+    root = Path(configured) if configured else _instance_path() / name
+    root.mkdir(mode=0o700, parents=True, exist_ok=True)
+    st = root.stat()
+    if st.st_uid != os.getuid():
+        raise PermissionError(f"Cache directory {root} is not owned by this user")
+    if stat.S_IMODE(st.st_mode) & 0o077:
+        os.chmod(root, 0o700)
+    return root
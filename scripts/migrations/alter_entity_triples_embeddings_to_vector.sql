@@ -0,0 +1,48 @@
+-- SQL migration script: store entity_triples embeddings as pgvector vector(384)
+-- and index them for cosine-distance search (EmbeddingService.find_similar_triples).
+--
+-- The three embedding columns were double precision[] with no fixed length.
+-- Rows whose arrays are not all 384-dim (hosted-provider vectors, partial
+-- writes) cannot be cast; their embeddings are cleared first, so the backfill
+-- re-encodes them with the local model afterwards:
+--
+--   EmbeddingService.get_instance().backfill_triple_embeddings()
+--
+-- Run with psql outside a transaction (no -1 / --single-transaction):
+-- CREATE INDEX CONCURRENTLY cannot run inside one. Safe to re-run.
+
+CREATE EXTENSION IF NOT EXISTS vector;
+
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'entity_triples'
+          AND column_name = 'subject_embedding'
+          AND data_type = 'ARRAY'
+    ) THEN
+        -- Clear embeddings that cannot become vector(384)
+        UPDATE entity_triples
+        SET subject_embedding = NULL, predicate_embedding = NULL, object_embedding = NULL
+        WHERE coalesce(array_length(subject_embedding, 1), 384) <> 384
+           OR coalesce(array_length(predicate_embedding, 1), 384) <> 384
+           OR coalesce(array_length(object_embedding, 1), 384) <> 384;
+
+        ALTER TABLE entity_triples
+            ALTER COLUMN subject_embedding TYPE vector(384) USING subject_embedding::vector(384),
+            ALTER COLUMN predicate_embedding TYPE vector(384) USING predicate_embedding::vector(384),
+            ALTER COLUMN object_embedding TYPE vector(384) USING object_embedding::vector(384);
+    END IF;
+END
+$$;
+
+-- HNSW indexes (vector_cosine_ops serves the <=> operator)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_entity_triples_subject_embedding_hnsw
+    ON entity_triples USING hnsw (subject_embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_entity_triples_predicate_embedding_hnsw
+    ON entity_triples USING hnsw (predicate_embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_entity_triples_object_embedding_hnsw
+    ON entity_triples USING hnsw (object_embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
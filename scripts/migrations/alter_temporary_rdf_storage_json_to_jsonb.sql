@@ -0,0 +1,44 @@
+-- SQL migration script: store temporary_rdf_storage.rdf_json_ld and
+-- provenance_metadata as jsonb, so the JSON-LD key filters in
+-- TemporaryRDFStorage.typed_rdf_fields / individual_properties (->, ->>, ?|)
+-- run in SQL on the binary form.
+--
+-- The type change rewrites the table under an ACCESS EXCLUSIVE lock; run it in
+-- a quiet window. jsonb does not keep key order or duplicate keys inside
+-- documents.
+--
+-- The JSON filters need no index of their own: every reader filters on
+-- case_id and extraction_type first, which ix_temporary_rdf_storage_case_extraction
+-- (create_temporary_rdf_storage_indexes.sql) serves. The expression indexes on
+-- @type, proeth:hasAgent and section_type that the model briefly declared are
+-- dropped here if a database created them.
+--
+-- Run with psql outside a transaction (no -1 / --single-transaction):
+-- DROP INDEX CONCURRENTLY cannot run inside one. Safe to re-run.
+
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'temporary_rdf_storage'
+          AND column_name = 'rdf_json_ld'
+          AND data_type <> 'jsonb'
+    ) THEN
+        ALTER TABLE temporary_rdf_storage
+            ALTER COLUMN rdf_json_ld TYPE jsonb USING rdf_json_ld::jsonb;
+    END IF;
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'temporary_rdf_storage'
+          AND column_name = 'provenance_metadata'
+          AND data_type <> 'jsonb'
+    ) THEN
+        ALTER TABLE temporary_rdf_storage
+            ALTER COLUMN provenance_metadata TYPE jsonb USING provenance_metadata::jsonb;
+    END IF;
+END
+$$;
+
+DROP INDEX CONCURRENTLY IF EXISTS ix_temporary_rdf_storage_rdf_type;
+DROP INDEX CONCURRENTLY IF EXISTS ix_temporary_rdf_storage_rdf_agent;
+DROP INDEX CONCURRENTLY IF EXISTS ix_temporary_rdf_storage_section_type;
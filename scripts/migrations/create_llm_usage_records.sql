@@ -0,0 +1,41 @@
+-- SQL migration script: create llm_usage_records, one row per Anthropic API
+-- call (LLMUsageRecord, written in batches by app.utils.llm_usage and summed
+-- by /api/runs/<id>/usage and /api/cases/<id>/usage).
+--
+-- A deleted run keeps its usage rows with run_id cleared (ON DELETE SET NULL).
+-- Safe to re-run.
+
+CREATE TABLE IF NOT EXISTS llm_usage_records (
+    id BIGSERIAL PRIMARY KEY,
+    called_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    run_id INTEGER,
+    case_id INTEGER,
+    step VARCHAR(100),
+    concept VARCHAR(100),
+    section_type VARCHAR(50),
+    span_name VARCHAR(200),
+    source VARCHAR(20),
+    model VARCHAR(100),
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    cache_read_tokens INTEGER,
+    cache_write_tokens INTEGER,
+    cost_usd FLOAT,
+    latency_seconds FLOAT,
+    queue_seconds FLOAT,
+    error BOOLEAN,
+
+    CONSTRAINT fk_llm_usage_records_run FOREIGN KEY (run_id)
+        REFERENCES pipeline_runs (id) ON DELETE SET NULL
+);
+
+-- Usage of one run, of one case, and of a time window
+CREATE INDEX IF NOT EXISTS ix_llm_usage_records_run_id
+    ON llm_usage_records (run_id);
+CREATE INDEX IF NOT EXISTS ix_llm_usage_records_case_id
+    ON llm_usage_records (case_id);
+CREATE INDEX IF NOT EXISTS ix_llm_usage_records_called_at
+    ON llm_usage_records (called_at);
+-- Per-case usage over time
+CREATE INDEX IF NOT EXISTS ix_llm_usage_records_case_called
+    ON llm_usage_records (case_id, called_at);
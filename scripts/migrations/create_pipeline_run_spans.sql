@@ -0,0 +1,24 @@
+-- SQL migration script: create pipeline_run_spans, the per-task timing
+-- breakdown of a pipeline run (PipelineRunSpan, written by
+-- app.utils.pipeline_spans.record_run and read by /api/runs/<id>/timing).
+--
+-- Rows go with their run (ON DELETE CASCADE, matching the relationship's
+-- passive_deletes). Safe to re-run.
+
+CREATE TABLE IF NOT EXISTS pipeline_run_spans (
+    id SERIAL PRIMARY KEY,
+    run_id INTEGER NOT NULL,
+    name VARCHAR(100) NOT NULL,
+    started_at TIMESTAMP WITHOUT TIME ZONE,
+    duration_seconds FLOAT,
+    totals JSONB,
+    spans JSONB,
+    created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT fk_pipeline_run_spans_run FOREIGN KEY (run_id)
+        REFERENCES pipeline_runs (id) ON DELETE CASCADE
+);
+
+-- Spans of one run (timing endpoint, cascade deletes)
+CREATE INDEX IF NOT EXISTS ix_pipeline_run_spans_run_id
+    ON pipeline_run_spans (run_id);
@@ -0,0 +1,15 @@
+-- SQL migration script: index the per-case temporary_rdf_storage hot paths
+-- (rdf_storage_service clears and dedup, reconciliation grouping, Step 4 / QC
+-- readers, get_bulk_progress). Matches TemporaryRDFStorage.__table_args__.
+--
+-- Run with psql outside a transaction (no -1 / --single-transaction):
+-- CREATE INDEX CONCURRENTLY cannot run inside one. Safe to re-run.
+
+-- Per-case reads by extraction type; covers case_id-only filters too
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_temporary_rdf_storage_case_extraction
+    ON temporary_rdf_storage (case_id, extraction_type, storage_type, is_published);
+
+-- Draft lookups by entity type / exact label; published rows are never matched
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_temporary_rdf_storage_draft_type_label
+    ON temporary_rdf_storage (case_id, entity_type, entity_label)
+    WHERE is_published = false;
@@ -2,6 +2,8 @@ import os
 import sys
 import pytest
 from datetime import datetime
+from types import SimpleNamespace
+from sqlalchemy.dialects import postgresql
 from app import create_app, db
 from app.models.world import World
 from app.models.scenario import Scenario
@@ -430,3 +432,79 @@ def sample_case_text():
 def sample_case_id():
     """Provide a sample case ID for extraction tests."""
     return 7
+
+
+# Recording db.session for unit tests of the SQL a service builds
+
+class RecordedResult(list):
+    """Rows of a recorded statement, with the result accessors the services use."""
+
+    _attributes = {}
+
+    @property
+    def rowcount(self):
+        return len(self)
+
+    def all(self):
+        return list(self)
+
+    fetchall = all
+
+    def first(self):
+        return self[0] if self else None
+
+    def close(self):
+        pass
+
+
+class RecordingSession:
+    """Stands in for ``db.session``: records every statement instead of running it.
+
+    Each ``execute`` appends a record to ``executed`` with the ``statement``, its
+    ``kind`` (``'select'``, ``'insert'``, ...), its Postgres ``compiled`` form and
+    the executemany ``rows`` passed alongside it, and returns ``rows`` as the
+    result. ``respond(record)``, when given, returns the rows for that statement
+    instead (None for none) or raises to simulate a failed write. ``Model.query``
+    calls the scoped session to get a session, so the instance returns itself
+    when called.
+    """
+
+    dispatch = SimpleNamespace(after_bulk_delete=lambda bulk_delete: None)
+
+    def __init__(self, rows=(), respond=None):
+        self.rows = list(rows)
+        self.respond = respond
+        self.executed = []
+        self.added = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def __call__(self):
+        return self
+
+    def execute(self, statement, params=None, **kwargs):
+        record = SimpleNamespace(statement=statement, kind=statement.__visit_name__,
+                                 compiled=statement.compile(dialect=postgresql.dialect()),
+                                 rows=params)
+        self.executed.append(record)
+        rows = self.respond(record) if self.respond else self.rows
+        return RecordedResult(rows or ())
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def recording_session(monkeypatch):
+    """Install a RecordingSession as ``db.session``; call with its arguments."""
+    def install(rows=(), respond=None):
+        session = RecordingSession(rows, respond)
+        monkeypatch.setattr(db, 'session', session)
+        return session
+    return install
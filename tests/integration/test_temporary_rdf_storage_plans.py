@@ -0,0 +1,152 @@
+"""Query-plan regression tests for the temporary_rdf_storage hot queries.
+
+Builds temporary_rdf_storage (columns and indexes straight from the model) in a
+scratch schema on the test Postgres, seeds a multi-case corpus, and captures
+EXPLAIN for the queries that rdf_storage_service, reconciliation, the Step 4 /
+QC readers and get_bulk_progress issue. The statements are the ones the service
+code itself builds: each call runs against a recording session and its SQL is
+compiled for the test database. An index or query change that sends
+any of them back to a sequential scan fails here. Everything runs in one
+transaction that is rolled back; skipped when the test database is unreachable.
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import MetaData, Table, Column, Index, create_engine, text
+
+from app.models.temporary_rdf_storage import TemporaryRDFStorage
+
+pytestmark = [pytest.mark.integration, pytest.mark.db]
+
+SCHEMA = 'rdf_plan_check'
+CASES = 400
+ROWS_PER_CASE = 60
+
+def _hot_queries():
+    """name -> zero-arg call into the service code that issues the query."""
+    from app.services.entity import rdf_storage_service
+    from app.services.entity.entity_merge_service import EntityMergeService
+    from app.services.entity.entity_reconciliation_service import EntityReconciliationService
+    from app.services.pipeline_state_manager.read_model import get_bulk_progress
+    from app.services.qc import semantic_audit
+
+    def store(case_id=7):
+        # clears drafts of one extraction type, then loads the fuzzy-dedup candidates
+        return rdf_storage_service.store_extraction_results(
+            case_id, 'session-7-0', 'roles', {}, provenance_data={'section_type': 'facts'})
+
+    return {
+        # rdf_storage_service: clear drafts of one extraction type before re-extraction
+        'drafts_by_extraction_type': (store, 0),
+        # rdf_storage_service: fuzzy-dedup candidates of one entity type
+        'drafts_by_entity_type': (store, 1),
+        # EntityMergeService: exact-label match of a draft from another section
+        'draft_exact_label': (lambda: EntityMergeService().find_existing_entity(
+            7, 'Entity 7-3', 'Roles', 'session-7-0'), 0),
+        # EntityReconciliationService._group_entities
+        'reconciliation_drafts': (lambda: EntityReconciliationService()._group_entities(7), 0),
+        # Step 4 views / QC audit: published entities of one extraction type
+        'published_by_extraction_type': (lambda: semantic_audit._rows(7, 'obligations'), 0),
+        # RichAnalyzer / timeline view: Step 3 Action rows
+        'temporal_actions': (lambda: TemporaryRDFStorage.typed_rdf_fields(
+            7, 'temporal_dynamics_enhanced', 'Action', ['proeth:hasAgent'],
+            storage_type='individual'), 0),
+        # get_bulk_progress: artifact and published counts per case and type
+        'bulk_progress_artifacts': (lambda: get_bulk_progress([3, 7, 11, 19]), 0),
+        'bulk_progress_published': (lambda: get_bulk_progress([3, 7, 11, 19]), 1),
+    }
+
+
+def _one_extraction_prompt(record):
+    """Answer the prompt lookup with one prior session so the re-extraction clear is issued."""
+    if record.kind == 'select' and 'extraction_prompts' in str(record.compiled):
+        return [SimpleNamespace(extraction_session_id='session-7-1')]
+
+
+def _service_statement(conn, name, recording_session):
+    """(sql, params) of the temporary_rdf_storage statement ``name`` issues, for ``conn``."""
+    call, position = _hot_queries()[name]
+    session = recording_session(respond=_one_extraction_prompt)
+    call()
+    issued = []
+    for record in session.executed:
+        compiled = record.statement.compile(dialect=conn.dialect,
+                                            compile_kwargs={'render_postcompile': True})
+        if 'temporary_rdf_storage' in str(compiled):
+            issued.append((str(compiled), {**compiled.params, **(record.rows or {})}))
+    return issued[position]
+
+
+def _scratch_table(metadata):
+    """temporary_rdf_storage with the model's columns and indexes, minus foreign keys."""
+    source = TemporaryRDFStorage.__table__
+    table = Table(source.name, metadata,
+                  *[Column(c.name, c.type, primary_key=c.primary_key) for c in source.columns])
+    for index in source.indexes:
+        Index(index.name, *[table.c[c.name] for c in index.columns], **index.dialect_kwargs)
+    return table
+
+
+@pytest.fixture(scope='module')
+def plan_conn():
+    """A seeded scratch copy of temporary_rdf_storage on the test database, or skip."""
+    from config import TestingConfig
+    try:
+        engine = create_engine(TestingConfig.SQLALCHEMY_DATABASE_URI,
+                               connect_args={'connect_timeout': 5})
+        conn = engine.connect()
+    except Exception as exc:  # noqa: BLE001 -- missing driver or connect failure -> skip
+        pytest.skip(f"test database not reachable: {exc}")
+
+    trans = conn.begin()
+    try:
+        conn.execute(text(f'CREATE SCHEMA {SCHEMA}'))
+        conn.execute(text(f'SET LOCAL search_path TO {SCHEMA}'))
+        _scratch_table(MetaData()).create(conn)
+        conn.execute(text("""
+            INSERT INTO temporary_rdf_storage
+                (case_id, extraction_session_id, extraction_type, storage_type,
+                 entity_label, entity_type, is_published, created_at)
+            SELECT c, 'session-' || c || '-' || (n % 3),
+                   (ARRAY['roles', 'states', 'resources', 'principles', 'obligations',
+                          'constraints', 'capabilities', 'actions', 'events'])[n % 9 + 1],
+                   CASE WHEN n % 4 = 0 THEN 'class' ELSE 'individual' END,
+                   'Entity ' || c || '-' || n,
+                   (ARRAY['Roles', 'States', 'Resources', 'Principles', 'Obligations',
+                          'Constraints', 'Capabilities', 'Actions', 'Events'])[n % 9 + 1],
+                   c % 2 = 0, now()
+            FROM generate_series(1, :cases) AS c, generate_series(1, :rows) AS n
+        """), {'cases': CASES, 'rows': ROWS_PER_CASE})
+        conn.execute(text('ANALYZE temporary_rdf_storage'))
+        yield conn
+    finally:
+        trans.rollback()
+        conn.close()
+        engine.dispose()
+
+
+def _nodes(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from _nodes(child)
+
+
+def _explain(conn, sql, params):
+    row = conn.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {sql}', params).scalar()
+    plan = row if isinstance(row, list) else json.loads(row)
+    return plan[0]['Plan']
+
+
+@pytest.mark.parametrize('name', sorted(_hot_queries()))
+def test_hot_query_avoids_sequential_scan(plan_conn, recording_session, name):
+    plan = _explain(plan_conn, *_service_statement(plan_conn, name, recording_session))
+    seq_scans = [n for n in _nodes(plan)
+                 if n['Node Type'] == 'Seq Scan' and n.get('Relation Name') == 'temporary_rdf_storage']
+    assert not seq_scans, f"{name} plans a sequential scan:\n{json.dumps(plan, indent=2)}"
+
+
+def test_draft_lookups_use_the_partial_index(plan_conn, recording_session):
+    plan = _explain(plan_conn, *_service_statement(plan_conn, 'draft_exact_label', recording_session))
+    indexes = {n.get('Index Name') for n in _nodes(plan)}
+    assert 'ix_temporary_rdf_storage_draft_type_label' in indexes
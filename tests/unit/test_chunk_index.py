@@ -0,0 +1,93 @@
+"""
+Unit tests for the in-process document chunk index (app.services.embedding.chunk_index).
+"""
+
+import numpy as np
+import pytest
+
+from app.services.embedding import chunk_index
+from app.services.embedding.chunk_index import ChunkIndex
+from app.services.embedding.similarity_utils import cosine_similarity_list
+
+
+def _rows(n=60, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    return [(100 + i, i // 10, 1 if i % 2 else 2, 'guideline' if i % 3 else 'case_study', vectors[i])
+            for i in range(n)]
+
+
+def _brute_force(rows, query, k):
+    scored = sorted(((r[0], cosine_similarity_list(list(query), list(r[4]))) for r in rows),
+                    key=lambda x: x[1], reverse=True)
+    return scored[:k]
+
+
+def test_search_matches_pure_python_cosine():
+    rows = _rows()
+    index = ChunkIndex('embedding_384')
+    index.rebuild(rows)
+    queries = np.random.default_rng(1).normal(size=(3, 16))
+
+    for query, hits in zip(queries, index.search(queries, k=5)):
+        expected = _brute_force(rows, query, 5)
+        assert [h[0] for h in hits] == [e[0] for e in expected]
+        assert [h[1] for h in hits] == pytest.approx([e[1] for e in expected], abs=1e-5)
+
+
+def test_world_and_document_type_filters():
+    rows = _rows()
+    index = ChunkIndex('embedding_384')
+    index.rebuild(rows)
+    query = rows[0][4]
+
+    hits, = index.search(query, k=100, world_id=1, document_type=['guideline'])
+    allowed = {r[0] for r in rows if r[2] == 1 and r[3] == 'guideline'}
+    assert {h[0] for h in hits} == allowed
+    assert index.search(query, k=5, world_id=99) == [[]]
+
+
+def test_replace_and_remove_document():
+    rows = _rows()
+    index = ChunkIndex('embedding_384')
+    index.rebuild(rows)
+    new_vec = np.ones(16, dtype=np.float32)
+
+    index.replace_document(0, 1, 'guideline', [900, 901], [new_vec, -new_vec])
+    assert len(index) == 52  # document 0 had 10 chunks
+    hits, = index.search(new_vec, k=1)
+    assert hits[0][0] == 900 and hits[0][1] == pytest.approx(1.0)
+
+    index.remove_document(0)
+    assert 900 not in set(index.ids.tolist()) and len(index) == 50
+    # vectors of another dimension are skipped, not truncated
+    index.replace_document(7, 1, 'guideline', [950], [np.ones(8)])
+    assert 950 not in set(index.ids.tolist())
+
+
+def test_persisted_index_is_reused_until_the_table_changes(tmp_path, monkeypatch):
+    monkeypatch.setenv('CHUNK_INDEX_DIR', str(tmp_path))
+    monkeypatch.setattr(chunk_index, '_db_key', lambda: 'test')
+    rows = _rows(n=20)
+    fingerprint = [(20, 119, 1)]
+    reads = []
+    monkeypatch.setattr(chunk_index, '_db_fingerprint', lambda: fingerprint[0])
+    monkeypatch.setattr(chunk_index, '_db_rows', lambda column: reads.append(column) or rows)
+
+    chunk_index.reset_chunk_indexes()
+    first = chunk_index.get_chunk_index('embedding_384')
+    assert len(first) == 20 and reads == ['embedding_384']
+    assert list(tmp_path.glob('embedding_384-*.npz'))
+
+    # a new process loads the file and skips the rebuild while the table is unchanged
+    chunk_index.reset_chunk_indexes()
+    second = chunk_index.get_chunk_index('embedding_384')
+    assert reads == ['embedding_384']
+    assert second.search(rows[3][4], k=1)[0][0][0] == rows[3][0]
+
+    # another writer changed the table: the next check rebuilds
+    fingerprint[0] = (21, 120, 2)
+    second._checked_at = 0.0
+    chunk_index.get_chunk_index('embedding_384')
+    assert reads == ['embedding_384', 'embedding_384']
+    chunk_index.reset_chunk_indexes()
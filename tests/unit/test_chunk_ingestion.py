@@ -0,0 +1,60 @@
+"""
+Unit tests for batched chunk ingestion (EmbeddingService.ingest_chunks / _store_chunks).
+"""
+
+import pytest
+
+from app.services.embedding import chunk_index
+from app.services.embedding.embedding_service import EmbeddingService
+
+
+@pytest.fixture
+def session(monkeypatch, recording_session):
+    monkeypatch.setattr(chunk_index, '_indexes', {})
+    return recording_session()
+
+
+def _service(dim=384):
+    service = object.__new__(EmbeddingService)
+    service.embedding_dimension = dim
+    calls = []
+    service.get_embeddings = lambda texts: calls.append(len(texts)) or [[0.1] * dim for _ in texts]
+    service.embed_calls = calls
+    return service
+
+
+def test_ingest_deletes_once_and_inserts_per_batch(monkeypatch, session):
+    monkeypatch.setenv('CHUNK_INGEST_BATCH_SIZE', '64')
+    service = _service()
+    chunks = [f"chunk {i}" for i in range(150)]
+
+    assert service.ingest_chunks(7, chunks) == 150
+
+    assert service.embed_calls == [64, 64, 22]
+    kinds = [(record.kind, record.statement.table.name) for record in session.executed]
+    assert kinds == [('delete', 'document_chunks')] + [('insert', 'document_chunks')] * 3
+    inserted = [row for record in session.executed[1:] for row in record.rows]
+    assert [row['chunk_index'] for row in inserted] == list(range(150))
+    # local 384-dim vectors go to embedding_384, never the 1536-dim column
+    assert all(row['embedding'] is None and len(row['embedding_384']) == 384 for row in inserted)
+    assert session.commits == 1
+
+
+def test_store_chunks_routes_hosted_vectors_to_embedding(monkeypatch, session):
+    service = _service(dim=1536)
+    assert service._store_chunks(3, ['a', 'b'], [[0.2] * 1536, [0.3] * 1536]) == 2
+    rows = session.executed[1].rows
+    assert [len(r['embedding']) for r in rows] == [1536, 1536]
+    assert all(r['embedding_384'] is None for r in rows)
+    with pytest.raises(ValueError):
+        service._store_chunks(3, ['a'], [])
+
+
+def test_failed_embedding_batch_stores_zero_vectors(monkeypatch, session):
+    service = _service()
+
+    def broken(texts):
+        raise RuntimeError('provider down')
+
+    service.get_embeddings = broken
+    assert service.embed_documents(['x', 'y']) == [[0.0] * 384, [0.0] * 384]
@@ -0,0 +1,130 @@
+"""
+Unit tests for app.services.entity.corpus_graph (SQLite-backed corpus store).
+"""
+
+import threading
+
+import pytest
+from rdflib import Graph, Literal, URIRef
+
+from app.services.entity import corpus_graph
+
+CASE_TTL = """@prefix core: <http://proethica.org/ontology/core#> .
+@prefix proeth: <http://proethica.org/ontology/intermediate#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix case: <http://proethica.org/ontology/case/{cid}#> .
+case:Obl_A a proeth:{winner} ; rdfs:label "Duty A"@en ;
+    core:prevailsOver case:Obl_B .
+case:Obl_B a proeth:FaithfulAgentObligation ; rdfs:label \"\"\"Duty
+B\"\"\" .
+"""
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    monkeypatch.setenv('CORPUS_GRAPH_PATH', str(tmp_path / 'corpus.sqlite'))
+    monkeypatch.setenv('GRAPH_STORE_DIR', 'off')
+    corpus_graph.reset_store()
+    ont = tmp_path / 'ontologies'
+    ont.mkdir()
+    (ont / 'proethica-case-5.ttl').write_text(
+        CASE_TTL.format(cid=5, winner='PublicSafetyObligation'))
+    (ont / 'proethica-case-6.ttl').write_text(
+        CASE_TTL.format(cid=6, winner='ConfidentialityObligation'))
+    yield ont
+    corpus_graph.reset_store()
+
+
+def test_sync_is_incremental(corpus):
+    assert corpus_graph.sync_corpus(corpus) == {'ingested': 2}
+    assert corpus_graph.sync_corpus(corpus) == {'unchanged': 2}
+    (corpus / 'proethica-case-6.ttl').unlink()
+    assert corpus_graph.sync_corpus(corpus) == {'unchanged': 1, 'removed': 1}
+
+
+def test_named_graph_round_trips_terms(corpus):
+    corpus_graph.sync_corpus(corpus)
+    expected = Graph().parse(corpus / 'proethica-case-5.ttl', format='turtle')
+    stored = corpus_graph.corpus_dataset().graph(corpus_graph.case_graph_iri(5))
+    assert set(stored) == set(expected)
+    assert (URIRef('http://proethica.org/ontology/case/5#Obl_A'), None,
+            Literal('Duty A', lang='en')) in stored
+
+
+def test_cross_case_query(corpus):
+    corpus_graph.sync_corpus(corpus)
+    rows = corpus_graph.cases_where_yields('FaithfulAgentObligation')
+    assert [r['case_id'] for r in rows] == [5, 6]
+    assert rows[0]['loser_label'] == 'Duty\nB'
+    rows = corpus_graph.cases_where_yields('FaithfulAgentObligation', 'PublicSafetyObligation')
+    assert [r['case_id'] for r in rows] == [5]
+
+
+def test_sparql_graph_binding(corpus):
+    corpus_graph.sync_corpus(corpus)
+    res = corpus_graph.query("SELECT DISTINCT ?g WHERE { GRAPH ?g { ?s ?p ?o } }")
+    assert sorted(corpus_graph.case_id_from_graph(r.g) for r in res) == [5, 6]
+
+
+def test_missing_ttl_without_store_is_noop(tmp_path, monkeypatch):
+    monkeypatch.setenv('CORPUS_GRAPH_PATH', str(tmp_path / 'absent.sqlite'))
+    corpus_graph.reset_store()
+    result = corpus_graph.ingest_case(1, tmp_path / 'proethica-case-1.ttl')
+    assert result['status'] == 'missing_ttl'
+    assert not (tmp_path / 'absent.sqlite').exists()
+
+
+def _term_count():
+    store = corpus_graph.get_store()
+    with store.lock:
+        return store.connection.execute("SELECT COUNT(*) FROM terms").fetchone()[0]
+
+
+def test_recommit_and_removal_collect_orphaned_terms(corpus):
+    corpus_graph.sync_corpus(corpus)
+    baseline = _term_count()
+    ttl = corpus / 'proethica-case-6.ttl'
+    original = ttl.read_text()
+    for winner in ('HonestyObligation', 'CompetenceObligation'):
+        ttl.write_text(CASE_TTL.format(cid=6, winner=winner).replace('Duty A', f'Duty {winner}'))
+        assert corpus_graph.ingest_case(6, ttl)['status'] == 'ingested'
+    ttl.write_text(original)
+    assert corpus_graph.ingest_case(6, ttl)['status'] == 'ingested'
+    assert _term_count() == baseline
+
+    # the graph's own terms go with it; terms case 5 still uses stay
+    corpus_graph.remove_case(6)
+    assert _term_count() < baseline
+    assert len(corpus_graph.cases_where_yields('FaithfulAgentObligation')) == 1
+
+
+def test_reads_run_safely_alongside_ingest(corpus):
+    corpus_graph.sync_corpus(corpus)
+    ttl = corpus / 'proethica-case-6.ttl'
+    errors, done = [], threading.Event()
+
+    def recommit():
+        try:
+            for i in range(30):
+                ttl.write_text(CASE_TTL.format(cid=6, winner=f'Obligation{i}'))
+                corpus_graph.ingest_case(6, ttl)
+        except Exception as e:  # noqa: BLE001 -- surfaced by the assertion below
+            errors.append(e)
+        finally:
+            done.set()
+
+    def read():
+        try:
+            while not done.is_set():
+                labels = {r['loser_label'] for r in corpus_graph.cases_where_yields(
+                    'FaithfulAgentObligation')}
+                assert labels == {'Duty\nB'}
+        except Exception as e:  # noqa: BLE001
+            errors.append(e)
+
+    threads = [threading.Thread(target=recommit)] + [threading.Thread(target=read) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=60)
+    assert errors == []
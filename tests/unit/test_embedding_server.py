@@ -0,0 +1,139 @@
+"""
+Unit tests for the shared embedding server (embedding_server.py) and its
+client shim / model loader (shared_model.py).
+"""
+
+import shutil
+import sys
+import tempfile
+import threading
+import types
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.services.embedding import shared_model
+from app.services.embedding import embedding_server
+from app.services.embedding.embedding_server import EmbeddingServer
+
+
+class FakeModel:
+    """Deterministic 3-d "embeddings" with a record of every encode call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False):
+        self.calls.append(list(texts))
+        return np.array([[len(t), t.count('a'), 1.0] for t in texts], dtype=np.float32)
+
+    def get_sentence_embedding_dimension(self):
+        return 3
+
+
+@pytest.fixture
+def server():
+    # AF_UNIX paths are length-limited; pytest's tmp_path can be too long.
+    root = tempfile.mkdtemp(prefix='emb')
+    model = FakeModel()
+    srv = EmbeddingServer(str(Path(root) / 's.sock'), model_factory=lambda name: model,
+                          max_batch=64, batch_wait_ms=50)
+    srv.start()
+    srv.fake_model = model
+    yield srv
+    srv.stop()
+    shutil.rmtree(root, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def fresh_loader():
+    shared_model.reset_shared_models()
+    yield
+    shared_model.reset_shared_models()
+
+
+def test_remote_encode_matches_local_shape(server):
+    client = shared_model.RemoteSentenceTransformer(server.path, 'fake')
+    vecs = client.encode(['banana', 'kiwi'])
+    assert vecs.shape == (2, 3)
+    assert vecs[0].tolist() == [6.0, 3.0, 1.0]
+    single = client.encode('banana')
+    assert single.shape == (3,)
+    assert client.get_sentence_embedding_dimension() == 3
+    unit = client.encode(['banana'], normalize_embeddings=True)
+    assert np.isclose(np.linalg.norm(unit[0]), 1.0)
+
+
+def test_results_are_cached_across_requests(server):
+    client = shared_model.RemoteSentenceTransformer(server.path, 'fake')
+    client.encode(['alpha', 'beta'])
+    client.encode(['beta', 'alpha', 'gamma'])
+    encoded = [t for call in server.fake_model.calls for t in call]
+    assert sorted(encoded) == ['alpha', 'beta', 'gamma']
+
+
+def test_concurrent_requests_are_micro_batched(server):
+    client = shared_model.RemoteSentenceTransformer(server.path, 'fake')
+    results = {}
+
+    def worker(i):
+        results[i] = client.encode([f"text {i}"])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(results) == 8
+    assert len(server.fake_model.calls) < 8
+    assert all(results[i][0][0] == len(f"text {i}") for i in range(8))
+
+
+def test_stats_updates_wait_for_the_stats_lock(server):
+    with server._stats_lock:
+        t = threading.Thread(target=server.submit, args=('fake', []))
+        t.start()
+        t.join(0.2)
+        assert t.is_alive() and server.stats['requests'] == 0
+    t.join(5)
+    assert server.snapshot_stats()['requests'] == 1
+
+
+def test_default_socket_is_not_a_shared_tmp_name(monkeypatch, tmp_path):
+    monkeypatch.delenv('EMBEDDING_SERVER_SOCKET', raising=False)
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    assert embedding_server.socket_path() == str(tmp_path / 'proethica-embeddings.sock')
+
+    monkeypatch.delenv('XDG_RUNTIME_DIR')
+    instance = tmp_path / 'instance'
+    monkeypatch.setattr('app.utils.private_cache_dir._DEFAULT_INSTANCE_PATH', instance)
+    path = Path(embedding_server.socket_path())
+    assert path.parent == instance / 'embedding-server'
+    assert path.parent.stat().st_mode & 0o777 == 0o700
+
+    monkeypatch.setenv('EMBEDDING_SERVER_SOCKET', '/run/proethica/e.sock')
+    assert embedding_server.socket_path() == '/run/proethica/e.sock'
+
+
+def test_loader_uses_server_when_configured(server, monkeypatch):
+    monkeypatch.setenv('EMBEDDING_SERVER_SOCKET', server.path)
+    model = shared_model.load_sentence_transformer('fake')
+    assert isinstance(model, shared_model.RemoteSentenceTransformer)
+    assert model.encode('aa').tolist() == [2.0, 2.0, 1.0]
+
+
+def test_loader_shares_one_local_model_when_server_missing(monkeypatch, tmp_path):
+    monkeypatch.setenv('EMBEDDING_SERVER_SOCKET', str(tmp_path / 'missing.sock'))
+    loads = []
+
+    class FakeST:
+        def __init__(self, name, local_files_only=True, **kwargs):
+            loads.append(name)
+
+    monkeypatch.setitem(sys.modules, 'sentence_transformers',
+                        types.SimpleNamespace(SentenceTransformer=FakeST))
+    first = shared_model.load_sentence_transformer('m', device='cpu')
+    second = shared_model.load_sentence_transformer('m', device='cpu')
+    assert first is second
+    assert loads == ['m']
@@ -0,0 +1,88 @@
+"""
+Unit tests for the cache-ordered extraction prompt layout (prompt_building) and
+how _call_llm sends it.
+"""
+
+from jinja2 import Template
+
+from app.services.extraction.unified_dual_extractor import CONCEPT_CONFIG, UnifiedDualExtractor
+from app.services.extraction.unified_dual_extractor.config import build_json_wrapper_suffix
+
+TEMPLATE = ("{{ role_definition }}\n\nEXISTING ROLES IN ONTOLOGY:\n{{ existing_roles_text }}\n\n"
+            "{{ cross_concept_context }}\n\nCASE TEXT:\n{{ case_text }}\n\n{{ role_schema }}")
+
+
+class _Template:
+    def render(self, **variables):
+        return Template(TEMPLATE).render(**variables)
+
+    def render_system(self, **variables):
+        return "SYSTEM"
+
+
+def _extractor(monkeypatch, prior='', cross=''):
+    monkeypatch.setattr('app.services.prompt_variable_resolver.concept_ontology_slots',
+                        lambda concept, section: {'role_definition': 'DEF', 'role_schema': 'SCHEMA'})
+    monkeypatch.setattr('app.services.extraction.unified_dual_extractor.prompt_building.'
+                        'format_cross_concept_context', lambda concept, case_id: cross)
+    ext = object.__new__(UnifiedDualExtractor)
+    ext.concept_type = 'roles'
+    ext.config = CONCEPT_CONFIG['roles']
+    ext.template = _Template()
+    ext.injection_mode = 'full'
+    ext._format_existing_entities = lambda: 'CURATED'
+    ext._format_prior_section_classes = lambda case_id, section: prior
+    ext._format_prior_section_individuals = lambda case_id, section: ''
+    return ext
+
+
+def test_default_layout_is_unchanged(monkeypatch):
+    monkeypatch.delenv('EXTRACTION_PROMPT_CACHE_LAYOUT', raising=False)
+    ext = _extractor(monkeypatch)
+    prompt = ext._build_prompt('Engineer A did things.', 'facts', case_id=1)
+    assert prompt.index('Engineer A did things.') < prompt.index('SCHEMA')
+    assert ext._prompt_blocks is None
+    assert ext._message_content(prompt) == prompt
+
+
+def test_stable_prefix_is_identical_across_cases(monkeypatch):
+    monkeypatch.setenv('EXTRACTION_PROMPT_CACHE_LAYOUT', 'true')
+    first = _extractor(monkeypatch, prior='\nPRIOR CLASSES', cross='States: S1')
+    prompt = first._build_prompt('Case one text.', 'discussion', case_id=1)
+    stable, tail = first._prompt_blocks
+
+    assert stable['cache_control'] == {'type': 'ephemeral'}
+    assert 'cache_control' not in tail
+    assert stable['text'] + tail['text'] == prompt
+    # curated classes, definition and schema are in the cached prefix ...
+    assert all(s in stable['text'] for s in ('DEF', 'CURATED', 'SCHEMA'))
+    # ... the case-specific parts only in the tail, case text last before the JSON suffix
+    assert 'Case one' not in stable['text'] and 'PRIOR' not in stable['text']
+    assert tail['text'].endswith('CASE TEXT:\nCase one text.' + build_json_wrapper_suffix('roles'))
+    assert tail['text'].index('States: S1') < tail['text'].index('PRIOR CLASSES')
+
+    second = _extractor(monkeypatch, prior='\nOTHER', cross='States: S9')
+    second._build_prompt('A different case.', 'discussion', case_id=2)
+    assert second._prompt_blocks[0] == stable
+
+
+def test_one_hour_ttl(monkeypatch):
+    monkeypatch.setenv('EXTRACTION_PROMPT_CACHE_LAYOUT', 'true')
+    monkeypatch.setenv('EXTRACTION_PROMPT_CACHE_TTL', '1h')
+    ext = _extractor(monkeypatch)
+    ext._build_prompt('Text.', 'facts', case_id=1)
+    assert ext._prompt_blocks[0]['cache_control'] == {'type': 'ephemeral', 'ttl': '1h'}
+
+
+def test_call_llm_sends_blocks_and_tool_loop_marks_the_end(monkeypatch):
+    monkeypatch.setenv('EXTRACTION_PROMPT_CACHE_LAYOUT', 'true')
+    ext = _extractor(monkeypatch)
+    prompt = ext._build_prompt('Text.', 'facts', case_id=1)
+
+    content = ext._message_content(prompt)
+    assert [b.get('cache_control') for b in content] == [{'type': 'ephemeral'}, None]
+    marked = ext._message_content(prompt, mark_end=True)
+    assert all(b.get('cache_control') for b in marked)
+    assert 'cache_control' not in ext._prompt_blocks[1]  # blocks are copied, not mutated
+    # a prompt edited after building falls back to the plain string
+    assert ext._message_content(prompt + ' extra') == prompt + ' extra'
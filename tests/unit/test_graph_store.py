@@ -0,0 +1,92 @@
+"""
+Unit tests for app.services.entity.graph_store (shared parsed-graph store).
+"""
+
+import os
+
+import pytest
+from rdflib import Literal, URIRef
+from rdflib.namespace import RDFS
+
+from app.services.entity import graph_store
+
+TTL = """@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix ex: <http://example.org/> .
+ex:a rdfs:label "A" .
+ex:b rdfs:label "B" .
+"""
+
+
+@pytest.fixture(autouse=True)
+def isolated_store(tmp_path, monkeypatch):
+    monkeypatch.setenv('GRAPH_STORE_DIR', str(tmp_path / 'pickles'))
+    graph_store.clear_graph_store()
+    yield
+    graph_store.clear_graph_store()
+
+
+def _write(path, text, mtime_ns=None):
+    path.write_text(text)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_same_file_returns_shared_graph(tmp_path):
+    p = tmp_path / 'case.ttl'
+    _write(p, TTL)
+    g1 = graph_store.load_ttl_graph(p)
+    g2 = graph_store.load_ttl_graph(str(p))
+    assert g1 is g2
+    assert (URIRef('http://example.org/a'), RDFS.label, Literal('A')) in g1
+
+
+def test_rewritten_file_is_reparsed(tmp_path):
+    p = tmp_path / 'case.ttl'
+    _write(p, TTL, mtime_ns=1_000_000_000)
+    g1 = graph_store.load_ttl_graph(p)
+    _write(p, TTL + 'ex:c rdfs:label "C" .\n', mtime_ns=2_000_000_000)
+    g2 = graph_store.load_ttl_graph(p)
+    assert g2 is not g1
+    assert len(g2) == 3
+
+
+def test_cold_process_loads_from_pickle(tmp_path):
+    p = tmp_path / 'case.ttl'
+    _write(p, TTL)
+    graph_store.load_ttl_graph(p)
+    assert len(list((tmp_path / 'pickles').glob('*.pickle'))) == 1
+    graph_store.clear_graph_store()
+    g = graph_store.load_ttl_graph(p)
+    assert len(g) == 2
+
+
+def test_triple_bound_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setenv('GRAPH_STORE_MAX_TRIPLES', '4')
+    paths = []
+    for i in range(3):
+        p = tmp_path / f'case{i}.ttl'
+        _write(p, TTL)
+        paths.append(p)
+    g0 = graph_store.load_ttl_graph(paths[0])
+    graph_store.load_ttl_graph(paths[1])
+    graph_store.load_ttl_graph(paths[2])
+    stats = graph_store.graph_store_stats()
+    assert stats['graphs'] == 2 and stats['triples'] == 4
+    # case0 was evicted, so it comes back as a fresh object
+    assert graph_store.load_ttl_graph(paths[0]) is not g0
+
+
+def test_missing_file_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        graph_store.load_ttl_graph(tmp_path / 'nope.ttl')
+
+
+def test_foreign_owned_pickle_dir_is_not_read(tmp_path, monkeypatch):
+    p = tmp_path / 'case.ttl'
+    _write(p, TTL)
+    graph_store.load_ttl_graph(p)
+    graph_store.clear_graph_store()
+    from app.utils import private_cache_dir as pcd
+    monkeypatch.setattr(pcd.os, 'getuid', lambda: (tmp_path / 'pickles').stat().st_uid + 1)
+    monkeypatch.setattr(graph_store.pickle, 'load', lambda fh: pytest.fail('unpickled a foreign dir'))
+    assert len(graph_store.load_ttl_graph(p)) == 2
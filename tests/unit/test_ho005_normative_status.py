@@ -23,23 +23,18 @@ class _FakeIndiv:
         self.rdf_json_ld = {'properties': props}
 
 
-class _FakeQuery:
-    """Stand-in for TemporaryRDFStorage.query; returns rows by extraction_type."""
-    def __init__(self, rows_by_type):
-        self._rows = rows_by_type
-        self._kw = {}
-
-    def filter_by(self, **kw):
-        self._kw = kw
-        return self
-
-    def all(self):
-        return self._rows.get(self._kw.get('extraction_type'), [])
-
-
 def _patch_storage(monkeypatch, rows_by_type):
     class _FakeStorage:
-        query = _FakeQuery(rows_by_type)
+        @staticmethod
+        def individual_properties(case_id, extraction_type, keys):
+            """Mirror of the SQL filter: individuals carrying any of ``keys``."""
+            out = []
+            for r in rows_by_type.get(extraction_type, []):
+                props = r.rdf_json_ld.get('properties', {})
+                found = {k: props[k] for k in keys if k in props}
+                if found:
+                    out.append((r.entity_label, found))
+            return out
     monkeypatch.setattr(dps, 'TemporaryRDFStorage', _FakeStorage)
 
 
@@ -0,0 +1,96 @@
+"""
+Unit tests for incremental parsing of streamed extraction output
+(llm_json_utils.IncrementalJSONItems and UnifiedDualExtractor's on_entity).
+"""
+
+import json
+from types import SimpleNamespace
+
+from app.services.extraction.schemas import CONCEPT_MODELS
+from app.services.extraction.unified_dual_extractor import CONCEPT_CONFIG, UnifiedDualExtractor
+from app.utils.llm_json_utils import IncrementalJSONItems
+
+RESPONSE = {
+    "new_role_classes": [
+        {"label": "Engineer Role", "definition": "An engineer {with braces} and \"quotes\".",
+         "text_references": ["Engineer L did X"]},
+        {"definition": "missing label -> invalid"},
+        {"label": "Client Role", "definition": "The client.", "examples_from_case": ["the client"]},
+    ],
+    "role_individuals": [
+        {"identifier": "Engineer L", "role_class": "Engineer Role", "text_references": ["Engineer L"]},
+    ],
+}
+
+
+def _chunks(text, size=7):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_items_are_emitted_as_they_close():
+    parser = IncrementalJSONItems()
+    text = '```json\n' + json.dumps(RESPONSE)
+    chunks = _chunks(text)
+    emitted = [(i, key, item) for i, chunk in enumerate(chunks) for key, item in parser.feed(chunk)]
+    assert [(key, item) for _, key, item in emitted] == (
+        [('new_role_classes', c) for c in RESPONSE['new_role_classes']]
+        + [('role_individuals', RESPONSE['role_individuals'][0])])
+    # each item arrives with the chunk that closes it, not at the end
+    assert [i for i, _, _ in emitted] == sorted({i for i, _, _ in emitted})
+    assert emitted[0][0] < len(chunks) // 2
+
+
+def test_root_array_and_truncated_tail():
+    parser = IncrementalJSONItems()
+    assert parser.feed('[{"a": 1}, {"b": [2, {"c": "]"}]}, {"trunc') == [
+        (None, {'a': 1}), (None, {'b': [2, {'c': ']'}]})]
+    assert parser.feed('ated": ') == []
+
+
+class _FakeStreamClient:
+    def __init__(self, chunks):
+        self.seen = []
+        outer = self
+
+        class _Stream:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            @property
+            def text_stream(self):
+                for chunk in chunks:
+                    outer.seen.append(chunk)
+                    yield chunk
+
+            def get_final_message(self):
+                return SimpleNamespace(stop_reason='end_turn',
+                                       usage=SimpleNamespace(input_tokens=1, output_tokens=1))
+
+        self.messages = SimpleNamespace(stream=lambda **kw: _Stream())
+
+
+def test_call_llm_emits_validated_entities_before_the_stream_ends(monkeypatch):
+    chunks = _chunks(json.dumps(RESPONSE))
+    client = _FakeStreamClient(chunks)
+    monkeypatch.setattr('app.utils.llm_utils.get_llm_client', lambda: client)
+
+    events = []
+    ext = object.__new__(UnifiedDualExtractor)
+    ext.concept_type = 'roles'
+    ext.config = CONCEPT_CONFIG['roles']
+    ext.model_name = 'claude-sonnet-4-6'
+    ext.injection_mode = 'full'
+    ext.llm_client = None
+    ext._structured_output_schema = None
+    ext.class_model, ext.individual_model = CONCEPT_MODELS['roles']
+    ext.on_entity = lambda kind, entity: events.append((kind, entity, len(client.seen)))
+
+    raw = ext._call_llm('prompt')
+
+    assert raw == RESPONSE  # the full parse is unchanged
+    assert [(kind, getattr(e, 'label', None) or e.identifier) for kind, e, _ in events] == [
+        ('class', 'Engineer Role'), ('class', 'Client Role'), ('individual', 'Engineer L')]
+    assert events[0][2] < len(chunks) // 2
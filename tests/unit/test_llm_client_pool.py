@@ -0,0 +1,82 @@
+"""
+Unit tests for app.utils.llm_client_pool (pooled Anthropic clients + limiter).
+"""
+
+from types import SimpleNamespace
+
+import anthropic
+import pytest
+
+from app.utils import llm_client_pool as pool
+
+
+class _FakeAnthropic:
+    instances = 0
+
+    def __init__(self, **kwargs):
+        _FakeAnthropic.instances += 1
+        self.kwargs = kwargs
+
+        def create(**kw):
+            return SimpleNamespace(usage=SimpleNamespace(input_tokens=7, output_tokens=3))
+
+        self.messages = SimpleNamespace(create=create)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fake_anthropic(monkeypatch):
+    for var in ('LLM_RATE_LIMIT_RPM', 'LLM_RATE_LIMIT_INPUT_TPM', 'LLM_RATE_LIMIT_OUTPUT_TPM'):
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setattr(anthropic, 'Anthropic', _FakeAnthropic)
+    _FakeAnthropic.instances = 0
+    pool.reset_llm_client_pool()
+    yield
+    pool.reset_llm_client_pool()
+
+
+def test_client_is_reused_per_config():
+    a = pool.get_anthropic_client('key-1', timeout=180.0)
+    b = pool.get_anthropic_client('key-1', timeout=180.0)
+    c = pool.get_anthropic_client('key-1', timeout=300.0)
+    assert a is b and a is not c
+    assert _FakeAnthropic.instances == 2
+    assert 'http_client' in a.kwargs
+
+
+def test_calls_record_usage_and_latency():
+    client = pool.get_anthropic_client('key-1')
+    client.messages.create(model='m', max_tokens=100,
+                           messages=[{'role': 'user', 'content': 'x' * 400}])
+    stats = pool.llm_pool_stats()
+    assert stats['calls'] == 1 and stats['errors'] == 0
+    assert stats['input_tokens'] == 7 and stats['output_tokens'] == 3
+    assert stats['queue_wait_total'] == 0.0
+
+
+def test_token_bucket_blocks_until_refilled(monkeypatch):
+    clock = {'t': 0.0}
+    monkeypatch.setattr(pool.time, 'monotonic', lambda: clock['t'])
+
+    def fake_sleep(seconds):
+        clock['t'] += seconds
+
+    monkeypatch.setattr(pool.time, 'sleep', fake_sleep)
+    bucket = pool.TokenBucket(per_minute=60)  # 1 token/second
+    assert bucket.acquire(60) == 0.0
+    assert bucket.acquire(5) == pytest.approx(5.0)
+    # settling an over-reservation hands the tokens back
+    bucket.settle(5)
+    assert bucket.acquire(5) == 0.0
+
+
+def test_output_reservation_is_settled_to_actual_usage(monkeypatch):
+    monkeypatch.setenv('LLM_RATE_LIMIT_OUTPUT_TPM', '1000')
+    pool.reset_llm_client_pool()
+    client = pool.get_anthropic_client('key-1')
+    client.messages.create(model='m', max_tokens=900, messages=[])
+    limiter = pool.get_rate_limiter()
+    # reserved 900, used 3: the bucket is back near full
+    assert limiter.output_tokens._tokens > 990
@@ -0,0 +1,206 @@
+"""
+Unit tests for app.services.llm.gateway (async LLM gateway + sync facade).
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.llm import gateway as gw
+from app.utils import llm_client_pool
+from app.utils.llm_utils import text_from_message as gw_text
+
+
+class _Overloaded(Exception):
+    status_code = 529
+    response = SimpleNamespace(headers={'retry-after': '0'})
+
+
+class FakeAsyncClient:
+    """Records concurrency and call order; optionally fails the first N calls."""
+
+    def __init__(self, delay=0.02, fail_first=0):
+        self.delay = delay
+        self.fail_first = fail_first
+        self.active = 0
+        self.peak = 0
+        self.order = []
+        self.lock = threading.Lock()
+        self.messages = SimpleNamespace(stream=self._stream)
+
+    def _stream(self, **params):
+        client = self
+
+        class _Stream:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def get_final_message(self):
+                with client.lock:
+                    client.active += 1
+                    client.peak = max(client.peak, client.active)
+                    client.order.append(params['messages'][0]['content'])
+                    fail = client.fail_first > 0
+                    client.fail_first -= int(fail)
+                try:
+                    await asyncio.sleep(client.delay)
+                    if fail:
+                        raise _Overloaded()
+                    return SimpleNamespace(
+                        content=[SimpleNamespace(type='text', text=f"re: {params['messages'][0]['content']}")],
+                        usage=SimpleNamespace(input_tokens=5, output_tokens=5),
+                        stop_reason='end_turn')
+                finally:
+                    with client.lock:
+                        client.active -= 1
+
+        return _Stream()
+
+
+@pytest.fixture
+def make_gateway(monkeypatch):
+    monkeypatch.setenv('LLM_GATEWAY_BACKOFF_SECONDS', '0.01')
+    llm_client_pool.reset_llm_client_pool()
+    made = []
+
+    def _make(client, per_model=4, total=8):
+        monkeypatch.setenv('LLM_GATEWAY_MAX_PER_MODEL', str(per_model))
+        monkeypatch.setenv('LLM_GATEWAY_MAX_CONCURRENCY', str(total))
+        g = gw.LLMGateway(api_key='test', client=client)
+        made.append(g)
+        return g
+
+    yield _make
+    for g in made:
+        g.close()
+
+
+def test_per_model_concurrency_is_capped(make_gateway):
+    client = FakeAsyncClient()
+    g = make_gateway(client, per_model=2)
+    futures = [g.submit(f"p{i}", model='m', max_tokens=10) for i in range(6)]
+    texts = [gw_text(f.result(timeout=5)) for f in futures]
+    assert texts == [f"re: p{i}" for i in range(6)]
+    assert client.peak == 2
+
+
+def test_interactive_requests_jump_the_batch_queue(make_gateway):
+    client = FakeAsyncClient(delay=0.05)
+    g = make_gateway(client, per_model=1)
+    first = g.submit('running', model='m', max_tokens=10)
+    batch = [g.submit(f"batch{i}", model='m', max_tokens=10, priority='batch') for i in range(3)]
+    time.sleep(0.02)  # let the batch requests queue behind the running one
+    urgent = g.submit('urgent', model='m', max_tokens=10, priority='interactive')
+    for f in [first, urgent, *batch]:
+        f.result(timeout=5)
+    assert client.order[:2] == ['running', 'urgent']
+
+
+def test_overload_is_retried_and_shrinks_the_lane(make_gateway):
+    client = FakeAsyncClient(fail_first=1)
+    g = make_gateway(client, per_model=4)
+    message = g.call('hello', model='m', max_tokens=10, timeout=5)
+    assert gw_text(message) == 're: hello'
+    assert g.stats['retries'] == 1
+    assert g._lanes['m'].sem.limit == 2
+
+
+def test_non_retryable_error_propagates(make_gateway):
+    client = FakeAsyncClient()
+
+    def broken(**params):
+        raise ValueError("bad request")
+
+    client.messages = SimpleNamespace(stream=broken)
+    g = make_gateway(client)
+    with pytest.raises(ValueError):
+        g.call('x', model='m', max_tokens=10, timeout=5)
+    assert g.stats['failed'] == 1
+
+
+def test_rate_limit_wait_holds_no_concurrency_slot(make_gateway, monkeypatch):
+    g = make_gateway(FakeAsyncClient())
+    held = []
+
+    class _Limiter:
+        def acquire(self, est_in, est_out):
+            held.append((g._global.in_use, g._lanes['m'].sem.in_use))
+            return 0.0
+
+        def record(self, *args, **kwargs):
+            pass
+
+    monkeypatch.setattr(llm_client_pool, 'get_rate_limiter', lambda: _Limiter())
+    g.call('hello', model='m', max_tokens=10, timeout=5)
+    assert held == [(0, 0)]
+
+
+def test_forked_child_rebuilds_loop_and_semaphores(make_gateway, monkeypatch):
+    g = make_gateway(FakeAsyncClient())
+    g.call('parent', model='m', max_tokens=10, timeout=5)
+    parent_loop, parent_global = g._loop, g._global
+
+    monkeypatch.setattr(gw.os, 'getpid', lambda: g._pid + 1)
+    try:
+        assert gw_text(g.call('child', model='m', max_tokens=10, timeout=5)) == 're: child'
+        assert g._loop is not parent_loop and g._global is not parent_global
+    finally:
+        parent_loop.call_soon_threadsafe(parent_loop.stop)
+
+
+def test_priority_semaphore_orders_waiters():
+    async def scenario():
+        sem = gw.PrioritySemaphore(1)
+        await sem.acquire()
+        order = []
+
+        async def waiter(name, prio):
+            await sem.acquire(prio)
+            order.append(name)
+            sem.release()
+
+        tasks = [asyncio.create_task(waiter('batch', 1)),
+                 asyncio.create_task(waiter('interactive', 0))]
+        await asyncio.sleep(0)
+        sem.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ['interactive', 'batch']
+
+
+@pytest.fixture
+def routed_priorities(monkeypatch):
+    """Turn LLM_GATEWAY on and record the priority each completion is queued at."""
+    monkeypatch.setenv('LLM_GATEWAY', 'true')
+    seen = []
+
+    def fake_completion(prompt, model, max_tokens, temperature=0.1, priority='batch', timeout=None):
+        seen.append(priority)
+        return 'ok'
+
+    monkeypatch.setattr(gw, 'gateway_completion', fake_completion)
+    return seen
+
+
+def test_streaming_completion_queues_request_calls_as_interactive(routed_priorities):
+    from flask import Flask
+    from app.services.step4_synthesis.batch_executor import run_batches
+    from app.utils.llm_utils import streaming_completion
+
+    app = Flask(__name__)
+    call = lambda batch: streaming_completion(None, 'm', 10, batch)
+    with app.test_request_context():
+        streaming_completion(None, 'm', 10, 'page')
+        run_batches(call, ['a', 'b'], max_workers=2)
+    with app.app_context():
+        streaming_completion(None, 'm', 10, 'task')
+        streaming_completion(None, 'm', 10, 'task', priority='interactive')
+
+    assert routed_priorities == ['interactive'] * 3 + ['batch', 'interactive']
@@ -0,0 +1,98 @@
+"""
+Unit tests for LLM usage capture (app.utils.llm_usage).
+"""
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import llm_client_pool
+from app.utils import llm_usage
+from app.utils import pipeline_spans
+
+
+def _usage(inp=100, out=50, cache_read=0, cache_write=0):
+    return SimpleNamespace(input_tokens=inp, output_tokens=out,
+                           cache_read_input_tokens=cache_read,
+                           cache_creation_input_tokens=cache_write)
+
+
+@pytest.fixture
+def written(monkeypatch):
+    """Install a recorder whose writer collects batches instead of hitting the DB."""
+    batches = []
+    recorder = llm_usage.UsageRecorder(writer=lambda app, rows: batches.append(rows),
+                                       batch_size=3, flush_seconds=0.05)
+    recorder._app = object()
+    monkeypatch.setattr(llm_usage, '_recorder', recorder)
+    monkeypatch.setattr(llm_usage, '_recorder_pid', os.getpid())
+    monkeypatch.setattr(pipeline_spans, '_persist', lambda run_id, root: None)
+    recorder.batches = batches
+    return recorder
+
+
+def _rows(recorder):
+    recorder.flush()
+    return [row for batch in recorder.batches for row in batch]
+
+
+def test_cost_includes_cache_pricing():
+    assert llm_usage.estimate_cost('claude-sonnet-4-6', 1000, 1000) == 0.018
+    assert llm_usage.estimate_cost('claude-opus-4-8', 1_000_000, 0) == 15.0
+    # cache reads at 10% and writes at 125% of the input price
+    assert llm_usage.estimate_cost('claude-sonnet-4-6', 0, 0, 1_000_000, 1_000_000) == pytest.approx(0.3 + 3.75)
+
+
+def test_rows_carry_context_tags_and_span_name(written):
+    with pipeline_spans.record_run(12, 'run_step1'):
+        with llm_usage.usage_context(case_id=4, concept='roles', section_type='facts'):
+            with pipeline_spans.span('llm_call'):
+                llm_usage.record_llm_call('claude-sonnet-4-6', _usage(cache_read=400), latency=1.5)
+        llm_usage.record_llm_call('claude-haiku-4-5', _usage())
+
+    rows = {row['model']: row for row in _rows(written)}
+    tagged, untagged = rows['claude-sonnet-4-6'], rows['claude-haiku-4-5']
+    assert tagged['run_id'] == 12 and tagged['step'] == 'run_step1'
+    assert (tagged['case_id'], tagged['concept'], tagged['section_type']) == (4, 'roles', 'facts')
+    assert tagged['span_name'] == 'llm_call'
+    assert tagged['cache_read_tokens'] == 400 and tagged['latency_seconds'] == 1.5
+    assert untagged['concept'] is None and untagged['span_name'] == 'run_step1'
+
+
+def test_unknown_tags_are_rejected():
+    with pytest.raises(ValueError):
+        with llm_usage.usage_context(prompt='x'):
+            pass
+
+
+def test_pooled_client_calls_are_recorded(written):
+    limiter = llm_client_pool.LLMRateLimiter()
+    response = SimpleNamespace(usage=_usage(inp=10, out=5))
+    messages = llm_client_pool._LimitedMessages(
+        SimpleNamespace(create=lambda **kw: response), limiter)
+    with llm_usage.usage_context(case_id=9):
+        messages.create(model='claude-sonnet-4-6', max_tokens=100,
+                        messages=[{'role': 'user', 'content': 'hi'}])
+    row, = _rows(written)
+    assert (row['model'], row['source'], row['case_id']) == ('claude-sonnet-4-6', 'create', 9)
+    assert (row['input_tokens'], row['output_tokens']) == (10, 5)
+
+
+def test_writer_receives_bounded_batches():
+    batches = []
+    recorder = llm_usage.UsageRecorder(writer=lambda app, rows: batches.append(len(rows)),
+                                       batch_size=3, flush_seconds=0.01, max_queue=7)
+    recorder._app = object()
+    recorder._ensure_thread = lambda: None  # drain from this thread only
+    for i in range(9):
+        recorder.submit({'i': i})
+    recorder.flush()
+    assert batches == [3, 3, 1]
+    assert recorder.stats == {'queued': 7, 'written': 7, 'dropped': 2, 'batches': 3}
+
+
+def test_tracking_can_be_disabled(monkeypatch, written):
+    monkeypatch.setenv('LLM_USAGE_TRACKING', 'false')
+    llm_usage.record_llm_call('claude-sonnet-4-6', _usage())
+    assert _rows(written) == []
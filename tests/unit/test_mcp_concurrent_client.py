@@ -0,0 +1,201 @@
+"""
+Unit tests for MCPTransport concurrency: coalescing, the response cache and
+JSON-RPC batching, run against a local fake MCP server (no OntServe needed).
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services.ontserve.mcp_transport import MCPTransport, invalidate_mcp_cache
+
+
+class _FakeMCPHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, message):
+        server = self.server
+        with server.lock:
+            server.posts.append(message)
+        if message.get("method") == "initialize":
+            return {"jsonrpc": "2.0", "id": message["id"],
+                    "result": {"protocolVersion": "2024-11-05", "capabilities": {}}}
+        name = message["params"]["name"]
+        arguments = message["params"]["arguments"]
+        with server.lock:
+            server.tool_calls.append(name)
+        time.sleep(server.delay)
+        if name == "get_entities_by_category":
+            payload = {"entities": [{"label": arguments["category"], "version": server.version}]}
+        elif name == "get_entities_by_uris":
+            payload = {"entities": [{"uri": uri} for uri in arguments["uris"]], "not_found": []}
+        else:
+            server.version += 1
+            payload = {"stored": True}
+        return {"jsonrpc": "2.0", "id": message["id"],
+                "result": {"content": [{"type": "text", "text": json.dumps(payload)}]}}
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if isinstance(body, list):
+            with self.server.lock:
+                self.server.batches += 1
+            if not self.server.accept_batches:
+                self.send_response(400)
+                self.end_headers()
+                return
+            events = "".join(f"event: message\ndata: {json.dumps(self._reply(m))}\n\n" for m in body)
+        else:
+            events = f"event: message\ndata: {json.dumps(self._reply(body))}\n\n"
+        data = events.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Mcp-Session-Id", "sess-1")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _FakeMCPHandler)
+    httpd.lock = threading.Lock()
+    httpd.posts, httpd.tool_calls = [], []
+    httpd.batches, httpd.version, httpd.delay = 0, 1, 0.0
+    httpd.accept_batches = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    invalidate_mcp_cache()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+    invalidate_mcp_cache()
+
+
+def _transport(server):
+    return MCPTransport(base_url=f"http://127.0.0.1:{server.server_address[1]}", timeout=5)
+
+
+def test_identical_concurrent_calls_share_one_request(server, monkeypatch):
+    monkeypatch.setenv("ONTSERVE_MCP_CACHE_TTL", "300")
+    server.delay = 0.2
+    transport = _transport(server)
+    results = []
+
+    def call():
+        results.append(transport.call_tool("get_entities_by_category", {"category": "Role"}))
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert server.tool_calls == ["get_entities_by_category"]
+    assert len(results) == 8 and all(r == results[0] for r in results)
+    assert transport._session_id == "sess-1"
+    ids = [m["id"] for m in server.posts]
+    assert len(ids) == len(set(ids))
+
+    # served from the cache afterwards; callers get their own copy
+    results[0]["entities"].clear()
+    again = transport.call_tool("get_entities_by_category", {"category": "Role"})
+    assert again["entities"][0]["label"] == "Role"
+    assert len(server.tool_calls) == 1
+
+
+def test_write_tool_invalidates_cached_reads(server, monkeypatch):
+    monkeypatch.setenv("ONTSERVE_MCP_CACHE_TTL", "300")
+    transport = _transport(server)
+    first = transport.call_tool("get_entities_by_category", {"category": "Role"})
+    transport.call_tool("store_extracted_entities", {"entities": []})
+    second = transport.call_tool("get_entities_by_category", {"category": "Role"})
+    assert (first["entities"][0]["version"], second["entities"][0]["version"]) == (1, 2)
+
+
+def test_cache_is_off_by_default(server, monkeypatch):
+    monkeypatch.delenv("ONTSERVE_MCP_CACHE_TTL", raising=False)
+    transport = _transport(server)
+    for _ in range(2):
+        transport.call_tool("get_domain_info", {"domain_id": "engineering-ethics"})
+    assert server.tool_calls == ["get_domain_info", "get_domain_info"]
+
+
+def test_call_tools_sends_one_batch(server):
+    transport = _transport(server)
+    calls = [("get_entities_by_category", {"category": c}) for c in ("Role", "State", "Role")]
+    calls.append(("get_entities_by_uris", {"uris": ["http://x/a", "http://x/b"]}))
+
+    results = transport.call_tools(calls)
+
+    assert server.batches == 1
+    assert sorted(server.tool_calls) == ["get_entities_by_category"] * 2 + ["get_entities_by_uris"]
+    assert [r["entities"][0].get("label") or r["entities"][0]["uri"] for r in results] == [
+        "Role", "State", "Role", "http://x/a"]
+
+
+def test_call_tools_falls_back_when_batches_are_rejected(server):
+    server.accept_batches = False
+    transport = _transport(server)
+    calls = [("get_entities_by_category", {"category": c}) for c in ("Role", "State")]
+
+    assert [r["entities"][0]["label"] for r in transport.call_tools(calls)] == ["Role", "State"]
+    assert transport._batch_supported is False
+    invalidate_mcp_cache()
+    transport.call_tools(calls)
+    assert server.batches == 1  # not retried once rejected
+    assert len(server.tool_calls) == 4
+
+
+def test_enrichment_lookup_batches_uri_chunks(server):
+    from app.services.ontserve.mcp_entity_enrichment_service import MCPEntityEnrichmentService
+
+    service = MCPEntityEnrichmentService.__new__(MCPEntityEnrichmentService)
+    service._cache = {}
+    service._transport = _transport(server)
+    uris = [f"http://proethica.org/ontology/intermediate#E{i}" for i in range(45)]
+
+    found = service.lookup_entities(uris)
+
+    assert server.batches == 1 and server.tool_calls == ["get_entities_by_uris"] * 3
+    assert all(found[uri]["source"] == "mcp" for uri in uris)
+
+
+def test_interrupted_send_settles_joined_callers():
+    from app.services.ontserve import mcp_transport
+
+    transport = MCPTransport(base_url="http://127.0.0.1:9", timeout=5)
+    transport._initialized = True
+
+    def interrupted(*args):
+        raise KeyboardInterrupt
+
+    transport._send = interrupted
+    mine, job = transport._claim("get_domain_info", {"domain_id": "x"})
+    joined, no_job = transport._claim("get_domain_info", {"domain_id": "x"})
+    assert joined is mine and no_job is None
+
+    with pytest.raises(KeyboardInterrupt):
+        transport._run_jobs([job])
+
+    with pytest.raises(mcp_transport.MCPTransportError):
+        joined.result(timeout=0)
+    assert mcp_transport._inflight == {}
+
+
+def test_joined_caller_gives_up_after_wait_timeout(monkeypatch):
+    from app.services.ontserve import mcp_transport
+
+    monkeypatch.setenv("ONTSERVE_MCP_WAIT_TIMEOUT", "0.05")
+    transport = MCPTransport(base_url="http://127.0.0.1:9", timeout=5)
+    transport._initialized = True
+    transport._claim("get_domain_info", {"domain_id": "stuck"})  # never sent
+    try:
+        with pytest.raises(mcp_transport.MCPTransportError, match="did not complete"):
+            transport.call_tool("get_domain_info", {"domain_id": "stuck"})
+    finally:
+        invalidate_mcp_cache()
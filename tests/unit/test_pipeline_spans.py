@@ -0,0 +1,102 @@
+"""
+Unit tests for pipeline timing spans (app.utils.pipeline_spans).
+"""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils import pipeline_spans as ps
+
+
+@pytest.fixture
+def persisted(monkeypatch):
+    saved = []
+    monkeypatch.setattr(ps, '_persist', lambda run_id, root: saved.append((run_id, root)))
+    return saved
+
+
+def test_spans_are_noops_outside_a_recording():
+    with ps.span('outside') as node:
+        ps.add_counts(llm_calls=1)
+    assert node is None
+    assert ps.current_span() is None
+    assert ps.timed()(lambda: 42)() == 42
+
+
+def test_nested_spans_build_a_tree_with_totals(persisted):
+    @ps.timed()
+    def store_entity():
+        ps.add_counts(rows=2)
+
+    with ps.record_run(7, 'run_step1', section_type='facts'):
+        with ps.span('extract', concept='roles'):
+            ps.add_counts(llm_calls=1, input_tokens=100)
+            store_entity()
+        store_entity()
+
+    (run_id, root), = persisted
+    assert run_id == 7
+    tree = root.to_dict()
+    assert tree['name'] == 'run_step1' and tree['attrs'] == {'section_type': 'facts'}
+    assert [c['name'] for c in tree['children']] == ['extract', 'store_entity']
+    extract = tree['children'][0]
+    assert extract['attrs'] == {'concept': 'roles'}
+    assert extract['children'][0]['counts'] == {'rows': 2}
+    assert root.totals() == {'llm_calls': 1, 'input_tokens': 100, 'rows': 4}
+    assert ps.current_span() is None
+
+
+def test_copied_context_carries_the_span_into_threads(persisted):
+    def worker(i):
+        with ps.span(f"worker {i}"):
+            ps.add_counts(llm_calls=1)
+
+    with ps.record_run(1, 'parallel'):
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            for future in [executor.submit(contextvars.copy_context().run, worker, i) for i in range(3)]:
+                future.result()
+
+    root = persisted[0][1]
+    assert sorted(c.name for c in root.children) == ['worker 0', 'worker 1', 'worker 2']
+    assert root.totals() == {'llm_calls': 3}
+
+
+def test_recorded_task_names_root_and_nests_inline(persisted):
+    @ps.recorded_task
+    def run_step2_task(self, run_id, section_type='facts', options=None):
+        return ps.current_span()
+
+    @ps.recorded_task
+    def run_full_task(self, run_id):
+        return run_step2_task(self, run_id, 'discussion')
+
+    node = run_full_task(None, 3)
+    assert node.name == 'run_step2' and node.attrs == {'section_type': 'discussion'}
+    (run_id, root), = persisted
+    assert run_id == 3 and root.name == 'run_full' and root.children == [node]
+
+
+def test_errors_are_recorded_and_reraised(persisted):
+    with pytest.raises(ValueError):
+        with ps.record_run(5, 'run_commit'):
+            raise ValueError('boom')
+    assert persisted[0][1].attrs == {'error': 'ValueError'}
+
+
+def test_many_siblings_are_folded_per_name(persisted):
+    with ps.record_run(2, 'run_reconcile'):
+        for i in range(ps.MAX_CHILDREN + 10):
+            with ps.span('store' if i % 2 else 'match'):
+                ps.add_counts(rows=1)
+
+    children = persisted[0][1].to_dict()['children']
+    assert {c['name']: c['count'] for c in children} == {'match': 30, 'store': 30}
+    assert all(c['counts'] == {'rows': 30} for c in children)
+
+
+def test_persistence_can_be_disabled(monkeypatch):
+    monkeypatch.setenv('PIPELINE_SPANS', 'false')
+    with ps.record_run(9, 'run_step4'):
+        pass  # _persist returns before touching the database
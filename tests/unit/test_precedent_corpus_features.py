@@ -0,0 +1,278 @@
+"""
+Unit tests for the corpus-wide precedent feature build and the fingerprint-driven
+refresh (CaseFeatureExtractor.build_corpus_features / refresh_case_features).
+"""
+
+from types import SimpleNamespace
+import zlib
+
+import numpy as np
+import pytest
+
+from app import db
+from app.services.precedent import similarity_service
+from app.services.precedent.case_feature_extractor import (
+    CaseFeatureExtractor,
+    COMPONENT_CODES,
+    COMPONENT_EMBEDDING_COLUMNS,
+    COMPONENT_WEIGHTS,
+    aggregate_component_embeddings,
+    stale_feature_columns,
+)
+from app.services.precedent.similarity_service import PrecedentSimilarityService
+
+
+class _FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, **kwargs):
+        if isinstance(texts, str):
+            return self._vector(texts)
+        self.calls.append(list(texts))
+        return np.array([self._vector(t) for t in texts])
+
+    @staticmethod
+    def _vector(text):
+        return np.random.default_rng(zlib.crc32(text.encode())).normal(size=384)
+
+
+def _case_ids(record):
+    return [v for k, v in record.compiled.params.items() if k.startswith('case_id')]
+
+
+def _upserts(session):
+    """(sql, params, case_ids) of every single-statement upsert."""
+    return [(str(r.compiled), r.compiled.params, _case_ids(r))
+            for r in session.executed if not isinstance(r.rows, list)]
+
+
+def _updates(session):
+    """(sql, rows) of every executemany UPDATE."""
+    return [(str(r.compiled), r.rows) for r in session.executed if isinstance(r.rows, list)]
+
+
+def _failing_writes(bulk=False, case=None):
+    """respond hook: fail multi-case upserts (``bulk``) and any upsert of ``case``."""
+    def respond(record):
+        case_ids = [] if isinstance(record.rows, list) else _case_ids(record)
+        if bulk and len(case_ids) > 1 or case in case_ids:
+            raise RuntimeError('constraint violation')
+    return respond
+
+
+def _entity(case_id, extraction_type, label, entity_type=None):
+    return SimpleNamespace(case_id=case_id, extraction_type=extraction_type, entity_type=entity_type,
+                           entity_label=label, entity_definition=f'{label} definition')
+
+
+CASES = [SimpleNamespace(id=i, doc_metadata={'subject_tags': ['tag']}) for i in (1, 2, 3)]
+SECTIONS = {
+    case.id: {
+        'facts': SimpleNamespace(content=f'facts of case {case.id}', embedding=None),
+        'conclusion': SimpleNamespace(content='It was unethical for Engineer A to proceed.',
+                                      embedding=np.full(384, 0.5) if case.id == 3 else None),
+    }
+    for case in CASES
+}
+ENTITIES = {
+    case.id: [_entity(case.id, 'roles', 'Engineer A'), _entity(case.id, 'principles', 'Public Safety'),
+              _entity(case.id, 'obligations', f'Report hazard {case.id}'),
+              _entity(case.id, 'temporal_dynamics_enhanced', 'Site visit', entity_type='Actions')]
+    for case in CASES
+}
+
+
+@pytest.fixture
+def extractor(monkeypatch):
+    model = _FakeModel()
+    service = SimpleNamespace(providers={'local': {'available': True, 'model': model}}, model_name='fake')
+    extractor = CaseFeatureExtractor(embedding_service=service)
+    extractor.model = model
+    tensions = [{'entity1': 'Public Safety', 'entity2': 'Confidentiality'}]
+    monkeypatch.setattr(extractor, '_corpus_cases', lambda case_ids=None: CASES)
+    monkeypatch.setattr(extractor, '_load_corpus_inputs', lambda ids: (SECTIONS, ENTITIES))
+    monkeypatch.setattr(extractor, '_get_step4_data', lambda case_id: (tensions, [], 'transfer', 'pattern'))
+    monkeypatch.setattr(extractor, '_stored_source_hashes', lambda ids: {})
+    return extractor
+
+
+def test_corpus_build_embeds_in_batches_and_upserts_once(extractor, recording_session):
+    session = recording_session()
+
+    assert extractor.build_corpus_features() == {1: True, 2: True, 3: True}
+
+    # every distinct text embedded once, in one batched call
+    assert len(extractor.model.calls) == 1
+    texts = extractor.model.calls[0]
+    assert len(texts) == len(set(texts))
+    assert 'Engineer A: Engineer A definition' in texts
+    assert 'Public Safety. Confidentiality' in texts
+    # stored section embeddings are reused, not re-encoded
+    assert texts.count('It was unethical for Engineer A to proceed.') == 1
+
+    (sql, params, case_ids), = _upserts(session)
+    assert case_ids == [1, 2, 3] and session.commits == 1
+    assert 'ON CONFLICT (case_id) DO UPDATE' in sql
+    assert params['extraction_method_m0'] == 'component_aggregation'
+    assert len(params['embedding_p_m0']) == 384 and params['embedding_s_m0'] is None
+    assert params['conclusion_embedding_m2'] == [0.5] * 384
+
+
+def test_aggregation_matches_per_case_loop():
+    rng = np.random.default_rng(3)
+    cases = [{code: rng.normal(size=384) for code in codes}
+             for codes in (['R', 'P', 'O'], ['P'], COMPONENT_CODES, ['A', 'E', 'Cs', 'Ca'])]
+    aggregated, components = aggregate_component_embeddings(cases)
+
+    for i, case in enumerate(cases):
+        expected = sum(COMPONENT_WEIGHTS[c] * e for c, e in case.items()) / sum(COMPONENT_WEIGHTS[c] for c in case)
+        expected /= np.linalg.norm(expected)
+        assert aggregated[i] == pytest.approx(expected, abs=1e-12)
+        for code, emb in case.items():
+            assert components[i, COMPONENT_CODES.index(code)] == pytest.approx(emb / np.linalg.norm(emb))
+        missing = [j for j, code in enumerate(COMPONENT_CODES) if code not in case]
+        assert not components[i, missing].any()
+
+
+def test_failures_are_isolated_per_case(extractor, monkeypatch, recording_session):
+    session = recording_session(respond=_failing_writes(bulk=True, case=3))
+    step4 = extractor._get_step4_data
+    monkeypatch.setattr(extractor, '_get_step4_data',
+                        lambda case_id: (_ for _ in ()).throw(ValueError('bad')) if case_id == 2 else step4(case_id))
+
+    # case 2 fails while gathering, case 3 when written; case 1 still lands
+    assert extractor.build_corpus_features() == {1: True, 2: False, 3: False}
+    # the failed bulk upsert is retried case by case
+    assert [case_ids for _, _, case_ids in _upserts(session)] == [[1, 3], [1], [3]]
+
+
+def test_incremental_skips_unchanged_cases(extractor, monkeypatch, recording_session):
+    session = recording_session()
+    extractor.build_corpus_features()
+    _, params, case_ids = _upserts(session)[0]
+    hashes = {case_id: params[f'extraction_metadata_m{i}']['source_hash'] for i, case_id in enumerate(case_ids)}
+
+    hashes[2] = 'stale'
+    monkeypatch.setattr(extractor, '_stored_source_hashes', lambda ids: hashes)
+    extractor.model.calls.clear()
+    assert extractor.build_corpus_features(incremental=True) == {1: True, 2: True, 3: True}
+    assert _upserts(session)[-1][2] == [2]
+    assert all('case 1' not in t and 'case 3' not in t for t in extractor.model.calls[0])
+
+
+def _fingerprints(extractor, recording_session):
+    session = recording_session()
+    extractor.build_corpus_features()
+    _, params, case_ids = _upserts(session)[0]
+    return {case_id: params[f'extraction_metadata_m{i}']['input_fingerprints']
+            for i, case_id in enumerate(case_ids)}
+
+
+def test_stale_columns_follow_input_dependencies(extractor, recording_session):
+    old = _fingerprints(extractor, recording_session)[1]
+    assert stale_feature_columns(None, old) is None
+    assert stale_feature_columns(old, old) == set()
+
+    changed = dict(old, components=dict(old['components'], P='other'))
+    assert stale_feature_columns(old, changed) == {'embedding_p', 'combined_embedding', 'extraction_method'}
+    assert stale_feature_columns(old, dict(old, weights='other')) == {'combined_embedding', 'extraction_method'}
+    assert stale_feature_columns(old, dict(old, tension=None)) == {'embedding_tension'}
+    assert 'provisions_cited' in stale_feature_columns(old, dict(old, features='other'))
+    stale = stale_feature_columns(old, dict(old, model='other'))
+    assert {'facts_embedding', 'embedding_r', 'embedding_tension', 'combined_embedding'} <= stale
+    assert 'outcome_type' not in stale
+
+
+def test_refresh_recomputes_only_changed_inputs(extractor, monkeypatch, recording_session):
+    stored = _fingerprints(extractor, recording_session)
+    refreshed_pairs = []
+    monkeypatch.setattr(PrecedentSimilarityService, 'refresh_cached_similarities',
+                        lambda self, case_id, columns: refreshed_pairs.append((case_id, columns)))
+    monkeypatch.setattr(extractor, '_stored_fingerprints', lambda ids: {1: stored[1], 2: stored[2]})
+    entities = {**ENTITIES, 1: ENTITIES[1][:2] + [_entity(1, 'obligations', 'Disclose conflict')] + ENTITIES[1][3:]}
+    monkeypatch.setattr(extractor, '_load_corpus_inputs', lambda ids: (SECTIONS, entities))
+    session = recording_session()
+    extractor.model.calls.clear()
+
+    refreshed = extractor.refresh_case_features([1, 2, 3])
+
+    # case 1: one component changed; case 2: unchanged; case 3: no fingerprint, full row
+    assert refreshed[1] == ['combined_embedding', 'embedding_o', 'extraction_method']
+    assert refreshed[2] == []
+    assert 'facts_embedding' in refreshed[3]
+    (sql, rows), = _updates(session)
+    assert sql.startswith('UPDATE case_precedent_features SET')
+    assert set(rows[0]) == {'row_case_id', 'new_combined_embedding', 'new_embedding_o',
+                            'new_extraction_method', 'new_extraction_metadata', 'new_extracted_at'}
+    assert [case_ids for _, _, case_ids in _upserts(session)] == [[3]]
+    # only case 1's component texts and case 3's inputs were embedded
+    embedded = [t for call in extractor.model.calls for t in call]
+    assert 'Engineer A: Engineer A definition' in embedded and 'facts of case 1' not in embedded
+    assert 'Report hazard 2: Report hazard 2 definition' not in embedded
+    assert sorted(case_id for case_id, _ in refreshed_pairs) == [1, 3]
+
+
+def test_refresh_below_min_components_clears_every_component(extractor, monkeypatch, recording_session):
+    stored = _fingerprints(extractor, recording_session)
+    monkeypatch.setattr(extractor, '_stored_fingerprints', lambda ids: {1: stored[1]})
+    monkeypatch.setattr(extractor, '_corpus_cases', lambda case_ids=None: CASES[:1])
+    entities = {1: ENTITIES[1][:2]}  # two component types left, min_components is 3
+    monkeypatch.setattr(extractor, '_load_corpus_inputs', lambda ids: (SECTIONS, entities))
+    session = recording_session()
+
+    refreshed = extractor.refresh_case_features([1], refresh_similarity_cache=False)
+
+    assert COMPONENT_EMBEDDING_COLUMNS <= set(refreshed[1])
+    (_, rows), = _updates(session)
+    # same as a full rebuild: no aggregate and no component vectors
+    assert rows[0]['new_combined_embedding'] is None
+    assert all(rows[0][f'new_{column}'] is None for column in COMPONENT_EMBEDDING_COLUMNS)
+
+
+def test_refresh_cached_similarities_rewrites_affected_columns(monkeypatch):
+    service = PrecedentSimilarityService()
+    rng = np.random.default_rng(5)
+    features = {
+        case_id: dict({f'embedding_{code}': rng.normal(size=8) for code in COMPONENT_CODES},
+                      case_id=case_id, outcome_type='ethical', provisions_cited=['I.1'], subject_tags=['t'],
+                      facts_embedding=None, discussion_embedding=None, embedding_tension=None)
+        for case_id in (1, 2, 3)
+    }
+    cached = [(10, 1, 2, None, 'component'), (11, 3, 1, '{"provision_overlap": 1.0}', 'section')]
+    executed = []
+
+    def execute(statement, params=None):
+        executed.append((str(statement), params))
+        return SimpleNamespace(fetchall=lambda: cached)
+
+    monkeypatch.setattr(db, 'session', SimpleNamespace(execute=execute, commit=lambda: None))
+    monkeypatch.setattr(service, '_get_features_for_cases', lambda ids: {i: features[i] for i in ids})
+
+    assert similarity_service.affected_cache_columns(['embedding_p']) == ['component_similarity']
+    assert service.refresh_cached_similarities(1, ['embedding_p', 'extraction_method']) == 2
+
+    sql, params = executed[-1]
+    assert 'SET component_similarity = :component_similarity,' in sql and 'facts_similarity' not in sql
+    first = service._score_features(1, 2, features[1], features[2],
+                                    service.COMPONENT_AWARE_WEIGHTS, True)
+    assert params[0]['cache_id'] == 10
+    assert params[0]['component_similarity'] == pytest.approx(first.component_scores['component_similarity'])
+    assert params[0]['overall_similarity'] == pytest.approx(first.overall_similarity)
+    # section-mode pairs keep their cached weights
+    assert params[1]['overall_similarity'] == pytest.approx(1.0)
+    assert service.refresh_cached_similarities(1, ['extraction_method']) == 0
+
+
+def test_commit_time_refresh_is_opt_in(monkeypatch):
+    from app.services.commit import precedent_features
+
+    calls = []
+    monkeypatch.setattr(CaseFeatureExtractor, 'refresh_case_features',
+                        lambda self, ids: calls.append(ids) or {ids[0]: ['embedding_r']})
+    monkeypatch.setattr(CaseFeatureExtractor, '__init__', lambda self: None)
+    monkeypatch.delenv('PRECEDENT_REFRESH_ON_COMMIT', raising=False)
+    assert precedent_features.refresh_precedent_features(4) == [] and calls == []
+
+    monkeypatch.setenv('PRECEDENT_REFRESH_ON_COMMIT', 'true')
+    assert precedent_features.refresh_precedent_features(4) == ['embedding_r'] and calls == [[4]]
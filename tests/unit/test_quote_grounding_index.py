@@ -0,0 +1,109 @@
+"""
+Unit tests for the vectorized, persisted quote-grounding index (quote_grounding.py).
+"""
+
+import string
+
+import numpy as np
+import pytest
+
+from app.services.embedding.similarity_utils import cosine_similarity_list
+from app.services.extraction import quote_grounding as qg
+
+CASE = ("Engineer A was retained to design a bridge. "
+        "The client asked Engineer A to omit the load test.\n"
+        "Engineer A refused and reported the matter to the state board.")
+
+
+def _vec(text):
+    """Letter-count embedding: similar wording -> similar vectors, deterministic."""
+    low = text.lower()
+    return [float(low.count(c)) for c in string.ascii_lowercase]
+
+
+class FakeLocalService:
+    def __init__(self):
+        self.batches = []
+
+    def _get_local_embedding(self, text):
+        self.batches.append([text])
+        return _vec(text)
+
+    def _get_local_embeddings(self, texts):
+        self.batches.append(list(texts))
+        return np.array([_vec(t) for t in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    monkeypatch.setenv('GROUNDING_INDEX_DIR', str(tmp_path / 'idx'))
+    fake = FakeLocalService()
+    monkeypatch.setattr(qg, '_local_embedding_service', lambda: fake)
+    qg.build_grounding_index.cache_clear()
+    yield fake
+    qg.build_grounding_index.cache_clear()
+
+
+def test_index_is_one_batched_normalized_matrix(service):
+    index = qg.build_grounding_index(CASE)
+    assert len(service.batches) == 1 and len(service.batches[0]) == 3
+    assert index.sentence_matrix.dtype == np.float32
+    assert np.allclose(np.linalg.norm(index.sentence_matrix, axis=1), 1.0)
+
+
+def test_matrix_is_shared_through_disk(service, tmp_path):
+    first = qg.build_grounding_index(CASE)
+    qg.build_grounding_index.cache_clear()  # a fresh worker process
+    second = qg.build_grounding_index(CASE)
+    assert len(service.batches) == 1
+    assert np.array_equal(first.sentence_matrix, second.sentence_matrix)
+    assert len(list((tmp_path / 'idx').glob('*.npy'))) == 1
+
+
+def test_disk_layer_can_be_disabled(service, monkeypatch, tmp_path):
+    monkeypatch.setenv('GROUNDING_INDEX_DIR', 'off')
+    qg.build_grounding_index(CASE)
+    assert not (tmp_path / 'idx').exists()
+
+
+def test_index_dir_is_private(service, tmp_path):
+    qg.build_grounding_index(CASE)
+    assert (tmp_path / 'idx').stat().st_mode & 0o777 == 0o700
+
+
+def test_foreign_owned_index_dir_is_neither_read_nor_written(service, monkeypatch, tmp_path):
+    qg.build_grounding_index(CASE)
+    qg.build_grounding_index.cache_clear()
+    from app.utils import private_cache_dir as pcd
+    monkeypatch.setattr(pcd.os, 'getuid', lambda: (tmp_path / 'idx').stat().st_uid + 1)
+    monkeypatch.setattr(qg.np, 'load', lambda *a, **k: pytest.fail('read a foreign index dir'))
+    monkeypatch.setattr(qg.np, 'save', lambda *a, **k: pytest.fail('wrote a foreign index dir'))
+    qg.build_grounding_index(CASE)
+    assert len(service.batches) == 2  # re-embedded instead
+
+
+def test_batched_scores_match_pairwise_cosine(service):
+    index = qg.build_grounding_index(CASE)
+    quotes = ['The board received a report from Engineer A', 'zzz qqq xxx', '', 'bridge design']
+    scores = qg.quote_semantic_similarities(quotes, index)
+    sentences = qg._sentences(CASE)
+    for quote, score in zip(quotes, scores):
+        expected = max(cosine_similarity_list(_vec(quote), _vec(s)) for s in sentences) if quote else 0.0
+        assert score == pytest.approx(expected, abs=1e-5)
+    assert qg.quote_semantic_similarity(quotes[0], index) == pytest.approx(scores[0])
+
+
+def test_filter_embeds_all_undecided_quotes_in_one_batch(service):
+    index = qg.build_grounding_index(CASE)
+    items = [
+        {'label': 'verbatim', 'quotes': ['Engineer A refused and reported the matter']},
+        {'label': 'paraphrase', 'quotes': ['A reported it to the state board after refusing']},
+        {'label': 'fabricated', 'quotes': ['zzz qqq xxx vvv', 'kkk jjj']},
+    ]
+    service.batches.clear()
+    kept, dropped = qg.drop_ungrounded_entities(
+        items, lambda it: it['label'], lambda it: it['quotes'], index)
+    assert [it['label'] for it in kept] == ['verbatim', 'paraphrase']
+    assert dropped == ['fabricated']
+    assert service.batches == [['A reported it to the state board after refusing',
+                                'zzz qqq xxx vvv', 'kkk jjj']]
@@ -0,0 +1,67 @@
+"""
+Unit tests for the JSON-LD filters pushed down into SQL on temporary_rdf_storage
+(TemporaryRDFStorage.typed_rdf_fields / individual_properties and their readers).
+"""
+
+import re
+
+from app.models.temporary_rdf_storage import TemporaryRDFStorage
+from app.services.qc import semantic_audit
+from app.services.step4_synthesis.rich_analysis import RichAnalyzer
+
+
+def test_typed_fields_select_only_requested_keys(recording_session):
+    session = recording_session([('Engineer A Reports', 'proeth:Action', 'Engineer A', None)])
+
+    rows = TemporaryRDFStorage.typed_rdf_fields(
+        5, 'temporal_dynamics_enhanced', 'Action', ['proeth:hasAgent', 'proeth:violatesObligation'],
+        storage_type='individual')
+
+    assert rows == [('Engineer A Reports', {'@type': 'proeth:Action', 'proeth:hasAgent': 'Engineer A',
+                                            'proeth:violatesObligation': None})]
+    compiled = session.executed[0].compiled
+    sql = str(compiled)
+    assert re.search(r"rdf_json_ld ->> %\(rdf_json_ld_\d+\)s::TEXT\) LIKE '%%' \|\|", sql)
+    assert 'Action' in compiled.params.values()
+    assert 'temporary_rdf_storage.rdf_json_ld,' not in sql and 'rdf_json_ld FROM' not in sql
+    assert compiled.params['storage_type_1'] == 'individual'
+
+
+def test_individual_properties_filters_on_property_keys(recording_session):
+    session = recording_session([('Disclosure Obligation', ['met'], None)])
+
+    rows = TemporaryRDFStorage.individual_properties(3, 'obligations', ['complianceStatus', 'importance'])
+
+    assert rows == [('Disclosure Obligation', {'complianceStatus': ['met']})]
+    sql = str(session.executed[0].compiled)
+    assert '?| ARRAY[' in sql and "storage_type = %(storage_type_1)s" in sql
+
+
+def test_committed_action_edges_recheck_the_type(monkeypatch):
+    calls = []
+
+    def typed_rdf_fields(case_id, extraction_type, fragment, keys, storage_type=None):
+        calls.append((fragment, storage_type))
+        return [
+            ('Engineer A Reports', {'@type': 'proeth:Action', 'proeth:hasAgent': ['Engineer A'],
+                                    'proeth:fulfillsObligation': 'Public Safety Obligation'}),
+            # list-valued @type passes the SQL LIKE but not the membership test
+            ('Listed', {'@type': ['proeth:Action'], 'proeth:hasAgent': 'Engineer B'}),
+        ]
+
+    monkeypatch.setattr(TemporaryRDFStorage, 'typed_rdf_fields', staticmethod(typed_rdf_fields))
+    edges = object.__new__(RichAnalyzer)._committed_action_edges(9)
+
+    assert calls == [('Action', 'individual')]
+    (edge,) = edges.values()
+    assert edge == {'fulfills': ['Public Safety Obligation'], 'violates': [], 'guided': [],
+                    'agent': 'Engineer A'}
+
+
+def test_semantic_audit_filters_question_type_in_sql(recording_session):
+    session = recording_session([])
+
+    assert semantic_audit._rows(4, 'ethical_question', questionType='board_explicit') == []
+    compiled = session.executed[0].compiled
+    assert "temporary_rdf_storage.rdf_json_ld ->> %(rdf_json_ld_1)s" in str(compiled)
+    assert compiled.params['param_1'] == 'board_explicit'
@@ -0,0 +1,78 @@
+"""
+Batched merge planner for store_extraction_results (rdf_storage_service).
+
+The planner must make the same exact-label / semantic / designator-guard
+decisions as the per-entity path, with one candidate query and one batched
+embedding call per extraction.
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import app.services.entity.rdf_storage_service as rss
+
+VECTORS = {
+    "Public Welfare Duty": (1.0, 0.0, 0.0),
+    "Paramount Public Welfare Duty": (0.99, 0.05, 0.0),
+    "BER Case 62-21": (0.0, 1.0, 0.0),
+    "BER Case 62-7": (0.0, 0.999, 0.02),
+    "Competence Obligation": (0.0, 0.0, 1.0),
+}
+
+
+def _entity(label, definition=""):
+    e = MagicMock()
+    e.entity_label = label
+    e.entity_definition = definition
+    return e
+
+
+@pytest.fixture
+def embedder():
+    svc = MagicMock()
+    svc.get_embeddings.side_effect = lambda texts: [VECTORS[t] for t in texts]
+    svc.get_embedding.side_effect = lambda text: VECTORS[text]
+    rss._EMBED_CACHE.clear()
+    with patch.object(rss, "_embedding_service", return_value=svc):
+        yield svc
+    rss._EMBED_CACHE.clear()
+
+
+def _planner(candidates, new_labels):
+    with patch.object(rss, "TemporaryRDFStorage") as storage:
+        storage.query.filter.return_value.order_by.return_value.all.return_value = candidates
+        return rss._MergePlanner(143, "Obligations", [(label, "") for label in new_labels])
+
+
+def test_exact_label_needs_no_embedding(embedder):
+    cand = _entity("Public Welfare Duty")
+    planner = _planner([cand], ["Public Welfare Duty"])
+    assert planner.find("Public Welfare Duty") is cand
+    embedder.get_embeddings.assert_not_called()
+
+
+def test_semantic_match_and_designator_guard(embedder):
+    welfare = _entity("Paramount Public Welfare Duty")
+    citation = _entity("BER Case 62-7")
+    planner = _planner([welfare, citation], ["Public Welfare Duty", "BER Case 62-21"])
+    assert planner.find("Public Welfare Duty") is welfare
+    assert planner.find("BER Case 62-21") is None
+    # every candidate and new text embedded in a single batch
+    embedder.get_embeddings.assert_called_once()
+    assert len(embedder.get_embeddings.call_args[0][0]) == 4
+
+
+def test_entities_created_in_batch_become_candidates(embedder):
+    planner = _planner([_entity("Competence Obligation")],
+                       ["Public Welfare Duty", "Paramount Public Welfare Duty"])
+    assert planner.find("Public Welfare Duty") is None
+    created = _entity("Public Welfare Duty")
+    planner.add(created)
+    assert planner.find("Paramount Public Welfare Duty") is created
+    assert planner.find("Public Welfare Duty") is created
+
+
+def test_embedding_failure_disables_semantic_merge(embedder):
+    embedder.get_embeddings.side_effect = RuntimeError("model unavailable")
+    planner = _planner([_entity("Paramount Public Welfare Duty")], ["Public Welfare Duty"])
+    assert planner.find("Public Welfare Duty") is None
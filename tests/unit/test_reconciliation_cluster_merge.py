@@ -0,0 +1,118 @@
+"""
+Unit tests for cluster-level exact-match merges (EntityReconciliationService.merge_clusters).
+"""
+
+from types import SimpleNamespace
+
+from app.services.entity.entity_reconciliation_service import (
+    EntityReconciliationService,
+    ReconciliationResult,
+)
+
+
+def _statements(session):
+    """(kind, sql, params, executemany rows) of every recorded statement."""
+    return [(r.kind, str(r.compiled), r.compiled.params, r.rows) for r in session.executed]
+
+
+def _deadlock(record):
+    raise RuntimeError('deadlock detected')
+
+
+def _entity(entity_id, label, session_id, extraction_type='roles', props=None, published=False):
+    return SimpleNamespace(
+        id=entity_id, case_id=7, extraction_session_id=session_id, extraction_type=extraction_type,
+        storage_type='individual', ontology_target=None, entity_label=label, entity_type=None,
+        entity_definition=f'{label} definition', entity_uri=None, extraction_model=None,
+        rdf_json_ld={'label': label, 'properties': props or {}, 'source_text': f'{label} in {session_id}'},
+        provenance_metadata={}, matched_ontology_uri=None, matched_ontology_label=None,
+        match_confidence=None, match_method=None, match_reasoning=None, is_selected=True,
+        is_published=published, property_count=0, relationship_count=0,
+    )
+
+
+def _service():
+    service = EntityReconciliationService()
+    service._merge_service._section_types.update({'s-facts': 'facts', 's-disc': 'discussion'})
+    return service
+
+
+def test_exact_duplicates_merge_in_one_transaction(recording_session):
+    session = recording_session()
+    entities = [
+        _entity(1, 'Engineer A', 's-facts', props={'hasRole': ['PE']}),
+        _entity(2, 'Engineer A (Present Case)', 's-disc', props={'hasRole': ['PE', 'Consultant']}),
+        _entity(3, 'engineer a', 's-disc'),
+        _entity(4, 'Public Safety', 's-facts', extraction_type='principles'),
+        _entity(5, 'Public Safety', 's-disc', extraction_type='principles'),
+        # same label in another extraction type is a different group
+        _entity(6, 'Engineer A', 's-disc', extraction_type='obligations'),
+    ]
+    result = ReconciliationResult(case_id=7)
+
+    assert _service()._auto_merge_exact_matches(entities, result) == 3
+
+    assert [kind for kind, *_ in _statements(session)] == ['update', 'delete']
+    assert session.commits == 1
+    _, update_sql, _, rows = _statements(session)[0]
+    assert update_sql.startswith('UPDATE temporary_rdf_storage SET')
+    assert [row['row_id'] for row in rows] == [1, 4]
+    engineer = rows[0]
+    assert engineer['new_entity_label'] == 'Engineer A'
+    assert engineer['new_rdf_json_ld']['properties']['hasRole'] == ['PE', 'Consultant']
+    assert engineer['new_rdf_json_ld']['section_sources'] == ['facts', 'discussion']
+    assert engineer['new_property_count'] == 2
+    _, _, delete_params, _ = _statements(session)[1]
+    assert delete_params['id_1'] == [2, 3, 5]
+
+    # undo snapshots hold the pre-merge rows, untouched by the in-memory merge
+    (keep_snapshot, merged) = result.merge_snapshots[0]['keep'], result.merge_snapshots[0]['merged']
+    assert keep_snapshot['id'] == 1 and 'section_sources' not in keep_snapshot['rdf_json_ld']
+    assert [m['id'] for m in merged] == [2, 3]
+    assert entities[0].rdf_json_ld == {'label': 'Engineer A', 'properties': {'hasRole': ['PE']},
+                                       'source_text': 'Engineer A in s-facts'}
+    assert result.errors == []
+
+
+def test_failed_write_rolls_back_every_cluster(recording_session):
+    session = recording_session(respond=_deadlock)
+    entities = [_entity(1, 'Engineer A', 's-facts'), _entity(2, 'Engineer A', 's-disc'),
+                _entity(3, 'Client B', 's-facts'), _entity(4, 'Client B', 's-disc')]
+    result = ReconciliationResult(case_id=7)
+
+    assert _service()._auto_merge_exact_matches(entities, result) == 0
+    assert session.rollbacks == 1 and session.commits == 0
+    assert result.merge_snapshots == [] and 'deadlock detected' in result.errors[0]
+
+
+def test_published_members_are_left_out_of_their_cluster(recording_session):
+    session = recording_session()
+    merge_result = _service().merge_clusters([
+        [_entity(1, 'Engineer A', 's-facts', published=True), _entity(2, 'Engineer A', 's-disc'),
+         _entity(3, 'engineer a', 's-disc')],
+        [_entity(4, 'Client B', 's-facts'), _entity(5, 'Client B', 's-disc')],
+        [_entity(6, 'Owner', 's-facts'), _entity(7, 'Owner', 's-disc', published=True)],
+    ])
+
+    # the drafts of each cluster still merge; only the published rows are reported
+    assert merge_result['merged'] == 2 and not merge_result['success']
+    assert merge_result['errors'] == ["Cannot merge published entities: 'Engineer A'",
+                                      "Cannot merge published entities: 'Owner'"]
+    _, _, _, rows = _statements(session)[0]
+    assert [row['row_id'] for row in rows] == [2, 4]
+    assert _statements(session)[1][2]['id_1'] == [3, 5]
+
+
+def test_auto_merge_snapshots_are_recorded_as_decisions(recording_session):
+    session = recording_session()
+    result = ReconciliationResult(case_id=7, auto_merged=2)
+    keep, merged = _service()._snapshot_entity(_entity(1, 'Engineer A', 's-facts')), [
+        _service()._snapshot_entity(_entity(i, 'Engineer A', 's-disc')) for i in (2, 3)]
+    result.merge_snapshots.append({'keep': keep, 'merged': merged})
+
+    assert _service().record_auto_merges(result, SimpleNamespace(id=11)) == 1
+
+    (decision,) = session.added
+    assert (decision.run_id, decision.entity_a_id, decision.entity_b_id) == (11, 1, 2)
+    assert decision.user_decision == 'auto_merge'
+    assert decision.merge_snapshots_json == {'keep': keep, 'merged': merged}
@@ -0,0 +1,58 @@
+"""
+The hand-run SQL migrations in scripts/migrations must create every table and
+index the models declare and convert the columns they change, so a deployed
+database matches the models.
+"""
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.models.entity_triple import EntityTriple
+from app.models.llm_usage import LLMUsageRecord
+from app.models.pipeline_run import PipelineRunSpan
+from app.models.temporary_rdf_storage import TemporaryRDFStorage
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / 'scripts' / 'migrations'
+
+
+def _table_args_indexes(model):
+    """Indexes from __table_args__ (Column(index=True) ones predate these scripts)."""
+    table = model.__table__
+    column_level = {f'ix_{table.name}_{column.name}' for column in table.columns if column.index}
+    return sorted(index.name for index in table.indexes if index.name not in column_level)
+
+
+@pytest.mark.parametrize('script, model', [
+    ('alter_entity_triples_embeddings_to_vector.sql', EntityTriple),
+    ('create_temporary_rdf_storage_indexes.sql', TemporaryRDFStorage),
+])
+def test_migration_creates_the_model_indexes(script, model):
+    sql = (MIGRATIONS / script).read_text()
+    for name in _table_args_indexes(model):
+        assert f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name}\n' in sql, name
+
+
+def test_jsonb_migration_converts_every_jsonb_column():
+    sql = (MIGRATIONS / 'alter_temporary_rdf_storage_json_to_jsonb.sql').read_text()
+    for column in TemporaryRDFStorage.__table__.columns:
+        if isinstance(column.type, JSONB):
+            assert f'ALTER COLUMN {column.name} TYPE jsonb USING {column.name}::jsonb' in sql
+
+
+@pytest.mark.parametrize('script, model', [
+    ('create_pipeline_run_spans.sql', PipelineRunSpan),
+    ('create_llm_usage_records.sql', LLMUsageRecord),
+])
+def test_create_table_script_matches_the_model(script, model):
+    sql = (MIGRATIONS / script).read_text()
+    table = model.__table__
+    assert f'CREATE TABLE IF NOT EXISTS {table.name} (\n' in sql
+    for column in table.columns:
+        assert f'\n    {column.name} ' in sql, column.name
+    for fk in table.foreign_keys:
+        references = f'REFERENCES {fk.column.table.name} ({fk.column.name})'
+        assert references + (f' ON DELETE {fk.ondelete}' if fk.ondelete else '') in sql, fk
+    for index in table.indexes:
+        assert f'CREATE INDEX IF NOT EXISTS {index.name}\n' in sql, index.name
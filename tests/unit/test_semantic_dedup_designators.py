@@ -6,6 +6,7 @@ Distinct citations embed nearly identically ('BER Case 62-21' ~ 'BER Case
 cited precedents. Labels whose designator sets (case numbers, provision
 codes) differ are never merged; designator-free labels keep the old behavior.
 """
+import math
 from unittest.mock import MagicMock, patch
 
 import app.services.entity.rdf_storage_service as rss
@@ -24,13 +25,18 @@ def _match(label, cand_label, sim=0.99):
     cand.entity_label = cand_label
     cand.entity_definition = ""
     query = MagicMock()
-    query.filter.return_value.all.return_value = [cand]
+    query.filter.return_value.order_by.return_value.all.return_value = [cand]
+
+    def embed(text):
+        # the candidate sits on one axis, the new label at cosine ``sim`` to it
+        return (1.0, 0.0) if text == cand_label else (sim, math.sqrt(1 - sim * sim))
+
     with patch.object(rss, "TemporaryRDFStorage") as storage, \
-         patch.object(rss, "_embed_text", return_value=(1.0, 0.0)):
+         patch.object(rss, "_embed_text", side_effect=embed), \
+         patch.object(rss, "_embed_texts", side_effect=lambda texts: [embed(t) for t in texts]):
         storage.query = query
-        with patch("app.services.embedding.similarity_utils.cosine_similarity_list",
-                   return_value=sim):
-            return rss._find_semantic_match(143, label, "", "Resources")
+        planner = rss._MergePlanner(143, "Resources", [(label, "")])
+        return planner.find(label, "")
 
 
 def test_different_case_numbers_never_merge():
@@ -0,0 +1,84 @@
+"""
+Equivalence tests: each similarity_kernels variant against the implementation
+it stands in for, pairwise and in batched form.
+"""
+
+import numpy as np
+import pytest
+
+from app.services.defeasibility_view_service import _cosine as defeasibility_cosine
+from app.services.embedding import similarity_kernels as sk
+from app.services.embedding.section_embedding_service import SectionEmbeddingService
+from app.services.embedding.similarity_utils import cosine_similarity_list
+from app.services.extraction.edge_resolution import _cosine as edge_cosine
+from app.services.precedent.similarity_service import PrecedentSimilarityService
+from app.services.ttl_triple_association.embedding_service import EmbeddingService as TTLEmbeddingService
+
+RNG = np.random.default_rng(7)
+VECTORS = [RNG.normal(size=12) for _ in range(20)] + [np.zeros(12), -RNG.normal(size=12)]
+PAIRS = [(a, b) for a in VECTORS[:6] for b in VECTORS]
+
+precedent = object.__new__(PrecedentSimilarityService)
+section = object.__new__(SectionEmbeddingService)
+ttl = object.__new__(TTLEmbeddingService)
+
+CURRENT = {
+    'prefix': lambda a, b: cosine_similarity_list(list(a), list(b)),
+    'truncated_dot': lambda a, b: edge_cosine(list(a), list(b)),
+    'raw': defeasibility_cosine,
+    'strict': precedent._cosine_similarity,
+    'clamped': section.calculate_similarity,
+}
+
+
+@pytest.mark.parametrize('variant', sk.VARIANTS)
+def test_pairwise_matches_current_implementation(variant):
+    for a, b in PAIRS:
+        assert sk.cosine(a, b, variant) == pytest.approx(CURRENT[variant](a, b), abs=1e-12)
+
+
+@pytest.mark.parametrize('variant', sk.VARIANTS)
+def test_batched_forms_match_pairwise(variant):
+    queries, items = np.array(VECTORS[:4]), np.array(VECTORS)
+    expected = np.array([[CURRENT[variant](q, m) for m in items] for q in queries])
+
+    assert sk.cosine_matrix(queries, items, variant) == pytest.approx(expected, abs=1e-6)
+    assert sk.cosine_matrix(queries, items, variant, dtype=np.float64) == pytest.approx(expected, abs=1e-12)
+    assert sk.cosine_one_to_many(queries[1], items, variant) == pytest.approx(expected[1], abs=1e-6)
+
+    by_sort = sorted(range(len(items)), key=lambda i: expected[0][i], reverse=True)[:5]
+    assert [i for i, _ in sk.top_k(queries[0], items, 5, variant, dtype=np.float64)] == by_sort
+    assert [[i for i, _ in hits] for hits in sk.top_k_many(queries, items, 3, variant)] == [
+        sorted(range(len(items)), key=lambda i: row[i], reverse=True)[:3] for row in expected]
+
+
+def test_ttl_compute_similarity_is_the_clamped_variant():
+    for a, b in PAIRS:
+        assert sk.cosine(a, b, 'clamped') == pytest.approx(ttl.compute_similarity(a, b), abs=1e-9)
+
+
+def test_length_mismatch_and_missing_vectors():
+    a, b = [1.0, 2.0, 3.0], [1.0, 2.0]
+    assert sk.cosine(a, b, 'prefix') == pytest.approx(cosine_similarity_list(a, b))
+    assert sk.cosine(a, b, 'truncated_dot') == pytest.approx(edge_cosine(a, b))
+    assert sk.cosine(a, b, 'strict') == precedent._cosine_similarity(np.array(a), np.array(b)) == 0.0
+    assert sk.cosine(None, b, 'strict') == 0.0
+    for variant in ('raw', 'clamped'):
+        with pytest.raises(ValueError):
+            sk.cosine(a, b, variant)
+    assert sk.cosine([], b, 'raw') == 0.0
+
+    # ragged item lists are scored pair by pair under the same rules
+    items = [b, a, None]
+    assert list(sk.cosine_one_to_many(a, items, 'strict')) == pytest.approx(
+        [precedent._cosine_similarity(np.array(a), None if i is None else np.array(i)) for i in items])
+    assert list(sk.cosine_one_to_many(a, [b, a], 'prefix', dtype=np.float64)) == pytest.approx(
+        [cosine_similarity_list(a, i) for i in (b, a)])
+    assert sk.cosine_matrix([a], [b], 'truncated_dot', dtype=np.float64)[0, 0] == pytest.approx(edge_cosine(a, b))
+
+
+def test_ties_keep_input_order_and_threshold_filters():
+    items = [[1.0, 0.0], [0.0, 1.0], [1.0, 0.0], [2.0, 0.0]]
+    assert sk.top_k([1.0, 0.0], items, 3) == [(0, 1.0), (2, 1.0), (3, 1.0)]
+    assert sk.top_k([0.0, 1.0], items, 4, threshold=0.5) == [(1, 1.0)]
+    assert sk.top_k([1.0, 0.0], [], 3) == []
@@ -0,0 +1,162 @@
+"""
+Unit tests for concurrent Step 4 batch execution (batch_executor.run_batches)
+and its use in RichAnalyzer / QuestionAnalyzer / ConclusionAnalyzer.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from flask import Flask, current_app
+
+from app.services.step4_synthesis import batch_executor, rich_analysis
+from app.services.step4_synthesis.batch_executor import run_batches
+from app.services.step4_synthesis.case_synthesis_models import LLMTrace
+from app.services.step4_synthesis.conclusion_analyzer import ConclusionAnalyzer
+from app.services.step4_synthesis.question_analyzer import QuestionAnalyzer
+from app.services.step4_synthesis.rich_analysis import RichAnalyzer
+
+
+def test_results_keep_batch_order_and_run_concurrently(monkeypatch):
+    monkeypatch.setenv('STEP4_BATCH_CONCURRENCY', '4')
+    active, peak = [0], [0]
+    lock = threading.Lock()
+    all_started = threading.Barrier(4, timeout=5)  # raises if the batches ran one at a time
+
+    def work(i):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        all_started.wait()
+        time.sleep(0.01 * (4 - i))  # later batches finish first
+        with lock:
+            active[0] -= 1
+        return i * 10
+
+    assert run_batches(work, range(4)) == [0, 10, 20, 30]
+    assert peak[0] == 4
+
+
+def test_concurrency_of_one_runs_inline(monkeypatch):
+    monkeypatch.setenv('STEP4_BATCH_CONCURRENCY', '1')
+    threads = set()
+    run_batches(lambda i: threads.add(threading.current_thread()), range(3))
+    assert threads == {threading.current_thread()}
+    assert batch_executor.batch_concurrency() == 1
+
+
+def test_workers_inherit_the_flask_app_context():
+    app = Flask('step4-test')
+    with app.app_context():
+        names = run_batches(lambda i: current_app.name, range(3), max_workers=3)
+    assert names == ['step4-test'] * 3
+
+
+def test_rich_analysis_merges_traces_in_batch_order(monkeypatch):
+    monkeypatch.setenv('STEP4_BATCH_CONCURRENCY', '4')
+    shared_client = object()
+    analyzer = RichAnalyzer(llm_client=shared_client)
+
+    def fake_batch(batch, batch_start, foundation, traces, client=None):
+        assert client is shared_client
+        time.sleep(0.01 * (20 - batch_start) / 5)  # reverse completion order
+        traces.append(LLMTrace(phase=2, phase_name='x', stage=f"batch {batch_start}",
+                               prompt='p', response='r', model='m'))
+        return [f"link {a}" for a in batch]
+
+    monkeypatch.setattr(analyzer, '_analyze_causal_batch', fake_batch)
+    foundation = type('F', (), {'actions': list(range(17))})()
+    traces = [LLMTrace(phase=1, phase_name='x', stage='earlier', prompt='', response='', model='m')]
+
+    links = analyzer.analyze_causal_normative_links(foundation, traces)
+
+    assert links == [f"link {a}" for a in range(17)]
+    assert [t.stage for t in traces] == ['earlier', 'batch 0', 'batch 5', 'batch 10', 'batch 15']
+
+
+
+class _FakeAnthropic:
+    """Answers each streamed prompt with one resolution pattern per listed conclusion."""
+
+    def __init__(self):
+        self.prompts = []
+        self.messages = self
+
+    @contextmanager
+    def stream(self, messages, **kwargs):
+        prompt = messages[0]['content']
+        self.prompts.append(prompt)
+        patterns = [{'conclusion_index': i + 1, 'answers_questions': [1], 'cited_provisions': [1]}
+                    for i in range(prompt.count('\nC') + 1)]
+        text = SimpleNamespace(type='text', text=json.dumps(patterns))
+        yield SimpleNamespace(get_final_message=lambda: SimpleNamespace(content=[text]))
+
+
+def test_resolution_patterns_run_end_to_end_on_the_shared_client(monkeypatch):
+    monkeypatch.setenv('STEP4_BATCH_CONCURRENCY', '2')
+    monkeypatch.delenv('LLM_GATEWAY', raising=False)
+    monkeypatch.setattr(rich_analysis, 'get_step4_template', lambda name: SimpleNamespace(
+        render=lambda conclusions_text, **kwargs: conclusions_text))
+    client = _FakeAnthropic()
+    analyzer = RichAnalyzer(llm_client=client)
+    conclusions = [{'uri': f'case:C{i}', 'text': f'conclusion {i}'} for i in range(7)]
+    traces = []
+
+    patterns = analyzer.analyze_resolution_patterns(
+        conclusions, [{'uri': 'case:Q1'}], [{'code': 'II.1.a'}], None, traces)
+
+    assert [p.conclusion_uri for p in patterns] == [c['uri'] for c in conclusions]
+    assert patterns[0].answers_questions == ['case:Q1'] and patterns[0].cited_provisions == ['II.1.a']
+    assert len(client.prompts) == 2
+    assert [t.stage for t in traces] == ['Resolution Patterns (batch 1)', 'Resolution Patterns (batch 2)']
+
+
+def _run_analytical(analyzer, generate, delays):
+    calls = []
+
+    def fake_prompt(*args, categories):
+        return '+'.join(categories)
+
+    def fake_call(prompt, all_entities, desc):
+        calls.append(prompt)
+        time.sleep(delays[prompt])
+        return {cat: [f"{cat} item"] for cat in prompt.split('+')}, f"response {prompt}"
+
+    analyzer._create_analytical_prompt = fake_prompt
+    analyzer._call_analytical_batch = fake_call
+    return generate(), calls
+
+
+def test_question_analytical_batches_merge_in_order(monkeypatch):
+    monkeypatch.setenv('STEP4_BATCH_CONCURRENCY', '4')
+    analyzer = QuestionAnalyzer(llm_client=object())
+    result, calls = _run_analytical(
+        analyzer,
+        lambda: analyzer._generate_analytical_questions([], {}, [], '', ''),
+        {'implicit+principle_tension': 0.05, 'theoretical+counterfactual': 0.0},
+    )
+    assert result['implicit'] == ['implicit item']
+    assert result['counterfactual'] == ['counterfactual item']
+    assert analyzer.last_response.index('response implicit') < analyzer.last_response.index(
+        'response theoretical')
+
+
+def test_conclusion_analytical_failed_batch_is_skipped(monkeypatch):
+    monkeypatch.setenv('STEP4_BATCH_CONCURRENCY', '4')
+    analyzer = ConclusionAnalyzer(llm_client=object())
+    analyzer._create_analytical_prompt = lambda *a, categories: categories[0]
+
+    def fake_call(prompt, all_entities, desc):
+        if prompt == 'question_response':
+            return {}, None
+        return {prompt: [prompt]}, f"response {prompt}"
+
+    analyzer._call_analytical_batch = fake_call
+    result = analyzer._generate_analytical_conclusions([], {}, [], [], [], '')
+    assert result == {'analytical_extension': ['analytical_extension'],
+                      'question_response': [],
+                      'principle_synthesis': ['principle_synthesis']}
+    assert analyzer.last_response == ('response analytical_extension\n\n--- ANALYTICAL RESPONSE '
+                                      '(principle synthesis) ---\nresponse principle_synthesis')
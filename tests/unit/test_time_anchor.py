@@ -55,3 +55,13 @@ def test_idempotent(tmp_path):
     g = Graph(); g.parse(str(p), format="turtle")
     # exactly one time entity per happening
     assert len(list(g.objects(CASE["Notification_Consent"], TIME.hasTime))) == 1
+
+
+def test_write_back_uses_the_deterministic_writer(tmp_path):
+    from app.services.commit.turtle_writer import write_turtle
+    p = _graph(tmp_path)
+    apply_time_anchors(15, p, write_back=True)
+    g = Graph(); g.parse(str(p), format="turtle")
+    again = tmp_path / "again.ttl"
+    write_turtle(g, again)
+    assert p.read_bytes() == again.read_bytes()
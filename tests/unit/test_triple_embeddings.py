@@ -0,0 +1,98 @@
+"""
+Unit tests for EntityTriple embedding backfill and similarity search (EmbeddingService).
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.embedding.embedding_service import EmbeddingService
+
+
+def _triple(i, subject='s', is_literal=False, obj=None):
+    return SimpleNamespace(id=i, subject=f'{subject}{i % 3}', predicate='p', object_literal=obj,
+                           object_uri=f'o{i}', is_literal=is_literal)
+
+
+def _triple_session(recording_session, rows):
+    """Serve ``rows`` to SELECTs in id order (keyset pages); UPDATEs return nothing."""
+    def respond(record):
+        if record.kind == 'update':
+            return None
+        params = record.compiled.params
+        last_id = next((v for k, v in params.items() if k.startswith('id_')), 0)
+        return [r for r in rows if r.id > last_id][:params['param_1']]
+    return recording_session(respond=respond)
+
+
+def _updates(session):
+    return [r.rows for r in session.executed if r.kind == 'update']
+
+
+def _selects(session):
+    return [r.compiled for r in session.executed if r.kind == 'select']
+
+
+def _service(dim=384):
+    service = object.__new__(EmbeddingService)
+    service.embedding_dimension = dim
+    calls = []
+    service.get_embeddings = lambda texts: calls.append(list(texts)) or [[float(len(t))] * dim for t in texts]
+    service.embed_calls = calls
+    return service
+
+
+def test_backfill_encodes_distinct_texts_once_per_batch(monkeypatch, recording_session):
+    monkeypatch.setenv('TRIPLE_EMBEDDING_BATCH_SIZE', '4')
+    session = _triple_session(recording_session, [_triple(i) for i in range(1, 11)])
+    service = _service()
+
+    assert service.backfill_triple_embeddings() == 10
+
+    # three batches (4, 4, 2), each one encode of its distinct texts
+    assert [len(batch) for batch in _updates(session)] == [4, 4, 2]
+    assert len(service.embed_calls) == 3
+    assert all(len(texts) == len(set(texts)) for texts in service.embed_calls)
+    assert service.embed_calls[0].count('p') == 1
+    assert session.commits == 3
+    row = _updates(session)[0][0]
+    assert row['triple_id'] == 1 and len(row['new_object_embedding']) == 384
+    # object text of a URI triple is its object_uri
+    assert row['new_object_embedding'][0] == float(len('o1'))
+
+
+def test_backfill_respects_limit_and_filters(recording_session):
+    session = _triple_session(recording_session, [_triple(i) for i in range(1, 11)])
+
+    assert _service().batch_update_embeddings(triple_ids=[1, 2, 3], limit=3) == 3
+    sql = str(_selects(session)[0])
+    assert 'entity_triples.subject_embedding IS NULL' in sql and 'entity_triples.id IN' in sql
+
+    session = _triple_session(recording_session, [_triple(i) for i in range(1, 4)])
+    _service().backfill_triple_embeddings(world_id=5)
+    assert 'entity_triples.world_id =' in str(_selects(session)[0])
+
+
+def test_vectors_of_another_dimension_are_not_written(recording_session):
+    session = _triple_session(recording_session, [_triple(i) for i in range(1, 4)])
+    service = _service(dim=1536)
+
+    assert service.backfill_triple_embeddings() == 0
+    assert _updates(session) == []
+    assert service.generate_triple_embeddings(_triple(1)) == dict.fromkeys(
+        ('subject_embedding', 'predicate_embedding', 'object_embedding'))
+
+
+def test_find_similar_triples_binds_the_query_vector(recording_session):
+    session = recording_session([SimpleNamespace(id=1, subject='s', predicate='p', object_literal=None,
+                                                 object_uri='o', is_literal=False, world_id=2,
+                                                 distance=0.25)])
+    results = _service().find_similar_triples('query text', field='object', limit=5, world_id=2)
+
+    assert results == [{'id': 1, 'subject': 's', 'predicate': 'p', 'object': 'o', 'is_literal': False,
+                        'world_id': 2, 'similarity': 0.75}]
+    compiled = session.executed[0].compiled
+    assert 'entity_triples.object_embedding <=> %(object_embedding_1)s' in str(compiled)
+    assert len(compiled.params['object_embedding_1']) == 384
+    with pytest.raises(ValueError):
+        _service().find_similar_triples('x', field='graph')
@@ -0,0 +1,75 @@
+"""
+Unit tests for app.services.entity.triple_index.TripleIndex.
+
+Every query shape is checked against rdflib on the same graph, so the index is a
+drop-in for the Graph read API the case-view builders use.
+"""
+
+import itertools
+
+import pytest
+from rdflib import Graph, Literal, Namespace, RDF, RDFS, URIRef
+
+from app.services.entity.triple_index import TripleIndex
+from app.services.defeasibility_view_service import _entity_index
+
+CORE = Namespace("http://proethica.org/ontology/core#")
+CASE = Namespace("http://proethica.org/ontology/case/5#")
+SKOS_DEF = URIRef("http://www.w3.org/2004/02/skos/core#definition")
+
+
+@pytest.fixture
+def graph():
+    g = Graph()
+    g.add((CASE.Obl_A, RDF.type, CORE.Obligation))
+    g.add((CASE.Obl_A, RDFS.label, Literal("Duty A")))
+    g.add((CASE.Obl_A, SKOS_DEF, Literal("Protect the public.")))
+    g.add((CASE.Obl_A, CORE.prevailsOver, CASE.Obl_B))
+    g.add((CASE.Obl_B, RDF.type, CORE.Obligation))
+    g.add((CASE.Obl_B, RDFS.label, Literal("Duty B")))
+    g.add((CASE.Agent_1, RDF.type, CORE.Agent))
+    g.add((CASE.Agent_1, RDFS.label, Literal("Engineer A")))
+    g.add((CASE.Agent_1, CORE.hasObligation, CASE.Obl_A))
+    return g
+
+
+def _patterns(g):
+    triples = list(g)
+    yield (None, None, None)
+    for s, p, o in triples:
+        yield from itertools.product((s, None), (p, None), (o, None))
+
+
+def test_triples_match_rdflib_for_every_pattern(graph):
+    index = TripleIndex.from_graph(graph)
+    assert len(index) == len(graph)
+    for pattern in _patterns(graph):
+        assert sorted(index.triples(pattern)) == sorted(graph.triples(pattern)), pattern
+
+
+def test_unknown_term_matches_nothing(graph):
+    index = TripleIndex.from_graph(graph)
+    assert list(index.subjects(RDF.type, CORE.Missing)) == []
+    assert (CASE.Obl_A, RDFS.label, Literal("nope")) not in index
+    assert (CASE.Obl_A, RDFS.label, Literal("Duty A")) in index
+
+
+def test_graph_read_api(graph):
+    index = TripleIndex.from_graph(graph)
+    assert sorted(index.subjects(RDF.type, CORE.Obligation)) == [CASE.Obl_A, CASE.Obl_B]
+    assert list(index.objects(CASE.Agent_1, CORE.hasObligation)) == [CASE.Obl_A]
+    assert index.value(CASE.Obl_B, RDFS.label) == Literal("Duty B")
+    assert index.value(CASE.Obl_B, CORE.prevailsOver) is None
+    assert sorted(index.predicates()) == sorted(set(graph.predicates()))
+    assert sorted(index.subject_objects(RDFS.label)) == sorted(graph.subject_objects(RDFS.label))
+
+
+def test_empty_graph():
+    index = TripleIndex.from_graph(Graph())
+    assert len(index) == 0
+    assert list(index) == []
+    assert index.predicates() == []
+
+
+def test_defeasibility_entity_index_same_for_graph_and_index(graph):
+    assert _entity_index(TripleIndex.from_graph(graph), 5) == _entity_index(graph, 5)
@@ -0,0 +1,174 @@
+"""
+Unit tests for app.services.view_model_cache.
+
+The cache is exercised against the filesystem backend in a tmp directory with
+case_version patched, so no database or committed TTL is needed.
+"""
+
+import pytest
+from unittest.mock import patch
+
+from app.services import view_model_cache as vmc
+
+
+@pytest.fixture
+def fs_cache(tmp_path, monkeypatch):
+    """Fresh filesystem backend bounded at three entries."""
+    monkeypatch.setattr(vmc, '_backend', vmc._FilesystemBackend(tmp_path, max_entries=3))
+    monkeypatch.setattr(vmc, '_cache_enabled', lambda: True)
+    yield vmc._backend
+
+
+class TestCachedView:
+
+    def test_hit_skips_builder(self, fs_cache):
+        calls = []
+        with patch.object(vmc, 'case_version', return_value='v1'):
+            first = vmc.cached_view('entity_graph', 7, lambda: calls.append(1) or {'n': 1})
+            second = vmc.cached_view('entity_graph', 7, lambda: calls.append(1) or {'n': 2})
+        assert first == second == {'n': 1}
+        assert len(calls) == 1
+
+    def test_version_change_rebuilds_and_drops_old_entry(self, fs_cache, tmp_path):
+        with patch.object(vmc, 'case_version', return_value='v1'):
+            vmc.cached_view('entity_graph', 7, lambda: 'old')
+        with patch.object(vmc, 'case_version', return_value='v2'):
+            assert vmc.cached_view('entity_graph', 7, lambda: 'new') == 'new'
+        assert len(list(tmp_path.glob('7__entity_graph__*.pkl'))) == 1
+
+    def test_variant_is_part_of_key(self, fs_cache):
+        with patch.object(vmc, 'case_version', return_value='v1'):
+            vmc.cached_view('entity_graph', 7, lambda: 'plain', variant=(False,))
+            hubs = vmc.cached_view('entity_graph', 7, lambda: 'hubs', variant=(True,))
+            # writing the second variant must not evict the first
+            plain = vmc.cached_view('entity_graph', 7, lambda: 'rebuilt', variant=(False,))
+        assert hubs == 'hubs'
+        assert plain == 'plain'
+
+    def test_new_version_prunes_only_its_own_variant(self, fs_cache, tmp_path):
+        with patch.object(vmc, 'case_version', return_value='v1'):
+            vmc.cached_view('synthesis', 7, lambda: 'published', variant=(True,))
+            vmc.cached_view('synthesis', 7, lambda: 'draft', variant=(False,))
+        with patch.object(vmc, 'case_version', return_value='v2'):
+            vmc.cached_view('synthesis', 7, lambda: 'draft v2', variant=(False,))
+        assert len(list(tmp_path.glob('7__synthesis__*.pkl'))) == 2
+
+    def test_builder_exception_is_not_cached(self, fs_cache, tmp_path):
+        def boom():
+            raise FileNotFoundError('no TTL')
+        with patch.object(vmc, 'case_version', return_value='v1'):
+            with pytest.raises(FileNotFoundError):
+                vmc.cached_view('defeasibility', 7, boom)
+        assert not list(tmp_path.glob('*.pkl'))
+
+    def test_version_failure_builds_uncached(self, fs_cache, tmp_path):
+        with patch.object(vmc, 'case_version', side_effect=RuntimeError('db down')):
+            assert vmc.cached_view('entity_graph', 7, lambda: 'built') == 'built'
+        assert not list(tmp_path.glob('*.pkl'))
+
+
+class TestEvictionAndInvalidation:
+
+    def test_lru_bound(self, fs_cache, tmp_path):
+        with patch.object(vmc, 'case_version', return_value='v1'):
+            for cid in range(5):
+                vmc.cached_view('entity_graph', cid, lambda: cid)
+        assert len(list(tmp_path.glob('*.pkl'))) == 3
+
+    def test_invalidate_case_drops_case_and_cross_case_kinds(self, fs_cache, tmp_path):
+        with patch.object(vmc, 'case_version', return_value='v1'):
+            vmc.cached_view('entity_graph', 7, lambda: 'a')
+            vmc.cached_view('entity_graph', 8, lambda: 'b')
+            vmc.cached_view('defeasibility', 8, lambda: 'c')
+        assert vmc.invalidate_case(7) == 2
+        remaining = sorted(p.name.split('__')[:2] for p in tmp_path.glob('*.pkl'))
+        assert remaining == [['8', 'entity_graph']]
+
+
+class TestCacheDirectory:
+
+    def test_default_dir_is_private(self, tmp_path):
+        from app.utils.private_cache_dir import private_cache_dir
+        root = private_cache_dir('view-cache', str(tmp_path / 'view-cache'))
+        assert root.stat().st_mode & 0o777 == 0o700
+
+    def test_dir_owned_by_another_user_is_refused(self, tmp_path, monkeypatch):
+        from app.utils import private_cache_dir as pcd
+        monkeypatch.setattr(pcd.os, 'getuid', lambda: tmp_path.stat().st_uid + 1)
+        with pytest.raises(PermissionError):
+            pcd.private_cache_dir('view-cache', str(tmp_path))
+
+
+class TestCaseVersion:
+
+    @pytest.fixture
+    def rows(self, tmp_path, monkeypatch):
+        """Answers case_version's queries from ``rows`` keyed by the table they read first."""
+        from types import SimpleNamespace
+        from app import db
+        from app.services.entity import committed_case_graph
+        rows = {'temporary_rdf_storage': (3, 12, None, 1), 'extraction_prompts': (5,),
+                'documents': (None, 4, None, 90, None)}
+
+        def execute(statement, params=None):
+            table = next(t for t in rows if f'FROM {t}' in str(statement))
+            return SimpleNamespace(fetchone=lambda: rows[table], scalar=lambda: rows[table][0])
+
+        monkeypatch.setattr(db, 'session', SimpleNamespace(execute=execute))
+        monkeypatch.setattr(committed_case_graph, 'case_ttl_path', lambda case_id: tmp_path / 'none.ttl')
+        return rows
+
+    def test_section_and_guideline_edits_change_the_version(self, rows):
+        base = vmc.case_version(7)
+        rows['documents'] = (None, 4, '2026-10-18 12:00', 90, None)    # a case section edited
+        sections = vmc.case_version(7)
+        rows['documents'] = (None, 4, '2026-10-18 12:00', 91, None)    # a guideline section added
+        guideline = vmc.case_version(7)
+        assert len({base, sections, guideline}) == 3
+
+
+class TestSynthesisViewsClassDefinitions:
+
+    def test_ontserve_definitions_are_attached_after_the_cache(self, fs_cache, monkeypatch):
+        from types import SimpleNamespace
+        import psycopg2
+        from app.services.ontserve import ontserve_config
+        from app.services.validation.synthesis_view_builder import SynthesisViewBuilder
+        ontserve = {'Obligation': 'A duty.', 'Engineer in Responsible Charge': 'Signs off.'}
+        lookups = []
+
+        class _Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, sql, params):
+                lookups.append(params[0])
+                self.rows = [(label, ontserve[label]) for label in params[0] if label in ontserve]
+
+            def fetchall(self):
+                return self.rows
+
+        monkeypatch.setattr(ontserve_config, 'get_ontserve_db_config', lambda: {})
+        monkeypatch.setattr(psycopg2, 'connect', lambda **kwargs: SimpleNamespace(
+            cursor=_Cursor, close=lambda: None))
+        views = {'provisions': lambda self, case_id: {
+                     'type_definitions': self._fetch_class_definitions(self.TYPE_CHIP_LABELS)},
+                 'narrative': lambda self, case_id: {
+                     'grouped_main_characters': [{'role_suffixes': ['Engineer in Responsible Charge']}],
+                     'grouped_other_characters': []}}
+        with patch.object(vmc, 'case_version', return_value='v1'), \
+                patch.multiple(SynthesisViewBuilder, get_provisions_view=views['provisions'],
+                               get_narrative_view=views['narrative'], get_qc_view=lambda s, c: {},
+                               get_decisions_view=lambda s, c: {}, get_timeline_view=lambda s, c: {}):
+            SynthesisViewBuilder().get_all_views(7)
+            ontserve['Obligation'] = 'An updated duty.'
+            cached = SynthesisViewBuilder().get_all_views(7)
+
+        assert cached['provisions']['type_definitions'] == {'Obligation': 'An updated duty.'}
+        assert cached['narrative']['grouped_main_characters'][0]['role_suffix_details'] == {
+            'Engineer in Responsible Charge': 'Signs off.'}
+        # nothing is looked up while building; one lookup per call after the cache
+        assert len(lookups) == 2